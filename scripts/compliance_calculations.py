@@ -0,0 +1,1203 @@
+import numpy as np
+import pandas as pd
+from functools import reduce
+from pandas import Timestamp as ts
+from openpyxl.styles import Font
+from openpyxl.utils.cell import get_column_letter
+from openpyxl.worksheet.worksheet import Worksheet
+from ra_logging import hot_path_counters
+
+# local areas as they appear in the nqc list with the service territory used
+# to select a transmission loss adder, in the order of the local true-up sheet:
+local_areas = [
+    ['los_angeles','LA Basin','sce'],
+    ['ventura','Big Creek-Ventura','sce'],
+    ['san_diego','San Diego-IV','sdge'],
+    ['bay_area','Bay Area','pge'],
+    ['humboldt','Humboldt','pge'],
+    ['sierra','Sierra','pge'],
+    ['stockton','Stockton','pge'],
+    ['northern_california','NCNB','pge'],
+    ['fresno','Fresno','pge'],
+    ['kern','Kern','pge'],
+]
+
+# aggregated regions following the local areas on the local true-up sheet:
+aggregated_regions = [
+    ['pge_other',['humboldt','sierra','stockton','northern_california','fresno','kern']],
+    ['sce_tac_other',['los_angeles','ventura']],
+    ['sdge_tac_other',['san_diego']],
+    ['pge_tac_other',['bay_area','humboldt','sierra','stockton','northern_california','fresno','kern']],
+]
+
+def excel_round(value,decimals:int=0):
+    '''
+    rounds a number or series half away from zero, matching excel's round
+    function rather than python's round-half-to-even.
+
+    parameters:
+        value - a number or series of numbers
+        decimals - the number of decimal places to retain
+    '''
+    factor = 10**decimals
+    return np.sign(value) * np.floor(np.abs(value) * factor + 0.5) / factor
+
+def excel_text(value):
+    '''
+    converts a value to text as excel would when concatenating it with a
+    string, e.g., 100.0 becomes '100'.
+
+    parameters:
+        value - a number, boolean, string, or null value
+    '''
+    if value is None or (isinstance(value,float) and np.isnan(value)):
+        text = ''
+    elif isinstance(value,(bool,np.bool_)):
+        text = 'TRUE' if value else 'FALSE'
+    elif isinstance(value,(int,float,np.integer,np.floating)):
+        text = '{:.15g}'.format(value)
+    else:
+        text = str(value)
+    return text
+
+def to_text(series:pd.Series):
+    '''
+    converts a series to text with excel_text, converting each distinct value
+    only once.
+
+    parameters:
+        series - a series of cell values
+    '''
+    codes,uniques = pd.factorize(series)
+    texts = np.array([excel_text(value) for value in uniques]+[''],dtype=object)
+    return pd.Series(texts[codes],index=series.index)
+
+def to_number(series:pd.Series):
+    '''
+    converts a series to numbers, treating text and blank cells as zero as
+    excel's sum functions do.
+
+    parameters:
+        series - a series of cell values
+    '''
+    return pd.to_numeric(series,errors='coerce').fillna(0)
+
+def get_resource_table(physical_resources:pd.DataFrame,demand_response:pd.DataFrame,nqc_list:pd.DataFrame,organization_ids:list,filing_month:ts):
+    '''
+    stacks physical resources and demand response programs in the order they
+    are written to the physicalresources sheet of the summary workbook and
+    joins each resource to its zone, local area, and monthly nqc values. the
+    running resource totals are calculated across all load-serving entities.
+
+    parameters:
+        physical_resources - a dataframe of physical resources from all
+            monthly filings
+        demand_response - a dataframe of demand response programs from all
+            monthly filings
+        nqc_list - a dataframe containing the nqc list indexed by resource id
+        organization_ids - a list of organization ids in the order written
+            to the summary workbook
+        filing_month - a timestamp representing the filing month
+    '''
+    columns = [
+        'organization_id',
+        'contract_id',
+        'resource_id',
+        'resource_adequacy_system',
+        'resource_adequacy_local',
+        'resource_mcc_bucket',
+        'continuous_availability',
+        'resource_adequacy_committed_flexible',
+        'resource_adequacy_flexibility_category',
+    ]
+    month_columns = [ts(filing_month.year,month,1).to_numpy().astype('datetime64[M]') for month in range(1,13)]
+    resources = physical_resources.reindex(columns=columns).assign(source_order=0)
+    programs = demand_response.rename(columns={'program_id':'resource_id'}).reindex(columns=columns).assign(continuous_availability=False,source_order=1)
+    resource_table = pd.concat([resources,programs],axis='index',ignore_index=True)
+    resource_table.loc[:,'organization_order'] = resource_table.loc[:,'organization_id'].map({organization_id:i for i,organization_id in enumerate(organization_ids)})
+    resource_table = resource_table.loc[resource_table.loc[:,'organization_order'].notna(),:]
+    resource_table = resource_table.sort_values(['organization_order','source_order'],kind='mergesort').reset_index(drop=True)
+
+    # join to the first occurrence of each resource id in the nqc list:
+    nqc_lookup = nqc_list.loc[~nqc_list.index.duplicated(keep='first'),['zone','local_area']+month_columns]
+    resource_table = resource_table.merge(nqc_lookup,how='left',left_on='resource_id',right_index=True)
+    resource_table.loc[:,'nqc_match'] = resource_table.loc[:,'resource_id'].isin(nqc_lookup.index)
+
+    # running resource totals, labelling the last occurrence of each resource:
+    resource_keys = resource_table.loc[:,'resource_id'].fillna('')
+    resource_table.loc[:,'resource_total'] = to_number(resource_table.loc[:,'resource_adequacy_system']).groupby(resource_keys).cumsum()
+    resource_table.loc[:,'resource_final_row'] = resource_table.groupby(resource_keys).cumcount(ascending=False)==0
+    return resource_table.drop(columns=['organization_order','source_order'])
+
+def get_resource_allocations(resource_table:pd.DataFrame,filing_month:ts):
+    '''
+    totals the capacity shown for each resource across all load-serving
+    entities in a single grouping and compares each total against the
+    resource's nqc for the filing month.
+
+    parameters:
+        resource_table - a dataframe produced by get_resource_table
+        filing_month - a timestamp representing the filing month
+    '''
+    shown = pd.DataFrame({
+        'resource_id' : resource_table.loc[:,'resource_id'].fillna(''),
+        'organization_id' : resource_table.loc[:,'organization_id'],
+        'resource_adequacy_system' : to_number(resource_table.loc[:,'resource_adequacy_system']),
+        'zone' : resource_table.loc[:,'zone'],
+        'local_area' : resource_table.loc[:,'local_area'],
+        'nqc' : pd.to_numeric(resource_table.loc[:,filing_month.to_numpy().astype('datetime64[M]')],errors='coerce'),
+    })
+    resource_allocations = shown.groupby('resource_id').agg(
+        zone=('zone','first'),
+        local_area=('local_area','first'),
+        nqc=('nqc','first'),
+        total_shown=('resource_adequacy_system','sum'),
+        organization_count=('organization_id','nunique'),
+        row_count=('organization_id','size'),
+    )
+    organization_totals = shown.groupby(['resource_id','organization_id'],sort=False)['resource_adequacy_system'].sum()
+    resource_allocations.loc[:,'allocations'] = organization_totals.groupby(level='resource_id').apply(
+        lambda totals: '; '.join('{}: {} MW'.format(organization_id,excel_text(excel_round(total,2))) for (_,organization_id),total in totals.items())
+    )
+    resource_allocations.loc[:,'nqc_exceedance'] = (resource_allocations.loc[:,'total_shown'] - resource_allocations.loc[:,'nqc']).where(
+        resource_allocations.loc[:,'total_shown']>resource_allocations.loc[:,'nqc']
+    )
+    return resource_allocations
+
+def get_over_allocation_report(resource_allocations:pd.DataFrame):
+    '''
+    lists resources whose combined capacity shown across all load-serving
+    entities exceeds the filing month's nqc, largest exceedance first.
+
+    parameters:
+        resource_allocations - a dataframe produced by
+            get_resource_allocations
+    '''
+    columns = [
+        'resource_id',
+        'zone',
+        'local_area',
+        'nqc',
+        'total_shown',
+        'nqc_exceedance',
+        'organization_count',
+        'allocations',
+    ]
+    over_allocations = resource_allocations.loc[resource_allocations.loc[:,'nqc_exceedance'].notna(),:].reset_index()
+    return over_allocations.sort_values(['nqc_exceedance','resource_id'],ascending=[False,True]).loc[:,columns].reset_index(drop=True)
+
+def sum_by_organization(resource_table:pd.DataFrame,value_column:str,mask:pd.Series,organization_ids:list):
+    '''
+    sums a column of the resource table for each organization over rows
+    selected by a mask, as with a sumifs formula.
+
+    parameters:
+        resource_table - a dataframe produced by get_resource_table
+        value_column - the name of the column to sum
+        mask - a boolean series selecting rows of the resource table
+        organization_ids - a list of organization ids defining the order of
+            the result
+    '''
+    return to_number(resource_table.loc[mask,value_column]).groupby(resource_table.loc[mask,'organization_id']).sum().reindex(organization_ids,fill_value=0)
+
+def is_formula(value):
+    '''
+    checks whether a cell value read from a worksheet opened with formulas
+    is a formula string.
+
+    parameters:
+        value - a cell value
+    '''
+    return isinstance(value,str) and value.startswith('=')
+
+def numeric_equals(series:pd.Series,value):
+    '''
+    compares cell values to a number, matching numbers stored as text as excel's
+    sumifs criteria do.
+
+    parameters:
+        series - a series of cell values
+        value - the number to match
+    '''
+    return pd.to_numeric(series,errors='coerce')==value
+
+
+def get_zonal_values(zonal_inputs:pd.DataFrame,other_zonal_inputs:pd.DataFrame,resource_table:pd.DataFrame,zone:str,demand_response_multiplier:float):
+    '''
+    calculates the formula columns of the np26 or sp26 sheet in the summary
+    workbook.
+
+    parameters:
+        zonal_inputs - a dataframe with columns A, B, E, G, and K read from
+            the np26 or sp26 sheet, indexed by row number
+        other_zonal_inputs - the same columns read from the opposite zone's
+            sheet
+        resource_table - a dataframe produced by get_resource_table
+        zone - the path designation of the zone, 'North' or 'South'
+        demand_response_multiplier - the demand response multiplier option
+    '''
+    organization_ids = list(zonal_inputs.loc[:,'A'])
+    mask = (resource_table.loc[:,'zone']==zone) & (resource_table.loc[:,'resource_mcc_bucket']!='DR')
+    values = pd.DataFrame(index=zonal_inputs.index)
+    values.loc[:,'C'] = sum_by_organization(resource_table,'resource_adequacy_system',mask,organization_ids).values
+    values.loc[:,'H'] = demand_response_multiplier * to_number(zonal_inputs.loc[:,'G'])
+    values.loc[:,'D'] = excel_round(values.loc[:,'H'],2)
+    values.loc[:,'F'] = (to_number(zonal_inputs.loc[:,'B']) - values.loc[:,'C'] - values.loc[:,'D'] - to_number(zonal_inputs.loc[:,'E'])).clip(lower=0)
+    values.loc[:,'I'] = values.loc[:,'C'] + values.loc[:,'D']
+    values.loc[:,'L'] = values.loc[:,'C'] + values.loc[:,'D'] - to_number(zonal_inputs.loc[:,'B'])
+
+    # leave the cross-zone sum as a formula in rows where column K holds formulas:
+    k_formulas = zonal_inputs.loc[:,'K'].map(is_formula) | other_zonal_inputs.loc[:,'K'].map(is_formula).values
+    values.loc[:,'M'] = (to_number(zonal_inputs.loc[:,'K']) + to_number(other_zonal_inputs.loc[:,'K']).values).where(~k_formulas)
+    return values
+
+def get_mcc_check_values(mcc_inputs:pd.DataFrame,np26_values:pd.DataFrame,sp26_values:pd.DataFrame,resource_table:pd.DataFrame,mcc_parameters:list):
+    '''
+    calculates the formula columns of the mcc_check sheet in the summary
+    workbook.
+
+    parameters:
+        mcc_inputs - a dataframe with columns A and B, containing organization
+            ids and resource adequacy obligations, indexed by row number
+        np26_values - a dataframe produced by get_zonal_values for np26
+        sp26_values - a dataframe produced by get_zonal_values for sp26
+        resource_table - a dataframe produced by get_resource_table
+        mcc_parameters - a list of the six parameters in cells B2 through B7
+            of the mcc_parameters sheet
+    '''
+    organization_ids = list(mcc_inputs.loc[:,'A'])
+    def bucket_sum(bucket:int,continuous_availability:bool=False):
+        mask = numeric_equals(resource_table.loc[:,'resource_mcc_bucket'],bucket)
+        if continuous_availability:
+            mask = mask & (resource_table.loc[:,'continuous_availability']==True)
+        else:
+            pass
+        return sum_by_organization(resource_table,'resource_adequacy_system',mask,organization_ids).values
+    obligations = to_number(mcc_inputs.loc[:,'B'])
+    values = pd.DataFrame(index=mcc_inputs.index)
+    values.loc[:,'B'] = obligations
+    values.loc[:,'E'] = obligations * mcc_parameters[0]
+    values.loc[:,'F'] = np.minimum(values.loc[:,'E'],np26_values.loc[:,'H'] + sp26_values.loc[:,'H'])
+    values.loc[:,'G'] = obligations * mcc_parameters[1]
+    values.loc[:,'H'] = np.minimum(values.loc[:,'G'],bucket_sum(1))
+    values.loc[:,'I'] = obligations * mcc_parameters[2]
+    values.loc[:,'J'] = np.minimum(values.loc[:,'I'],bucket_sum(2) + values.loc[:,'H'])
+    values.loc[:,'K'] = obligations * mcc_parameters[3]
+    values.loc[:,'L'] = np.minimum(values.loc[:,'K'],bucket_sum(3) + values.loc[:,'J'])
+    values.loc[:,'M'] = obligations * mcc_parameters[4]
+    values.loc[:,'N'] = bucket_sum(4)
+    values.loc[:,'O'] = obligations * mcc_parameters[5]
+    values.loc[:,'P'] = bucket_sum(4,continuous_availability=True)
+    values.loc[:,'C'] = values.loc[:,'F'] + values.loc[:,'L'] + values.loc[:,'N']
+    values.loc[:,'D'] = (values.loc[:,'C'] / obligations.where(obligations!=0)).astype(object).where(obligations!=0,'')
+    return values
+
+def get_flex_rar_values(flex_inputs:pd.DataFrame,resource_table:pd.DataFrame):
+    '''
+    calculates the formula columns of the flexrar sheet in the summary
+    workbook.
+
+    parameters:
+        flex_inputs - a dataframe with columns A, L, M, N, Q, R, and S read
+            from the flexrar sheet, indexed by row number
+        resource_table - a dataframe produced by get_resource_table
+    '''
+    organization_ids = list(flex_inputs.loc[:,'A'])
+    def category_sum(category:int):
+        mask = numeric_equals(resource_table.loc[:,'resource_adequacy_flexibility_category'],category)
+        return sum_by_organization(resource_table,'resource_adequacy_committed_flexible',mask,organization_ids).values
+    inputs = flex_inputs.loc[:,['L','M','N','Q','R','S']].apply(to_number)
+    values = pd.DataFrame(index=flex_inputs.index)
+    values.loc[:,'E'] = excel_round(inputs.loc[:,'L'] + inputs.loc[:,'Q'])
+    values.loc[:,'F'] = category_sum(1)
+    values.loc[:,'G'] = excel_round(inputs.loc[:,'M'] + inputs.loc[:,'R'])
+    values.loc[:,'I'] = excel_round(inputs.loc[:,'N'] + inputs.loc[:,'S'])
+    values.loc[:,'H'] = np.minimum(values.loc[:,'G'] + values.loc[:,'I'],category_sum(2))
+    values.loc[:,'J'] = np.minimum(values.loc[:,'I'],category_sum(3))
+    values.loc[:,'B'] = values.loc[:,'E'] + values.loc[:,'G'] + values.loc[:,'I']
+    values.loc[:,'C'] = values.loc[:,'F'] + values.loc[:,'H'] + values.loc[:,'J']
+    values.loc[:,'D'] = (values.loc[:,'C'] / values.loc[:,'B'].where(values.loc[:,'B']!=0)).fillna(0)
+    values.loc[:,'O'] = inputs.loc[:,['L','M','N']].sum(axis='columns')
+    values.loc[:,'T'] = inputs.loc[:,['Q','R','S']].sum(axis='columns')
+    return values
+
+def get_certifying_officer_values(officer_inputs:pd.DataFrame):
+    '''
+    flags changes in certifying officer names and titles from the previous
+    month on the certifyingofficers sheet in the summary workbook.
+
+    parameters:
+        officer_inputs - a dataframe with columns B, C, D, and F read from the
+            certifyingofficers sheet, indexed by row number
+    '''
+    def changed(current:pd.Series,previous:pd.Series):
+        current_text = current.map(excel_text).str.upper()
+        previous_text = previous.map(excel_text).str.upper()
+        return pd.Series(np.where(current_text==previous_text,'-','Yes'),index=current.index)
+    values = pd.DataFrame(index=officer_inputs.index)
+    values.loc[:,'E'] = changed(officer_inputs.loc[:,'B'],officer_inputs.loc[:,'D'])
+    values.loc[:,'G'] = changed(officer_inputs.loc[:,'C'],officer_inputs.loc[:,'F'])
+    return values
+
+def get_compliance(rar:pd.Series,incremental:pd.Series,demand_response:pd.Series,procurement:pd.Series):
+    '''
+    calculates local compliance as procurement plus demand response less the
+    local requirement and incremental adjustment, labelling non-negative
+    results as 'compliant'.
+
+    parameters:
+        rar - a series of local resource adequacy requirements
+        incremental - a series of incremental local adjustments
+        demand_response - a series of demand response allocations
+        procurement - a series of local procurement
+    '''
+    net = to_number(procurement) + to_number(demand_response) - to_number(rar) - to_number(incremental)
+    return net.astype(object).where(net<0,'compliant')
+
+def get_local_procurement(resource_table:pd.DataFrame,organization_ids:list,organization_types:dict,transmission_loss_adders:dict):
+    '''
+    calculates local procurement for each organization and local area,
+    including the transmission loss adder applied to demand response for
+    organizations other than investor-owned utilities.
+
+    parameters:
+        resource_table - a dataframe produced by get_resource_table
+        organization_ids - a list of organization ids defining the order of
+            the result
+        organization_types - a dictionary mapping organization ids to types
+        transmission_loss_adders - a dictionary mapping service territories
+            'pge', 'sce', and 'sdge' to transmission loss adders
+    '''
+    local_area_keys = resource_table.loc[:,'local_area'].map(lambda s: s.lower() if isinstance(s,str) else s)
+    demand_response_mask = resource_table.loc[:,'resource_mcc_bucket']=='DR'
+    non_utility = pd.Series(
+        [organization_types.get(organization_id)!='investor-owned utility' for organization_id in organization_ids],
+        index=organization_ids
+    )
+    procurement = pd.DataFrame(index=organization_ids)
+    for locality,local_area,service_territory in local_areas:
+        mask = local_area_keys==local_area.lower()
+        procurement.loc[:,locality] = sum_by_organization(resource_table,'resource_adequacy_local',mask,organization_ids) + \
+            non_utility * round(transmission_loss_adders[service_territory]-1,4) * \
+            sum_by_organization(resource_table,'resource_adequacy_local',mask&demand_response_mask,organization_ids)
+    return procurement
+
+def get_local_trueup_values(local_inputs:pd.DataFrame,procurement:pd.DataFrame):
+    '''
+    calculates the procurement, compliance, and aggregated region columns of
+    the localtrueup sheet in the summary workbook.
+
+    parameters:
+        local_inputs - a dataframe with column A and the requirement,
+            incremental adjustment, and demand response columns of each local
+            area read from the localtrueup sheet, indexed by row number
+        procurement - a dataframe produced by get_local_procurement
+    '''
+    values = pd.DataFrame(index=local_inputs.index)
+    blocks = {}
+    for area_index,(locality,_,_) in enumerate(local_areas):
+        letters = [get_column_letter(2+5*area_index+offset) for offset in range(5)]
+        values.loc[:,letters[3]] = procurement.loc[list(local_inputs.loc[:,'A']),locality].values
+        blocks[locality] = [to_number(local_inputs.loc[:,letters[0]]),to_number(local_inputs.loc[:,letters[1]]),to_number(local_inputs.loc[:,letters[2]]),values.loc[:,letters[3]]]
+        values.loc[:,letters[4]] = get_compliance(*blocks[locality])
+    for region_index,(region,localities) in enumerate(aggregated_regions):
+        letters = [get_column_letter(2+5*(len(local_areas)+region_index)+offset) for offset in range(5)]
+        for offset in range(4):
+            values.loc[:,letters[offset]] = sum(blocks[locality][offset] for locality in localities)
+        values.loc[:,letters[4]] = get_compliance(*[values.loc[:,letters[offset]] for offset in range(4)])
+    return values
+
+def get_local_trueup_totals(local_trueup:pd.DataFrame):
+    '''
+    calculates the totals row of the localtrueup sheet, summing each column
+    and reporting compliance columns as 'compliant' unless any organization is
+    deficient.
+
+    parameters:
+        local_trueup - a dataframe with columns B through BS read from the
+            localtrueup sheet, indexed by row number
+    '''
+    totals = {}
+    for column_number in range(2,72):
+        column_letter = get_column_letter(column_number)
+        total = to_number(local_trueup.loc[:,column_letter]).sum()
+        if column_number%5==1 and total>=0:
+            totals[column_letter] = 'compliant'
+        else:
+            totals[column_letter] = total
+    return totals
+
+def get_requirements_values(requirements_inputs:pd.DataFrame):
+    '''
+    calculates the formula columns of the requirements sheet in the caiso
+    supply plan cross-check workbook.
+
+    parameters:
+        requirements_inputs - a dataframe with columns B, C, D, M, N, O, P,
+            Q, and R and each local area's requirement, incremental
+            adjustment, demand response, and procurement columns from X
+            through CN, indexed by row number
+    '''
+    inputs = requirements_inputs.apply(to_number)
+    values = pd.DataFrame(index=requirements_inputs.index)
+    values.loc[:,'E'] = inputs.loc[:,'C'] + inputs.loc[:,'D']
+    values.loc[:,'F'] = excel_round(values.loc[:,'E'] / inputs.loc[:,'B'].where(inputs.loc[:,'B']!=0),2).astype(object).where(inputs.loc[:,'B']!=0,'')
+    values.loc[:,'J'] = inputs.loc[:,'M'] + inputs.loc[:,'O'] + inputs.loc[:,'Q']
+    values.loc[:,'K'] = inputs.loc[:,'N'] + inputs.loc[:,'P'] + inputs.loc[:,'R']
+    values.loc[:,'L'] = (values.loc[:,'K'] / values.loc[:,'J'].where(values.loc[:,'J']!=0)).fillna(0)
+    for block_index in range(len(local_areas)+len(aggregated_regions)):
+        letters = [get_column_letter(24+5*block_index+offset) for offset in range(5)]
+        values.loc[:,letters[4]] = get_compliance(*[inputs.loc[:,letters[offset]] for offset in range(4)])
+    return values
+
+def get_nqc_lookup_values(resource_table:pd.DataFrame,first_row:int,filing_month:ts):
+    '''
+    provides the zone, local area, monthly nqc, and nqc match columns of the
+    physicalresources sheet in the summary workbook.
+
+    parameters:
+        resource_table - a dataframe produced by get_resource_table
+        first_row - the row number of the first resource on the sheet
+        filing_month - a timestamp representing the filing month
+    '''
+    values = pd.DataFrame(index=range(first_row,first_row+len(resource_table)))
+    values.loc[:,'J'] = resource_table.loc[:,'zone'].fillna('').values
+    values.loc[:,'K'] = resource_table.loc[:,'local_area'].fillna('').values
+    for month in range(1,13):
+        month_column = ts(filing_month.year,month,1).to_numpy().astype('datetime64[M]')
+        # matched resources with blank nqc values appear as zero, as with index():
+        monthly_nqc = resource_table.loc[:,month_column].fillna(0).astype(object)
+        values.loc[:,get_column_letter(11+month)] = monthly_nqc.where(resource_table.loc[:,'nqc_match'],'').values
+    values.loc[:,'Z'] = np.where(resource_table.loc[:,'nqc_match'].values,'','No Match')
+    return values
+
+def get_resource_total_values(resource_table:pd.DataFrame,resource_allocations:pd.DataFrame,first_row:int):
+    '''
+    provides the resource total and nqc exceedance columns of the
+    physicalresources sheet in the summary workbook. rows preceding the last
+    occurrence of a resource show the running total and are labelled
+    'Partial', while the last occurrence shows the total across all
+    load-serving entities and any exceedance of nqc.
+
+    parameters:
+        resource_table - a dataframe produced by get_resource_table
+        resource_allocations - a dataframe produced by
+            get_resource_allocations
+        first_row - the row number of the first resource on the sheet
+    '''
+    values = pd.DataFrame(index=range(first_row,first_row+len(resource_table)))
+    final_row = resource_table.loc[:,'resource_final_row'].values
+    resource_total = resource_table.loc[:,'resource_total'].values
+    nqc_exceedance = resource_table.loc[:,'resource_id'].fillna('').map(resource_allocations.loc[:,'nqc_exceedance']).where(final_row).values
+    values.loc[:,'X'] = np.where(final_row,'',pd.Series(resource_total).astype(object))
+    values.loc[:,'Y'] = np.where(final_row,['Resource Total: {} MW'.format(excel_text(excel_round(total,2))) for total in resource_total],'Partial')
+    values.loc[:,'AA'] = [
+        'Resource Total Exceeds NQC by {} MW'.format(excel_text(excel_round(exceedance,2))) if pd.notna(exceedance) else ''
+        for exceedance in nqc_exceedance
+    ]
+    return values
+
+# columns read from the filings sheet of the caiso supply plan cross-check
+# workbook, labelled as in the monthly filings:
+cross_check_filing_columns = {
+    'A' : 'organization_id',
+    'B' : 'contract_id',
+    'C' : 'resource_id',
+    'G' : 'resource_adequacy_system',
+    'H' : 'resource_adequacy_local',
+    'M' : 'resource_adequacy_committed_flexible',
+    'Q' : 'resource_adequacy_flexibility_category',
+}
+
+# formulas written to each row of the caiso supply plan sheets of the
+# cross-check workbook, and the columns to which supply plan data are copied:
+supply_plan_sheet_formulas = {
+    'CAISO_Sys_SP' : {
+        'A' : '=CONCATENATE(INDIRECT("C"&ROW()),INDIRECT("F"&ROW()),INDIRECT("I"&ROW()))',
+        'B' : '=CONCATENATE(INDIRECT("C"&ROW()),INDIRECT("F"&ROW()))',
+        'C' : '=VLOOKUP(INDIRECT("N"&ROW()),LoadServingEntities!B:C,2,FALSE)',
+        'J' : '=SUMIFS(I:I,C:C,INDIRECT("C"&ROW()),F:F,INDIRECT("F"&ROW()))',
+        'K' : '=SUMIFS(G:G,C:C,INDIRECT("C"&ROW()),F:F,INDIRECT("F"&ROW()))',
+        'P' : '=IF(ISNA(VLOOKUP(INDIRECT("A"&ROW()),Filings!D:D,1,FALSE)),"N","-")',
+    },
+    'CAISO_Flex_SP' : {
+        'A' : '=CONCATENATE(INDIRECT("B"&ROW()),INDIRECT("E"&ROW()),INDIRECT("G"&ROW()))',
+        'B' : '=VLOOKUP(INDIRECT("K"&ROW()),LoadServingEntities!B:C,2,FALSE)',
+        'H' : '=SUMIFS(G:G,B:B,INDIRECT("B"&ROW()),E:E,INDIRECT("E"&ROW()),F:F,INDIRECT("F"&ROW()))',
+        'M' : '=IF(ISNA(VLOOKUP(INDIRECT("A"&ROW()),Filings!F:F,1,FALSE)),"N","-")',
+    },
+}
+supply_plan_sheet_columns = {
+    'CAISO_Sys_SP' : list('DEFGHILMNO'),
+    'CAISO_Flex_SP' : list('CDEFGIJKL'),
+}
+
+# headers for the matched tables written to the cross-check workbook:
+supply_plan_match_headers = {
+    'organization_id' : 'Organization ID',
+    'resource_id' : 'Resource ID',
+    'category' : 'Flexibility Category',
+    'filed_system' : 'Filed System RA (MW)',
+    'filed_local' : 'Filed Local RA (MW)',
+    'filed_flexible' : 'Filed Flexible RA (MW)',
+    'supply_plan_system' : 'Supply Plan System RA (MW)',
+    'supply_plan_local' : 'Supply Plan Local RA (MW)',
+    'supply_plan_total' : 'Supply Plan Total Capacity (MW)',
+    'supply_plan_flexible' : 'Supply Plan Flexible RA (MW)',
+    'system_discrepancy' : 'System Discrepancy (MW)',
+    'local_discrepancy' : 'Local Discrepancy (MW)',
+    'flexible_discrepancy' : 'Flexible Discrepancy (MW)',
+    'status' : 'Status',
+}
+
+def is_blank(series:pd.Series):
+    '''
+    identifies empty cells in a series of cell values.
+
+    parameters:
+        series - a series of cell values
+    '''
+    return series.map(lambda v: v is None or (isinstance(v,str) and v=='') or (isinstance(v,float) and np.isnan(v)))
+
+def get_match_keys(frame:pd.DataFrame,columns:list):
+    '''
+    converts key columns to upper-case text as excel compares them in lookups,
+    so that numbers such as 100.0 and 100 produce the same key.
+
+    parameters:
+        frame - a dataframe containing the key columns
+        columns - a list of column names to convert
+    '''
+    return pd.DataFrame({column : to_text(frame.loc[:,column]).str.upper() for column in columns},index=frame.index)
+
+def map_load_serving_entities(supply_plan:pd.DataFrame,load_serving_entities:dict):
+    '''
+    adds an organization_id column to a caiso supply plan from the caiso load-
+    serving entity id column. unrecognized entities are left null.
+
+    parameters:
+        supply_plan - a dataframe produced by read_supply_plan
+        load_serving_entities - a dictionary mapping upper-case caiso
+            load-serving entity ids to organization ids
+    '''
+    return supply_plan.assign(
+        organization_id=to_text(supply_plan.loc[:,'organization_id_caiso']).str.upper().map(load_serving_entities)
+    )
+
+def get_supply_plan_matches(filings:pd.DataFrame,supply_plan_system:pd.DataFrame,supply_plan_flexible:pd.DataFrame):
+    '''
+    joins monthly filings against caiso supply plans, summing capacity on each
+    side by load-serving entity and resource (and flexibility category for
+    flexible capacity) before an outer join, so each pair appears once with
+    its discrepancies and whether it is missing from either side.
+
+    parameters:
+        filings - a dataframe of filed resources with the columns named in
+            cross_check_filing_columns
+        supply_plan_system - a dataframe produced by read_supply_plan for the
+            system supply plan with an organization_id column added by
+            map_load_serving_entities
+        supply_plan_flexible - a dataframe produced by read_supply_plan for
+            the flexible supply plan with an organization_id column added by
+            map_load_serving_entities
+    '''
+    resource_keys = ['organization_id','resource_id']
+    flexible_keys = resource_keys + ['category']
+    match_status = {
+        'both' : 'Matched',
+        'left_only' : 'Missing in Supply Plan',
+        'right_only' : 'Missing in Filing',
+    }
+    def outer_join(filed:pd.DataFrame,planned:pd.DataFrame,keys:list):
+        filed = filed.groupby(keys,sort=False).sum()
+        planned = planned.groupby(keys,sort=False).sum()
+        matches = filed.merge(planned,how='outer',left_index=True,right_index=True,indicator='status')
+        matches = matches.assign(status=matches.loc[:,'status'].astype(str).map(match_status))
+        value_columns = list(filed.columns) + list(planned.columns)
+        matches.loc[:,value_columns] = matches.loc[:,value_columns].fillna(0)
+        return matches.sort_index().reset_index()
+
+    # system and local capacity by load-serving entity and resource:
+    system_mapped = supply_plan_system.loc[:,'organization_id'].notna()
+    filed_system = get_match_keys(filings,resource_keys).assign(
+        filed_system=to_number(filings.loc[:,'resource_adequacy_system']),
+        filed_local=to_number(filings.loc[:,'resource_adequacy_local']),
+    )
+    planned_system = get_match_keys(supply_plan_system.loc[system_mapped,:],resource_keys).assign(
+        supply_plan_system=to_number(supply_plan_system.loc[system_mapped,'system_resource_adequacy']),
+        supply_plan_local=to_number(supply_plan_system.loc[system_mapped,'local_resource_adequacy']),
+        supply_plan_total=to_number(supply_plan_system.loc[system_mapped,'total_capacity']),
+    )
+    system_matches = outer_join(filed_system,planned_system,resource_keys)
+    system_matches.loc[:,'system_discrepancy'] = system_matches.loc[:,'supply_plan_total'] - system_matches.loc[:,'filed_system']
+    system_matches.loc[:,'local_discrepancy'] = system_matches.loc[:,'supply_plan_local'] - system_matches.loc[:,'filed_local']
+
+    # flexible capacity by load-serving entity, resource, and category:
+    flexible_filings = filings.loc[~is_blank(filings.loc[:,'resource_adequacy_committed_flexible']),:]
+    flexible_filings = flexible_filings.assign(category=flexible_filings.loc[:,'resource_adequacy_flexibility_category'])
+    flexible_mapped = supply_plan_flexible.loc[:,'organization_id'].notna()
+    filed_flexible = get_match_keys(flexible_filings,flexible_keys).assign(
+        filed_flexible=to_number(flexible_filings.loc[:,'resource_adequacy_committed_flexible']),
+    )
+    planned_flexible = get_match_keys(supply_plan_flexible.loc[flexible_mapped,:],flexible_keys).assign(
+        supply_plan_flexible=to_number(supply_plan_flexible.loc[flexible_mapped,'flex_capacity']),
+    )
+    flexible_matches = outer_join(filed_flexible,planned_flexible,flexible_keys)
+    flexible_matches.loc[:,'flexible_discrepancy'] = flexible_matches.loc[:,'supply_plan_flexible'] - flexible_matches.loc[:,'filed_flexible']
+
+    # list the match status after the discrepancies:
+    system_matches = system_matches.loc[:,[column for column in system_matches.columns if column!='status']+['status']]
+    flexible_matches = flexible_matches.loc[:,[column for column in flexible_matches.columns if column!='status']+['status']]
+
+    return (system_matches,flexible_matches)
+
+def get_supply_plan_values(filings:pd.DataFrame,supply_plan_system:pd.DataFrame,supply_plan_flexible:pd.DataFrame,system_matches:pd.DataFrame,flexible_matches:pd.DataFrame,organization_ids:list):
+    '''
+    calculates the key, sum, and discrepancy columns comparing monthly filings
+    against caiso supply plans on the filings, caiso_sys_sp, caiso_flex_sp,
+    and filingsummary sheets of the caiso supply plan cross-check workbook.
+
+    parameters:
+        filings - a dataframe with columns A, B, C, G, H, M, and Q read from
+            the filings sheet, indexed by row number
+        supply_plan_system - a dataframe produced by read_supply_plan for the
+            system supply plan with an organization_id column added by
+            map_load_serving_entities, indexed by row number
+        supply_plan_flexible - a dataframe produced by read_supply_plan for
+            the flexible supply plan with an organization_id column added by
+            map_load_serving_entities, indexed by row number
+        system_matches - the system matches produced by
+            get_supply_plan_matches
+        flexible_matches - the flexible matches produced by
+            get_supply_plan_matches
+        organization_ids - a list of organization ids in the order of the
+            filingsummary sheet
+    '''
+    def key(*columns):
+        return reduce(lambda a,b: a+b,[to_text(column) for column in columns])
+    def lookup(matches:pd.DataFrame,value_column:str,keys:pd.DataFrame):
+        index = pd.MultiIndex.from_frame(keys)
+        return pd.Series(matches.set_index(list(keys.columns)).loc[:,value_column].reindex(index).fillna(0).values,index=keys.index)
+    def discrepancy(supply_plan_total:pd.Series,filing_total:pd.Series):
+        return pd.Series([
+            'Y: {} MW'.format(excel_text(supply_plan_value-filing_value)) if supply_plan_value!=filing_value else '-'
+            for supply_plan_value,filing_value in zip(supply_plan_total,filing_total)
+        ],index=filing_total.index)
+    def missing_flag(present:pd.Series,applicable:pd.Series):
+        return pd.Series(np.where(applicable,np.where(present,'-','N'),''),index=present.index)
+    resource_keys = ['organization_id','resource_id']
+    flexible_keys = resource_keys + ['category']
+    flexible_resource_matches = flexible_matches.groupby(resource_keys,sort=False).sum(numeric_only=True).reset_index()
+
+    # caiso system supply plan:
+    system = supply_plan_system
+    system_mapped = system.loc[:,'organization_id'].notna()
+    system_values = pd.DataFrame(index=system.index)
+    system_values.loc[:,'A'] = key(system.loc[:,'organization_id'],system.loc[:,'resource_id'],system.loc[:,'total_capacity']).where(system_mapped)
+    system_values.loc[:,'B'] = key(system.loc[:,'organization_id'],system.loc[:,'resource_id']).where(system_mapped)
+    system_values.loc[:,'C'] = system.loc[:,'organization_id']
+    system_resource_keys = get_match_keys(system,resource_keys)
+    system_values.loc[:,'J'] = lookup(system_matches,'supply_plan_total',system_resource_keys).where(system_mapped)
+    system_values.loc[:,'K'] = lookup(system_matches,'supply_plan_local',system_resource_keys).where(system_mapped)
+
+    # caiso flexible supply plan:
+    flexible = supply_plan_flexible
+    flexible_mapped = flexible.loc[:,'organization_id'].notna()
+    flexible_values = pd.DataFrame(index=flexible.index)
+    flexible_values.loc[:,'A'] = key(flexible.loc[:,'organization_id'],flexible.loc[:,'resource_id'],flexible.loc[:,'flex_capacity']).where(flexible_mapped)
+    flexible_values.loc[:,'B'] = flexible.loc[:,'organization_id']
+    flexible_values.loc[:,'H'] = lookup(flexible_matches,'supply_plan_flexible',get_match_keys(flexible,flexible_keys)).where(flexible_mapped)
+
+    # monthly filings:
+    filing_resource_keys = get_match_keys(filings.loc[:,['A','C']].rename(columns={'A':'organization_id','C':'resource_id'}),resource_keys)
+    filings_values = pd.DataFrame(index=filings.index)
+    filings_values.loc[:,'D'] = key(filings.loc[:,'A'],filings.loc[:,'C'],filings.loc[:,'G'])
+    filings_values.loc[:,'E'] = key(filings.loc[:,'A'],filings.loc[:,'C'])
+    filings_values.loc[:,'F'] = key(filings.loc[:,'A'],filings.loc[:,'C'],filings.loc[:,'M'])
+    filings_values.loc[:,'I'] = lookup(system_matches,'filed_system',filing_resource_keys)
+    filings_values.loc[:,'J'] = lookup(system_matches,'supply_plan_total',filing_resource_keys)
+    filings_values.loc[:,'K'] = discrepancy(filings_values.loc[:,'J'],filings_values.loc[:,'I'])
+    filings_values.loc[:,'N'] = lookup(flexible_resource_matches,'filed_flexible',filing_resource_keys)
+    filings_values.loc[:,'O'] = lookup(flexible_resource_matches,'supply_plan_flexible',filing_resource_keys)
+    filings_values.loc[:,'P'] = discrepancy(filings_values.loc[:,'O'],filings_values.loc[:,'N'])
+
+    # missing flags, matching on load-serving entity, resource, and capacity:
+    system_capacity_keys = set(system_values.loc[system_mapped,'A'].str.upper())
+    flexible_capacity_keys = set(flexible_values.loc[flexible_mapped,'A'].str.upper())
+    filing_system_keys = set(filings_values.loc[:,'D'].str.upper())
+    filing_flexible_keys = set(filings_values.loc[:,'F'].str.upper())
+    supply_plan_resources = system_matches.loc[system_matches.loc[:,'status']!='Missing in Supply Plan',resource_keys]
+    filings_values.loc[:,'S'] = missing_flag(
+        filings_values.loc[:,'D'].str.upper().isin(system_capacity_keys),
+        ~is_blank(filings.loc[:,'G'])
+    )
+    filings_values.loc[:,'T'] = missing_flag(
+        pd.Series(pd.MultiIndex.from_frame(filing_resource_keys).isin(pd.MultiIndex.from_frame(supply_plan_resources)),index=filings.index),
+        ~is_blank(filings.loc[:,'H']) & (pd.to_numeric(filings.loc[:,'H'],errors='coerce')!=0)
+    )
+    filings_values.loc[:,'U'] = missing_flag(
+        filings_values.loc[:,'F'].str.upper().isin(flexible_capacity_keys),
+        ~is_blank(filings.loc[:,'M'])
+    )
+    system_values.loc[:,'P'] = missing_flag(
+        system_values.loc[:,'A'].fillna('').str.upper().isin(filing_system_keys) & system_mapped,
+        pd.Series(True,index=system.index)
+    )
+    flexible_values.loc[:,'M'] = missing_flag(
+        flexible_values.loc[:,'A'].fillna('').str.upper().isin(filing_flexible_keys) & flexible_mapped,
+        pd.Series(True,index=flexible.index)
+    )
+
+    # filing summary by organization:
+    def organization_sum(matches:pd.DataFrame,value_column:str,mask:pd.Series=None):
+        if mask is not None:
+            matches = matches.loc[mask,:]
+        else:
+            pass
+        return matches.loc[:,value_column].groupby(matches.loc[:,'organization_id']).sum().reindex([str(s).upper() for s in organization_ids],fill_value=0).values
+    filing_summary_values = pd.DataFrame(index=range(2,2+len(organization_ids)))
+    filing_summary_values.loc[:,'B'] = organization_sum(system_matches,'filed_system')
+    filing_summary_values.loc[:,'C'] = organization_sum(system_matches,'supply_plan_total')
+    filing_summary_values.loc[:,'D'] = filing_summary_values.loc[:,'C'] - filing_summary_values.loc[:,'B']
+    for category,(filing_column,supply_plan_column,difference_column) in enumerate([['E','F','G'],['H','I','J'],['K','L','M']],start=1):
+        category_mask = numeric_equals(flexible_matches.loc[:,'category'],category)
+        filing_summary_values.loc[:,filing_column] = organization_sum(flexible_matches,'filed_flexible',category_mask)
+        filing_summary_values.loc[:,supply_plan_column] = organization_sum(flexible_matches,'supply_plan_flexible',category_mask)
+        filing_summary_values.loc[:,difference_column] = filing_summary_values.loc[:,supply_plan_column] - filing_summary_values.loc[:,filing_column]
+    filing_summary_values.loc[:,'Y'] = filing_summary_values.loc[:,'M']
+
+    return (filings_values,system_values,flexible_values,filing_summary_values)
+
+def get_column_totals(sheet_values:pd.DataFrame):
+    '''
+    sums each column of values read from a worksheet, as with a sum formula in
+    a totals row. columns which still contain formulas are returned as null
+    so the totals formula is left in place.
+
+    parameters:
+        sheet_values - a dataframe of cell values labelled by column letter
+    '''
+    totals = sheet_values.apply(to_number).sum()
+    formula_columns = sheet_values.apply(lambda column: column.map(is_formula)).any()
+    return totals.where(~formula_columns)
+
+def write_static_values(worksheet:Worksheet,values:pd.DataFrame,audit_entries:list,formulas:dict=None):
+    '''
+    writes calculated values over the formulas in a worksheet, recording the
+    first formula replaced in each column for the audit sheet. null values are
+    skipped, leaving any existing formula in place.
+
+    parameters:
+        worksheet - the worksheet to which values are written
+        values - a dataframe indexed by row number with columns labelled by
+            column letter
+        audit_entries - a list to which a dictionary describing each
+            replaced column is appended
+        formulas - an optional dictionary of formulas by column letter for
+            columns whose formulas were not written to the worksheet. each
+            formula is recorded for the audit sheet as the formula replaced
+            in its column, and is written to rows with null values.
+    '''
+    if formulas is None:
+        formulas = dict()
+    else:
+        pass
+    for column_letter in values.columns:
+        column_values = values.loc[:,column_letter]
+        written_rows = column_values.index[column_values.notna()]
+        if len(written_rows)>0:
+            formula = formulas.get(column_letter,worksheet[f'{column_letter}{written_rows[0]}'].value)
+            if is_formula(formula):
+                audit_entries.append({
+                    'worksheet' : worksheet.title,
+                    'column' : column_letter,
+                    'first_row' : int(written_rows[0]),
+                    'last_row' : int(written_rows[-1]),
+                    'formula' : formula,
+                })
+            else:
+                pass
+            for row_number in written_rows:
+                value = column_values.loc[row_number]
+                if isinstance(value,np.generic):
+                    value = value.item()
+                else:
+                    pass
+                worksheet[f'{column_letter}{row_number}'].value = value
+        else:
+            pass
+        if column_letter in formulas.keys():
+            formula_rows = column_values.index[column_values.isna()]
+            for row_number in formula_rows:
+                worksheet[f'{column_letter}{row_number}'].value = formulas[column_letter]
+        else:
+            formula_rows = []
+        hot_path_counters.count('write_static_values',len(written_rows)+len(formula_rows))
+
+def write_audit_sheet(workbook,audit_entries:list):
+    '''
+    writes a sheet to a workbook listing each column in which formulas were
+    replaced with static values along with an example of the replaced formula.
+    entries are appended if the sheet already exists.
+
+    parameters:
+        workbook - an openpyxl workbook open for writing
+        audit_entries - a list of dictionaries produced by write_static_values
+    '''
+    if 'FormulaAudit' in workbook.sheetnames:
+        worksheet = workbook['FormulaAudit']
+    else:
+        worksheet = workbook.create_sheet('FormulaAudit')
+        for column_letter,header in zip('ABCD',['Worksheet','Column','Rows','Replaced Formula (First Row)']):
+            worksheet[f'{column_letter}1'].value = header
+            worksheet[f'{column_letter}1'].font = Font(bold=True)
+    row_number = worksheet.max_row + 1
+    for entry in audit_entries:
+        worksheet[f'A{row_number}'].value = entry['worksheet']
+        worksheet[f'B{row_number}'].value = entry['column']
+        worksheet[f'C{row_number}'].value = '{}:{}'.format(entry['first_row'],entry['last_row'])
+        # store the formula as text so it is displayed rather than evaluated:
+        worksheet[f'D{row_number}'].value = entry['formula']
+        worksheet[f'D{row_number}'].data_type = 's'
+        row_number += 1
+    hot_path_counters.count('write_audit_sheet',4*len(audit_entries))
+
+def write_match_sheet(workbook,sheet_name:str,matches:pd.DataFrame):
+    '''
+    writes a table of matches produced by get_supply_plan_matches to a sheet
+    as values, replacing the sheet if it already exists.
+
+    parameters:
+        workbook - an openpyxl workbook open for writing
+        sheet_name - the name of the sheet to write
+        matches - a dataframe of system or flexible matches
+    '''
+    if sheet_name in workbook.sheetnames:
+        workbook.remove(workbook[sheet_name])
+    else:
+        pass
+    worksheet = workbook.create_sheet(sheet_name)
+    worksheet.append([supply_plan_match_headers.get(column,column) for column in matches.columns])
+    for cell in worksheet[1]:
+        cell.font = Font(bold=True)
+    for row in matches.itertuples(index=False):
+        worksheet.append([value.item() if isinstance(value,np.generic) else value for value in row])
+    worksheet.freeze_panes = 'A2'
+    hot_path_counters.count('write_match_sheet',(len(matches)+1)*len(matches.columns))
+
+# sheets compared between consolidation runs, with the row number of the first
+# load serving entity on each sheet:
+consolidation_metric_sheets = [
+    ['ra_summary','NP26',2],
+    ['ra_summary','SP26',2],
+    ['ra_summary','MCC_Check',2],
+    ['ra_summary','FlexRAR',2],
+    ['ra_summary','LocalTrueUp',2],
+    ['caiso_cross_check','Requirements',3],
+    ['caiso_cross_check','FilingSummary',2],
+]
+consolidation_metric_columns = ['organization_id','workbook','sheet','column','header','value']
+
+def get_sheet_metrics(worksheet:Worksheet,workbook_name:str,first_row:int):
+    '''
+    reads the numeric values in each load serving entity's row of a worksheet
+    into a long table with one metric per row, labelled by column letter and
+    by the header in the row above the first load serving entity. rows are
+    read until column a is blank or contains a total.
+
+    parameters:
+        worksheet - an openpyxl worksheet with organization ids in column a
+        workbook_name - the path id of the workbook containing the worksheet,
+            either 'ra_summary' or 'caiso_cross_check'
+        first_row - the row number of the first load serving entity
+    '''
+    metrics = []
+    headers = ()
+    for row_number,row in enumerate(worksheet.iter_rows(min_row=first_row-1,values_only=True),start=first_row-1):
+        if row_number<first_row:
+            headers = row
+        elif len(row)==0 or row[0] is None or str(row[0]).lower().startswith('total'):
+            break
+        else:
+            for column_number,value in enumerate(row[1:],start=2):
+                if isinstance(value,(int,float)) and not isinstance(value,bool):
+                    header = headers[column_number-1] if column_number<=len(headers) else None
+                    metrics.append([row[0],workbook_name,worksheet.title,get_column_letter(column_number),'' if header is None else str(header),float(value)])
+                else:
+                    pass
+    return pd.DataFrame(metrics,columns=consolidation_metric_columns)
+
+def get_metric_differences(previous_metrics:pd.DataFrame,current_metrics:pd.DataFrame,tolerance:float=1e-6):
+    '''
+    compares two tables of consolidation metrics, returning each metric which
+    was added, removed, or changed by more than the tolerance, sorted by load
+    serving entity. text metrics such as compliance are compared as strings.
+
+    parameters:
+        previous_metrics - a dataframe with consolidation_metric_columns from
+            the earlier consolidation
+        current_metrics - a dataframe with consolidation_metric_columns from
+            the later consolidation
+        tolerance - the largest absolute difference treated as unchanged
+    '''
+    keys = ['organization_id','workbook','sheet','column']
+    comparison = previous_metrics.merge(current_metrics,how='outer',on=keys,suffixes=('_previous','_current'),indicator=True)
+    previous_numbers = pd.to_numeric(comparison.loc[:,'value_previous'],errors='coerce')
+    current_numbers = pd.to_numeric(comparison.loc[:,'value_current'],errors='coerce')
+    numeric = previous_numbers.notna() & current_numbers.notna()
+    comparison = comparison.assign(
+        header=comparison.loc[:,'header_current'].fillna(comparison.loc[:,'header_previous']),
+        difference=(current_numbers - previous_numbers).where(numeric),
+        status=comparison.loc[:,'_merge'].astype(str).map({'both':'Changed','left_only':'Removed','right_only':'Added'}),
+    )
+    changed = (comparison.loc[:,'status']!='Changed') | \
+        (numeric & (comparison.loc[:,'difference'].abs()>tolerance)) | \
+        (~numeric & (comparison.loc[:,'value_previous'].astype(str)!=comparison.loc[:,'value_current'].astype(str)))
+    return comparison.loc[changed,keys+['header','value_previous','value_current','difference','status']].sort_values(keys).reset_index(drop=True)
+
+# august demand response allocations by local area, with the iou territory of
+# the load forecasts used to allocate them and the allocation type:
+august_demand_response_allocations = [
+    ['los_angeles','SCE','prorated'],
+    ['ventura','SCE','prorated'],
+    ['san_diego','SDGE','prorated'],
+    ['bay_area','PGE','prorated'],
+    ['fresno','PGE','base'],
+    ['sierra','PGE','base'],
+    ['stockton','PGE','base'],
+    ['kern','PGE','base'],
+    ['humboldt','PGE','base'],
+    ['northern_california','PGE','base'],
+]
+
+# allocation components calculated for each load serving entity and month, in
+# the order of the columns of the summary table in consolidate_allocations:
+allocation_components = [
+    'np26_ra_obligation',
+    'sn_path26_allocation',
+    'sp26_ra_obligation',
+    'ns_path26_allocation',
+    'system_rmr_credit',
+    'np26_cpe_system_cam',
+    'sp26_cpe_system_cam',
+    'year_ahead_flex_rar_category1',
+    'year_ahead_flex_rar_category2',
+    'year_ahead_flex_rar_category3',
+    'year_ahead_flex_incremental_category1',
+    'year_ahead_flex_incremental_category2',
+    'year_ahead_flex_incremental_category3',
+] + ['{}_local_rar'.format(allocation[0]) for allocation in august_demand_response_allocations] \
+  + ['{}_august_demand_response'.format(allocation[0]) for allocation in august_demand_response_allocations] \
+  + ['{}_incremental_load'.format(allocation[0]) for allocation in august_demand_response_allocations]
+
+# allocation components included in the annual obligation report:
+annual_obligation_components = [
+    'np26_ra_obligation',
+    'sp26_ra_obligation',
+    'system_rmr_credit',
+    'year_ahead_flex_rar_category1',
+    'year_ahead_flex_rar_category2',
+    'year_ahead_flex_rar_category3',
+]
+
+def to_month_index(values:pd.Series,level:str='month'):
+    '''
+    converts a level of a series' index to timestamps at the start of each
+    month so values read from different workbooks can be aligned, keeping the
+    first value of any duplicated index entries.
+
+    parameters:
+        values - a series with a multi-index including a level of dates
+        level - the name of the index level containing dates
+    '''
+    values = values.copy()
+    values.index = pd.MultiIndex.from_arrays(
+        [
+            pd.to_datetime(values.index.get_level_values(name)).to_period('M').to_timestamp() if name==level else values.index.get_level_values(name)
+            for name in values.index.names
+        ],
+        names=values.index.names
+    )
+    return values.loc[~values.index.duplicated(keep='first')]
+
+def get_month_values(table:pd.DataFrame,year:int):
+    '''
+    stacks the month columns of a wide table into a series indexed by the
+    table's index and month, ignoring any columns labelled with text.
+
+    parameters:
+        table - a dataframe with a column for each month of the year
+        year - the year of the month columns
+    '''
+    months = pd.date_range(ts(year,1,1),periods=12,freq='MS')
+    # select month columns by position, since numpy datetime64[M] labels are
+    # not matched by label:
+    month_positions = [position for position,column in enumerate(table.columns) if not isinstance(column,str) and ts(column) in months]
+    values = table.iloc[:,month_positions]
+    values.columns = pd.DatetimeIndex([ts(table.columns[position]) for position in month_positions],name='month')
+    return pd.to_numeric(values.stack(),errors='coerce')
+
+def get_allocation_cube(year_ahead_tables:tuple,month_ahead_forecasts:pd.DataFrame,cam_rmr_update_tables:tuple,incremental_local_tables:tuple,organization_ids:list,load_serving_entity_ids:list,year:int,planning_reserve_margin:float):
+    '''
+    calculates each allocation component for every load serving entity and
+    month of a year from 2024 onward, when cam and rmr allocations are read
+    from the year ahead workbook, returning a dataframe indexed by
+    organization id and month with a column for each allocation component.
+    cam and rmr true-ups apply from june and incremental local requirements
+    from july, when provided.
+
+    parameters:
+        year_ahead_tables - a tuple of dataframes produced by
+            get_year_ahead_tables
+        month_ahead_forecasts - a dataframe produced by
+            get_month_ahead_tables
+        cam_rmr_update_tables - a tuple of dataframes produced by
+            get_cam_rmr_update_tables, or None if not yet available
+        incremental_local_tables - a tuple of dataframes produced by
+            get_incremental_local_tables, or None if not yet available
+        organization_ids - a list of load serving entities to include
+        load_serving_entity_ids - a list of all load serving entities in the
+            organizations file, used to share cpe system cam by load
+        year - the year of the allocations
+        planning_reserve_margin - the planning reserve margin applied to
+            month ahead load forecasts
+    '''
+    (load_forecast_input_data,demand_response_allocation,_,flexibility_requirements,flexibility_rmr,flexibility_cme,flexibility_irp,local_rar,_,cam_system,irp_system,cam_rmr) = year_ahead_tables
+    months = pd.date_range(ts(year,1,1),periods=12,freq='MS')
+    cube_index = pd.MultiIndex.from_product([organization_ids,months],names=['organization_id','month'])
+    month_numbers = cube_index.get_level_values('month').month
+    cube_organization_ids = cube_index.get_level_values('organization_id')
+    def by_organization_month(values:pd.Series):
+        values = values.copy()
+        values.index.names = ['organization_id','month']
+        return to_month_index(values).reindex(cube_index).values
+    def by_organization(values:pd.Series):
+        return pd.Series(values.loc[~values.index.duplicated(keep='first')].reindex(organization_ids).values,index=organization_ids).reindex(cube_organization_ids).values
+    cube = pd.DataFrame(index=cube_index)
+
+    # cam and rmr allocations, replaced with true-ups from june:
+    cam_rmr_values = get_month_values(cam_rmr,year)
+    if cam_rmr_update_tables is not None:
+        (cam_rmr_update,diablo_canyon_credits) = cam_rmr_update_tables
+        cam_rmr_update_values = get_month_values(cam_rmr_update,year)
+        diablo_canyon_credit_values = get_month_values(diablo_canyon_credits,year)
+    else:
+        pass
+    def cam_rmr_allocation(path_26_region:str,allocation_type:str,true_up:bool=True):
+        allocation = by_organization_month(cam_rmr_values.xs((path_26_region,allocation_type),level=[1,2]))
+        if true_up and cam_rmr_update_tables is not None:
+            allocation = np.where(month_numbers>=6,by_organization_month(cam_rmr_update_values.xs((path_26_region,allocation_type),level=[1,2])),allocation)
+        else:
+            pass
+        return allocation
+    if cam_rmr_update_tables is not None:
+        diablo_canyon_credit = np.where(month_numbers>=6,by_organization_month(diablo_canyon_credit_values),0)
+    else:
+        diablo_canyon_credit = 0
+
+    # cpe system cam, shared by each load serving entity's coincident peak load:
+    coincident_peak = pd.to_numeric(load_forecast_input_data.loc[:,'final_coincident_peak_forecast'],errors='coerce')
+    coincident_peak = to_month_index(coincident_peak).groupby(level=[0,1,2]).sum()
+    def cpe_system_cam(iou_territory:str,path_26_region:str):
+        system_cam = get_month_values(cam_system.loc[(cam_system.loc[:,'path_26_region']==path_26_region),:].reset_index(drop=True),year).groupby(level='month').sum()
+        territory_peak = coincident_peak.xs(iou_territory,level=0) if iou_territory in coincident_peak.index.get_level_values(0) else pd.Series(dtype=float,index=pd.MultiIndex.from_tuples([],names=['organization_id','month']))
+        total_peak = territory_peak.loc[territory_peak.index.get_level_values(0).isin(load_serving_entity_ids)].groupby(level=1).sum()
+        with np.errstate(divide='ignore',invalid='ignore'):
+            allocation = system_cam.reindex(months,fill_value=0).reindex(cube_index.get_level_values('month')).values * \
+                np.nan_to_num(by_organization_month(territory_peak)) / \
+                total_peak.reindex(months,fill_value=0).reindex(cube_index.get_level_values('month')).values
+        return np.round(allocation,2)
+
+    # zonal obligations:
+    irp_system_values = get_month_values(irp_system,year)
+    np26_cam = cam_rmr_allocation('north','cam')
+    np26_rmr = cam_rmr_allocation('north','rmr')
+    cube.loc[:,'np26_cpe_system_cam'] = cpe_system_cam('PGE','north')
+    np26_irp_system_cam = by_organization_month(irp_system_values.xs('north',level=1))
+    cube.loc[:,'np26_ra_obligation'] = np.round(
+        (1 + planning_reserve_margin) * by_organization_month(pd.to_numeric(month_ahead_forecasts.loc[:,'pge_revised_monthly_forecast'],errors='coerce')) \
+        - np26_cam - np26_rmr - cube.loc[:,'np26_cpe_system_cam'].values - np26_irp_system_cam,
+        0
+    )
+    cube.loc[:,'sn_path26_allocation'] = 0
+    sp26_cam = cam_rmr_allocation('south','cam')
+    sp26_rmr = cam_rmr_allocation('south','rmr')
+    cube.loc[:,'sp26_cpe_system_cam'] = cpe_system_cam('SCE','south')
+    sp26_irp_system_cam = by_organization_month(irp_system_values.xs('south',level=1))
+    cube.loc[:,'sp26_ra_obligation'] = np.round(
+        (1 + planning_reserve_margin) * (
+            by_organization_month(pd.to_numeric(month_ahead_forecasts.loc[:,'sce_revised_monthly_forecast'],errors='coerce')) \
+            + by_organization_month(pd.to_numeric(month_ahead_forecasts.loc[:,'sdge_revised_monthly_forecast'],errors='coerce'))
+        ) - sp26_cam - sp26_rmr - cube.loc[:,'sp26_cpe_system_cam'].values - sp26_irp_system_cam - diablo_canyon_credit,
+        0
+    )
+    cube.loc[:,'ns_path26_allocation'] = 0
+    cube.loc[:,'system_rmr_credit'] = cam_rmr_allocation('system','rmr',true_up=False)
+
+    # flexible capacity requirements:
+    flexibility_requirement = flexibility_requirements.loc[:,'flexibility_requirement']
+    flexibility_irp = flexibility_irp.loc[:,'flexibility_irp']
+    cube.loc[:,'year_ahead_flex_rar_category1'] = by_organization_month(flexibility_requirement.xs(1,level=1)) \
+        - by_organization_month(flexibility_rmr.loc[:,'flexibility_rmr']) \
+        - by_organization_month(flexibility_cme.loc[:,'flexibility_cme']) \
+        - by_organization_month(flexibility_irp.xs(1,level=1))
+    for category in (2,3):
+        cube.loc[:,f'year_ahead_flex_rar_category{category}'] = by_organization_month(flexibility_requirement.xs(category,level=1)) \
+            - by_organization_month(flexibility_irp.xs(category,level=1))
+    if incremental_local_tables is not None:
+        (incremental_flex,incremental_local_load,_) = incremental_local_tables
+    else:
+        pass
+    for category in (1,2,3):
+        if incremental_local_tables is not None:
+            cube.loc[:,f'year_ahead_flex_incremental_category{category}'] = np.where(
+                month_numbers>=7,
+                by_organization(incremental_flex.loc[:,'flexibility_requirement'].xs(category,level=1)),
+                0
+            )
+        else:
+            cube.loc[:,f'year_ahead_flex_incremental_category{category}'] = 0
+
+    # local requirements, august demand response, and incremental local load:
+    august = ts(year,8,1)
+    demand_response_allocation = to_month_index(demand_response_allocation.loc[:,'allocation'])
+    for local_area,iou_territory,allocation_type in august_demand_response_allocations:
+        cube.loc[:,f'{local_area}_local_rar'] = by_organization(local_rar.loc[:,local_area])
+    for local_area,iou_territory,allocation_type in august_demand_response_allocations:
+        if iou_territory in coincident_peak.index.get_level_values(0) and (local_area,allocation_type,august) in demand_response_allocation.index:
+            august_peak = coincident_peak.xs(iou_territory,level=0).xs(august,level=1)
+            august_allocation = demand_response_allocation.loc[[(local_area,allocation_type,august)]].sum()
+            august_peak_local = august_peak.sum()
+            if august_peak_local>0:
+                demand_response = np.round(august_peak / august_peak_local * august_allocation,decimals=2)
+            else:
+                demand_response = august_peak * 0
+            cube.loc[:,f'{local_area}_august_demand_response'] = np.nan_to_num(by_organization(demand_response))
+        else:
+            cube.loc[:,f'{local_area}_august_demand_response'] = 0
+    for local_area,iou_territory,allocation_type in august_demand_response_allocations:
+        if incremental_local_tables is not None:
+            cube.loc[:,f'{local_area}_incremental_load'] = np.where(
+                month_numbers>=7,
+                by_organization(incremental_local_load.loc[:,'incremental_load'].xs(local_area,level=1)),
+                0
+            )
+        else:
+            cube.loc[:,f'{local_area}_incremental_load'] = 0
+
+    return cube.loc[:,allocation_components]
+
+def get_annual_obligation_report(allocation_cube:pd.DataFrame,components:list):
+    '''
+    pivots selected components of an allocation cube into a table with a row
+    for each load serving entity and component and a column for each month.
+
+    parameters:
+        allocation_cube - a dataframe produced by get_allocation_cube
+        components - a list of allocation components to include
+    '''
+    report = allocation_cube.loc[:,components].stack().rename('value').reset_index()
+    report = report.rename(columns={report.columns[2]:'component'})
+    report = report.assign(month=pd.to_datetime(report.loc[:,'month']).dt.strftime('%Y-%m'))
+    report = report.pivot_table(index=['organization_id','component'],columns='month',values='value',aggfunc='sum')
+    return report.reindex(components,level='component').reset_index()
@@ -52,7 +52,14 @@ class ConfigurationOptions:
             'ra_summary_template_filename' : None,
             'caiso_cross_check_filename' : None,
             'caiso_cross_check_template_filename' : None,
+            'nqc_over_allocation_report_filename' : None,
+            'consolidation_diff_filename' : None,
+            'consolidation_snapshot_filename' : None,
+            'allocation_cube_filename' : None,
+            'annual_obligation_report_filename' : None,
+            'consolidation_checkpoint_directory' : None,
             'results_archive_filename' : None,
+            'results_archive_compression_level' : 6,
             'ezdb_data_sources_filename' : None,
             'ezdb_organizations_filename' : None,
             'ezdb_requirements_filename' : None,
@@ -70,9 +77,20 @@ class ConfigurationOptions:
             'file_logging_criticalities' : ['INFORMATION','WARNING','ERROR'],
             'email_log_filename' : None,
             'attachment_log_filename' : None,
+            'classification_log_filename' : None,
             'consolidation_log_filename' : None,
+            'run_manifest_filename' : None,
+            'run_metrics_filename' : None,
+            'profile_top_functions' : 30,
+            'trace_memory' : False,
+            'count_hot_paths' : False,
+            'archive_placement_mode' : 'copy',
+            'watch_poll_interval' : 5,
+            'pipeline_poll_interval' : 300,
             'files_for_archive' : [],
             'version_controlled_files' : [],
+            'consolidation_output_mode' : 'formulas',
+            'consolidation_audit_sheet' : False,
         }
         self.load_configuration_options(configuration_options_path)
         if filing_month is None:
@@ -172,6 +190,12 @@ class Paths:
             'ra_summary_template' : config.get_option('ra_summary_template_filename'),
             'caiso_cross_check' : config.get_option('caiso_cross_check_filename'),
             'caiso_cross_check_template' : config.get_option('caiso_cross_check_template_filename'),
+            'nqc_over_allocation_report' : config.get_option('nqc_over_allocation_report_filename'),
+            'consolidation_diff' : config.get_option('consolidation_diff_filename'),
+            'consolidation_snapshot' : config.get_option('consolidation_snapshot_filename'),
+            'allocation_cube' : config.get_option('allocation_cube_filename'),
+            'annual_obligation_report' : config.get_option('annual_obligation_report_filename'),
+            'consolidation_checkpoints' : config.get_option('consolidation_checkpoint_directory'),
             'results_archive' : config.get_option('results_archive_filename'),
             'ezdb_root' : config.get_option('ezdb_root_directory'),
             'ezdb_data_sources' : config.get_option('ezdb_data_sources_filename'),
@@ -185,7 +209,10 @@ class Paths:
             'log' : config.get_option('log_filename'),
             'email_log' : config.get_option('email_log_filename'),
             'attachment_log' : config.get_option('attachment_log_filename'),
+            'classification_log' : config.get_option('classification_log_filename') if config.get_option('classification_log_filename') is not None or config.get_option('attachment_log_filename') is None else re.sub(r'\.[^.\\/]*$','',config.get_option('attachment_log_filename')) + '_classifications.csv',
             'consolidation_log' : config.get_option('consolidation_log_filename'),
+            'run_manifest' : config.get_option('run_manifest_filename') if config.get_option('run_manifest_filename') is not None else re.sub(r'\.[^.\\/]*$','',config.get_option('log_filename')) + '_manifest.json',
+            'run_metrics' : config.get_option('run_metrics_filename'),
         }
         self.files_for_archive = config.get_option('files_for_archive')
         self.version_controlled_files = config.get_option('version_controlled_files')
@@ -278,6 +305,66 @@ class Paths:
         else:
             path = None
         return path
+    def get_paths(self,path_id:str,organization_ids:pd.Series,dates:pd.Series,versions:pd.Series,organizations=None):
+        '''
+        resolves the filename template for a category of files for many files
+        at once, returning a series of path strings matching those returned by
+        get_path for each element of the input series. the template is split
+        into its tokens once and each token is replaced for all files
+        together.
+
+        parameters:
+            path_id - a string matching a key in the object's paths dictionary
+            organization_ids - a series of organization ids, used only for
+                monthly filings
+            dates - a series of dates to use when replacing date-based tokens;
+                missing dates are replaced with the filing month
+            versions - a series of version numbers, used only for monthly
+                filings and version-controlled files
+            organizations - an instance of the Organizations class used to
+                look up organization names
+        '''
+        if path_id not in self.path_strings.keys() or self.path_strings[path_id] is None:
+            return pd.Series('',index=organization_ids.index,dtype='object')
+        else:
+            pass
+        if 'ezdb' in path_id:
+            relative_root = Path(self.path_strings['ezdb_root'])
+        else:
+            relative_root = Path(self.path_strings['archive_root'])
+        dates = pd.to_datetime(dates).fillna(pd.to_datetime(self.filing_month))
+        if path_id=='ra_monthly_filing' and organizations is not None:
+            organization_names = {organization_id:organizations.get_name(organization_id) for organization_id in organization_ids.unique()}
+            replacement_ids = organization_ids.where(organization_ids.isin(list(organizations.list_organization_ids())),'')
+            replacement_names = replacement_ids.map(lambda organization_id: organization_names.get(organization_id,'') if organization_id!='' else '')
+        else:
+            replacement_ids = pd.Series('',index=organization_ids.index)
+            replacement_names = pd.Series('',index=organization_ids.index)
+        if path_id=='ra_monthly_filing' or path_id in self.version_controlled_files:
+            replacement_versions = versions.map(lambda version: f'{version:02.0f}')
+        else:
+            replacement_versions = pd.Series('00',index=organization_ids.index)
+        replacements = {
+            '[yy]' : dates.dt.strftime('%y'),
+            '[yyyy]' : dates.dt.strftime('%Y'),
+            '[mm]' : dates.dt.strftime('%m'),
+            '[mmm]' : dates.dt.strftime('%b'),
+            '[mmmm]' : dates.dt.strftime('%B'),
+            '[organization_id]' : replacement_ids,
+            '[organization_name]' : replacement_names,
+            '[version]' : replacement_versions,
+        }
+        parsed_filenames = pd.Series('',index=organization_ids.index,dtype='object')
+        for part in re.split(r'(\[\w[_A-Za-z]*\])',self.path_strings[path_id]):
+            if part in replacements.keys():
+                parsed_filenames = parsed_filenames + replacements[part].astype(str)
+            else:
+                parsed_filenames = parsed_filenames + part
+        if path_id in self.files_for_archive:
+            paths = parsed_filenames.map(lambda filename: str(Path(filename).relative_to(relative_root)))
+        else:
+            paths = parsed_filenames.map(lambda filename: str(relative_root / Path(filename).relative_to(relative_root)))
+        return paths
     def most_recent_version(self,path_id:str,organization:dict=None,date:ts=None):
         '''
         searches directories for all versions of files matching a specified
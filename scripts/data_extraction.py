@@ -1,18 +1,21 @@
 import io
 import re
+import hashlib
 import xlrd
 import warnings
 import pandas as pd
 from pathlib import Path
 from itertools import chain
 from functools import reduce
+from zipfile import ZipFile
+from xml.etree import ElementTree
 from datetime import time
 from pandas import Timestamp as ts, Timedelta as td
 from openpyxl import load_workbook
 from openpyxl.utils.cell import get_column_letter
 from openpyxl.worksheet.worksheet import Worksheet
 
-from ra_logging import TextLogger
+from ra_logging import TextLogger,hot_path_counters
 from configuration_options import ConfigurationOptions
 
 def open_workbook(path:Path,data_only:bool=True,read_only:bool=True,in_mem:bool=True):
@@ -38,12 +41,53 @@ def open_workbook(path:Path,data_only:bool=True,read_only:bool=True,in_mem:bool=
                         workbook = load_workbook(in_mem_file,data_only=data_only,read_only=read_only)
                 else:
                     workbook = load_workbook(str(path),data_only=data_only,read_only=read_only)
+            hot_path_counters.count('open_workbook')
         else:
             workbook = None
     else:
         workbook = None
     return workbook
 
+def get_workbook_sheetnames(file):
+    '''
+    returns the names of the worksheets in an excel xlsx or xlsm file, read
+    from the workbook manifest within the file's zip container without loading
+    the workbook. raises BadZipFile if the file is not a zip archive, and
+    returns an empty list if the archive does not contain a workbook.
+
+    parameters:
+        file - a path or binary file object pointing to an excel file
+    '''
+    with ZipFile(file) as container:
+        try:
+            # the workbook part is named by the package relationships:
+            relationships = ElementTree.fromstring(container.read('_rels/.rels'))
+            workbook_parts = [
+                relationship.get('Target').lstrip('/') for relationship in relationships \
+                if str(relationship.get('Type')).endswith('/officeDocument')
+            ]
+            workbook_part = workbook_parts[0] if len(workbook_parts)>0 else 'xl/workbook.xml'
+            manifest = ElementTree.fromstring(container.read(workbook_part))
+            sheetnames = [element.get('name') for element in manifest.iter() if element.tag.endswith('}sheet')]
+        except KeyError:
+            sheetnames = []
+    hot_path_counters.count('get_workbook_sheetnames')
+    return sheetnames
+
+def get_file_hash(path:Path):
+    '''
+    calculates a sha-256 digest of a file's contents, used to identify files
+    which have changed between runs regardless of their names.
+
+    parameters:
+        path - a Path object which points to a file
+    '''
+    file_hash = hashlib.sha256()
+    with Path(path).open('rb') as f:
+        for chunk in iter(lambda: f.read(1048576),b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
 def get_data_range(worksheet:Worksheet,lse_column:str,data_columns:str,config:ConfigurationOptions):
     '''
     extracts a table from a worksheet with rows corresponding to each load-serving entity
@@ -60,12 +104,16 @@ def get_data_range(worksheet:Worksheet,lse_column:str,data_columns:str,config:Co
     first_row = 0
     last_row = 0
     organization_ids = [organization['id'].lower() for organization in config.organizations.list_load_serving_entities()]
+    cells_read = 0
     for row_number in range(1,worksheet.max_row+1):
+        cells_read += 1
         if first_row==0 and str(worksheet[f'{lse_column}{row_number}'].value).lower() in organization_ids:
             first_row = row_number
         if first_row>0 and last_row==0 and str(worksheet[f'{lse_column}{row_number+1}'].value).lower() in ('none','total','total:','total cpuc juris'):
+            cells_read += 1
             last_row = row_number
             break
+    hot_path_counters.count('get_data_range',cells_read)
     if first_row>0 and last_row>0:
         # return a list of lists containing excel cell objects:
         data_range = []
@@ -93,8 +141,26 @@ def data_range_to_dataframe(columns,data_range):
         for data_range_cell in data_range_row:
             data_array_row.append(data_range_cell.value)
         data_array.append(data_array_row)
+    hot_path_counters.count('data_range_to_dataframe',sum([len(data_array_row) for data_array_row in data_array]))
     return pd.DataFrame(data_array,columns=columns)
 
+def get_column_values(worksheet:Worksheet,column_letters:list,first_row:int,last_row:int):
+    '''
+    reads the values in a set of worksheet columns over a range of rows into a
+    dataframe labelled by column letter.
+    parameters:
+        worksheet - an excel worksheet containing the data
+        column_letters - a list of column letters to read
+        first_row - the first row number to read
+        last_row - the last row number to read
+    '''
+    values = {
+        column_letter : [worksheet[f'{column_letter}{row_number}'].value for row_number in range(first_row,last_row+1)]
+        for column_letter in column_letters
+    }
+    hot_path_counters.count('get_column_values',len(column_letters)*max(last_row-first_row+1,0))
+    return pd.DataFrame(values,index=range(first_row,last_row+1))
+
 # find and return data range for the flex requirements net cam table:
 def get_table(worksheet,table_header_text:str,table_header_offset:dict,columns:list):
     '''
@@ -118,9 +184,11 @@ def get_table(worksheet,table_header_text:str,table_header_offset:dict,columns:l
         'left' : get_column_letter(worksheet.max_column),
         'right' : get_column_letter(worksheet.max_column),
     }
+    cells_scanned = 0
     for row_index,row in enumerate(worksheet.rows):
         if row_index+1<table_bounds['bottom']:
             for column_index,cell in enumerate(row):
+                cells_scanned += 1
                 if table_header_text.lower() in str(cell.value).lower():
                     # found header, setting upper, left, and right boundaries of table (row and column indices are excel label-1):
                     table_bounds['top'] = row_index + 1 + table_header_offset['rows']
@@ -132,6 +200,7 @@ def get_table(worksheet,table_header_text:str,table_header_offset:dict,columns:l
                     break
         else:
             break
+    hot_path_counters.count('get_table',cells_scanned)
     data_range = worksheet['{left}{top}:{right}{bottom}'.format(**table_bounds)]
     return data_range_to_dataframe(columns,data_range)
 
@@ -1083,10 +1152,6 @@ def read_supply_plan(config:ConfigurationOptions,supply_plan_type:str,date:ts=No
             'organization_id_caiso',
             'errors_and_warnings',
         ]
-        supply_plan = pd.DataFrame(columns=columns)
-        for row_number in range(1,sheet.nrows):
-            new_row = [sheet.cell_value(rowx=row_number,colx=column_number) for column_number in range(sheet.ncols)]
-            supply_plan.loc[len(supply_plan)] = new_row
     elif supply_plan_type=='supply_plan_flexible':
         columns = [
             'validation_status',
@@ -1099,11 +1164,9 @@ def read_supply_plan(config:ConfigurationOptions,supply_plan_type:str,date:ts=No
             'organization_id_caiso',
             'errors_and_warnings',
         ]
-        supply_plan = pd.DataFrame(columns=columns)
-        sheet = workbook.sheet_by_index(0)
-        for row_number in range(1,sheet.nrows):
-            new_row = [sheet.cell_value(rowx=row_number,colx=column_number) for column_number in range(sheet.ncols)]
-            supply_plan.loc[len(supply_plan)] = new_row
+
+    # build the dataframe from all rows at once rather than appending rows:
+    supply_plan = pd.DataFrame([sheet.row_values(row_number) for row_number in range(1,sheet.nrows)],columns=columns)
 
     return supply_plan
 
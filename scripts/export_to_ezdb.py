@@ -3,7 +3,7 @@ import pandas as pd
 from pandas import Timestamp as ts
 from openpyxl.styles import Alignment
 
-from ra_logging import TextLogger,EmailLogger,AttachmentLogger,ConsolidationLogger
+from ra_logging import TextLogger,EmailLogger,AttachmentLogger,ConsolidationLogger,TimingLogger
 from configuration_options import ConfigurationOptions
 from data_extraction import *
 
@@ -37,6 +37,13 @@ class DataExporter:
         self.email_logger = EmailLogger(self.config.paths.get_path('email_log'))
         self.attachment_logger = AttachmentLogger(self.config.paths.get_path('attachment_log'))
         self.consolidation_logger = ConsolidationLogger(self.config.paths.get_path('consolidation_log'))
+        self.timer = TimingLogger(
+            self.config.paths.get_path('run_manifest'),
+            self.config.paths.get_path('run_metrics') if self.config.get_option('run_metrics_filename') is not None else None,
+            {'filing_month':self.config.filing_month.strftime('%Y-%m')},
+            self.config.get_option('trace_memory'),
+            self.config.get_option('count_hot_paths')
+        )
 
     def write_organizations(self):
         '''
@@ -69,6 +76,8 @@ class DataExporter:
         out_path.parent.mkdir(parents=True,exist_ok=True)
         self.logger.log(f'Exporting Organizations for EZDB to {out_path.name}','INFORMATION')
         organizations.to_csv(out_path,index=False,sep=',',quotechar='"')
+        self.timer.count(rows=len(organizations))
+        self.timer.count_file(out_path,'written')
 
     def write_data_sources(self):
         data_sources = self.consolidation_logger.data.merge(self.attachment_logger.data.merge(self.email_logger.data,on='email_id',suffixes=('','_emails')),on='attachment_id',suffixes=('','_attachments'))
@@ -136,6 +145,8 @@ class DataExporter:
         out_path.parent.mkdir(parents=True,exist_ok=True)
         self.logger.log(f'Exporting Data Sources for EZDB to {out_path.name}','INFORMATION')
         data_sources.to_csv(out_path,index=False,sep=',',quotechar='"')
+        self.timer.count(rows=len(data_sources))
+        self.timer.count_file(out_path,'written')
 
     def write_requirements(self):
         columns = [
@@ -405,6 +416,8 @@ class DataExporter:
         out_path.parent.mkdir(parents=True,exist_ok=True)
         self.logger.log(f'Exporting Resource Adequacy Requirements for EZDB to {out_path.name}','INFORMATION')
         requirements.loc[:,columns].to_csv(out_path,index=False)
+        self.timer.count(rows=len(requirements))
+        self.timer.count_file(out_path,'written')
 
     def write_resources(self):
         columns = [
@@ -564,6 +577,8 @@ class DataExporter:
         out_path.parent.mkdir(parents=True,exist_ok=True)
         self.logger.log(f'Exporting Physical and DR Resources for EZDB to {out_path.name}','INFORMATION')
         resources.loc[:,columns].to_csv(out_path,index=False,sep=',',quotechar='"')
+        self.timer.count(rows=len(resources))
+        self.timer.count_file(out_path,'written')
 
     def write_supply_plans(self):
         columns = [
@@ -676,6 +691,8 @@ class DataExporter:
         out_path.parent.mkdir(parents=True,exist_ok=True)
         self.logger.log(f'Exporting Supply Plans for EZDB to {out_path.name}','INFORMATION')
         supply_plans.to_csv(out_path,index=False,sep=',',quotechar='"')
+        self.timer.count(rows=len(supply_plans))
+        self.timer.count_file(out_path,'written')
 
     def write_summaries(self):
         columns = [
@@ -751,17 +768,16 @@ class DataExporter:
         self.logger.log(f'Exporting Summaries for EZDB to {out_path.name}','INFORMATION')
         out_path.parent.mkdir(parents=True,exist_ok=True)
         summaries.to_csv(out_path,index=False,sep=',',quotechar='"')
+        self.timer.count(rows=len(summaries))
+        self.timer.count_file(out_path,'written')
 
     def write_all(self):
         '''
         calls each of the write table methods in sequence, exporting all tables.
         '''
-        self.write_data_sources()
-        self.write_organizations()
-        self.write_requirements()
-        self.write_resources()
-        self.write_supply_plans()
-        self.write_summaries()
+        for write_table in [self.write_data_sources,self.write_organizations,self.write_requirements,self.write_resources,self.write_supply_plans,self.write_summaries]:
+            with self.timer.span(write_table.__name__):
+                write_table()
 
     def update_master_lookup_table(self):
         master_lookup_path = self.config.paths.get_path('ezdb_master_lookup')
@@ -253,6 +253,12 @@ class KiteworksAPI:
         '''
         response = self.get_attachment(email_id,attachment_id)
         if response.status_code==200:
+            # remove any previous download rather than overwriting it, since
+            # it may be hardlinked to an archived revision:
+            if download_path.is_file():
+                download_path.unlink()
+            else:
+                pass
             with download_path.open('wb') as f:
                 for chunk in response.iter_content(chunk_size=1024):
                     f.write(chunk)
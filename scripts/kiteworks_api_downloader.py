@@ -1,12 +1,13 @@
 import re
+import threading
 import pandas as pd
 from pathlib import Path
 from itertools import chain
 from pandas import Timestamp as ts,Timedelta as td
 
 from configuration_options import ConfigurationOptions,EmailFilter
-from ra_logging import TextLogger,EmailLogger,AttachmentLogger,ConsolidationLogger
-from data_extraction import load_workbook,get_cross_check_tables
+from ra_logging import TextLogger,EmailLogger,AttachmentLogger,ConsolidationLogger,TimingLogger
+from data_extraction import load_workbook,get_cross_check_tables,get_file_hash
 from kiteworks_api import KiteworksAPI
 
 class AttachmentDownloader:
@@ -37,6 +38,16 @@ class AttachmentDownloader:
         self.email_logger = EmailLogger(log_path=self.config.paths.get_path('email_log'))
         self.attachment_logger = AttachmentLogger(log_path=self.config.paths.get_path('attachment_log'))
         self.consolidation_logger = ConsolidationLogger(log_path=self.config.paths.get_path('consolidation_log'))
+        # held while reading or writing the email and attachment logs, which
+        # may be shared with an organizer running in another thread:
+        self.log_lock = threading.RLock()
+        self.timer = TimingLogger(
+            self.config.paths.get_path('run_manifest'),
+            self.config.paths.get_path('run_metrics') if self.config.get_option('run_metrics_filename') is not None else None,
+            {'filing_month':self.config.filing_month.strftime('%Y-%m')},
+            self.config.get_option('trace_memory'),
+            self.config.get_option('count_hot_paths')
+        )
         if connection is None:
             kiteworks_hostname = self.config.get_option('kiteworks_hostname')
             client_app_id = api_client['app_id']
@@ -51,7 +62,7 @@ class AttachmentDownloader:
         else:
             self.connection = connection
 
-    def download_filtered(self,start_date:ts,end_date:ts):
+    def download_filtered(self,start_date:ts,end_date:ts,on_download=None):
         '''
         retrieves a list of emails for the inbox specified by user name when
         connecting to the kiteworks api, then loops through each email and each
@@ -64,6 +75,8 @@ class AttachmentDownloader:
                 creation date in a range of dates which emailswill be retrieved
             end_date - datetime object representing the latest email creation
                 date in a range of dates from which emails will be retrieved
+            on_download - an optional function called with the attachment id
+                of each new attachment once it has been downloaded and logged
         '''
         # ensure start_date is before end_date, otherwise swap:
         if start_date>end_date:
@@ -77,8 +90,9 @@ class AttachmentDownloader:
         else:
             response = self.connection.list_email_in_date_range(start_date,end_date)
         email_list = response.json()['data']
+        self.timer.count(rows=len(email_list))
         internal_address_check = re.compile(r'\S*@cpuc\.ca\.gov$')
-        file_type_check = re.compile(r'.*\.(xlsx|xlsm|xls)$')
+        file_type_check = re.compile(r'.*\.(xlsx|xlsm|xls|zip)$')
         log_str = 'Searching for Emails from {} to {}'
         self.logger.log(
             log_str.format(
@@ -108,17 +122,19 @@ class AttachmentDownloader:
                 'included' : str(include_email),
                 'group' : sender_group,
             })
-            if email_id not in self.email_logger.data.loc[:,'email_id'].values:
-                self.email_logger.log(email_information)
-            else:
-                pass
+            with self.log_lock:
+                if email_id not in self.email_logger:
+                    self.email_logger.log(email_information)
+                else:
+                    pass
             if include_email:
                 response = self.connection.list_attachments(email_id)
                 attachment_list = response.json()['data']
                 for attachment in filter(lambda a: file_type_check.match(a['name']),attachment_list):
-                    attachment_ids = self.attachment_logger.data.loc[:,'attachment_id'].values
+                    with self.log_lock:
+                        logged_attachment = attachment['attachmentId'] in self.attachment_logger
                     attachment_names = [p.name for p in chain(self.config.paths.get_path('downloads_internal').iterdir(),self.config.paths.get_path('downloads_external').iterdir())]
-                    if attachment['attachmentId'] not in attachment_ids:
+                    if not logged_attachment:
                         if internal_sender:
                             download_path = self.config.paths.get_path('downloads_internal') / attachment['name']
                         else:
@@ -135,6 +151,7 @@ class AttachmentDownloader:
                                 'INFORMATION'
                             )
                             self.connection.download_attachment(email_id,attachment['attachmentId'],download_path)
+                            self.timer.count_file(download_path,'written')
                         else:
                             log_str = 'Skipping Attachment - Already Downloaded \'{}\' --- Date: {}; Subject: {}; Sender: {}'
                             self.logger.log(
@@ -154,8 +171,14 @@ class AttachmentDownloader:
                             'effective_date' : 'NaT',
                             'organization_id' : '',
                             'archive_path' : '',
+                            'file_hash' : get_file_hash(download_path) if download_path.is_file() else '',
                         })
-                        self.attachment_logger.log(attachment_information)
+                        with self.log_lock:
+                            self.attachment_logger.log(attachment_information)
+                        if on_download is not None:
+                            on_download(attachment['attachmentId'])
+                        else:
+                            pass
                     else:
                         log_str = 'Skipping Attachment - Already Downloaded \'{}\' --- Date: {}; Subject: {}; Sender: {}'
                         self.logger.log(
@@ -167,8 +190,10 @@ class AttachmentDownloader:
                             ),
                             'INFORMATION'
                         )
-                self.attachment_logger.commit()
-            self.email_logger.commit()
+                with self.log_lock:
+                    self.attachment_logger.commit()
+            with self.log_lock:
+                self.email_logger.commit()
 
     def download_filing_month(self):
         '''
@@ -181,13 +206,17 @@ class AttachmentDownloader:
         end_date = start_date.replace(day=28)
         self.download_filtered(start_date,end_date)
 
-    def download_current_month(self):
+    def download_current_month(self,on_download=None):
         '''
         downloads attachments from emails created in the past 30 days
+
+        parameters:
+            on_download - an optional function called with the attachment id
+                of each new attachment once it has been downloaded and logged
         '''
         start_date = ts.now().replace(hour=0,minute=0,second=0,microsecond=0) - td(days=30)
         end_date = ts.now() + td(days=1)
-        self.download_filtered(start_date,end_date)
+        self.download_filtered(start_date,end_date,on_download)
 
     def send_invalid_filing_notification(self,consolidation_log_entry:pd.Series):
         '''
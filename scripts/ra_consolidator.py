@@ -1,5 +1,10 @@
 from os import rename
 import xlrd
+import hashlib
+import json
+import shutil
+from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import pandas as pd
 from pathlib import Path
@@ -8,15 +13,28 @@ from openpyxl.styles import PatternFill,Font
 from openpyxl.formatting.rule import CellIsRule
 from openpyxl.utils.cell import get_column_letter
 
-from ra_logging import TextLogger,EmailLogger,AttachmentLogger,ConsolidationLogger
+from ra_logging import TextLogger,EmailLogger,AttachmentLogger,ConsolidationLogger,TimingLogger,hot_path_counters
 from configuration_options import ConfigurationOptions
 from data_extraction import *
+from compliance_calculations import *
 
 class WorkbookConsolidator:
     '''
     this class contains methods to collect data from allocations, filings, and
     supply plans into monthly summary and cross-check files.
     '''
+
+    # functions and workbook options for reading the tables of each input file
+    # shared between stages:
+    shared_input_readers = {
+        'year_ahead' : (get_year_ahead_tables,{}),
+        'month_ahead' : (get_month_ahead_tables,{'in_mem':False}),
+        'cam_rmr' : (lambda workbook,config: get_cam_rmr_tables(workbook),{'in_mem':False}),
+        'cam_rmr_update' : (get_cam_rmr_update_tables,{}),
+        'incremental_local' : (get_incremental_local_tables,{}),
+        'nqc_list' : (get_nqc_list,{'data_only':True,'in_mem':True}),
+    }
+
     def __init__(self,configuration_path:Path,filing_month:ts=None):
         '''
         initializes an instance of the WorkbookConsolidator class
@@ -27,6 +45,7 @@ class WorkbookConsolidator:
             filing_month - an optional filing month timestamp to overwrite the
                 date in the configuration options yaml file
         '''
+        self.configuration_path = configuration_path
         self.config = ConfigurationOptions(configuration_path,filing_month=filing_month)
         self.logger = TextLogger(
             self.config.get_option('cli_logging_criticalities'),
@@ -36,6 +55,115 @@ class WorkbookConsolidator:
         self.email_logger = EmailLogger(self.config.paths.get_path('email_log'))
         self.attachment_logger = AttachmentLogger(self.config.paths.get_path('attachment_log'))
         self.consolidation_logger = ConsolidationLogger(self.config.paths.get_path('consolidation_log'))
+        self.timer = TimingLogger(
+            self.config.paths.get_path('run_manifest'),
+            self.config.paths.get_path('run_metrics') if self.config.get_option('run_metrics_filename') is not None else None,
+            {'filing_month':self.config.filing_month.strftime('%Y-%m')},
+            self.config.get_option('trace_memory'),
+            self.config.get_option('count_hot_paths')
+        )
+        # during a dry run, output workbooks are kept in memory rather than saved:
+        self.dry_run = False
+        self.dry_run_workbooks = {}
+        # in formulas mode, copies of the output workbooks with calculated
+        # values, from which the consolidation's metrics are saved:
+        self.metric_workbooks = None
+        # tables read from year-scoped input files, keyed by path id, path, and
+        # year, and allocation cubes, keyed by their input fingerprints:
+        self.shared_inputs = {}
+        # when consolidating a batch of months, the calling process logs results to the email and attachment logs:
+        self.defer_result_logging = False
+
+    def read_shared_input(self,path_id:str):
+        '''
+        opens an input workbook and reads its tables, reusing the tables
+        already read from the same file for the same year, such as when
+        consolidating several months in a batch or when the tables were read
+        in parallel by read_shared_inputs.
+
+        parameters:
+            path_id - one of 'year_ahead', 'month_ahead', 'cam_rmr',
+                'cam_rmr_update', 'incremental_local', or 'nqc_list'
+        '''
+        (read_tables,open_options) = self.shared_input_readers[path_id]
+        path = self.config.paths.get_path(path_id)
+        key = (path_id,str(path),self.config.filing_month.year)
+        if key not in self.shared_inputs.keys():
+            workbook = open_workbook(path,**open_options)
+            self.shared_inputs[key] = read_tables(workbook,self.config)
+            workbook.close()
+            self.timer.count_file(path,'read')
+        else:
+            pass
+        # return a copy, since tables are modified in place during consolidation:
+        return deepcopy(self.shared_inputs[key])
+
+    def read_shared_inputs(self,path_ids:list):
+        '''
+        reads the tables of several input workbooks at once, each in its own
+        worker process, so that the time taken is about that of the largest
+        workbook rather than the sum of all of them. files already read or not
+        found are skipped, and a file which cannot be read by a worker is left
+        to be read again by read_shared_input, which reports the error.
+
+        parameters:
+            path_ids - a list of path ids accepted by read_shared_input
+        '''
+        paths = {path_id:self.config.paths.get_path(path_id) for path_id in path_ids}
+        keys = {path_id:(path_id,str(paths[path_id]),self.config.filing_month.year) for path_id in path_ids}
+        unread_path_ids = [
+            path_id for path_id in path_ids \
+            if keys[path_id] not in self.shared_inputs.keys() and paths[path_id] is not None and paths[path_id].is_file()
+        ]
+        if len(unread_path_ids)>1:
+            # start timer:
+            init_time = ts.now()
+            self.logger.log('Reading Input Files in Parallel: {}'.format(', '.join(unread_path_ids)),'INFORMATION')
+            with ProcessPoolExecutor(max_workers=len(unread_path_ids)) as executor:
+                futures = {path_id : executor.submit(read_shared_input_tables,self.configuration_path,self.config.filing_month,path_id) for path_id in unread_path_ids}
+                for path_id,future in futures.items():
+                    try:
+                        self.shared_inputs[keys[path_id]] = future.result()
+                        self.timer.count_file(paths[path_id],'read')
+                    except Exception as e:
+                        self.logger.log('Unable to Read {} in Parallel: {}'.format(path_id,e),'WARNING')
+            # check time and report:
+            run_time = (ts.now() - init_time).total_seconds()
+            self.logger.log('Read Input Files in {:02.0f}:{:02.0f}:{:05.2f}'.format(int(run_time/3600),int((run_time%3600)/60),run_time%60),'INFORMATION')
+        else:
+            pass
+
+    def open_output_workbook(self,path_id:str):
+        '''
+        opens the summary or caiso supply plan cross-check workbook for
+        writing, or returns the copy held in memory during a dry run.
+
+        parameters:
+            path_id - either 'ra_summary' or 'caiso_cross_check'
+        '''
+        if self.dry_run:
+            workbook = self.dry_run_workbooks[path_id]
+        else:
+            path = self.config.paths.get_path(path_id)
+            workbook = open_workbook(path,data_only=False,read_only=False)
+            self.timer.count_file(path,'read')
+        return workbook
+
+    def save_output_workbook(self,workbook,path_id:str):
+        '''
+        saves and closes the summary or caiso supply plan cross-check
+        workbook, or holds it in memory during a dry run.
+
+        parameters:
+            workbook - an openpyxl workbook open for writing
+            path_id - either 'ra_summary' or 'caiso_cross_check'
+        '''
+        if self.dry_run:
+            self.dry_run_workbooks[path_id] = workbook
+        else:
+            workbook.save(str(self.config.paths.get_path(path_id)))
+            workbook.close()
+            self.timer.count_file(self.config.paths.get_path(path_id),'written')
 
     def initialize_ra_summary(self):
         '''
@@ -49,8 +177,7 @@ class WorkbookConsolidator:
         try:
             path = self.config.paths.get_path('ra_summary_template')
             ra_summary = open_workbook(path,data_only=False,read_only=False,in_mem=True)
-            ra_summary.save(str(self.config.paths.get_path('ra_summary')))
-            ra_summary.close()
+            self.save_output_workbook(ra_summary,'ra_summary')
             self.logger.log('Created New Monthly RA Summary File: {}'.format(self.config.paths.get_path('ra_summary').name),'INFORMATION')
         except:
             self.logger.log('Unable to Create New Monthly RA Summary File','ERROR')
@@ -65,8 +192,7 @@ class WorkbookConsolidator:
         try:
             path = self.config.paths.get_path('caiso_cross_check_template')
             caiso_cross_check = open_workbook(path,data_only=False,read_only=False,in_mem=True)
-            caiso_cross_check.save(str(self.config.paths.get_path('caiso_cross_check')))
-            caiso_cross_check.close()
+            self.save_output_workbook(caiso_cross_check,'caiso_cross_check')
             self.logger.log('Created New CAISO Supply Plan Cross-Check File: {}'.format(self.config.paths.get_path('caiso_cross_check').name),'INFORMATION')
         except:
             self.logger.log('Unable to Create New CAISO Supply Plan Cross-Check File','ERROR')
@@ -83,57 +209,8 @@ class WorkbookConsolidator:
 
         filing_month = self.config.filing_month
 
-        # get source data from year ahead file:
-        path = self.config.paths.get_path('year_ahead')
-        year_ahead = open_workbook(path)
-        year_ahead_tables = get_year_ahead_tables(year_ahead,self.config)
-        load_forecast_input_data = year_ahead_tables[0]
-        demand_response_allocation = year_ahead_tables[1]
-        flexibility_requirements = year_ahead_tables[3]
-        flexibility_rmr = year_ahead_tables[4]
-        flexibility_cme = year_ahead_tables[5]
-        flexibility_irp = year_ahead_tables[6]
-        local_rar = year_ahead_tables[7]
-        cam_system = year_ahead_tables[9]
-        irp_system = year_ahead_tables[10]
-        cam_rmr = year_ahead_tables[11]
-        year_ahead.close()
-
-        # get source data from month ahead file:
-        path = self.config.paths.get_path('month_ahead')
-        month_ahead = open_workbook(path,in_mem=False)
-        (month_ahead_forecasts,monthly_tracking) = get_month_ahead_tables(month_ahead,self.config)
-        month_ahead.close()
-
-        # get source data from cam-rmr file:
-        if filing_month.year < 2024:
-            path = self.config.paths.get_path('cam_rmr')
-            cam_rmr_workbook = open_workbook(path,in_mem=False)
-            (cam_rmr_monthly_tracking,total_cam_rmr) = get_cam_rmr_tables(cam_rmr_workbook)
-            cam_rmr_workbook.close()
-        else:
-            (cam_rmr_monthly_tracking,total_cam_rmr) = (None,None)
-
-        # get CAM, RMR, and Diablo Canyon credit true-ups:
-        if filing_month.month>=6:
-            path = self.config.paths.get_path('cam_rmr_update')
-            cam_rmr_update = open_workbook(path)
-            (cam_rmr_update,diablo_canyon_credits) = get_cam_rmr_update_tables(cam_rmr_update,self.config)
-        else:
-            (cam_rmr_update,diablo_canyon_credits) = (None,None)
-
-        # get source data from incremental local workbook:
-        if filing_month.month>=7:
-            path = self.config.paths.get_path('incremental_local')
-            incremental_local = open_workbook(path)
-            (incremental_flex,incremental_local_load,local_rar_trueup) = get_incremental_local_tables(incremental_local,self.config)
-            incremental_local.close()
-        else:
-            (incremental_flex,incremental_local_load,local_rar_trueup) = (None,None,None)
-
         # open summary file and initialize summary table:
-        path = self.config.paths.get_path('ra_summary')
-        ra_summary = open_workbook(path,data_only=False,read_only=False)
+        ra_summary = self.open_output_workbook('ra_summary')
         columns = [
             'organization_id',
         ]
@@ -141,197 +218,15 @@ class WorkbookConsolidator:
         summary = data_range_to_dataframe(columns,data_range)
 
         # open caiso supply plan cross-check file:
-        path = self.config.paths.get_path('caiso_cross_check')
-        caiso_cross_check = open_workbook(path,data_only=False,read_only=False)
-
-        # create function to use in dataframe.apply():
-        def calculate_summary(row):
-            organization_id = row.loc['organization_id']
-            if organization_id in ('PGE','SCE','SDGE'):
-                inverse_organization_selection = list(dict.fromkeys(filter(lambda idx: idx!=organization_id,monthly_tracking.index.get_level_values(0))).keys())
-            else:
-                inverse_organization_selection = []
-            all_lses = list(map(lambda d: d['id'],self.config.organizations.list_load_serving_entities()))
-            # NP26 summary sheet:
-            if organization_id=='PGE' and filing_month.year<2024:
-                cam_load_share_pge = -monthly_tracking.loc[(inverse_organization_selection,filing_month),'pge_revised_nonjurisdictional_load_share'].sum()
-            elif filing_month.year<2024:
-                cam_load_share_pge = monthly_tracking.loc[(organization_id,filing_month),'pge_revised_nonjurisdictional_load_share']
-            else:
-                cam_load_share_pge = 0
-            if filing_month.year<2024:
-                np26_cam = total_cam_rmr.loc['np26_cam'] * cam_load_share_pge
-                np26_rmr = total_cam_rmr.loc['np26_rmr'] * monthly_tracking.loc[(organization_id,filing_month),'pge_revised_nonjurisdictional_load_share'] + total_cam_rmr.loc['system_rmr'] * monthly_tracking.loc[(organization_id,filing_month),'total_revised_jurisdictional_load_share']
-            else:
-                np26_cam = cam_rmr.loc[(organization_id,'north','cam'),filing_month.to_numpy().astype('datetime64[M]')]
-                np26_rmr = cam_rmr.loc[(organization_id,'north','rmr'),filing_month.to_numpy().astype('datetime64[M]')]
-                if filing_month.month>=6:
-                    np26_cam = cam_rmr_update.loc[(organization_id,'north','cam'),filing_month.to_numpy().astype('datetime64[M]')]
-                    np26_rmr = cam_rmr_update.loc[(organization_id,'north','rmr'),filing_month.to_numpy().astype('datetime64[M]')]
-            np26_cpe_system_cam = np.round(
-                cam_system.loc[(cam_system.loc[:,'path_26_region']=='north'),filing_month.to_numpy().astype('datetime64[M]')].sum() * \
-                load_forecast_input_data.loc[filter(lambda i: i[0]=='PGE' and i[1]==organization_id and i[2]==filing_month,load_forecast_input_data.index),'final_coincident_peak_forecast'].sum() / \
-                load_forecast_input_data.loc[filter(lambda i: i[0]=='PGE' and i[1] in all_lses and i[2]==filing_month,load_forecast_input_data.index),'final_coincident_peak_forecast'].sum(),
-                2
-            )
-            np26_irp_system_cam = irp_system.loc[(organization_id,'north'),filing_month.to_numpy().astype('datetime64[M]')]
-            np26_ra_obligation = np.round(
-                (
-                    # PGEload:
-                    (1 + self.config.get_option('planning_reserve_margin')) * month_ahead_forecasts.loc[(organization_id,filing_month),'pge_revised_monthly_forecast']
-                    # NP26CAM:
-                    -np26_cam
-                    # NP26RMR:
-                    -np26_rmr
-                    # CPE System CAM:
-                    -np26_cpe_system_cam
-                    # IRP System CAM:
-                    -np26_irp_system_cam
-                ),
-                0
-            )
-            sn_path26_allocation = 0
-            # SP26 summary sheet:
-            if organization_id=='SCE' and filing_month.year<2024:
-                cam_load_share_sce = -cam_rmr_monthly_tracking.loc[(inverse_organization_selection,filing_month),'sce_revised_nonjurisdictional_load_share'].sum()
-                cam_load_share_sdge = cam_rmr_monthly_tracking.loc[(organization_id,filing_month),'sdge_revised_nonjurisdictional_load_share']
-            elif organization_id=='SDGE' and filing_month.year<2024:
-                cam_load_share_sce = cam_rmr_monthly_tracking.loc[(organization_id,filing_month),'sce_revised_nonjurisdictional_load_share']
-                cam_load_share_sdge = -cam_rmr_monthly_tracking.loc[(inverse_organization_selection,filing_month),'sdge_revised_nonjurisdictional_load_share'].sum()
-            elif filing_month.year<2024:
-                cam_load_share_sce = cam_rmr_monthly_tracking.loc[(organization_id,filing_month),'sce_revised_nonjurisdictional_load_share']
-                cam_load_share_sdge = cam_rmr_monthly_tracking.loc[(organization_id,filing_month),'sdge_revised_nonjurisdictional_load_share']
-            else:
-                cam_load_share_sce = 0
-                cam_load_share_sdge = 0
-            if filing_month.year<2024:
-                sp26_cam = total_cam_rmr.loc['sce_cam'] * cam_load_share_sce + total_cam_rmr.loc['sdge_cam'] * cam_load_share_sdge
-                sp26_rmr = total_cam_rmr.loc['sp26_rmr'] * cam_rmr_monthly_tracking.loc[(organization_id,filing_month),'sce_revised_nonjurisdictional_load_share']
-                sce_lcr = total_cam_rmr.loc['sce_preferred_lcr_credit'] * cam_rmr_monthly_tracking.loc[(organization_id,filing_month),'sce_revised_jurisdictional_load_share']
-                diablo_canyon_credit = 0
-            else:
-                sp26_cam = cam_rmr.loc[(organization_id,'south','cam'),filing_month.to_numpy().astype('datetime64[M]')]
-                sp26_rmr = cam_rmr.loc[(organization_id,'south','rmr'),filing_month.to_numpy().astype('datetime64[M]')]
-                sce_lcr = 0
-                diablo_canyon_credit = 0
-                if filing_month.month>=6:
-                    sp26_cam = cam_rmr_update.loc[(organization_id,'south','cam'),filing_month.to_numpy().astype('datetime64[M]')]
-                    sp26_rmr = cam_rmr_update.loc[(organization_id,'south','rmr'),filing_month.to_numpy().astype('datetime64[M]')]
-                    diablo_canyon_credit = diablo_canyon_credits.loc[organization_id,filing_month.to_numpy().astype('datetime64[M]')]
-            sp26_cpe_system_cam = np.round(
-                cam_system.loc[(cam_system.loc[:,'path_26_region']=='south'),filing_month.to_numpy().astype('datetime64[M]')].sum() * \
-                load_forecast_input_data.loc[filter(lambda i:i[0]=='SCE' and i[1]==organization_id and i[2]==filing_month,load_forecast_input_data.index),'final_coincident_peak_forecast'].sum() / \
-                load_forecast_input_data.loc[filter(lambda i:i[0]=='SCE' and i[1] in all_lses and i[2]==filing_month,load_forecast_input_data.index),'final_coincident_peak_forecast'].sum(),
-                2
-            )
-            sp26_irp_system_cam = irp_system.loc[(organization_id,'south'),filing_month.to_numpy().astype('datetime64[M]')]
-            sp26_ra_obligation = np.round(
-                (
-                    (1 + self.config.get_option('planning_reserve_margin')) * (
-                        # SCEload:
-                        month_ahead_forecasts.loc[(organization_id,filing_month),'sce_revised_monthly_forecast']
-                        # SDGEload:
-                        +month_ahead_forecasts.loc[(organization_id,filing_month),'sdge_revised_monthly_forecast']
-                    )
-                    # SP26CAM:
-                    -sp26_cam
-                    # SP26RMR:
-                    -sp26_rmr
-                    # SCELCR:
-                    -sce_lcr
-                    # CPE System CAM:
-                    -sp26_cpe_system_cam
-                    # IRP System CAM:
-                    -sp26_irp_system_cam
-                    # Diablo Canyon Credi:
-                    -diablo_canyon_credit
-                ) ,
-                0
-            )
-            ns_path26_allocation = 0
-            if filing_month.year < 2024:
-                system_rmr_credit = total_cam_rmr.loc['system_rmr'] * cam_rmr_monthly_tracking.loc[(organization_id,filing_month),'total_revised_jurisdictional_load_share']
-            else:
-                system_rmr_credit = cam_rmr.loc[(organization_id,'system','rmr'),filing_month.to_numpy().astype('datetime64[M]')]
-            def incremental_flex_by_category(category:int):
-                if incremental_flex is not None:
-                    flex = incremental_flex.loc[(organization_id,category),'flexibility_requirement']
-                else:
-                    flex = 0
-                return flex
-            def incremental_load_by_area(area:str):
-                if incremental_local_load is not None:
-                    incremental_load = incremental_local_load.loc[(organization_id,area),'incremental_load']
-                else:
-                    incremental_load = 0
-                return incremental_load
-            def august_demand_response(iou_territory:str,location:str,allocation_type:str):
-                month = ts(filing_month.year,8,1)
-                if (iou_territory,organization_id,month) in load_forecast_input_data.index and (location,allocation_type,month) in demand_response_allocation.index:
-                    august_forecast_lse = load_forecast_input_data.loc[(iou_territory,organization_id,month),'final_coincident_peak_forecast']
-                    organization_id_indices = list(dict.fromkeys(load_forecast_input_data.loc[(iou_territory),:].index.get_level_values(0)))
-                    august_forecast_local = load_forecast_input_data.loc[(iou_territory,organization_id_indices,month),'final_coincident_peak_forecast'].sum()
-                    august_demand_response_allocation = demand_response_allocation.loc[(location,allocation_type,month),'allocation'].sum()
-                    if august_forecast_local>0:
-                        demand_response = np.round(august_forecast_lse / august_forecast_local * august_demand_response_allocation,decimals=2)
-                    else:
-                        demand_response = 0
-                else:
-                    demand_response = 0
-                return demand_response
+        caiso_cross_check = self.open_output_workbook('caiso_cross_check')
 
-            return pd.Series({
-                'organization_id' : organization_id,
-                'np26_ra_obligation' : np26_ra_obligation,
-                'sn_path26_allocation' : sn_path26_allocation,
-                'sp26_ra_obligation' : sp26_ra_obligation,
-                'ns_path26_allocation' : ns_path26_allocation,
-                'system_rmr_credit' : system_rmr_credit,
-                'np26_cpe_system_cam' : np26_cpe_system_cam,
-                'sp26_cpe_system_cam' : sp26_cpe_system_cam,
-                'year_ahead_flex_rar_category1' : flexibility_requirements.loc[(organization_id,1,filing_month),'flexibility_requirement'] \
-                    - flexibility_rmr.loc[(organization_id,filing_month),'flexibility_rmr'] \
-                    - flexibility_cme.loc[(organization_id,filing_month),'flexibility_cme']
-                    - flexibility_irp.loc[(organization_id,1,filing_month),'flexibility_irp'],
-                'year_ahead_flex_rar_category2' : flexibility_requirements.loc[(organization_id,2,filing_month),'flexibility_requirement'] \
-                    - flexibility_irp.loc[(organization_id,2,filing_month),'flexibility_irp'],
-                'year_ahead_flex_rar_category3' : flexibility_requirements.loc[(organization_id,3,filing_month),'flexibility_requirement'] \
-                    - flexibility_irp.loc[(organization_id,3,filing_month),'flexibility_irp'],
-                'year_ahead_flex_incremental_category1' : incremental_flex_by_category(1),
-                'year_ahead_flex_incremental_category2' : incremental_flex_by_category(2),
-                'year_ahead_flex_incremental_category3' : incremental_flex_by_category(3),
-                'los_angeles_local_rar' : local_rar.loc[organization_id,'los_angeles'],
-                'ventura_local_rar' : local_rar.loc[organization_id,'ventura'],
-                'san_diego_local_rar' : local_rar.loc[organization_id,'san_diego'],
-                'bay_area_local_rar' : local_rar.loc[organization_id,'bay_area'],
-                'fresno_local_rar' : local_rar.loc[organization_id,'fresno'],
-                'sierra_local_rar' : local_rar.loc[organization_id,'sierra'],
-                'stockton_local_rar' : local_rar.loc[organization_id,'stockton'],
-                'kern_local_rar' : local_rar.loc[organization_id,'kern'],
-                'humboldt_local_rar' : local_rar.loc[organization_id,'humboldt'],
-                'northern_california_local_rar' : local_rar.loc[organization_id,'northern_california'],
-                'los_angeles_august_demand_response' : august_demand_response('SCE','los_angeles','prorated'),
-                'ventura_august_demand_response' : august_demand_response('SCE','ventura','prorated'),
-                'san_diego_august_demand_response' : august_demand_response('SDGE','san_diego','prorated'),
-                'bay_area_august_demand_response' : august_demand_response('PGE','bay_area','prorated'),
-                'fresno_august_demand_response' : august_demand_response('PGE','fresno','base'),
-                'sierra_august_demand_response' : august_demand_response('PGE','sierra','base'),
-                'stockton_august_demand_response' : august_demand_response('PGE','stockton','base'),
-                'kern_august_demand_response' : august_demand_response('PGE','kern','base'),
-                'humboldt_august_demand_response' : august_demand_response('PGE','humboldt','base'),
-                'northern_california_august_demand_response' : august_demand_response('PGE','northern_california','base'),
-                'los_angeles_incremental_load' : incremental_load_by_area('los_angeles'),
-                'ventura_incremental_load' : incremental_load_by_area('ventura'),
-                'san_diego_incremental_load' : incremental_load_by_area('san_diego'),
-                'bay_area_incremental_load' : incremental_load_by_area('bay_area'),
-                'fresno_incremental_load' : incremental_load_by_area('fresno'),
-                'sierra_incremental_load' : incremental_load_by_area('sierra'),
-                'stockton_incremental_load' : incremental_load_by_area('stockton'),
-                'kern_incremental_load' : incremental_load_by_area('kern'),
-                'humboldt_incremental_load' : incremental_load_by_area('humboldt'),
-                'northern_california_incremental_load' : incremental_load_by_area('northern_california'),
-            })
-        summary = summary.merge(summary.apply(calculate_summary,axis='columns'),on='organization_id')
+        # calculate allocations, from 2024 by slicing the filing month from the allocation cube for the year:
+        if filing_month.year>=2024:
+            allocation_cube = self.get_allocation_cube(list(summary.loc[:,'organization_id']))
+            allocations = allocation_cube.xs(pd.to_datetime(filing_month).to_period('M').to_timestamp(),level='month')
+            summary = summary.merge(allocations,how='left',left_on='organization_id',right_index=True)
+        else:
+            summary = self.calculate_allocations(summary)
 
         #  copy summary dataframe to worksheet:
         row_number = 2
@@ -582,7 +477,10 @@ class WorkbookConsolidator:
             caiso_cross_check['Requirements'][f'CO{row_number+1}'] = compliance_check
 
             row_number += 1
-        self.consolidation_logger.commit()
+        if not self.dry_run:
+            self.consolidation_logger.commit()
+        else:
+            pass
 
         # total rows on local true-up sheet:
         ra_summary['LocalTrueUp'][f'A{row_number}'] = 'Total:'
@@ -596,82 +494,1075 @@ class WorkbookConsolidator:
             ra_summary['LocalTrueUp'][f'{col_letter}{row_number}'].number_format = '#,##0.00'
 
         # save and close summary and caiso supply plan cross-check files:
-        ra_summary.save(str(self.config.paths.get_path('ra_summary')))
-        ra_summary.close()
-        caiso_cross_check.save(str(self.config.paths.get_path('caiso_cross_check')))
-        caiso_cross_check.close()
+        self.save_output_workbook(ra_summary,'ra_summary')
+        self.save_output_workbook(caiso_cross_check,'caiso_cross_check')
 
         # check time and report:
         run_time = (ts.now() - init_time).total_seconds()
         self.logger.log('Retrieved Allocations in {:02.0f}:{:02.0f}:{:05.2f}'.format(int(run_time/3600),int((run_time%3600)/60),run_time%60),'INFORMATION')
 
-    # collect data from each of the monthly lse filings:
+    def calculate_allocations(self,summary:pd.DataFrame):
+        '''
+        reads the year ahead, month ahead, cam-rmr, and incremental local
+        files and calculates the allocations for each load serving entity in
+        the filing month, as used for filing months before 2024 when cam and
+        rmr allocations are read from a monthly cam-rmr file. returns the
+        summary table with a column for each allocation component.
+
+        parameters:
+            summary - a dataframe with the organization ids from the summary
+                workbook
+        '''
+        filing_month = self.config.filing_month
+
+        # read all source files at once:
+        path_ids = ['year_ahead','month_ahead']
+        if filing_month.year < 2024:
+            path_ids.append('cam_rmr')
+        else:
+            pass
+        if filing_month.month>=6:
+            path_ids.append('cam_rmr_update')
+        else:
+            pass
+        if filing_month.month>=7:
+            path_ids.append('incremental_local')
+        else:
+            pass
+        self.read_shared_inputs(path_ids)
+
+        # get source data from year ahead file:
+        year_ahead_tables = self.read_shared_input('year_ahead')
+        load_forecast_input_data = year_ahead_tables[0]
+        demand_response_allocation = year_ahead_tables[1]
+        flexibility_requirements = year_ahead_tables[3]
+        flexibility_rmr = year_ahead_tables[4]
+        flexibility_cme = year_ahead_tables[5]
+        flexibility_irp = year_ahead_tables[6]
+        local_rar = year_ahead_tables[7]
+        cam_system = year_ahead_tables[9]
+        irp_system = year_ahead_tables[10]
+        cam_rmr = year_ahead_tables[11]
+
+        # get source data from month ahead file:
+        (month_ahead_forecasts,monthly_tracking) = self.read_shared_input('month_ahead')
+
+        # get source data from cam-rmr file:
+        if filing_month.year < 2024:
+            (cam_rmr_monthly_tracking,total_cam_rmr) = self.read_shared_input('cam_rmr')
+        else:
+            (cam_rmr_monthly_tracking,total_cam_rmr) = (None,None)
+
+        # get CAM, RMR, and Diablo Canyon credit true-ups:
+        if filing_month.month>=6:
+            (cam_rmr_update,diablo_canyon_credits) = self.read_shared_input('cam_rmr_update')
+        else:
+            (cam_rmr_update,diablo_canyon_credits) = (None,None)
+
+        # get source data from incremental local workbook:
+        if filing_month.month>=7:
+            (incremental_flex,incremental_local_load,local_rar_trueup) = self.read_shared_input('incremental_local')
+        else:
+            (incremental_flex,incremental_local_load,local_rar_trueup) = (None,None,None)
+
+        # create function to use in dataframe.apply():
+        def calculate_summary(row):
+            organization_id = row.loc['organization_id']
+            if organization_id in ('PGE','SCE','SDGE'):
+                inverse_organization_selection = list(dict.fromkeys(filter(lambda idx: idx!=organization_id,monthly_tracking.index.get_level_values(0))).keys())
+            else:
+                inverse_organization_selection = []
+            all_lses = list(map(lambda d: d['id'],self.config.organizations.list_load_serving_entities()))
+            # NP26 summary sheet:
+            if organization_id=='PGE' and filing_month.year<2024:
+                cam_load_share_pge = -monthly_tracking.loc[(inverse_organization_selection,filing_month),'pge_revised_nonjurisdictional_load_share'].sum()
+            elif filing_month.year<2024:
+                cam_load_share_pge = monthly_tracking.loc[(organization_id,filing_month),'pge_revised_nonjurisdictional_load_share']
+            else:
+                cam_load_share_pge = 0
+            if filing_month.year<2024:
+                np26_cam = total_cam_rmr.loc['np26_cam'] * cam_load_share_pge
+                np26_rmr = total_cam_rmr.loc['np26_rmr'] * monthly_tracking.loc[(organization_id,filing_month),'pge_revised_nonjurisdictional_load_share'] + total_cam_rmr.loc['system_rmr'] * monthly_tracking.loc[(organization_id,filing_month),'total_revised_jurisdictional_load_share']
+            else:
+                np26_cam = cam_rmr.loc[(organization_id,'north','cam'),filing_month.to_numpy().astype('datetime64[M]')]
+                np26_rmr = cam_rmr.loc[(organization_id,'north','rmr'),filing_month.to_numpy().astype('datetime64[M]')]
+                if filing_month.month>=6:
+                    np26_cam = cam_rmr_update.loc[(organization_id,'north','cam'),filing_month.to_numpy().astype('datetime64[M]')]
+                    np26_rmr = cam_rmr_update.loc[(organization_id,'north','rmr'),filing_month.to_numpy().astype('datetime64[M]')]
+            np26_cpe_system_cam = np.round(
+                cam_system.loc[(cam_system.loc[:,'path_26_region']=='north'),filing_month.to_numpy().astype('datetime64[M]')].sum() * \
+                load_forecast_input_data.loc[filter(lambda i: i[0]=='PGE' and i[1]==organization_id and i[2]==filing_month,load_forecast_input_data.index),'final_coincident_peak_forecast'].sum() / \
+                load_forecast_input_data.loc[filter(lambda i: i[0]=='PGE' and i[1] in all_lses and i[2]==filing_month,load_forecast_input_data.index),'final_coincident_peak_forecast'].sum(),
+                2
+            )
+            np26_irp_system_cam = irp_system.loc[(organization_id,'north'),filing_month.to_numpy().astype('datetime64[M]')]
+            np26_ra_obligation = np.round(
+                (
+                    # PGEload:
+                    (1 + self.config.get_option('planning_reserve_margin')) * month_ahead_forecasts.loc[(organization_id,filing_month),'pge_revised_monthly_forecast']
+                    # NP26CAM:
+                    -np26_cam
+                    # NP26RMR:
+                    -np26_rmr
+                    # CPE System CAM:
+                    -np26_cpe_system_cam
+                    # IRP System CAM:
+                    -np26_irp_system_cam
+                ),
+                0
+            )
+            sn_path26_allocation = 0
+            # SP26 summary sheet:
+            if organization_id=='SCE' and filing_month.year<2024:
+                cam_load_share_sce = -cam_rmr_monthly_tracking.loc[(inverse_organization_selection,filing_month),'sce_revised_nonjurisdictional_load_share'].sum()
+                cam_load_share_sdge = cam_rmr_monthly_tracking.loc[(organization_id,filing_month),'sdge_revised_nonjurisdictional_load_share']
+            elif organization_id=='SDGE' and filing_month.year<2024:
+                cam_load_share_sce = cam_rmr_monthly_tracking.loc[(organization_id,filing_month),'sce_revised_nonjurisdictional_load_share']
+                cam_load_share_sdge = -cam_rmr_monthly_tracking.loc[(inverse_organization_selection,filing_month),'sdge_revised_nonjurisdictional_load_share'].sum()
+            elif filing_month.year<2024:
+                cam_load_share_sce = cam_rmr_monthly_tracking.loc[(organization_id,filing_month),'sce_revised_nonjurisdictional_load_share']
+                cam_load_share_sdge = cam_rmr_monthly_tracking.loc[(organization_id,filing_month),'sdge_revised_nonjurisdictional_load_share']
+            else:
+                cam_load_share_sce = 0
+                cam_load_share_sdge = 0
+            if filing_month.year<2024:
+                sp26_cam = total_cam_rmr.loc['sce_cam'] * cam_load_share_sce + total_cam_rmr.loc['sdge_cam'] * cam_load_share_sdge
+                sp26_rmr = total_cam_rmr.loc['sp26_rmr'] * cam_rmr_monthly_tracking.loc[(organization_id,filing_month),'sce_revised_nonjurisdictional_load_share']
+                sce_lcr = total_cam_rmr.loc['sce_preferred_lcr_credit'] * cam_rmr_monthly_tracking.loc[(organization_id,filing_month),'sce_revised_jurisdictional_load_share']
+                diablo_canyon_credit = 0
+            else:
+                sp26_cam = cam_rmr.loc[(organization_id,'south','cam'),filing_month.to_numpy().astype('datetime64[M]')]
+                sp26_rmr = cam_rmr.loc[(organization_id,'south','rmr'),filing_month.to_numpy().astype('datetime64[M]')]
+                sce_lcr = 0
+                diablo_canyon_credit = 0
+                if filing_month.month>=6:
+                    sp26_cam = cam_rmr_update.loc[(organization_id,'south','cam'),filing_month.to_numpy().astype('datetime64[M]')]
+                    sp26_rmr = cam_rmr_update.loc[(organization_id,'south','rmr'),filing_month.to_numpy().astype('datetime64[M]')]
+                    diablo_canyon_credit = diablo_canyon_credits.loc[organization_id,filing_month.to_numpy().astype('datetime64[M]')]
+            sp26_cpe_system_cam = np.round(
+                cam_system.loc[(cam_system.loc[:,'path_26_region']=='south'),filing_month.to_numpy().astype('datetime64[M]')].sum() * \
+                load_forecast_input_data.loc[filter(lambda i:i[0]=='SCE' and i[1]==organization_id and i[2]==filing_month,load_forecast_input_data.index),'final_coincident_peak_forecast'].sum() / \
+                load_forecast_input_data.loc[filter(lambda i:i[0]=='SCE' and i[1] in all_lses and i[2]==filing_month,load_forecast_input_data.index),'final_coincident_peak_forecast'].sum(),
+                2
+            )
+            sp26_irp_system_cam = irp_system.loc[(organization_id,'south'),filing_month.to_numpy().astype('datetime64[M]')]
+            sp26_ra_obligation = np.round(
+                (
+                    (1 + self.config.get_option('planning_reserve_margin')) * (
+                        # SCEload:
+                        month_ahead_forecasts.loc[(organization_id,filing_month),'sce_revised_monthly_forecast']
+                        # SDGEload:
+                        +month_ahead_forecasts.loc[(organization_id,filing_month),'sdge_revised_monthly_forecast']
+                    )
+                    # SP26CAM:
+                    -sp26_cam
+                    # SP26RMR:
+                    -sp26_rmr
+                    # SCELCR:
+                    -sce_lcr
+                    # CPE System CAM:
+                    -sp26_cpe_system_cam
+                    # IRP System CAM:
+                    -sp26_irp_system_cam
+                    # Diablo Canyon Credi:
+                    -diablo_canyon_credit
+                ) ,
+                0
+            )
+            ns_path26_allocation = 0
+            if filing_month.year < 2024:
+                system_rmr_credit = total_cam_rmr.loc['system_rmr'] * cam_rmr_monthly_tracking.loc[(organization_id,filing_month),'total_revised_jurisdictional_load_share']
+            else:
+                system_rmr_credit = cam_rmr.loc[(organization_id,'system','rmr'),filing_month.to_numpy().astype('datetime64[M]')]
+            def incremental_flex_by_category(category:int):
+                if incremental_flex is not None:
+                    flex = incremental_flex.loc[(organization_id,category),'flexibility_requirement']
+                else:
+                    flex = 0
+                return flex
+            def incremental_load_by_area(area:str):
+                if incremental_local_load is not None:
+                    incremental_load = incremental_local_load.loc[(organization_id,area),'incremental_load']
+                else:
+                    incremental_load = 0
+                return incremental_load
+            def august_demand_response(iou_territory:str,location:str,allocation_type:str):
+                month = ts(filing_month.year,8,1)
+                if (iou_territory,organization_id,month) in load_forecast_input_data.index and (location,allocation_type,month) in demand_response_allocation.index:
+                    august_forecast_lse = load_forecast_input_data.loc[(iou_territory,organization_id,month),'final_coincident_peak_forecast']
+                    organization_id_indices = list(dict.fromkeys(load_forecast_input_data.loc[(iou_territory),:].index.get_level_values(0)))
+                    august_forecast_local = load_forecast_input_data.loc[(iou_territory,organization_id_indices,month),'final_coincident_peak_forecast'].sum()
+                    august_demand_response_allocation = demand_response_allocation.loc[(location,allocation_type,month),'allocation'].sum()
+                    if august_forecast_local>0:
+                        demand_response = np.round(august_forecast_lse / august_forecast_local * august_demand_response_allocation,decimals=2)
+                    else:
+                        demand_response = 0
+                else:
+                    demand_response = 0
+                return demand_response
+
+            return pd.Series({
+                'organization_id' : organization_id,
+                'np26_ra_obligation' : np26_ra_obligation,
+                'sn_path26_allocation' : sn_path26_allocation,
+                'sp26_ra_obligation' : sp26_ra_obligation,
+                'ns_path26_allocation' : ns_path26_allocation,
+                'system_rmr_credit' : system_rmr_credit,
+                'np26_cpe_system_cam' : np26_cpe_system_cam,
+                'sp26_cpe_system_cam' : sp26_cpe_system_cam,
+                'year_ahead_flex_rar_category1' : flexibility_requirements.loc[(organization_id,1,filing_month),'flexibility_requirement'] \
+                    - flexibility_rmr.loc[(organization_id,filing_month),'flexibility_rmr'] \
+                    - flexibility_cme.loc[(organization_id,filing_month),'flexibility_cme']
+                    - flexibility_irp.loc[(organization_id,1,filing_month),'flexibility_irp'],
+                'year_ahead_flex_rar_category2' : flexibility_requirements.loc[(organization_id,2,filing_month),'flexibility_requirement'] \
+                    - flexibility_irp.loc[(organization_id,2,filing_month),'flexibility_irp'],
+                'year_ahead_flex_rar_category3' : flexibility_requirements.loc[(organization_id,3,filing_month),'flexibility_requirement'] \
+                    - flexibility_irp.loc[(organization_id,3,filing_month),'flexibility_irp'],
+                'year_ahead_flex_incremental_category1' : incremental_flex_by_category(1),
+                'year_ahead_flex_incremental_category2' : incremental_flex_by_category(2),
+                'year_ahead_flex_incremental_category3' : incremental_flex_by_category(3),
+                'los_angeles_local_rar' : local_rar.loc[organization_id,'los_angeles'],
+                'ventura_local_rar' : local_rar.loc[organization_id,'ventura'],
+                'san_diego_local_rar' : local_rar.loc[organization_id,'san_diego'],
+                'bay_area_local_rar' : local_rar.loc[organization_id,'bay_area'],
+                'fresno_local_rar' : local_rar.loc[organization_id,'fresno'],
+                'sierra_local_rar' : local_rar.loc[organization_id,'sierra'],
+                'stockton_local_rar' : local_rar.loc[organization_id,'stockton'],
+                'kern_local_rar' : local_rar.loc[organization_id,'kern'],
+                'humboldt_local_rar' : local_rar.loc[organization_id,'humboldt'],
+                'northern_california_local_rar' : local_rar.loc[organization_id,'northern_california'],
+                'los_angeles_august_demand_response' : august_demand_response('SCE','los_angeles','prorated'),
+                'ventura_august_demand_response' : august_demand_response('SCE','ventura','prorated'),
+                'san_diego_august_demand_response' : august_demand_response('SDGE','san_diego','prorated'),
+                'bay_area_august_demand_response' : august_demand_response('PGE','bay_area','prorated'),
+                'fresno_august_demand_response' : august_demand_response('PGE','fresno','base'),
+                'sierra_august_demand_response' : august_demand_response('PGE','sierra','base'),
+                'stockton_august_demand_response' : august_demand_response('PGE','stockton','base'),
+                'kern_august_demand_response' : august_demand_response('PGE','kern','base'),
+                'humboldt_august_demand_response' : august_demand_response('PGE','humboldt','base'),
+                'northern_california_august_demand_response' : august_demand_response('PGE','northern_california','base'),
+                'los_angeles_incremental_load' : incremental_load_by_area('los_angeles'),
+                'ventura_incremental_load' : incremental_load_by_area('ventura'),
+                'san_diego_incremental_load' : incremental_load_by_area('san_diego'),
+                'bay_area_incremental_load' : incremental_load_by_area('bay_area'),
+                'fresno_incremental_load' : incremental_load_by_area('fresno'),
+                'sierra_incremental_load' : incremental_load_by_area('sierra'),
+                'stockton_incremental_load' : incremental_load_by_area('stockton'),
+                'kern_incremental_load' : incremental_load_by_area('kern'),
+                'humboldt_incremental_load' : incremental_load_by_area('humboldt'),
+                'northern_california_incremental_load' : incremental_load_by_area('northern_california'),
+            })
+        summary = summary.merge(summary.apply(calculate_summary,axis='columns'),on='organization_id')
+        return summary
+
+    def check_allocation_cube(self):
+        '''
+        compares the filing month's allocations from the allocation cube with
+        those calculated for each load serving entity in the summary template
+        by calculate_allocations, logging any differences. returns a dataframe
+        with the organization id, component, and both values of each
+        allocation which differs by more than 0.01.
+        '''
+        path = self.config.paths.get_path('ra_summary_template')
+        ra_summary = open_workbook(path,data_only=True,read_only=True)
+        data_range = get_data_range(ra_summary['Summary'],'A','',self.config)
+        summary = data_range_to_dataframe(['organization_id'],data_range)
+        organization_ids = list(summary.loc[:,'organization_id'])
+        calculated = self.calculate_allocations(summary).set_index('organization_id').loc[organization_ids,allocation_components]
+        month = pd.to_datetime(self.config.filing_month).to_period('M').to_timestamp()
+        cube = self.get_allocation_cube(organization_ids).xs(month,level='month').loc[organization_ids,allocation_components]
+        calculated = calculated.astype(float).stack().rename('calculated')
+        cube = cube.astype(float).stack().rename('cube')
+        allocations = pd.concat([cube,calculated],axis='columns')
+        allocations.index.names = ['organization_id','component']
+        differences = allocations.loc[~np.isclose(allocations.loc[:,'cube'],allocations.loc[:,'calculated'],rtol=0,atol=0.01,equal_nan=True),:].reset_index()
+        if len(differences)>0:
+            self.logger.log('Allocation Cube Differs from Calculated Allocations for {} Values: {}'.format(len(differences),', '.join(differences.loc[:,'component'].unique())),'WARNING')
+        else:
+            self.logger.log('Allocation Cube Matches Calculated Allocations','INFORMATION')
+        return differences
+
+    def get_allocation_cube(self,organization_ids:list):
+        '''
+        provides the allocations for every load serving entity and month of
+        the filing month's year, loading them from the saved allocation cube
+        if it was calculated from the same inputs, or otherwise calculating
+        them from the year-scoped input files and saving the cube. a cube
+        already provided in the shared inputs, as when consolidating several
+        months in a batch, is reused without being saved again. the cam-rmr
+        update and incremental local files are included whenever available,
+        and are required from june and july respectively.
+
+        parameters:
+            organization_ids - a list of load serving entities from the
+                summary workbook
+        '''
+        filing_month = self.config.filing_month
+        def input_available(path_id:str):
+            try:
+                path = self.config.paths.get_path(path_id)
+                available = path is not None and path.is_file()
+            except:
+                available = False
+            return available
+        input_ids = ['year_ahead','month_ahead']
+        for path_id,first_month in [['cam_rmr_update',6],['incremental_local',7]]:
+            if filing_month.month>=first_month or input_available(path_id):
+                input_ids.append(path_id)
+            else:
+                pass
+
+        # fingerprint the inputs to the cube:
+        load_serving_entity_ids = [organization['id'] for organization in self.config.organizations.list_load_serving_entities()]
+        fingerprint = hashlib.sha256()
+        for path_id in input_ids:
+            fingerprint.update('{}:{};'.format(path_id,get_file_hash(self.config.paths.get_path(path_id))).encode())
+        fingerprint.update('planning_reserve_margin:{};'.format(self.config.get_option('planning_reserve_margin')).encode())
+        fingerprint.update('organization_ids:{};'.format(','.join(organization_ids)).encode())
+        fingerprint.update('load_serving_entity_ids:{};'.format(','.join(load_serving_entity_ids)).encode())
+        input_fingerprint = fingerprint.hexdigest()
+
+        # reuse a cube calculated from the same inputs by the calling process:
+        key = ('allocation_cube',input_fingerprint)
+        shared = key in self.shared_inputs.keys()
+        if shared:
+            allocation_cube = self.shared_inputs[key]
+            self.logger.log('Reusing Shared Allocation Cube for {}'.format(filing_month.year),'INFORMATION')
+        else:
+            allocation_cube = None
+
+        # otherwise load the saved cube if its inputs are unchanged:
+        if self.config.get_option('allocation_cube_filename') is not None:
+            path = self.config.paths.get_path('allocation_cube')
+        else:
+            path = None
+        if allocation_cube is None and path is not None and path.is_file():
+            saved_cube = pd.read_csv(path,parse_dates=['month'])
+            if 'input_fingerprint' in saved_cube.columns and (saved_cube.loc[:,'input_fingerprint']==input_fingerprint).all() \
+                and all([component in saved_cube.columns for component in allocation_components]):
+                allocation_cube = saved_cube.set_index(['organization_id','month']).loc[:,allocation_components]
+                self.logger.log('Loaded Allocation Cube: {}'.format(path.name),'INFORMATION')
+            else:
+                pass
+        else:
+            pass
+
+        # otherwise calculate the cube from year-scoped inputs:
+        if allocation_cube is None:
+            # start timer:
+            init_time = ts.now()
+            self.logger.log('Calculating Allocation Cube for {} from: {}'.format(filing_month.year,', '.join(input_ids)),'INFORMATION')
+            self.read_shared_inputs(input_ids)
+            allocation_cube = get_allocation_cube(
+                self.read_shared_input('year_ahead'),
+                self.read_shared_input('month_ahead')[0],
+                self.read_shared_input('cam_rmr_update') if 'cam_rmr_update' in input_ids else None,
+                self.read_shared_input('incremental_local') if 'incremental_local' in input_ids else None,
+                organization_ids,
+                load_serving_entity_ids,
+                filing_month.year,
+                self.config.get_option('planning_reserve_margin')
+            )
+            self.timer.count(rows=len(allocation_cube))
+            # stop rather than report compliance against incomplete allocations:
+            missing_organizations = list(allocation_cube.index[allocation_cube.isna().any(axis='columns')].get_level_values('organization_id').unique())
+            if len(missing_organizations)>0:
+                message = 'Allocation Data Missing for LSEs: {}'.format(', '.join(missing_organizations))
+                self.logger.log(message,'ERROR')
+                raise ValueError(message)
+            else:
+                pass
+            if path is not None and not self.dry_run:
+                save_csv(allocation_cube.reset_index().assign(input_fingerprint=input_fingerprint),path)
+                self.logger.log('Saved Allocation Cube: {}'.format(path.name),'INFORMATION')
+            else:
+                pass
+            # check time and report:
+            run_time = (ts.now() - init_time).total_seconds()
+            self.logger.log('Calculated Allocation Cube in {:02.0f}:{:02.0f}:{:05.2f}'.format(int(run_time/3600),int((run_time%3600)/60),run_time%60),'INFORMATION')
+        else:
+            pass
+
+        # save the annual obligation report, unless already saved by the calling process:
+        if self.config.get_option('annual_obligation_report_filename') is not None and not self.dry_run and not shared:
+            path = self.config.paths.get_path('annual_obligation_report')
+            save_csv(get_annual_obligation_report(allocation_cube,annual_obligation_components),path)
+            self.logger.log('Saved Annual Obligation Report: {}'.format(path.name),'INFORMATION')
+        else:
+            pass
+
+        self.shared_inputs[key] = allocation_cube
+        return allocation_cube.copy()
+
+    # collect data from each of the monthly lse filings:
     def consolidate_filings(self):
         '''
-        loads data from each ra monthly filing workbook and populates the
-        summary and caiso cross-check workbooks with data and calculation
-        results.
+        loads data from each ra monthly filing workbook and populates the
+        summary and caiso cross-check workbooks with data and calculation
+        results.
+        '''
+        # start timer:
+        init_time = ts.now()
+        self.logger.log('Consolidating Data from LSE Filings','INFORMATION')
+
+        filing_month = self.config.filing_month
+
+        # get list of active load serving entities from summary sheet:
+        ra_summary = self.open_output_workbook('ra_summary')
+        data_range = get_data_range(ra_summary['Summary'],'A','',self.config)
+        active_organizations = [row[0].value for row in data_range]
+
+        # open summary from previous month:
+        path = self.config.paths.get_path('ra_summary_previous_month')
+        ra_summary_previous_month = open_workbook(path,data_only=False,read_only=True)
+
+        # open caiso supply plan cross-check file:
+        caiso_cross_check = self.open_output_workbook('caiso_cross_check')
+
+        # load nqc list from most recent file for current year:
+        nqc_list = self.read_shared_input('nqc_list')
+
+        # set the nqc list index:
+        nqc_list.set_index('resource_id',inplace=True)
+        nqc_list.sort_index(inplace=True)
+
+        # initialize tables:
+        summary = pd.DataFrame()
+        physical_resources = pd.DataFrame()
+        demand_response = pd.DataFrame()
+
+        # combine data tables from each lse filing:
+        for organization_id in active_organizations:
+            organization = self.config.organizations.get_organization(organization_id)
+            monthly_filing_tables = read_ra_monthly_filing(organization,self.config,self.logger)
+            ra_monthly_filing_summary = monthly_filing_tables[0]
+            ra_monthly_filing_physical_resources = monthly_filing_tables[1]
+            ra_monthly_filing_demand_response = monthly_filing_tables[2]
+            self.timer.count_file(self.config.paths.get_path('ra_monthly_filing',organization=organization),'read')
+
+            # append summary, physical resources, and demand response tables with lse-specific data:
+            summary = pd.concat([summary,ra_monthly_filing_summary],axis='index',ignore_index=True)
+            physical_resources = pd.concat([physical_resources,ra_monthly_filing_physical_resources],axis='index',ignore_index=True)
+            demand_response = pd.concat([demand_response,ra_monthly_filing_demand_response],axis='index',ignore_index=True)
+
+        self.timer.count(rows=len(physical_resources)+len(demand_response))
+
+        # set summary table index:
+        summary.set_index('organization_id',inplace=True)
+        summary.sort_index(inplace=True)
+
+        # helper function to retrieve zone for a given resource id:
+        def get_zone(resource_id: str):
+            if resource_id in nqc_list.index:
+                zone = nqc_list.loc[resource_id,'zone']
+            else:
+                zone = 'Unknown'
+            return zone
+
+        # helper function to retrieve local area for a given resource id:
+        def get_local_area(resource_id: str):
+            if resource_id in nqc_list.index:
+                local_area = nqc_list.loc[resource_id,'local_area']
+            else:
+                local_area = 'Unknown'
+            return local_area
+
+        # lookup local areas for physical resources and demand response programs:
+        physical_resources.loc[:,'local_area'] = physical_resources.loc[:,'resource_id'].map(get_local_area)
+        physical_resources.loc[:,'locality'] = physical_resources.loc[:,'local_area'].map(rename_locality)
+        demand_response.loc[:,'local_area'] = demand_response.loc[:,'program_id'].map(get_local_area)
+        demand_response.loc[:,'locality'] = demand_response.loc[:,'local_area'].map(rename_locality)
+
+        # get certifications from previous month:
+        columns = [
+            'organization_id',
+            'organization_officer_name',
+            'organization_officer_title',
+            'filename'
+        ]
+        try:
+            data_range = get_data_range(ra_summary_previous_month['CertifyingOfficers'],'A','BCH',self.config)
+            previous_certifications = data_range_to_dataframe(columns,data_range)
+        except:
+            previous_certifications = pd.DataFrame(columns=columns)
+        previous_certifications.set_index('organization_id',inplace=True)
+        previous_certifications.sort_index(inplace=True)
+
+        # write nqc list to summary file:
+        row_number = 2
+        for resource_id,r in nqc_list.iterrows():
+            ra_summary['NQC_List'][f'A{row_number}'].value = r.loc['generator_name']
+            ra_summary['NQC_List'][f'B{row_number}'].value = resource_id
+            ra_summary['NQC_List'][f'C{row_number}'].value = r.loc['zone']
+            ra_summary['NQC_List'][f'D{row_number}'].value = r.loc['local_area']
+            ra_summary['NQC_List'][f'E{row_number}'].value = r.loc[ts(filing_month.year,1,1).to_numpy().astype('datetime64[M]')]
+            ra_summary['NQC_List'][f'F{row_number}'].value = r.loc[ts(filing_month.year,2,1).to_numpy().astype('datetime64[M]')]
+            ra_summary['NQC_List'][f'G{row_number}'].value = r.loc[ts(filing_month.year,3,1).to_numpy().astype('datetime64[M]')]
+            ra_summary['NQC_List'][f'H{row_number}'].value = r.loc[ts(filing_month.year,4,1).to_numpy().astype('datetime64[M]')]
+            ra_summary['NQC_List'][f'I{row_number}'].value = r.loc[ts(filing_month.year,5,1).to_numpy().astype('datetime64[M]')]
+            ra_summary['NQC_List'][f'J{row_number}'].value = r.loc[ts(filing_month.year,6,1).to_numpy().astype('datetime64[M]')]
+            ra_summary['NQC_List'][f'K{row_number}'].value = r.loc[ts(filing_month.year,7,1).to_numpy().astype('datetime64[M]')]
+            ra_summary['NQC_List'][f'L{row_number}'].value = r.loc[ts(filing_month.year,8,1).to_numpy().astype('datetime64[M]')]
+            ra_summary['NQC_List'][f'M{row_number}'].value = r.loc[ts(filing_month.year,9,1).to_numpy().astype('datetime64[M]')]
+            ra_summary['NQC_List'][f'N{row_number}'].value = r.loc[ts(filing_month.year,10,1).to_numpy().astype('datetime64[M]')]
+            ra_summary['NQC_List'][f'O{row_number}'].value = r.loc[ts(filing_month.year,11,1).to_numpy().astype('datetime64[M]')]
+            ra_summary['NQC_List'][f'P{row_number}'].value = r.loc[ts(filing_month.year,12,1).to_numpy().astype('datetime64[M]')]
+            ra_summary['NQC_List'][f'Q{row_number}'].value = r.loc['dispatchable']
+            ra_summary['NQC_List'][f'R{row_number}'].value = r.loc['deliverability_status']
+            ra_summary['NQC_List'][f'S{row_number}'].value = r.loc['deliverable']
+            ra_summary['NQC_List'][f'T{row_number}'].value = r.loc['comments']
+            row_number+=1
+
+        # total the capacity shown for each resource across all load serving entities:
+        resource_table = get_resource_table(physical_resources,demand_response,nqc_list,active_organizations,filing_month)
+        resource_allocations = get_resource_allocations(resource_table,filing_month)
+
+        # write consolidated data and formulas to summary and caiso check files:
+        first_row_number_summary = 2
+        row_number_summary = first_row_number_summary
+        first_row_number_physical_resources = 2
+        row_number_physical_resources = first_row_number_physical_resources
+        for organization_id in active_organizations:
+            ra_summary['NP26'][f'C{row_number_summary}'] = '=SUMIFS(PhysicalResources!D:D,PhysicalResources!A:A,INDIRECT("A"&ROW()),PhysicalResources!J:J,"North",PhysicalResources!F:F,"<>DR")'
+            ra_summary['NP26'][f'C{row_number_summary}'].fill = PatternFill(start_color='FFCC99',end_color='FFCC99',fill_type='solid')
+            ra_summary['NP26'][f'C{row_number_summary}'].number_format = '#,##0.00'
+            ra_summary['NP26'][f'D{row_number_summary}'] = '=ROUND(INDIRECT("H"&ROW()),2)'
+            ra_summary['NP26'][f'D{row_number_summary}'].number_format = '#,##0.00'
+            ra_summary['NP26'][f'E{row_number_summary}'].value = 0
+            ra_summary['NP26'][f'E{row_number_summary}'].number_format = '#,##0.00'
+            ra_summary['NP26'][f'F{row_number_summary}'] = '=MAX(INDIRECT("B"&ROW())-INDIRECT("C"&ROW())-INDIRECT("D"&ROW())-INDIRECT("E"&ROW()),0)'
+            ra_summary['NP26'][f'F{row_number_summary}'].fill = PatternFill(start_color='CC99FF',end_color='CC99FF',fill_type='solid')
+            ra_summary['NP26'][f'F{row_number_summary}'].number_format = '#,##0.00'
+            ra_summary['NP26'][f'H{row_number_summary}'] = '={}*INDIRECT("G"&ROW())'.format(self.config.get_option('demand_response_multiplier'))
+            ra_summary['NP26'][f'H{row_number_summary}'].number_format = '#,##0.00'
+            ra_summary['NP26'][f'I{row_number_summary}'] = '=INDIRECT("C"&ROW())+INDIRECT("D"&ROW())'
+            ra_summary['NP26'][f'I{row_number_summary}'].number_format = '#,##0.00'
+            ra_summary['NP26'][f'L{row_number_summary}'] = '=INDIRECT("C"&ROW())+INDIRECT("D"&ROW())-INDIRECT("B"&ROW())'
+            ra_summary['NP26'][f'L{row_number_summary}'].number_format = '#,##0.00'
+            ra_summary['NP26'][f'M{row_number_summary}'] = '=INDIRECT("K"&ROW())+INDIRECT("SP26!K"&ROW())'
+            ra_summary['NP26'][f'M{row_number_summary}'].number_format = '#,##0.00'
+            ra_summary['NP26'][f'N{row_number_summary}'] = '=INDIRECT("L"&ROW())-INDIRECT("SP26!L"&ROW())'
+            ra_summary['NP26'][f'N{row_number_summary}'].number_format = '#,##0.00'
+            ra_summary['SP26'][f'C{row_number_summary}'] = '=SUMIFS(PhysicalResources!D:D,PhysicalResources!A:A,INDIRECT("A"&ROW()),PhysicalResources!J:J,"South",PhysicalResources!F:F, "<>DR")'
+            ra_summary['SP26'][f'C{row_number_summary}'].fill = PatternFill(start_color='FFCC99',end_color='FFCC99',fill_type='solid')
+            ra_summary['SP26'][f'C{row_number_summary}'].number_format = '#,##0.00'
+            ra_summary['SP26'][f'D{row_number_summary}'] = '=ROUND(INDIRECT("H"&ROW()),2)'
+            ra_summary['SP26'][f'D{row_number_summary}'].number_format = '#,##0.00'
+            ra_summary['SP26'][f'E{row_number_summary}'].value = 0
+            ra_summary['SP26'][f'E{row_number_summary}'].number_format = '#,##0.00'
+            ra_summary['SP26'][f'F{row_number_summary}'] = '=MAX(INDIRECT("B"&ROW())-INDIRECT("C"&ROW())-INDIRECT("D"&ROW())-INDIRECT("E"&ROW()),0)'
+            ra_summary['SP26'][f'F{row_number_summary}'].fill = PatternFill(start_color='CC99FF',end_color='CC99FF',fill_type='solid')
+            ra_summary['SP26'][f'F{row_number_summary}'].number_format = '#,##0.00'
+            ra_summary['SP26'][f'H{row_number_summary}'] = '={}*INDIRECT("G"&ROW())'.format(self.config.get_option('demand_response_multiplier'))
+            ra_summary['SP26'][f'H{row_number_summary}'].number_format = '#,##0.00'
+            ra_summary['SP26'][f'I{row_number_summary}'] = '=INDIRECT("C"&ROW())+INDIRECT("D"&ROW())'
+            ra_summary['SP26'][f'I{row_number_summary}'].number_format = '#,##0.00'
+            ra_summary['SP26'][f'L{row_number_summary}'] = '=INDIRECT("C"&ROW())+INDIRECT("D"&ROW())-INDIRECT("B"&ROW())'
+            ra_summary['SP26'][f'L{row_number_summary}'].number_format = '#,##0.00'
+            ra_summary['SP26'][f'M{row_number_summary}'] = '=INDIRECT("K"&ROW())+INDIRECT("NP26!K"&ROW())'
+            ra_summary['SP26'][f'M{row_number_summary}'].number_format = '#,##0.00'
+            ra_summary['MCC_Check'][f'B{row_number_summary}'] = '=VLOOKUP(INDIRECT("A"&ROW()),Summary!$A:$B,2,FALSE)'
+            ra_summary['MCC_Check'][f'C{row_number_summary}'] = '=INDIRECT("F"&ROW())+INDIRECT("L"&ROW())+INDIRECT("N"&ROW())'
+            ra_summary['MCC_Check'][f'D{row_number_summary}'] = '=IFERROR(INDIRECT("C"&ROW())/INDIRECT("B"&ROW()),"")'
+            ra_summary['MCC_Check'][f'E{row_number_summary}'] = '=INDIRECT("B"&ROW())*MCC_Parameters!$B$2'
+            ra_summary['MCC_Check'][f'F{row_number_summary}'] = '=MIN(INDIRECT("E"&ROW()),INDIRECT("NP26!H"&ROW())+INDIRECT("SP26!H"&ROW()))'
+            ra_summary['MCC_Check'][f'G{row_number_summary}'] = '=INDIRECT("B"&ROW())*MCC_Parameters!$B$3'
+            ra_summary['MCC_Check'][f'H{row_number_summary}'] = '=MIN(INDIRECT("G"&ROW()),SUMIFS(PhysicalResources!$D:$D,PhysicalResources!$A:$A,INDIRECT("A"&ROW()),PhysicalResources!$F:$F,1))'
+            ra_summary['MCC_Check'][f'I{row_number_summary}'] = '=INDIRECT("B"&ROW())*MCC_Parameters!$B$4'
+            ra_summary['MCC_Check'][f'J{row_number_summary}'] = '=MIN(INDIRECT("I"&ROW()),SUMIFS(PhysicalResources!$D:$D,PhysicalResources!$A:$A,INDIRECT("A"&ROW()),PhysicalResources!$F:$F,2)+INDIRECT("H"&ROW()))'
+            ra_summary['MCC_Check'][f'K{row_number_summary}'] = '=INDIRECT("B"&ROW())*MCC_Parameters!$B$5'
+            ra_summary['MCC_Check'][f'L{row_number_summary}'] = '=MIN(INDIRECT("K"&ROW()),SUMIFS(PhysicalResources!$D:$D,PhysicalResources!$A:$A,INDIRECT("A"&ROW()),PhysicalResources!$F:$F,3)+INDIRECT("J"&ROW()))'
+            ra_summary['MCC_Check'][f'M{row_number_summary}'] = '=INDIRECT("B"&ROW())*MCC_Parameters!$B$6'
+            ra_summary['MCC_Check'][f'N{row_number_summary}'] = '=SUMIFS(PhysicalResources!$D:$D,PhysicalResources!$A:$A,INDIRECT("A"&ROW()),PhysicalResources!$F:$F,4)'
+            ra_summary['MCC_Check'][f'O{row_number_summary}'] = '=INDIRECT("B"&ROW())*MCC_Parameters!$B$7'
+            ra_summary['MCC_Check'][f'P{row_number_summary}'] = '=SUMIFS(PhysicalResources!$D:$D,PhysicalResources!$A:$A,INDIRECT("A"&ROW()),PhysicalResources!$F:$F,4,PhysicalResources!$G:$G,TRUE)'
+            ra_summary['FlexRAR'][f'F{row_number_summary}'] = '=SUMIFS(PhysicalResources!$H:$H,PhysicalResources!$A:$A,INDIRECT("A"&ROW()),PhysicalResources!$I:$I,1)'
+            ra_summary['CertifyingOfficers'][f'E{row_number_summary}'] = '=IF(INDIRECT("D"&ROW())=INDIRECT("B"&ROW()),"-","Yes")'
+            ra_summary['CertifyingOfficers'][f'G{row_number_summary}'] = '=IF(INDIRECT("F"&ROW())=INDIRECT("C"&ROW()),"-","Yes")'
+            if organization_id in previous_certifications.index:
+                ra_summary['CertifyingOfficers'][f'D{row_number_summary}'] = previous_certifications.loc[organization_id,'organization_officer_name']
+                ra_summary['CertifyingOfficers'][f'F{row_number_summary}'] = previous_certifications.loc[organization_id,'organization_officer_title']
+                ra_summary['CertifyingOfficers'][f'I{row_number_summary}'] = previous_certifications.loc[organization_id,'filename']
+            else:
+                ra_summary['CertifyingOfficers'][f'D{row_number_summary}'] = '[Record Not Found]'
+                ra_summary['CertifyingOfficers'][f'F{row_number_summary}'] = '[Record Not Found]'
+                ra_summary['CertifyingOfficers'][f'I{row_number_summary}'] = '[Record Not Found]'
+            self.write_organization_values(ra_summary,caiso_cross_check,row_number_summary,organization_id,summary,physical_resources,demand_response)
+            caiso_cross_check['FilingSummary'][f'A{row_number_summary}'] = organization_id
+            caiso_cross_check['FilingSummary'][f'B{row_number_summary}'] = '=SUMIF(Filings!$A:$A,INDIRECT("A"&ROW()),Filings!$G:$G)'
+            caiso_cross_check['FilingSummary'][f'C{row_number_summary}'] = '=SUMIF(CAISO_Sys_SP!$C:$C,INDIRECT("A"&ROW()),CAISO_Sys_SP!$I:$I)'
+            caiso_cross_check['FilingSummary'][f'D{row_number_summary}'] = '=INDIRECT("C"&ROW())-INDIRECT("B"&ROW())'
+            caiso_cross_check['FilingSummary'][f'D{row_number_summary}'].fill = PatternFill(start_color='FFF2CC',end_color='FFF2CC',fill_type='solid')
+            caiso_cross_check['FilingSummary'][f'E{row_number_summary}'] = '=SUMIFS(Filings!$M:$M,Filings!$A:$A,INDIRECT("A"&ROW()),Filings!$Q:$Q,1)'
+            caiso_cross_check['FilingSummary'][f'F{row_number_summary}'] = '=SUMIFS(CAISO_Flex_SP!$G:$G,CAISO_Flex_SP!$B:$B,INDIRECT("A"&ROW()),CAISO_Flex_SP!$F:$F,1)'
+            caiso_cross_check['FilingSummary'][f'G{row_number_summary}'] = '=INDIRECT("F"&ROW())-INDIRECT("E"&ROW())'
+            caiso_cross_check['FilingSummary'][f'G{row_number_summary}'].fill = PatternFill(start_color='FFF2CC',end_color='FFF2CC',fill_type='solid')
+            caiso_cross_check['FilingSummary'][f'H{row_number_summary}'] = '=SUMIFS(Filings!$M:$M,Filings!$A:$A,INDIRECT("A"&ROW()),Filings!$Q:$Q,2)'
+            caiso_cross_check['FilingSummary'][f'I{row_number_summary}'] = '=SUMIFS(CAISO_Flex_SP!$G:$G,CAISO_Flex_SP!$B:$B,INDIRECT("A"&ROWC()),CAISO_Flex_SP!$F:$F,2)'
+            caiso_cross_check['FilingSummary'][f'J{row_number_summary}'] = '=INDIRECT("I"&ROW())-INDIRECT("H"&ROW())'
+            caiso_cross_check['FilingSummary'][f'J{row_number_summary}'].fill = PatternFill(start_color='FFF2CC',end_color='FFF2CC',fill_type='solid')
+            caiso_cross_check['FilingSummary'][f'K{row_number_summary}'] = '=SUMIFS(Filings!$M:$M,Filings!$A:$A,INDIRECT("A"&ROW()),Filings!$Q:$Q,3)'
+            caiso_cross_check['FilingSummary'][f'L{row_number_summary}'] = '=SUMIFS(CAISO_Flex_SP!$G:$G,CAISO_Flex_SP!$B:$B,INDIRECT("A"&ROW()),CAISO_Flex_SP!$F:$F,3)'
+            caiso_cross_check['FilingSummary'][f'M{row_number_summary}'] = '=INDIRECT("L"&ROW())-INDIRECT("K"&ROW())'
+            caiso_cross_check['FilingSummary'][f'M{row_number_summary}'].fill = PatternFill(start_color='FFF2CC',end_color='FFF2CC',fill_type='solid')
+            caiso_cross_check['FilingSummary'][f'Y{row_number_summary}'] = '=INDIRECT("L"&ROW())-INDIRECT("K"&ROW())'
+            row_number_summary += 1
+            for _,row in physical_resources.loc[(physical_resources.loc[:,'organization_id']==organization_id),:].iterrows():
+                self.write_resource_row(ra_summary,caiso_cross_check,row_number_physical_resources,organization_id,row,get_zone(row.loc['resource_id']))
+                row_number_physical_resources += 1
+            for _,row in demand_response.loc[(demand_response.loc[:,'organization_id']==organization_id),:].iterrows():
+                program = row.rename({'program_id':'resource_id'})
+                program.loc['continuous_availability'] = False
+                self.write_resource_row(ra_summary,caiso_cross_check,row_number_physical_resources,organization_id,program,get_zone(program.loc['resource_id']))
+                row_number_physical_resources += 1
+
+        # write resource totals and nqc exceedance to physical resources sheet:
+        write_static_values(ra_summary['PhysicalResources'],get_resource_total_values(resource_table,resource_allocations,first_row_number_physical_resources),[])
+        self.write_over_allocation_report(resource_allocations)
+
+        # apply conditional formatting to flex-rar sheet:
+        ra_summary['FlexRAR'].conditional_formatting.add(
+            'C{}:C{}'.format(first_row_number_summary,row_number_summary-1),
+            CellIsRule(
+                operator='lessThan',
+                formula=['INDIRECT("B"&ROW())'],
+                stopIfTrue=False,
+                fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
+                font=Font(color='9C0006')
+            )
+        )
+        ra_summary['FlexRAR'].conditional_formatting.add(
+            'D{}:D{}'.format(first_row_number_summary,row_number_summary-1),
+            CellIsRule(
+                operator='lessThan',
+                formula=[1.0],
+                stopIfTrue=False,
+                fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
+                font=Font(color='9C0006')
+            )
+        )
+        ra_summary['FlexRAR'].conditional_formatting.add(
+            'F{}:F{}'.format(first_row_number_summary,row_number_summary-1),
+            CellIsRule(
+                operator='lessThan',
+                formula=['INDIRECT("E"&ROW())'],
+                stopIfTrue=False,
+                fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
+                font=Font(color='9C0006')
+            )
+        )
+
+        # create totals row in MCC_Check worksheet:
+        ra_summary['MCC_Check'][f'A{row_number_summary}'] = 'Total:'
+        for col_letter in 'BCDEFGHIJKLMNOP':
+            ra_summary['MCC_Check'][f'{col_letter}{row_number_summary}'] = '=SUM({0}{1}:{0}{2})'.format(col_letter,first_row_number_summary,row_number_summary-1)
+            for row_number_formatting in range(first_row_number_summary,row_number_summary+1):
+                ra_summary['MCC_Check'][f'{col_letter}{row_number_formatting}'].number_format = '#,##0.00'
+
+        # create totals row in FlexRAR worksheet:
+        ra_summary['FlexRAR'][f'A{row_number_summary}'] = 'Total:'
+        ra_summary['FlexRAR'][f'D{row_number_summary}'] = '=IFERROR(INDIRECT("C"&ROW())/INDIRECT("B"&ROW()),0)'
+        ra_summary['FlexRAR'][f'D{row_number_summary}'].number_format = '0.00%'
+        for col_letter in 'BCEFGHIJLMNOQRST':
+            ra_summary['FlexRAR']['{}{}'.format(col_letter,row_number_summary)] = '=SUM({0}2:{0}{1})'.format(col_letter,row_number_summary-1)
+            ra_summary['FlexRAR']['{}{}'.format(col_letter,row_number_summary)].number_format ='#,##0.00'
+        for col_letter in 'ABCDEFGHIJKLMNOPQRST':
+            ra_summary['FlexRAR']['{}{}'.format(col_letter,row_number_summary)].fill = PatternFill(start_color='00FF00',end_color='00FF00',fill_type='solid')
+
+        # apply conditional formatting to local true-up sheet:
+        for col_letter in ['F','K','P','U','Z','AE','AJ','AO','AT','AY','BD','BI','BN','BS']:
+            ra_summary['LocalTrueUp'].conditional_formatting.add(
+                '{0}{1}:{0}{2}'.format(col_letter,first_row_number_summary,row_number_summary-1),
+                CellIsRule(
+                    operator='lessThan',
+                    formula=[0],
+                    stopIfTrue=False,
+                    fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
+                    font=Font(color='9C0006')
+                )
+            )
+
+        # apply conditional formatting to certifying officer sheet:
+        ra_summary['CertifyingOfficers'].conditional_formatting.add(
+            'E{}:E{}'.format(first_row_number_summary,row_number_summary-1),
+            CellIsRule(
+                operator='equal',
+                formula=['"Yes"'],
+                stopIfTrue=False,
+                fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
+                font=Font(color='9C0006')
+            )
+        )
+        ra_summary['CertifyingOfficers'].conditional_formatting.add(
+            'G{}:G{}'.format(first_row_number_summary,row_number_summary-1),
+            CellIsRule(
+                operator='equal',
+                formula=['"Yes"'],
+                stopIfTrue=False,
+                fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
+                font=Font(color='9C0006')
+            )
+        )
+
+        # write total lines in np and sp worksheets:
+        for sheet_name in ['NP26','SP26']:
+            ra_summary[sheet_name][f'A{row_number_summary}'] = 'Total:'
+            ra_summary[sheet_name][f'A{row_number_summary}'].fill = PatternFill(start_color='00FF00',end_color='00FF00',fill_type='solid')
+            for col_letter in 'BCDEFGHIJK':
+                ra_summary[sheet_name][f'{col_letter}{row_number_summary}'] = '=SUM({0}{1}:{0}{2})'.format(col_letter,first_row_number_summary,row_number_summary-1)
+                ra_summary[sheet_name][f'{col_letter}{row_number_summary}'].number_format = '#,##0.00'
+                ra_summary[sheet_name][f'{col_letter}{row_number_summary}'].fill = PatternFill(start_color='00FF00',end_color='00FF00',fill_type='solid')
+            ra_summary[sheet_name][f'I{row_number_summary}'] = '=INDIRECT("C"&ROW())+INDIRECT("E"&ROW())'
+            ra_summary[sheet_name][f'A{row_number_summary+1}'].value = 'Net Long/Short:'
+            ra_summary[sheet_name][f'C{row_number_summary+1}'].value = 'Excess in Zone:'
+            ra_summary[sheet_name][f'A{row_number_summary+1}'].fill = PatternFill(start_color='CCFFCC',end_color='CCFFCC',fill_type='solid')
+            ra_summary[sheet_name][f'E{row_number_summary+1}'] = '=INDIRECT("D"&ROW()-1)+INDIRECT("C"&ROW()-1)-INDIRECT("B"&ROW()-1)'
+
+            # apply conditional formatting to columns:
+            ra_summary[sheet_name].conditional_formatting.add(
+                f'F{first_row_number_summary}:F{row_number_summary-1}',
+                CellIsRule(
+                    operator='greaterThan',
+                    formula=[0],
+                    stopIfTrue=False,
+                    fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
+                    font=Font(color='9C0006')
+                )
+            )
+            ra_summary[sheet_name].conditional_formatting.add(
+                '{0}{1}:{0}{2}'.format({'NP26':'M','SP26':'L'}[sheet_name],first_row_number_summary,row_number_summary-1),
+                CellIsRule(
+                    operator='equal',
+                    formula=['"Monthly Filing Not Found"'],
+                    stopIfTrue=False,
+                    fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
+                    font=Font(color='9C0006')
+                )
+            )
+
+        # apply conditional formatting to requirements sheet in caiso supply plan cross-check file:
+        caiso_cross_check['Requirements'].conditional_formatting.add(
+            f'E{first_row_number_summary+1}:E{row_number_summary}',
+            CellIsRule(
+                operator='lessThan',
+                formula=['INDIRECT("B"&ROW())'],
+                stopIfTrue=False,
+                fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
+                font=Font(color='9C0006')
+            )
+        )
+        caiso_cross_check['Requirements'].conditional_formatting.add(
+            f'F{first_row_number_summary+1}:F{row_number_summary}',
+            CellIsRule(
+                operator='lessThan',
+                formula=[1.0],
+                stopIfTrue=False,
+                fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
+                font=Font(color='9C0006')
+            )
+        )
+        caiso_cross_check['Requirements'].conditional_formatting.add(
+            f'K{first_row_number_summary+1}:K{row_number_summary}',
+            CellIsRule(
+                operator='lessThan',
+                formula=['INDIRECT("J"&ROW())'],
+                stopIfTrue=False,
+                fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
+                font=Font(color='9C0006')
+            )
+        )
+        caiso_cross_check['Requirements'].conditional_formatting.add(
+            f'L{first_row_number_summary+1}:L{row_number_summary}',
+            CellIsRule(
+                operator='lessThan',
+                formula=[1.0],
+                stopIfTrue=False,
+                fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
+                font=Font(color='9C0006')
+            )
+        )
+        caiso_cross_check['Requirements'].conditional_formatting.add(
+            f'N{first_row_number_summary+1}:N{row_number_summary}',
+            CellIsRule(
+                operator='lessThan',
+                formula=['INDIRECT("M"&ROW())'],
+                stopIfTrue=False,
+                fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
+                font=Font(color='9C0006')
+            )
+        )
+        for col in ['AB','AG','AL','AQ','AV','BA','BF','BK','BP','BU','BZ','CE','CJ','CO']:
+            caiso_cross_check['Requirements'].conditional_formatting.add(
+                '{0}{1}:{0}{2}'.format(col,first_row_number_summary+1,row_number_summary),
+                CellIsRule(
+                    operator='lessThan',
+                    formula=[0],
+                    stopIfTrue=False,
+                    fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
+                    font=Font(color='9C0006')
+                )
+            )
+
+        # replace formulas with calculated values, which a dry run requires for
+        # comparison, or calculate them in copies of the workbooks from which
+        # the consolidation's metrics are saved:
+        if self.config.get_option('consolidation_output_mode')=='values' or self.dry_run:
+            self.write_filing_values(ra_summary,caiso_cross_check,resource_table,first_row_number_summary,row_number_summary)
+        else:
+            self.metric_workbooks = {'ra_summary':deepcopy(ra_summary),'caiso_cross_check':deepcopy(caiso_cross_check)}
+            self.write_filing_values(self.metric_workbooks['ra_summary'],self.metric_workbooks['caiso_cross_check'],resource_table,first_row_number_summary,row_number_summary)
+
+        # save outputs and add to logs, which are left to the calling process in a batch and skipped during a dry run:
+        self.save_output_workbook(ra_summary,'ra_summary')
+        self.save_output_workbook(caiso_cross_check,'caiso_cross_check')
+        if self.dry_run or self.defer_result_logging:
+            pass
+        else:
+            self.log_results()
+
+        # check time and report:
+        run_time = (ts.now() - init_time).total_seconds()
+        self.logger.log('Consolidated LSE Filings in {:02.0f}:{:02.0f}:{:05.2f}'.format(int(run_time/3600),int((run_time%3600)/60),run_time%60),'INFORMATION')
+
+    def log_results(self):
+        '''
+        adds the summary and caiso supply plan cross-check workbooks for the
+        filing month to the email and attachment logs as results of the
+        consolidation.
+        '''
+        filing_month = self.config.filing_month
+        save_timestamp = ts.now()
+        email_id = '00000000-0000-0000-0000-{}0002'.format(save_timestamp.strftime('%Y%m%d'))
+        if email_id not in self.email_logger.data.loc[:,'email_id'].values:
+            email_information = pd.Series({
+                'email_id' : email_id,
+                'sender' : 'results',
+                'subject' : '',
+                'receipt_date' : save_timestamp,
+                'included' : True,
+                'group' : 'internal',
+            })
+            self.email_logger.log(email_information)
+        attachment_index = len(self.attachment_logger.data.loc[(self.attachment_logger.data.loc[:,'email_id']==email_id),'attachment_id'])
+        attachment_id = '{}0002{:020.0f}'.format(save_timestamp.strftime('%Y%m%d'),attachment_index)
+        archive_path = self.config.paths.get_path('ra_summary')
+        if attachment_id not in self.attachment_logger.data.loc[:,'attachment_id'].values and str(archive_path) not in self.attachment_logger.data.loc[:,'archive_path'].values:
+            attachment_information = pd.Series({
+                'email_id' : email_id,
+                'attachment_id' : attachment_id,
+                'download_path' : '',
+                'ra_category' : 'ra_summary',
+                'organization_id' : 'CPUC',
+                'effective_date' : filing_month,
+                'archive_path' : str(archive_path),
+                'file_hash' : '',
+            })
+            self.attachment_logger.log(attachment_information)
+
+        attachment_index = len(self.attachment_logger.data.loc[(self.attachment_logger.data.loc[:,'email_id']==email_id),'attachment_id'])
+        attachment_id = '{}0002{:020.0f}'.format(save_timestamp.strftime('%Y%m%d'),attachment_index)
+        archive_path = self.config.paths.get_path('caiso_cross_check')
+        if attachment_id not in self.attachment_logger.data.loc[:,'attachment_id'].values and str(archive_path) not in self.attachment_logger.data.loc[:,'archive_path'].values:
+            attachment_information = pd.Series({
+                'email_id' : email_id,
+                'attachment_id' : attachment_id,
+                'download_path' : '',
+                'ra_category' : 'caiso_cross_check',
+                'organization_id' : 'CPUC',
+                'effective_date' : filing_month,
+                'archive_path' : str(archive_path),
+                'file_hash' : '',
+            })
+            self.attachment_logger.log(attachment_information)
+        self.attachment_logger.commit()
+        self.email_logger.commit()
+
+    # consolidate caiso supply plans into cross-check file:
+    def consolidate_supply_plans(self):
+        '''
+        loads data from caiso supply plan workbooks and populates the caiso
+        cross-check workbooks with data and calculation results.
         '''
         # start timer:
         init_time = ts.now()
-        self.logger.log('Consolidating Data from LSE Filings','INFORMATION')
+        self.logger.log('Copying CAISO Supply Plan into Cross-Check File','INFORMATION')
+
+        supply_plan_system = read_supply_plan(self.config,'supply_plan_system')
+        supply_plan_flexible = read_supply_plan(self.config,'supply_plan_flexible')
+        for path_id in ['supply_plan_system','supply_plan_flexible']:
+            self.timer.count_file(self.config.paths.get_path(path_id),'read')
+        self.timer.count(rows=len(supply_plan_system)+len(supply_plan_flexible))
+
+        caiso_cross_check = self.open_output_workbook('caiso_cross_check')
+
+        # copy supply plan data into cross-check file. the formulas on each
+        # row are only written in formulas mode, since in values mode
+        # cross_check_supply_plans writes calculated values in their place:
+        supply_plan_fill = PatternFill(start_color='DDEBF7',end_color='DDEBF7',fill_type='solid')
+        for sheet_name,supply_plan in [['CAISO_Sys_SP',supply_plan_system],['CAISO_Flex_SP',supply_plan_flexible]]:
+            worksheet = caiso_cross_check[sheet_name]
+            formulas = supply_plan_sheet_formulas[sheet_name]
+            data_columns = supply_plan_sheet_columns[sheet_name]
+            row_numbers = range(2,len(supply_plan)+2)
+            supply_plan_values = supply_plan.iloc[:,:len(data_columns)].set_axis(data_columns[:len(supply_plan.columns)],axis=1)
+            write_static_values(worksheet,supply_plan_values.set_index(pd.Index(row_numbers)),[])
+            if self.config.get_option('consolidation_output_mode')!='values':
+                for row_number in row_numbers:
+                    for column_letter,formula in formulas.items():
+                        worksheet[f'{column_letter}{row_number}'] = formula
+            else:
+                pass
+            for row_number in row_numbers:
+                for column_letter in formulas.keys():
+                    worksheet[f'{column_letter}{row_number}'].fill = supply_plan_fill
+
+        # match filings against supply plans and replace formulas with calculated values:
+        self.cross_check_supply_plans(caiso_cross_check,supply_plan_system,supply_plan_flexible,self.get_metric_workbook('caiso_cross_check'))
+
+        # save and close:
+        self.save_output_workbook(caiso_cross_check,'caiso_cross_check')
+
+        # check time and report:
+        run_time = (ts.now() - init_time).total_seconds()
+        self.logger.log('Copied CAISO Supply Plan to Cross-Check File in {:02.0f}:{:02.0f}:{:05.2f}'.format(int(run_time/3600),int((run_time%3600)/60),run_time%60),'INFORMATION')
+
+    def get_revised_filings(self,previous_consolidation_log:pd.DataFrame):
+        '''
+        compares the files found by check_files with those logged by the
+        previous consolidation and returns a list of organization ids whose
+        monthly filings have a new version or new contents. returns none if
+        the consolidated files must be rebuilt instead, i.e., if there is no
+        previous consolidation to compare against, if any file other than a
+        monthly filing has changed, or if load serving entities have been
+        added or removed.
+
+        parameters:
+            previous_consolidation_log - the consolidation log data from the
+                previous run, copied before check_files is called
+        '''
+        check_columns = ['ra_category','organization_id']
+        compare_columns = ['attachment_id','archive_path','status','file_hash']
+        if len(previous_consolidation_log)==0 or all(previous_consolidation_log.loc[:,'file_hash'].fillna('')==''):
+            self.logger.log('No Previous Consolidation Available for Comparison','INFORMATION')
+            revised_organizations = None
+        elif not (self.config.paths.get_path('ra_summary').is_file() and self.config.paths.get_path('caiso_cross_check').is_file()):
+            self.logger.log('Previously Consolidated Files Not Found','INFORMATION')
+            revised_organizations = None
+        else:
+            current = self.consolidation_logger.data.loc[:,check_columns+compare_columns].fillna('').astype(str)
+            previous = previous_consolidation_log.loc[:,check_columns+compare_columns].fillna('').astype(str)
+            comparison = current.merge(previous,how='outer',on=check_columns,suffixes=('','_previous'),indicator=True)
+            changed = comparison.loc[:,'_merge']!='both'
+            for column in compare_columns:
+                changed |= comparison.loc[:,column]!=comparison.loc[:,f'{column}_previous']
+            monthly_filings = comparison.loc[:,'ra_category']=='ra_monthly_filing'
+            if (changed & ~monthly_filings).any():
+                changed_ra_categories = ', '.join(comparison.loc[changed & ~monthly_filings,'ra_category'].unique())
+                self.logger.log('Files Other Than Monthly Filings Changed Since Previous Consolidation: {}'.format(changed_ra_categories),'INFORMATION')
+                revised_organizations = None
+            elif (monthly_filings & (comparison.loc[:,'_merge']!='both')).any():
+                self.logger.log('Load Serving Entities Changed Since Previous Consolidation','INFORMATION')
+                revised_organizations = None
+            else:
+                revised_organizations = list(comparison.loc[changed & monthly_filings,'organization_id'])
+        return revised_organizations
+
+    def consolidate_revised_filings(self,previous_consolidation_log:pd.DataFrame):
+        '''
+        patches the existing summary and caiso cross-check workbooks with the
+        monthly filings revised since the previous consolidation. only the
+        revised filings are read, and only their rows are rewritten, along
+        with any resource rows shifted by a change in a revised filing's
+        length. resource totals and supply plan matches, which depend on all
+        filings, are recalculated. returns false without changing any files
+        if the workbooks must instead be rebuilt with a full consolidation.
+
+        parameters:
+            previous_consolidation_log - the consolidation log data from the
+                previous run, copied before check_files is called
+        '''
+        # start timer:
+        init_time = ts.now()
+        self.logger.log('Checking for Revised LSE Filings','INFORMATION')
+
+        revised_organizations = self.get_revised_filings(previous_consolidation_log)
+        if revised_organizations is None:
+            self.logger.log('Unable to Patch Consolidated Files, Full Consolidation Required','INFORMATION')
+            patched = False
+        else:
+            # carry compliance forward for filings which have not been revised:
+            previous_compliance = previous_consolidation_log.loc[
+                (previous_consolidation_log.loc[:,'ra_category']=='ra_monthly_filing'),
+                ['organization_id','compliance']
+            ].set_index('organization_id').loc[:,'compliance']
+            unrevised_filings = (self.consolidation_logger.data.loc[:,'ra_category']=='ra_monthly_filing') & \
+                ~self.consolidation_logger.data.loc[:,'organization_id'].isin(revised_organizations)
+            self.consolidation_logger.data.loc[unrevised_filings,'compliance'] = \
+                self.consolidation_logger.data.loc[unrevised_filings,'organization_id'].map(previous_compliance)
+            self.consolidation_logger.commit()
+            if len(revised_organizations)==0:
+                self.logger.log('No Revised LSE Filings Since Previous Consolidation','INFORMATION')
+                patched = True
+            else:
+                self.logger.log('Patching Consolidated Files with Revised LSE Filings: {}'.format(', '.join(revised_organizations)),'INFORMATION')
+                patched = self.patch_filings(revised_organizations)
+                if patched and not self.dry_run:
+                    self.save_consolidation_metrics()
+                else:
+                    self.metric_workbooks = None
 
+        # check time and report:
+        run_time = (ts.now() - init_time).total_seconds()
+        self.logger.log('Checked for Revised LSE Filings in {:02.0f}:{:02.0f}:{:05.2f}'.format(int(run_time/3600),int((run_time%3600)/60),run_time%60),'INFORMATION')
+        return patched
+
+    def patch_filings(self,revised_organizations:list):
+        '''
+        rewrites the rows of the given load serving entities in the existing
+        summary and caiso cross-check workbooks from their monthly filings.
+        resources of other load serving entities are read back from the
+        physicalresources sheet rather than from their filings. returns false
+        without saving if the existing workbooks do not match the current list
+        of load serving entities.
+
+        parameters:
+            revised_organizations - a list of organization ids whose monthly
+                filings have been revised
+        '''
         filing_month = self.config.filing_month
+        resource_columns = [
+            'organization_id',
+            'contract_id',
+            'resource_id',
+            'resource_adequacy_system',
+            'resource_adequacy_local',
+            'resource_mcc_bucket',
+            'continuous_availability',
+            'resource_adequacy_committed_flexible',
+            'resource_adequacy_flexibility_category',
+        ]
 
-        # get list of active load serving entities from summary sheet:
+        # open previously consolidated files, which are read from disk even
+        # during a dry run:
         path = self.config.paths.get_path('ra_summary')
         ra_summary = open_workbook(path,data_only=False,read_only=False)
+        self.timer.count_file(path,'read')
         data_range = get_data_range(ra_summary['Summary'],'A','',self.config)
         active_organizations = [row[0].value for row in data_range]
-
-        # open summary from previous month:
-        path = self.config.paths.get_path('ra_summary_previous_month')
-        ra_summary_previous_month = open_workbook(path,data_only=False,read_only=True)
-
-        # open caiso supply plan cross-check file:
         path = self.config.paths.get_path('caiso_cross_check')
         caiso_cross_check = open_workbook(path,data_only=False,read_only=False)
+        self.timer.count_file(path,'read')
 
         # load nqc list from most recent file for current year:
-        path = self.config.paths.get_path('nqc_list')
-        nqc_workbook = open_workbook(path,data_only=True,in_mem=True)
-        nqc_list = get_nqc_list(nqc_workbook,self.config)
-
-        # set the nqc list index:
+        nqc_list = self.read_shared_input('nqc_list')
         nqc_list.set_index('resource_id',inplace=True)
         nqc_list.sort_index(inplace=True)
-
-        # initialize tables:
-        summary = pd.DataFrame()
-        physical_resources = pd.DataFrame()
-        demand_response = pd.DataFrame()
-
-        # combine data tables from each lse filing:
-        for organization_id in active_organizations:
-            organization = self.config.organizations.get_organization(organization_id)
-            monthly_filing_tables = read_ra_monthly_filing(organization,self.config,self.logger)
-            ra_monthly_filing_summary = monthly_filing_tables[0]
-            ra_monthly_filing_physical_resources = monthly_filing_tables[1]
-            ra_monthly_filing_demand_response = monthly_filing_tables[2]
-
-            # append summary, physical resources, and demand response tables with lse-specific data:
-            summary = pd.concat([summary,ra_monthly_filing_summary],axis='index',ignore_index=True)
-            physical_resources = pd.concat([physical_resources,ra_monthly_filing_physical_resources],axis='index',ignore_index=True)
-            demand_response = pd.concat([demand_response,ra_monthly_filing_demand_response],axis='index',ignore_index=True)
-
-        # set summary table index:
-        summary.set_index('organization_id',inplace=True)
-        summary.sort_index(inplace=True)
-
-        # helper function to retrieve zone for a given resource id:
         def get_zone(resource_id: str):
             if resource_id in nqc_list.index:
                 zone = nqc_list.loc[resource_id,'zone']
             else:
                 zone = 'Unknown'
             return zone
-
-        # helper function to retrieve local area for a given resource id:
         def get_local_area(resource_id: str):
             if resource_id in nqc_list.index:
                 local_area = nqc_list.loc[resource_id,'local_area']
@@ -679,645 +1570,923 @@ class WorkbookConsolidator:
                 local_area = 'Unknown'
             return local_area
 
-        # lookup local areas for physical resources and demand response programs:
-        physical_resources.loc[:,'local_area'] = physical_resources.loc[:,'resource_id'].map(get_local_area)
-        physical_resources.loc[:,'locality'] = physical_resources.loc[:,'local_area'].map(rename_locality)
-        demand_response.loc[:,'local_area'] = demand_response.loc[:,'program_id'].map(get_local_area)
-        demand_response.loc[:,'locality'] = demand_response.loc[:,'local_area'].map(rename_locality)
+        # read resources written by the previous consolidation, which must be
+        # grouped by load serving entity in the order of the summary sheet:
+        previous_last_row = max(ra_summary['PhysicalResources'].max_row,2)
+        previous_resources = get_column_values(ra_summary['PhysicalResources'],list('ABCDEFGHI'),2,previous_last_row)
+        previous_resources.columns = resource_columns
+        previous_resources = previous_resources.loc[previous_resources.loc[:,'organization_id'].notna(),:]
+        organization_order = previous_resources.loc[:,'organization_id'].map({organization_id:i for i,organization_id in enumerate(active_organizations)})
+        if organization_order.isna().any() or not organization_order.is_monotonic_increasing:
+            self.logger.log('Resources in Previously Consolidated Files Do Not Match Active LSEs','WARNING')
+            patched = False
+        else:
+            # read revised filings:
+            summary = pd.DataFrame()
+            revised_physical_resources = pd.DataFrame()
+            revised_demand_response = pd.DataFrame()
+            for organization_id in revised_organizations:
+                organization = self.config.organizations.get_organization(organization_id)
+                monthly_filing_tables = read_ra_monthly_filing(organization,self.config,self.logger)
+                summary = pd.concat([summary,monthly_filing_tables[0]],axis='index',ignore_index=True)
+                revised_physical_resources = pd.concat([revised_physical_resources,monthly_filing_tables[1]],axis='index',ignore_index=True)
+                revised_demand_response = pd.concat([revised_demand_response,monthly_filing_tables[2]],axis='index',ignore_index=True)
+            summary.set_index('organization_id',inplace=True)
+            revised_physical_resources.loc[:,'local_area'] = revised_physical_resources.loc[:,'resource_id'].map(get_local_area)
+            revised_physical_resources.loc[:,'locality'] = revised_physical_resources.loc[:,'local_area'].map(rename_locality)
+            revised_demand_response.loc[:,'local_area'] = revised_demand_response.loc[:,'program_id'].map(get_local_area)
+            revised_demand_response.loc[:,'locality'] = revised_demand_response.loc[:,'local_area'].map(rename_locality)
 
-        # get certifications from previous month:
-        columns = [
-            'organization_id',
-            'organization_officer_name',
-            'organization_officer_title',
-            'filename'
-        ]
-        try:
-            data_range = get_data_range(ra_summary_previous_month['CertifyingOfficers'],'A','BCH',self.config)
-            previous_certifications = data_range_to_dataframe(columns,data_range)
-        except:
-            previous_certifications = pd.DataFrame(columns=columns)
-        previous_certifications.set_index('organization_id',inplace=True)
-        previous_certifications.sort_index(inplace=True)
+            # combine revised and previously consolidated resources in sheet order:
+            resources = []
+            for organization_id in active_organizations:
+                if organization_id in revised_organizations:
+                    resources.append(revised_physical_resources.loc[(revised_physical_resources.loc[:,'organization_id']==organization_id),:].reindex(columns=resource_columns))
+                    resources.append(
+                        revised_demand_response.loc[(revised_demand_response.loc[:,'organization_id']==organization_id),:] \
+                            .rename(columns={'program_id':'resource_id'}).reindex(columns=resource_columns).assign(continuous_availability=False)
+                    )
+                else:
+                    resources.append(previous_resources.loc[(previous_resources.loc[:,'organization_id']==organization_id),:])
+            resources = pd.concat(resources,axis='index',ignore_index=True)
+            resource_table = get_resource_table(resources,pd.DataFrame(columns=['organization_id','program_id']),nqc_list,active_organizations,filing_month)
+            resource_allocations = get_resource_allocations(resource_table,filing_month)
+
+            # rewrite rows of revised filings, and of all following filings
+            # once a revised filing changes length:
+            first_row_number_summary = 2
+            first_row_number_physical_resources = 2
+            previous_counts = previous_resources.loc[:,'organization_id'].value_counts()
+            counts = resources.loc[:,'organization_id'].value_counts()
+            shifted = False
+            rewritten_count = 0
+            row_number_physical_resources = first_row_number_physical_resources
+            for row_number_summary,organization_id in enumerate(active_organizations,start=first_row_number_summary):
+                if organization_id in revised_organizations:
+                    self.write_organization_values(ra_summary,caiso_cross_check,row_number_summary,organization_id,summary,revised_physical_resources,revised_demand_response)
+                else:
+                    pass
+                shifted = shifted or (organization_id in revised_organizations and counts.get(organization_id,0)!=previous_counts.get(organization_id,0))
+                for _,row in resources.loc[(resources.loc[:,'organization_id']==organization_id),:].iterrows():
+                    if shifted or organization_id in revised_organizations:
+                        self.write_resource_row(ra_summary,caiso_cross_check,row_number_physical_resources,organization_id,row,get_zone(row.loc['resource_id']))
+                        rewritten_count += 1
+                    else:
+                        pass
+                    row_number_physical_resources += 1
+
+            # remove rows left over from a longer previous consolidation:
+            previous_row_count = len(previous_resources)
+            if previous_row_count>len(resources):
+                ra_summary['PhysicalResources'].delete_rows(first_row_number_physical_resources+len(resources),previous_row_count-len(resources))
+                caiso_cross_check['Filings'].delete_rows(first_row_number_physical_resources+len(resources)+1,previous_row_count-len(resources))
+            else:
+                pass
+            self.logger.log('Rewrote {} of {} Resource Rows'.format(rewritten_count,len(resources)),'INFORMATION')
+
+            # resource totals span all filings, so are recalculated for every row:
+            write_static_values(ra_summary['PhysicalResources'],get_resource_total_values(resource_table,resource_allocations,first_row_number_physical_resources),[])
+            self.write_over_allocation_report(resource_allocations)
+
+            # replace formulas with calculated values:
+            row_number_summary = first_row_number_summary + len(active_organizations)
+            if self.config.get_option('consolidation_output_mode')=='values':
+                self.write_filing_values(ra_summary,caiso_cross_check,resource_table,first_row_number_summary,row_number_summary)
+            else:
+                self.metric_workbooks = {'ra_summary':deepcopy(ra_summary),'caiso_cross_check':deepcopy(caiso_cross_check)}
+                self.write_filing_values(self.metric_workbooks['ra_summary'],self.metric_workbooks['caiso_cross_check'],resource_table,first_row_number_summary,row_number_summary)
+
+            # match revised filings against supply plans:
+            supply_plan_system = read_supply_plan(self.config,'supply_plan_system')
+            supply_plan_flexible = read_supply_plan(self.config,'supply_plan_flexible')
+            self.cross_check_supply_plans(caiso_cross_check,supply_plan_system,supply_plan_flexible,self.get_metric_workbook('caiso_cross_check'))
+
+            self.save_output_workbook(ra_summary,'ra_summary')
+            self.save_output_workbook(caiso_cross_check,'caiso_cross_check')
+            patched = True
+        return patched
+
+    def get_consolidation_metrics(self,ra_summary,caiso_cross_check,consolidation_log:pd.DataFrame):
+        '''
+        collects the numeric values for each load serving entity from the
+        summary and caiso supply plan cross-check workbooks, along with each
+        monthly filing's compliance status, into a long table of metrics for
+        comparison between consolidation runs.
+
+        parameters:
+            ra_summary - the summary workbook
+            caiso_cross_check - the caiso supply plan cross-check workbook
+            consolidation_log - a dataframe with the contents of a
+                consolidation log
+        '''
+        workbooks = {
+            'ra_summary' : ra_summary,
+            'caiso_cross_check' : caiso_cross_check,
+        }
+        metrics = []
+        for workbook_name,sheet_name,first_row in consolidation_metric_sheets:
+            if sheet_name in workbooks[workbook_name].sheetnames:
+                metrics.append(get_sheet_metrics(workbooks[workbook_name][sheet_name],workbook_name,first_row))
+            else:
+                pass
+        compliance = consolidation_log.loc[
+            (consolidation_log.loc[:,'ra_category']=='ra_monthly_filing') & \
+            consolidation_log.loc[:,'compliance'].notna() & \
+            (consolidation_log.loc[:,'compliance']!=''),
+            ['organization_id','compliance']
+        ].rename(columns={'compliance':'value'})
+        metrics.append(compliance.assign(workbook='consolidation_log',sheet='Compliance',column='compliance',header='Compliance'))
+        return pd.concat(metrics,ignore_index=True).loc[:,consolidation_metric_columns]
+
+    def get_metric_workbook(self,path_id:str):
+        '''
+        returns the copy of an output workbook from which the consolidation's
+        metrics are saved, or None outside of formulas mode.
+
+        parameters:
+            path_id - either 'ra_summary' or 'caiso_cross_check'
+        '''
+        if self.metric_workbooks is not None:
+            workbook = self.metric_workbooks[path_id]
+        else:
+            workbook = None
+        return workbook
+
+    def get_metrics_path(self):
+        '''
+        returns the path to the metrics saved by the most recent consolidation
+        of the filing month, next to the consolidation log.
+        '''
+        path = self.config.paths.get_path('consolidation_log')
+        return path.with_name(path.stem+'_metrics.csv')
+
+    def save_consolidation_metrics(self):
+        '''
+        saves the metrics of a completed consolidation next to the
+        consolidation log, for comparison with later dry runs. in formulas
+        mode, the saved workbooks hold no calculated values, so the metrics
+        are read from the copies in which values were calculated during the
+        consolidation. if no copies are available, e.g., when the filings
+        stage was restored from a checkpoint, any previously saved metrics are
+        removed rather than left to describe an earlier consolidation.
+        '''
+        path = self.get_metrics_path()
+        if self.config.get_option('consolidation_output_mode')=='values':
+            ra_summary = open_workbook(self.config.paths.get_path('ra_summary'),data_only=True,read_only=True)
+            caiso_cross_check = open_workbook(self.config.paths.get_path('caiso_cross_check'),data_only=True,read_only=True)
+            metrics = self.get_consolidation_metrics(ra_summary,caiso_cross_check,self.consolidation_logger.data)
+            ra_summary.close()
+            caiso_cross_check.close()
+        elif self.metric_workbooks is not None:
+            metrics = self.get_consolidation_metrics(self.metric_workbooks['ra_summary'],self.metric_workbooks['caiso_cross_check'],self.consolidation_logger.data)
+        else:
+            metrics = None
+        if metrics is not None:
+            path.parent.mkdir(parents=True,exist_ok=True)
+            metrics.to_csv(path,index=False)
+            self.timer.count_file(path,'written')
+        elif path.is_file():
+            path.unlink()
+            self.logger.log('Unable to Save Consolidation Metrics, Stages Restored from Checkpoints','WARNING')
+        else:
+            pass
+        self.metric_workbooks = None
+
+    def get_snapshot_path(self,snapshot_name:str):
+        '''
+        resolves the path to a named snapshot of consolidation metrics, or
+        returns None if no snapshot filename is configured.
+
+        parameters:
+            snapshot_name - the name under which the snapshot is saved
+        '''
+        if self.config.get_option('consolidation_snapshot_filename') is not None:
+            path = Path(str(self.config.paths.get_path('consolidation_snapshot')).replace('[snapshot]',snapshot_name))
+        else:
+            path = None
+        return path
+
+    def save_consolidation_snapshot(self,snapshot_name:str,metrics:pd.DataFrame=None):
+        '''
+        saves consolidation metrics under a name for comparison with later dry
+        runs. if no metrics are provided, they are read from the saved summary
+        and caiso supply plan cross-check workbooks and consolidation log.
+
+        parameters:
+            snapshot_name - the name under which the snapshot is saved
+            metrics - an optional dataframe produced by
+                get_consolidation_metrics
+        '''
+        path = self.get_snapshot_path(snapshot_name)
+        if path is None:
+            self.logger.log('Unable to Save Consolidation Snapshot, No Snapshot Filename Configured','WARNING')
+        else:
+            if metrics is None:
+                ra_summary = open_workbook(self.config.paths.get_path('ra_summary'),data_only=True,read_only=True)
+                caiso_cross_check = open_workbook(self.config.paths.get_path('caiso_cross_check'),data_only=True,read_only=True)
+                metrics = self.get_consolidation_metrics(ra_summary,caiso_cross_check,self.consolidation_logger.data)
+                ra_summary.close()
+                caiso_cross_check.close()
+            else:
+                pass
+            path.parent.mkdir(parents=True,exist_ok=True)
+            metrics.to_csv(path,index=False)
+            self.logger.log('Saved Consolidation Snapshot: {}'.format(path.name),'INFORMATION')
+
+    def dry_run_consolidation(self,snapshot_name:str=None,save_snapshot_name:str=None):
+        '''
+        consolidates allocations, filings, and supply plans into summary and
+        caiso supply plan cross-check workbooks held in memory, without saving
+        the workbooks or updating any logs, and reports the metrics for each
+        load serving entity which differ from the previously saved
+        consolidation or from a named snapshot. returns a dataframe of the
+        differences produced by get_metric_differences, or None if the files
+        required for consolidation are not available.
+
+        parameters:
+            snapshot_name - the name of a snapshot saved by
+                save_consolidation_snapshot against which to compare; if
+                omitted, the metrics saved by the previous consolidation are
+                used, or in values mode, the saved workbooks
+            save_snapshot_name - an optional name under which to save the
+                dry run's metrics as a snapshot
+        '''
+        # start timer:
+        init_time = ts.now()
+        self.logger.log('Starting Dry-Run Consolidation','INFORMATION')
 
-        # write nqc list to summary file:
-        row_number = 2
-        for resource_id,r in nqc_list.iterrows():
-            ra_summary['NQC_List'][f'A{row_number}'].value = r.loc['generator_name']
-            ra_summary['NQC_List'][f'B{row_number}'].value = resource_id
-            ra_summary['NQC_List'][f'C{row_number}'].value = r.loc['zone']
-            ra_summary['NQC_List'][f'D{row_number}'].value = r.loc['local_area']
-            ra_summary['NQC_List'][f'E{row_number}'].value = r.loc[ts(filing_month.year,1,1).to_numpy().astype('datetime64[M]')]
-            ra_summary['NQC_List'][f'F{row_number}'].value = r.loc[ts(filing_month.year,2,1).to_numpy().astype('datetime64[M]')]
-            ra_summary['NQC_List'][f'G{row_number}'].value = r.loc[ts(filing_month.year,3,1).to_numpy().astype('datetime64[M]')]
-            ra_summary['NQC_List'][f'H{row_number}'].value = r.loc[ts(filing_month.year,4,1).to_numpy().astype('datetime64[M]')]
-            ra_summary['NQC_List'][f'I{row_number}'].value = r.loc[ts(filing_month.year,5,1).to_numpy().astype('datetime64[M]')]
-            ra_summary['NQC_List'][f'J{row_number}'].value = r.loc[ts(filing_month.year,6,1).to_numpy().astype('datetime64[M]')]
-            ra_summary['NQC_List'][f'K{row_number}'].value = r.loc[ts(filing_month.year,7,1).to_numpy().astype('datetime64[M]')]
-            ra_summary['NQC_List'][f'L{row_number}'].value = r.loc[ts(filing_month.year,8,1).to_numpy().astype('datetime64[M]')]
-            ra_summary['NQC_List'][f'M{row_number}'].value = r.loc[ts(filing_month.year,9,1).to_numpy().astype('datetime64[M]')]
-            ra_summary['NQC_List'][f'N{row_number}'].value = r.loc[ts(filing_month.year,10,1).to_numpy().astype('datetime64[M]')]
-            ra_summary['NQC_List'][f'O{row_number}'].value = r.loc[ts(filing_month.year,11,1).to_numpy().astype('datetime64[M]')]
-            ra_summary['NQC_List'][f'P{row_number}'].value = r.loc[ts(filing_month.year,12,1).to_numpy().astype('datetime64[M]')]
-            ra_summary['NQC_List'][f'Q{row_number}'].value = r.loc['dispatchable']
-            ra_summary['NQC_List'][f'R{row_number}'].value = r.loc['deliverability_status']
-            ra_summary['NQC_List'][f'S{row_number}'].value = r.loc['deliverable']
-            ra_summary['NQC_List'][f'T{row_number}'].value = r.loc['comments']
-            row_number+=1
+        # read metrics from the previous consolidation before anything is recalculated:
+        previous_consolidation_log = self.consolidation_logger.data.copy()
+        if snapshot_name is not None:
+            snapshot_path = self.get_snapshot_path(snapshot_name)
+            if snapshot_path is not None and snapshot_path.is_file():
+                previous_metrics = pd.read_csv(snapshot_path)
+                self.logger.log('Comparing Dry Run Against Snapshot: {}'.format(snapshot_path.name),'INFORMATION')
+            else:
+                previous_metrics = pd.DataFrame(columns=consolidation_metric_columns)
+                self.logger.log('Unable to Find Consolidation Snapshot {}, Reporting All Metrics as Added'.format(snapshot_name),'WARNING')
+        elif self.get_metrics_path().is_file():
+            previous_metrics = pd.read_csv(self.get_metrics_path())
+            self.logger.log('Comparing Dry Run Against Previous Consolidation','INFORMATION')
+        elif self.config.get_option('consolidation_output_mode')=='values' and \
+            self.config.paths.get_path('ra_summary').is_file() and self.config.paths.get_path('caiso_cross_check').is_file():
+            # workbooks saved in values mode hold the values calculated during consolidation:
+            ra_summary = open_workbook(self.config.paths.get_path('ra_summary'),data_only=True,read_only=True)
+            caiso_cross_check = open_workbook(self.config.paths.get_path('caiso_cross_check'),data_only=True,read_only=True)
+            previous_metrics = self.get_consolidation_metrics(ra_summary,caiso_cross_check,previous_consolidation_log)
+            ra_summary.close()
+            caiso_cross_check.close()
+            self.logger.log('Comparing Dry Run Against Previous Consolidation','INFORMATION')
+        else:
+            previous_metrics = pd.DataFrame(columns=consolidation_metric_columns)
+            self.logger.log('No Previous Consolidation Found, Reporting All Metrics as Added','WARNING')
 
-        # write consolidated data and formulas to summary and caiso check files:
-        first_row_number_summary = 2
-        row_number_summary = first_row_number_summary
-        first_row_number_physical_resources = 2
-        row_number_physical_resources = first_row_number_physical_resources
-        for organization_id in active_organizations:
-            ra_summary['NP26'][f'C{row_number_summary}'] = '=SUMIFS(PhysicalResources!D:D,PhysicalResources!A:A,INDIRECT("A"&ROW()),PhysicalResources!J:J,"North",PhysicalResources!F:F,"<>DR")'
-            ra_summary['NP26'][f'C{row_number_summary}'].fill = PatternFill(start_color='FFCC99',end_color='FFCC99',fill_type='solid')
-            ra_summary['NP26'][f'C{row_number_summary}'].number_format = '#,##0.00'
-            ra_summary['NP26'][f'D{row_number_summary}'] = '=ROUND(INDIRECT("H"&ROW()),2)'
-            ra_summary['NP26'][f'D{row_number_summary}'].number_format = '#,##0.00'
-            ra_summary['NP26'][f'E{row_number_summary}'].value = 0
-            ra_summary['NP26'][f'E{row_number_summary}'].number_format = '#,##0.00'
-            ra_summary['NP26'][f'F{row_number_summary}'] = '=MAX(INDIRECT("B"&ROW())-INDIRECT("C"&ROW())-INDIRECT("D"&ROW())-INDIRECT("E"&ROW()),0)'
-            ra_summary['NP26'][f'F{row_number_summary}'].fill = PatternFill(start_color='CC99FF',end_color='CC99FF',fill_type='solid')
-            ra_summary['NP26'][f'F{row_number_summary}'].number_format = '#,##0.00'
-            ra_summary['NP26'][f'G{row_number_summary}'].value = summary.loc[organization_id,'np26dr']
-            ra_summary['NP26'][f'G{row_number_summary}'].number_format = '#,##0.00'
-            ra_summary['NP26'][f'H{row_number_summary}'] = '={}*INDIRECT("G"&ROW())'.format(self.config.get_option('demand_response_multiplier'))
-            ra_summary['NP26'][f'H{row_number_summary}'].number_format = '#,##0.00'
-            ra_summary['NP26'][f'I{row_number_summary}'] = '=INDIRECT("C"&ROW())+INDIRECT("D"&ROW())'
-            ra_summary['NP26'][f'I{row_number_summary}'].number_format = '#,##0.00'
-            ra_summary['NP26'][f'L{row_number_summary}'] = '=INDIRECT("C"&ROW())+INDIRECT("D"&ROW())-INDIRECT("B"&ROW())'
-            ra_summary['NP26'][f'L{row_number_summary}'].number_format = '#,##0.00'
-            ra_summary['NP26'][f'M{row_number_summary}'] = '=INDIRECT("K"&ROW())+INDIRECT("SP26!K"&ROW())'
-            ra_summary['NP26'][f'M{row_number_summary}'].number_format = '#,##0.00'
-            ra_summary['NP26'][f'N{row_number_summary}'] = '=INDIRECT("L"&ROW())-INDIRECT("SP26!L"&ROW())'
-            ra_summary['NP26'][f'N{row_number_summary}'].number_format = '#,##0.00'
-            ra_summary['SP26'][f'C{row_number_summary}'] = '=SUMIFS(PhysicalResources!D:D,PhysicalResources!A:A,INDIRECT("A"&ROW()),PhysicalResources!J:J,"South",PhysicalResources!F:F, "<>DR")'
-            ra_summary['SP26'][f'C{row_number_summary}'].fill = PatternFill(start_color='FFCC99',end_color='FFCC99',fill_type='solid')
-            ra_summary['SP26'][f'C{row_number_summary}'].number_format = '#,##0.00'
-            ra_summary['SP26'][f'D{row_number_summary}'] = '=ROUND(INDIRECT("H"&ROW()),2)'
-            ra_summary['SP26'][f'D{row_number_summary}'].number_format = '#,##0.00'
-            ra_summary['SP26'][f'E{row_number_summary}'].value = 0
-            ra_summary['SP26'][f'E{row_number_summary}'].number_format = '#,##0.00'
-            ra_summary['SP26'][f'F{row_number_summary}'] = '=MAX(INDIRECT("B"&ROW())-INDIRECT("C"&ROW())-INDIRECT("D"&ROW())-INDIRECT("E"&ROW()),0)'
-            ra_summary['SP26'][f'F{row_number_summary}'].fill = PatternFill(start_color='CC99FF',end_color='CC99FF',fill_type='solid')
-            ra_summary['SP26'][f'F{row_number_summary}'].number_format = '#,##0.00'
-            ra_summary['SP26'][f'G{row_number_summary}'] = summary.loc[organization_id,'sp26dr']
-            ra_summary['SP26'][f'G{row_number_summary}'].number_format = '#,##0.00'
-            ra_summary['SP26'][f'H{row_number_summary}'] = '={}*INDIRECT("G"&ROW())'.format(self.config.get_option('demand_response_multiplier'))
-            ra_summary['SP26'][f'H{row_number_summary}'].number_format = '#,##0.00'
-            ra_summary['SP26'][f'I{row_number_summary}'] = '=INDIRECT("C"&ROW())+INDIRECT("D"&ROW())'
-            ra_summary['SP26'][f'I{row_number_summary}'].number_format = '#,##0.00'
-            ra_summary['SP26'][f'L{row_number_summary}'] = '=INDIRECT("C"&ROW())+INDIRECT("D"&ROW())-INDIRECT("B"&ROW())'
-            ra_summary['SP26'][f'L{row_number_summary}'].number_format = '#,##0.00'
-            ra_summary['SP26'][f'M{row_number_summary}'] = '=INDIRECT("K"&ROW())+INDIRECT("NP26!K"&ROW())'
-            ra_summary['SP26'][f'M{row_number_summary}'].number_format = '#,##0.00'
-            ra_summary['MCC_Check'][f'B{row_number_summary}'] = '=VLOOKUP(INDIRECT("A"&ROW()),Summary!$A:$B,2,FALSE)'
-            ra_summary['MCC_Check'][f'C{row_number_summary}'] = '=INDIRECT("F"&ROW())+INDIRECT("L"&ROW())+INDIRECT("N"&ROW())'
-            ra_summary['MCC_Check'][f'D{row_number_summary}'] = '=IFERROR(INDIRECT("C"&ROW())/INDIRECT("B"&ROW()),"")'
-            ra_summary['MCC_Check'][f'E{row_number_summary}'] = '=INDIRECT("B"&ROW())*MCC_Parameters!$B$2'
-            ra_summary['MCC_Check'][f'F{row_number_summary}'] = '=MIN(INDIRECT("E"&ROW()),INDIRECT("NP26!H"&ROW())+INDIRECT("SP26!H"&ROW()))'
-            ra_summary['MCC_Check'][f'G{row_number_summary}'] = '=INDIRECT("B"&ROW())*MCC_Parameters!$B$3'
-            ra_summary['MCC_Check'][f'H{row_number_summary}'] = '=MIN(INDIRECT("G"&ROW()),SUMIFS(PhysicalResources!$D:$D,PhysicalResources!$A:$A,INDIRECT("A"&ROW()),PhysicalResources!$F:$F,1))'
-            ra_summary['MCC_Check'][f'I{row_number_summary}'] = '=INDIRECT("B"&ROW())*MCC_Parameters!$B$4'
-            ra_summary['MCC_Check'][f'J{row_number_summary}'] = '=MIN(INDIRECT("I"&ROW()),SUMIFS(PhysicalResources!$D:$D,PhysicalResources!$A:$A,INDIRECT("A"&ROW()),PhysicalResources!$F:$F,2)+INDIRECT("H"&ROW()))'
-            ra_summary['MCC_Check'][f'K{row_number_summary}'] = '=INDIRECT("B"&ROW())*MCC_Parameters!$B$5'
-            ra_summary['MCC_Check'][f'L{row_number_summary}'] = '=MIN(INDIRECT("K"&ROW()),SUMIFS(PhysicalResources!$D:$D,PhysicalResources!$A:$A,INDIRECT("A"&ROW()),PhysicalResources!$F:$F,3)+INDIRECT("J"&ROW()))'
-            ra_summary['MCC_Check'][f'M{row_number_summary}'] = '=INDIRECT("B"&ROW())*MCC_Parameters!$B$6'
-            ra_summary['MCC_Check'][f'N{row_number_summary}'] = '=SUMIFS(PhysicalResources!$D:$D,PhysicalResources!$A:$A,INDIRECT("A"&ROW()),PhysicalResources!$F:$F,4)'
-            ra_summary['MCC_Check'][f'O{row_number_summary}'] = '=INDIRECT("B"&ROW())*MCC_Parameters!$B$7'
-            ra_summary['MCC_Check'][f'P{row_number_summary}'] = '=SUMIFS(PhysicalResources!$D:$D,PhysicalResources!$A:$A,INDIRECT("A"&ROW()),PhysicalResources!$F:$F,4,PhysicalResources!$G:$G,TRUE)'
-            ra_summary['FlexRAR'][f'F{row_number_summary}'] = '=SUMIFS(PhysicalResources!$H:$H,PhysicalResources!$A:$A,INDIRECT("A"&ROW()),PhysicalResources!$I:$I,1)'
-            ra_summary['CertifyingOfficers'][f'B{row_number_summary}'] = summary.loc[organization_id,'organization_officer_name']
-            ra_summary['CertifyingOfficers'][f'C{row_number_summary}'] = summary.loc[organization_id,'organization_officer_title']
-            ra_summary['CertifyingOfficers'][f'E{row_number_summary}'] = '=IF(INDIRECT("D"&ROW())=INDIRECT("B"&ROW()),"-","Yes")'
-            ra_summary['CertifyingOfficers'][f'G{row_number_summary}'] = '=IF(INDIRECT("F"&ROW())=INDIRECT("C"&ROW()),"-","Yes")'
-            if organization_id in previous_certifications.index:
-                ra_summary['CertifyingOfficers'][f'D{row_number_summary}'] = previous_certifications.loc[organization_id,'organization_officer_name']
-                ra_summary['CertifyingOfficers'][f'F{row_number_summary}'] = previous_certifications.loc[organization_id,'organization_officer_title']
-                ra_summary['CertifyingOfficers'][f'I{row_number_summary}'] = previous_certifications.loc[organization_id,'filename']
+        # check files and consolidate into workbooks held in memory:
+        self.dry_run = True
+        self.dry_run_workbooks = {}
+        self.metric_workbooks = None
+        try:
+            self.consolidation_logger.clear_log()
+            if self.check_files():
+                self.initialize_ra_summary()
+                self.initialize_caiso_cross_check()
+                self.consolidate_allocations()
+                self.consolidate_filings()
+                self.consolidate_supply_plans()
+                current_metrics = self.get_consolidation_metrics(
+                    self.dry_run_workbooks['ra_summary'],
+                    self.dry_run_workbooks['caiso_cross_check'],
+                    self.consolidation_logger.data
+                )
             else:
-                ra_summary['CertifyingOfficers'][f'D{row_number_summary}'] = '[Record Not Found]'
-                ra_summary['CertifyingOfficers'][f'F{row_number_summary}'] = '[Record Not Found]'
-                ra_summary['CertifyingOfficers'][f'I{row_number_summary}'] = '[Record Not Found]'
-            if self.config.paths.get_path('ra_monthly_filing',self.config.organizations.get_organization(organization_id)):
-                filename = self.config.paths.get_path('ra_monthly_filing',self.config.organizations.get_organization(organization_id)).name
+                current_metrics = None
+                self.logger.log('Unable to Complete Dry-Run Consolidation, Required Files Not Available','ERROR')
+        finally:
+            self.dry_run = False
+            self.dry_run_workbooks = {}
+            self.consolidation_logger.data = previous_consolidation_log
+
+        # compare and report differences by load serving entity:
+        if current_metrics is not None:
+            differences = get_metric_differences(previous_metrics,current_metrics)
+            if len(differences)>0:
+                for organization_id,organization_differences in differences.groupby('organization_id'):
+                    status_counts = organization_differences.loc[:,'status'].value_counts()
+                    self.logger.log('{}: {}'.format(
+                        organization_id,
+                        ', '.join(['{} {}'.format(count,status) for status,count in status_counts.items()])
+                    ),'INFORMATION')
+                self.logger.log('Dry Run Differs from Previous Consolidation in {} Metrics Across {} LSEs'.format(len(differences),differences.loc[:,'organization_id'].nunique()),'WARNING')
             else:
-                filename = 'Monthly Filing Not Found'
-            ra_summary['Summary'][f'J{row_number_summary}'] = filename
-            ra_summary['NP26'][f'N{row_number_summary}'] = filename
-            ra_summary['SP26'][f'M{row_number_summary}'] = filename
-            ra_summary['CertifyingOfficers'][f'H{row_number_summary}'] = filename
-            caiso_cross_check['Requirements'][f'C{row_number_summary+1}'].value = physical_resources.loc[(physical_resources.loc[:,'organization_id']==organization_id),'resource_adequacy_system'].sum() - physical_resources.loc[(physical_resources.loc[:,'organization_id']==organization_id)&(physical_resources.loc[:,'resource_mcc_bucket']=='DR'),'resource_adequacy_system'].sum()
-            caiso_cross_check['Requirements'][f'C{row_number_summary+1}'].number_format = '#,##0.00'
-            caiso_cross_check['Requirements'][f'D{row_number_summary+1}'].value = (self.config.get_option('demand_response_multiplier')) * (summary.loc[organization_id,'np26dr'] + summary.loc[organization_id,'sp26dr'])
-            caiso_cross_check['Requirements'][f'D{row_number_summary+1}'].number_format = '#,##0.00'
-            caiso_cross_check['Requirements'][f'E{row_number_summary+1}'] = '=INDIRECT("C"&ROW())+INDIRECT("D"&ROW())'
-            caiso_cross_check['Requirements'][f'E{row_number_summary+1}'].number_format = '#,##0.00'
-            caiso_cross_check['Requirements'][f'F{row_number_summary+1}'] = '=IFERROR(ROUND(INDIRECT("E"&ROW())/INDIRECT("B"&ROW()),2),"")'
-            caiso_cross_check['Requirements'][f'F{row_number_summary+1}'].number_format = '0.00%'
-            caiso_cross_check['Requirements'][f'N{row_number_summary+1}'].value = physical_resources.loc[(physical_resources.loc[:,'organization_id']==organization_id)&(physical_resources.loc[:,'resource_adequacy_flexibility_category']==1),'resource_adequacy_committed_flexible'].sum()
-            caiso_cross_check['Requirements'][f'P{row_number_summary+1}'].value = min(
-                caiso_cross_check['Requirements'][f'O{row_number_summary+1}'].value +
-                caiso_cross_check['Requirements'][f'Q{row_number_summary+1}'].value,
-                physical_resources.loc[(physical_resources.loc[:,'organization_id']==organization_id)&(physical_resources.loc[:,'resource_adequacy_flexibility_category']==2),'resource_adequacy_committed_flexible'].sum()
-            )
-            caiso_cross_check['Requirements'][f'R{row_number_summary+1}'].value = min(
-                caiso_cross_check['Requirements'][f'Q{row_number_summary+1}'].value,
-                physical_resources.loc[(physical_resources.loc[:,'organization_id']==organization_id)&(physical_resources.loc[:,'resource_adequacy_flexibility_category']==3),'resource_adequacy_committed_flexible'].sum()
-            )
-            # calculate values for caiso cross-check file because excel
-            # calculations aren't available from calculated fields in summary file:
-            if self.config.organizations.get_organization(organization_id)['type']=='investor-owned utility':
-                demand_response_coefficient = 1
+                self.logger.log('Dry Run Matches Previous Consolidation','INFORMATION')
+            if self.config.get_option('consolidation_diff_filename') is not None:
+                path = self.config.paths.get_path('consolidation_diff')
+                path.parent.mkdir(parents=True,exist_ok=True)
+                differences.to_csv(path,index=False)
+                self.logger.log('Saved Dry-Run Differences: {}'.format(path.name),'INFORMATION')
             else:
-                demand_response_coefficient = self.config.get_option('demand_response_multiplier')
-            localities = [
-                ['AA{}','los_angeles','sce'],
-                ['AF{}','ventura','sce'],
-                ['AK{}','san_diego','sdge'],
-                ['AP{}','bay_area','pge'],
-                ['AU{}','humboldt','pge'],
-                ['AZ{}','sierra','pge'],
-                ['BE{}','stockton','pge'],
-                ['BJ{}','northern_california','pge'],
-                ['BO{}','fresno','pge'],
-                ['BT{}','kern','pge'],
-            ]
-            for cell_address,locality,service_territory in localities:
-                if organization_id in ['pge','sce','sdge']:
-                    transmission_loss_adder = 1
+                pass
+            if save_snapshot_name is not None:
+                self.save_consolidation_snapshot(save_snapshot_name,current_metrics)
+            else:
+                pass
+        else:
+            differences = None
+
+        # check time and report:
+        run_time = (ts.now() - init_time).total_seconds()
+        self.logger.log('Completed Dry-Run Consolidation in {:02.0f}:{:02.0f}:{:05.2f}'.format(int(run_time/3600),int((run_time%3600)/60),run_time%60),'INFORMATION')
+
+        return differences
+
+    def consolidate_stages(self):
+        '''
+        initializes the summary and caiso supply plan cross-check workbooks and
+        consolidates allocations, filings, and supply plans. if a checkpoint
+        directory is configured, the output workbooks and consolidation log
+        are saved after each stage along with a fingerprint of the stage's
+        inputs, and a rerun resumes from the first stage which did not
+        complete or whose inputs have changed since it completed.
+        '''
+        stages = [
+            ('initialize',['configuration_options','organizations','ra_summary_template','caiso_cross_check_template'],[],[self.initialize_ra_summary,self.initialize_caiso_cross_check]),
+            ('allocations',[],['year_ahead','month_ahead','cam_rmr','cam_rmr_update','incremental_local'],[self.consolidate_allocations]),
+            ('filings',[],['ra_monthly_filing','nqc_list'],[self.consolidate_filings]),
+            ('supply_plans',[],['supply_plan_system','supply_plan_flexible'],[self.consolidate_supply_plans]),
+        ]
+        checkpoints = self.config.get_option('consolidation_checkpoint_directory') is not None and not self.dry_run
+        self.metric_workbooks = None
+        input_fingerprint = ''
+        completed_stage = None
+        resuming = checkpoints
+        for stage,path_ids,ra_categories,steps in stages:
+            if checkpoints:
+                input_fingerprint = self.get_stage_fingerprint(stage,path_ids,ra_categories,input_fingerprint)
+            else:
+                pass
+            if resuming and self.checkpoint_is_valid(stage,input_fingerprint):
+                self.logger.log('Skipping Completed Consolidation Stage: {}'.format(stage),'INFORMATION')
+                completed_stage = stage
+            else:
+                if resuming and completed_stage is not None:
+                    self.restore_checkpoint(completed_stage)
                 else:
-                    transmission_loss_adder = round(self.config.get_option(f'transmission_loss_adder_{service_territory}'),5)
-                caiso_cross_check['Requirements'][cell_address.format(row_number_summary+1)].value = \
-                    physical_resources.loc[
-                        (physical_resources.loc[:,'organization_id']==organization_id) &
-                        (physical_resources.loc[:,'locality']==locality),
-                        'resource_adequacy_local'
-                    ].sum() + \
-                    transmission_loss_adder * \
-                    demand_response.loc[
-                        (demand_response.loc[:,'organization_id']==organization_id) &
-                        (demand_response.loc[:,'locality']==locality),
-                        'resource_adequacy_local'
-                    ].sum()
-            regions = [
-                ['BY{}',['humboldt','sierra','stockton','northern_california','fresno','kern'],'pge'],
-                ['CD{}',['los_angeles','ventura'],'sce'],
-                ['CI{}',['san_diego'],'sdge'],
-                ['CN{}',['bay_area','humboldt','sierra','stockton','northern_california','fresno','kern'],'pge'],
-            ]
-            for cell_address,localities,service_territory in regions:
-                if organization_id in ['pge','sce','sdge']:
-                    transmission_loss_adder = 1
+                    pass
+                resuming = False
+                if checkpoints:
+                    self.remove_checkpoint(stage)
                 else:
-                    transmission_loss_adder = round(self.config.get_option(f'transmission_loss_adder_{service_territory}'),5)
-                caiso_cross_check['Requirements'][cell_address.format(row_number_summary+1)].value = \
-                    physical_resources.loc[
-                        (physical_resources.loc[:,'organization_id']==organization_id) &
-                        (physical_resources.loc[:,'locality'].isin(localities)),
-                        'resource_adequacy_local'
-                    ].sum() + \
-                    transmission_loss_adder * \
-                    demand_response.loc[
-                        (demand_response.loc[:,'organization_id']==organization_id) &
-                        (demand_response.loc[:,'locality'].isin(localities)),
-                        'resource_adequacy_local'
-                    ].sum()
-            caiso_cross_check['FilingSummary'][f'A{row_number_summary}'] = organization_id
-            caiso_cross_check['FilingSummary'][f'B{row_number_summary}'] = '=SUMIF(Filings!$A:$A,INDIRECT("A"&ROW()),Filings!$G:$G)'
-            caiso_cross_check['FilingSummary'][f'C{row_number_summary}'] = '=SUMIF(CAISO_Sys_SP!$C:$C,INDIRECT("A"&ROW()),CAISO_Sys_SP!$I:$I)'
-            caiso_cross_check['FilingSummary'][f'D{row_number_summary}'] = '=INDIRECT("C"&ROW())-INDIRECT("B"&ROW())'
-            caiso_cross_check['FilingSummary'][f'D{row_number_summary}'].fill = PatternFill(start_color='FFF2CC',end_color='FFF2CC',fill_type='solid')
-            caiso_cross_check['FilingSummary'][f'E{row_number_summary}'] = '=SUMIFS(Filings!$M:$M,Filings!$A:$A,INDIRECT("A"&ROW()),Filings!$Q:$Q,1)'
-            caiso_cross_check['FilingSummary'][f'F{row_number_summary}'] = '=SUMIFS(CAISO_Flex_SP!$G:$G,CAISO_Flex_SP!$B:$B,INDIRECT("A"&ROW()),CAISO_Flex_SP!$F:$F,1)'
-            caiso_cross_check['FilingSummary'][f'G{row_number_summary}'] = '=INDIRECT("F"&ROW())-INDIRECT("E"&ROW())'
-            caiso_cross_check['FilingSummary'][f'G{row_number_summary}'].fill = PatternFill(start_color='FFF2CC',end_color='FFF2CC',fill_type='solid')
-            caiso_cross_check['FilingSummary'][f'H{row_number_summary}'] = '=SUMIFS(Filings!$M:$M,Filings!$A:$A,INDIRECT("A"&ROW()),Filings!$Q:$Q,2)'
-            caiso_cross_check['FilingSummary'][f'I{row_number_summary}'] = '=SUMIFS(CAISO_Flex_SP!$G:$G,CAISO_Flex_SP!$B:$B,INDIRECT("A"&ROWC()),CAISO_Flex_SP!$F:$F,2)'
-            caiso_cross_check['FilingSummary'][f'J{row_number_summary}'] = '=INDIRECT("I"&ROW())-INDIRECT("H"&ROW())'
-            caiso_cross_check['FilingSummary'][f'J{row_number_summary}'].fill = PatternFill(start_color='FFF2CC',end_color='FFF2CC',fill_type='solid')
-            caiso_cross_check['FilingSummary'][f'K{row_number_summary}'] = '=SUMIFS(Filings!$M:$M,Filings!$A:$A,INDIRECT("A"&ROW()),Filings!$Q:$Q,3)'
-            caiso_cross_check['FilingSummary'][f'L{row_number_summary}'] = '=SUMIFS(CAISO_Flex_SP!$G:$G,CAISO_Flex_SP!$B:$B,INDIRECT("A"&ROW()),CAISO_Flex_SP!$F:$F,3)'
-            caiso_cross_check['FilingSummary'][f'M{row_number_summary}'] = '=INDIRECT("L"&ROW())-INDIRECT("K"&ROW())'
-            caiso_cross_check['FilingSummary'][f'M{row_number_summary}'].fill = PatternFill(start_color='FFF2CC',end_color='FFF2CC',fill_type='solid')
-            caiso_cross_check['FilingSummary'][f'Y{row_number_summary}'] = '=INDIRECT("L"&ROW())-INDIRECT("K"&ROW())'
+                    pass
+                for step in steps:
+                    with self.timer.span(step.__name__):
+                        step()
+                if checkpoints:
+                    self.save_checkpoint(stage,input_fingerprint)
+                else:
+                    pass
+        # restore outputs if every stage had already completed:
+        if resuming and completed_stage is not None:
+            self.restore_checkpoint(completed_stage)
+        else:
+            pass
+        if not self.dry_run:
+            self.save_consolidation_metrics()
+        else:
+            pass
+
+    def get_stage_fingerprint(self,stage:str,path_ids:list,ra_categories:list,previous_fingerprint:str):
+        '''
+        calculates a fingerprint of a consolidation stage's inputs from the
+        hashes of its input files, chained with the fingerprint of the
+        preceding stage so changes to earlier inputs also invalidate all later
+        stages.
 
-            # update log with compliance:
-            requirements = caiso_cross_check['Requirements'][f'B{row_number_summary+1}'].value
-            resources = caiso_cross_check['Requirements'][f'C{row_number_summary+1}'].value + \
-                caiso_cross_check['Requirements'][f'D{row_number_summary+1}'].value
-            if resources>=requirements:
-                compliance = 'Compliant'
+        parameters:
+            stage - the name of the consolidation stage
+            path_ids - a list of path ids of configuration and template files
+                read by the stage
+            ra_categories - a list of categories of input files in the
+                consolidation log read by the stage
+            previous_fingerprint - the fingerprint of the preceding stage
+        '''
+        fingerprint = hashlib.sha256()
+        fingerprint.update('{}:{}:{};'.format(previous_fingerprint,stage,self.config.filing_month.strftime('%Y-%m')).encode())
+        for path_id in path_ids:
+            path = self.config.paths.get_path(path_id)
+            if path is not None and path.is_file():
+                fingerprint.update('{}:{};'.format(path_id,get_file_hash(path)).encode())
             else:
-                compliance = 'Noncompliant'
-            self.consolidation_logger.data.loc[
-                (self.consolidation_logger.data.loc[:,'ra_category']=='ra_monthly_filing') & \
-                (self.consolidation_logger.data.loc[:,'organization_id']==organization_id),
-                'compliance'
-            ] = compliance
-            self.consolidation_logger.commit()
-            row_number_summary += 1
-            monthly_nqc_formula = '=IFERROR(INDEX(NQC_List!$A:$P,MATCH(INDIRECT(ADDRESS(ROW(),3)),NQC_List!$B:$B,0),MATCH(INDIRECT(ADDRESS(1,COLUMN())),NQC_List!$1:$1,0)),"")'
-            for _,row in physical_resources.loc[(physical_resources.loc[:,'organization_id']==organization_id),:].iterrows():
-                ra_summary['PhysicalResources']['A{}'.format(row_number_physical_resources)] = organization_id
-                ra_summary['PhysicalResources']['B{}'.format(row_number_physical_resources)] = row.loc['contract_id']
-                ra_summary['PhysicalResources']['C{}'.format(row_number_physical_resources)] = row.loc['resource_id']
-                ra_summary['PhysicalResources']['D{}'.format(row_number_physical_resources)].value = row.loc['resource_adequacy_system']
-                ra_summary['PhysicalResources']['E{}'.format(row_number_physical_resources)].value = row.loc['resource_adequacy_local']
-                ra_summary['PhysicalResources']['F{}'.format(row_number_physical_resources)].value = row.loc['resource_mcc_bucket']
-                ra_summary['PhysicalResources']['G{}'.format(row_number_physical_resources)].value = row.loc['continuous_availability']
-                ra_summary['PhysicalResources']['H{}'.format(row_number_physical_resources)].value = row.loc['resource_adequacy_committed_flexible']
-                ra_summary['PhysicalResources']['I{}'.format(row_number_physical_resources)].value = row.loc['resource_adequacy_flexibility_category']
-                ra_summary['PhysicalResources']['J{}'.format(row_number_physical_resources)] = '=IFERROR(VLOOKUP(@INDIRECT("C"&ROW()),NQC_List!$B:$D,2,FALSE),"")'
-                ra_summary['PhysicalResources']['K{}'.format(row_number_physical_resources)] = '=IFERROR(VLOOKUP(@INDIRECT("C"&ROW()),NQC_List!$B:$D,3,FALSE),"")'
-                ra_summary['PhysicalResources']['L{}'.format(row_number_physical_resources)] = monthly_nqc_formula
-                ra_summary['PhysicalResources']['M{}'.format(row_number_physical_resources)] = monthly_nqc_formula
-                ra_summary['PhysicalResources']['N{}'.format(row_number_physical_resources)] = monthly_nqc_formula
-                ra_summary['PhysicalResources']['O{}'.format(row_number_physical_resources)] = monthly_nqc_formula
-                ra_summary['PhysicalResources']['P{}'.format(row_number_physical_resources)] = monthly_nqc_formula
-                ra_summary['PhysicalResources']['Q{}'.format(row_number_physical_resources)] = monthly_nqc_formula
-                ra_summary['PhysicalResources']['R{}'.format(row_number_physical_resources)] = monthly_nqc_formula
-                ra_summary['PhysicalResources']['S{}'.format(row_number_physical_resources)] = monthly_nqc_formula
-                ra_summary['PhysicalResources']['T{}'.format(row_number_physical_resources)] = monthly_nqc_formula
-                ra_summary['PhysicalResources']['U{}'.format(row_number_physical_resources)] = monthly_nqc_formula
-                ra_summary['PhysicalResources']['V{}'.format(row_number_physical_resources)] = monthly_nqc_formula
-                ra_summary['PhysicalResources']['W{}'.format(row_number_physical_resources)] = monthly_nqc_formula
-                ra_summary['PhysicalResources']['X{}'.format(row_number_physical_resources)] = '=IF(COUNTIF(INDIRECT("C"&ROW()&":C"&COUNTA(C:C)),INDIRECT("C"&ROW()))>1,SUMIF(INDIRECT("C2:C"&ROW()),INDIRECT("C"&ROW()),INDIRECT("D2:D"&ROW())),"")'
-                ra_summary['PhysicalResources']['Y{}'.format(row_number_physical_resources)] = '=IF(COUNTIF(INDIRECT("C"&ROW()&":C"&COUNTA(C:C)),INDIRECT("C"&ROW()))>1,"Partial","Resource Total: " & ROUND(SUMIF(INDIRECT("C$2:C"&ROW()),INDIRECT("C"&ROW()),INDIRECT("D$2:D"&ROW())),2) & " MW")'
-                ra_summary['PhysicalResources']['Y{}'.format(row_number_physical_resources)].font = Font(color='3366FF',bold=True)
-                ra_summary['PhysicalResources']['Z{}'.format(row_number_physical_resources)] = '=IF(COUNTIF(NQC_List!$B:$B,INDIRECT("C"&ROW()))=0,"No Match","")'
-                ra_summary['PhysicalResources']['Z{}'.format(row_number_physical_resources)].font =Font(color='FF0000',bold=True)
-                ra_summary['PhysicalResources']['AA{}'.format(row_number_physical_resources)] = '=IF(COUNTIF(INDIRECT("C"&ROW()&":C"&COUNTA(C:C)),INDIRECT("C"&ROW()))>1,"",IF(SUMIF(INDIRECT("C$2:C"&ROW()),INDIRECT("C"&ROW()),INDIRECT("D$2:D"&ROW()))>OFFSET(INDIRECT("K"&ROW()),0,INT(RIGHT(_xlfn.TEXTBEFORE(CELL("filename"),".xlsx"),2))),"Resource Total Exceeds NQC by " & ROUND(SUMIF(INDIRECT("C2:C"&ROW()),INDIRECT("C"&ROW()),INDIRECT("D2:D"&ROW()))-OFFSET(INDIRECT("K"&ROW()),0,INT(RIGHT(_xlfn.TEXTBEFORE(CELL("filename"),".xlsx"),2))),2) & " MW",""))'
-                ra_summary['PhysicalResources']['AA{}'.format(row_number_physical_resources)].font = Font(bold=True)
-                caiso_cross_check['Filings']['A{}'.format(row_number_physical_resources+1)] = organization_id
-                caiso_cross_check['Filings']['B{}'.format(row_number_physical_resources+1)] = row.loc['contract_id']
-                caiso_cross_check['Filings']['C{}'.format(row_number_physical_resources+1)] = row.loc['resource_id']
-                caiso_cross_check['Filings']['D{}'.format(row_number_physical_resources+1)] = '=CONCATENATE(INDIRECT("A"&ROW()),INDIRECT("C"&ROW()),INDIRECT("G"&ROW()))'
-                caiso_cross_check['Filings']['E{}'.format(row_number_physical_resources+1)] = '=CONCATENATE(INDIRECT("A"&ROW()),INDIRECT("C"&ROW()))'
-                caiso_cross_check['Filings']['F{}'.format(row_number_physical_resources+1)] = '=CONCATENATE(INDIRECT("A"&ROW()),INDIRECT("C"&ROW()),INDIRECT("M"&ROW()))'
-                caiso_cross_check['Filings']['G{}'.format(row_number_physical_resources+1)].value = row.loc['resource_adequacy_system']
-                caiso_cross_check['Filings']['H{}'.format(row_number_physical_resources+1)].value = row.loc['resource_adequacy_local']
-                caiso_cross_check['Filings']['I{}'.format(row_number_physical_resources+1)] = '=SUMIFS($G:$G,$A:$A,INDIRECT("A"&ROW()),$C:$C,INDIRECT("C"&ROW()))'
-                caiso_cross_check['Filings']['J{}'.format(row_number_physical_resources+1)] = '=SUMIFS(CAISO_Sys_SP!$I:$I,CAISO_Sys_SP!$C:$C,INDIRECT("A"&ROW()),CAISO_Sys_SP!$F:$F,INDIRECT("C"&ROW()))'
-                caiso_cross_check['Filings']['K{}'.format(row_number_physical_resources+1)] = '=IF(INDIRECT("J"&ROW())<>INDIRECT("I"&ROW()),"Y: "&INDIRECT("J"&ROW())-INDIRECT("I"&ROW())&" MW","-")'
-                caiso_cross_check['Filings']['L{}'.format(row_number_physical_resources+1)].value = row.loc['resource_mcc_bucket']
-                caiso_cross_check['Filings']['M{}'.format(row_number_physical_resources+1)].value = row.loc['resource_adequacy_committed_flexible']
-                caiso_cross_check['Filings']['N{}'.format(row_number_physical_resources+1)] = '=SUMIFS($M:$M,$A:$A,INDIRECT("A"&ROW()),$C:$C,INDIRECT("C"&ROW()))'
-                caiso_cross_check['Filings']['O{}'.format(row_number_physical_resources+1)] = '=SUMIFS(CAISO_Flex_SP!$G:$G,CAISO_Flex_SP!$B:$B,INDIRECT("A"&ROW()),CAISO_Flex_SP!$E:$E,INDIRECT("C"&ROW()))'
-                caiso_cross_check['Filings']['P{}'.format(row_number_physical_resources+1)] = '=IF(INDIRECT("O"&ROW())<>INDIRECT("N"&ROW()),"Y: "&INDIRECT("O"&ROW())-INDIRECT("N"&ROW())&" MW","-")'
-                caiso_cross_check['Filings']['Q{}'.format(row_number_physical_resources+1)].value = row.loc['resource_adequacy_flexibility_category']
-                caiso_cross_check['Filings']['R{}'.format(row_number_physical_resources+1)].value = get_zone(row.loc['resource_id'])
-                caiso_cross_check['Filings']['S{}'.format(row_number_physical_resources+1)] = '=IF(NOT(ISBLANK(INDIRECT("G"&ROW()))),IF(ISNA(VLOOKUP(INDIRECT("A"&ROW()),CAISO_Sys_SP!$A:$A,1,FALSE)),"N","-"),"")'
-                caiso_cross_check['Filings']['T{}'.format(row_number_physical_resources+1)] = '=IF(AND(NOT(ISBLANK(INDIRECT("H"&ROW()))),NOT(INDIRECT("H"&ROW())=0)),IF(ISNA(VLOOKUP(INDIRECT("B"&ROW()),CAISO_Sys_SP!$B:$B,1,FALSE)),"N","-"),"")'
-                caiso_cross_check['Filings']['U{}'.format(row_number_physical_resources+1)] = '=IF(NOT(ISBLANK(INDIRECT("M"&ROW()))),IF(ISNA(VLOOKUP(INDIRECT("C"&ROW()),CAISO_Flex_SP!$A:$A,1,FALSE)),"N","-"),"")'
-                for col in 'DEFIJKNOPSTU':
-                    caiso_cross_check['Filings']['{}{}'.format(col,row_number_physical_resources+1)].fill = PatternFill(start_color='DDEBF7',end_color='DDEBF7',fill_type='solid')
-                row_number_physical_resources += 1
-            for _,row in demand_response.loc[(demand_response.loc[:,'organization_id']==organization_id),:].iterrows():
-                ra_summary['PhysicalResources']['A{}'.format(row_number_physical_resources)] = organization_id
-                ra_summary['PhysicalResources']['B{}'.format(row_number_physical_resources)] = row.loc['contract_id']
-                ra_summary['PhysicalResources']['C{}'.format(row_number_physical_resources)] = row.loc['program_id']
-                ra_summary['PhysicalResources']['D{}'.format(row_number_physical_resources)].value = row.loc['resource_adequacy_system']
-                ra_summary['PhysicalResources']['E{}'.format(row_number_physical_resources)].value = row.loc['resource_adequacy_local']
-                ra_summary['PhysicalResources']['F{}'.format(row_number_physical_resources)].value = row.loc['resource_mcc_bucket']
-                ra_summary['PhysicalResources']['G{}'.format(row_number_physical_resources)].value = False
-                ra_summary['PhysicalResources']['H{}'.format(row_number_physical_resources)].value = row.loc['resource_adequacy_committed_flexible']
-                ra_summary['PhysicalResources']['I{}'.format(row_number_physical_resources)].value = row.loc['resource_adequacy_flexibility_category']
-                ra_summary['PhysicalResources']['J{}'.format(row_number_physical_resources)] = '=IFERROR(VLOOKUP(@INDIRECT("C"&ROW()),NQC_List!$B:$D,2,FALSE),"")'
-                ra_summary['PhysicalResources']['K{}'.format(row_number_physical_resources)] = '=IFERROR(VLOOKUP(@INDIRECT("C"&ROW()),NQC_List!$B:$D,3,FALSE),"")'
-                ra_summary['PhysicalResources']['L{}'.format(row_number_physical_resources)] = monthly_nqc_formula
-                ra_summary['PhysicalResources']['M{}'.format(row_number_physical_resources)] = monthly_nqc_formula
-                ra_summary['PhysicalResources']['N{}'.format(row_number_physical_resources)] = monthly_nqc_formula
-                ra_summary['PhysicalResources']['O{}'.format(row_number_physical_resources)] = monthly_nqc_formula
-                ra_summary['PhysicalResources']['P{}'.format(row_number_physical_resources)] = monthly_nqc_formula
-                ra_summary['PhysicalResources']['Q{}'.format(row_number_physical_resources)] = monthly_nqc_formula
-                ra_summary['PhysicalResources']['R{}'.format(row_number_physical_resources)] = monthly_nqc_formula
-                ra_summary['PhysicalResources']['S{}'.format(row_number_physical_resources)] = monthly_nqc_formula
-                ra_summary['PhysicalResources']['T{}'.format(row_number_physical_resources)] = monthly_nqc_formula
-                ra_summary['PhysicalResources']['U{}'.format(row_number_physical_resources)] = monthly_nqc_formula
-                ra_summary['PhysicalResources']['V{}'.format(row_number_physical_resources)] = monthly_nqc_formula
-                ra_summary['PhysicalResources']['W{}'.format(row_number_physical_resources)] = monthly_nqc_formula
-                ra_summary['PhysicalResources']['X{}'.format(row_number_physical_resources)] = '=IF(COUNTIF(INDIRECT("C"&ROW()&":C"&COUNTA(C:C)),INDIRECT("C"&ROW()))>1,SUMIF(INDIRECT("C2:C"&ROW()),INDIRECT("C"&ROW()),INDIRECT("D2:D"&ROW())),"")'
-                ra_summary['PhysicalResources']['Y{}'.format(row_number_physical_resources)] = '=IF(COUNTIF(INDIRECT("C"&ROW()&":C"&COUNTA(C:C)),INDIRECT("C"&ROW()))>1,"Partial","Resource Total: " & ROUND(SUMIF(INDIRECT("C$2:C"&ROW()),INDIRECT("C"&ROW()),INDIRECT("D$2:D"&ROW())),2) & " MW")'
-                ra_summary['PhysicalResources']['Y{}'.format(row_number_physical_resources)].font = Font(color='3366FF',bold=True)
-                ra_summary['PhysicalResources']['Z{}'.format(row_number_physical_resources)] = '=IF(COUNTIF(NQC_List!$B:$B,INDIRECT("C"&ROW()))=0,"No Match","")'
-                ra_summary['PhysicalResources']['Z{}'.format(row_number_physical_resources)].font =Font(color='FF0000',bold=True)
-                ra_summary['PhysicalResources']['AA{}'.format(row_number_physical_resources)] = '=IF(COUNTIF(INDIRECT("C"&ROW()&":C"&COUNTA(C:C)),INDIRECT("C"&ROW()))>1,"",IF(SUMIF(INDIRECT("C$2:C"&ROW()),INDIRECT("C"&ROW()),INDIRECT("D$2:D"&ROW()))>OFFSET(INDIRECT("K"&ROW()),0,INT(RIGHT(_xlfn.TEXTBEFORE(CELL("filename"),".xlsx"),2))),"Resource Total Exceeds NQC by " & ROUND(SUMIF(INDIRECT("C2:C"&ROW()),INDIRECT("C"&ROW()),INDIRECT("D2:D"&ROW()))-OFFSET(INDIRECT("K"&ROW()),0,INT(RIGHT(_xlfn.TEXTBEFORE(CELL("filename"),".xlsx"),2))),2) & " MW",""))'
-                ra_summary['PhysicalResources']['AA{}'.format(row_number_physical_resources)].font = Font(bold=True)
-                caiso_cross_check['Filings']['A{}'.format(row_number_physical_resources+1)] = organization_id
-                caiso_cross_check['Filings']['B{}'.format(row_number_physical_resources+1)] = row.loc['contract_id']
-                caiso_cross_check['Filings']['C{}'.format(row_number_physical_resources+1)] = row.loc['program_id']
-                caiso_cross_check['Filings']['D{}'.format(row_number_physical_resources+1)] = '=CONCATENATE(INDIRECT("A"&ROW()),INDIRECT("C"&ROW()),INDIRECT("G"&ROW()))'
-                caiso_cross_check['Filings']['E{}'.format(row_number_physical_resources+1)] = '=CONCATENATE(INDIRECT("A"&ROW()),INDIRECT("C"&ROW()))'
-                caiso_cross_check['Filings']['F{}'.format(row_number_physical_resources+1)] = '=CONCATENATE(INDIRECT("A"&ROW()),INDIRECT("C"&ROW()),INDIRECT("M"&ROW()))'
-                caiso_cross_check['Filings']['G{}'.format(row_number_physical_resources+1)].value = row.loc['resource_adequacy_system']
-                caiso_cross_check['Filings']['H{}'.format(row_number_physical_resources+1)].value = row.loc['resource_adequacy_local']
-                caiso_cross_check['Filings']['I{}'.format(row_number_physical_resources+1)] = '=SUMIFS($G:$G,$A:$A,INDIRECT("A"&ROW()),$C:$C,INDIRECT("C"&ROW()))'
-                caiso_cross_check['Filings']['J{}'.format(row_number_physical_resources+1)] = '=SUMIFS(CAISO_Sys_SP!$I:$I,CAISO_Sys_SP!$C:$C,INDIRECT("A"&ROW()),CAISO_Sys_SP!$F:$F,INDIRECT("C"&ROW()))'
-                caiso_cross_check['Filings']['K{}'.format(row_number_physical_resources+1)] = '=IF(INDIRECT("J"&ROW())<>INDIRECT("I"&ROW()),"Y: "&INDIRECT("J"&ROW())-INDIRECT("I"&ROW())&" MW","-")'
-                caiso_cross_check['Filings']['L{}'.format(row_number_physical_resources+1)].value = row.loc['resource_mcc_bucket']
-                caiso_cross_check['Filings']['M{}'.format(row_number_physical_resources+1)].value = row.loc['resource_adequacy_committed_flexible']
-                caiso_cross_check['Filings']['N{}'.format(row_number_physical_resources+1)] = '=SUMIFS($M:$M,$A:$A,INDIRECT("A"&ROW()),$C:$C,INDIRECT("C"&ROW()))'
-                caiso_cross_check['Filings']['O{}'.format(row_number_physical_resources+1)] = '=SUMIFS(CAISO_Flex_SP!$G:$G,CAISO_Flex_SP!$B:$B,INDIRECT("A"&ROW()),CAISO_Flex_SP!$E:$E,INDIRECT("C"&ROW()))'
-                caiso_cross_check['Filings']['P{}'.format(row_number_physical_resources+1)] = '=IF(INDIRECT("O"&ROW())<>INDIRECT("N"&ROW()),"Y: "&INDIRECT("O"&ROW())-INDIRECT("N"&ROW())&" MW","-")'
-                caiso_cross_check['Filings']['Q{}'.format(row_number_physical_resources+1)].value = row.loc['resource_adequacy_flexibility_category']
-                caiso_cross_check['Filings']['R{}'.format(row_number_physical_resources+1)].value = get_zone(row.loc['program_id'])
-                caiso_cross_check['Filings']['S{}'.format(row_number_physical_resources+1)] = '=IF(NOT(ISBLANK(INDIRECT("G"&ROW()))),IF(ISNA(VLOOKUP(INDIRECT("A"&ROW()),CAISO_Sys_SP!$A:$A,1,FALSE)),"N","-"),"")'
-                caiso_cross_check['Filings']['T{}'.format(row_number_physical_resources+1)] = '=IF(AND(NOT(ISBLANK(INDIRECT("H"&ROW()))),NOT(INDIRECT("H"&ROW())=0)),IF(ISNA(VLOOKUP(INDIRECT("B"&ROW()),CAISO_Sys_SP!$B:$B,1,FALSE)),"N","-"),"")'
-                caiso_cross_check['Filings']['U{}'.format(row_number_physical_resources+1)] = '=IF(NOT(ISBLANK(INDIRECT("M"&ROW()))),IF(ISNA(VLOOKUP(INDIRECT("C"&ROW()),CAISO_Flex_SP!$A:$A,1,FALSE)),"N","-"),"")'
-                for col in 'DEFIJKNOPSTU':
-                    caiso_cross_check['Filings']['{}{}'.format(col,row_number_physical_resources+1)].fill = PatternFill(start_color='DDEBF7',end_color='DDEBF7',fill_type='solid')
-                row_number_physical_resources += 1
+                fingerprint.update('{}:;'.format(path_id).encode())
+        stage_files = self.consolidation_logger.data.loc[
+            self.consolidation_logger.data.loc[:,'ra_category'].isin(ra_categories),
+            ['ra_category','organization_id','status','file_hash']
+        ].fillna('').astype(str).sort_values(['ra_category','organization_id'])
+        for ra_category,organization_id,status,file_hash in stage_files.itertuples(index=False):
+            fingerprint.update('{}:{}:{}:{};'.format(ra_category,organization_id,status,file_hash).encode())
+        return fingerprint.hexdigest()
 
-        # apply conditional formatting to flex-rar sheet:
-        ra_summary['FlexRAR'].conditional_formatting.add(
-            'C{}:C{}'.format(first_row_number_summary,row_number_summary-1),
-            CellIsRule(
-                operator='lessThan',
-                formula=['INDIRECT("B"&ROW())'],
-                stopIfTrue=False,
-                fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
-                font=Font(color='9C0006')
-            )
-        )
-        ra_summary['FlexRAR'].conditional_formatting.add(
-            'D{}:D{}'.format(first_row_number_summary,row_number_summary-1),
-            CellIsRule(
-                operator='lessThan',
-                formula=[1.0],
-                stopIfTrue=False,
-                fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
-                font=Font(color='9C0006')
-            )
-        )
-        ra_summary['FlexRAR'].conditional_formatting.add(
-            'F{}:F{}'.format(first_row_number_summary,row_number_summary-1),
-            CellIsRule(
-                operator='lessThan',
-                formula=['INDIRECT("E"&ROW())'],
-                stopIfTrue=False,
-                fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
-                font=Font(color='9C0006')
-            )
-        )
+    def get_checkpoint_marker(self,stage:str):
+        '''
+        reads the completion marker of a consolidation stage's checkpoint,
+        returning an empty dictionary if there is no readable marker.
 
-        # create totals row in MCC_Check worksheet:
-        ra_summary['MCC_Check'][f'A{row_number_summary}'] = 'Total:'
-        for col_letter in 'BCDEFGHIJKLMNOP':
-            ra_summary['MCC_Check'][f'{col_letter}{row_number_summary}'] = '=SUM({0}{1}:{0}{2})'.format(col_letter,first_row_number_summary,row_number_summary-1)
-            for row_number_formatting in range(first_row_number_summary,row_number_summary+1):
-                ra_summary['MCC_Check'][f'{col_letter}{row_number_formatting}'].number_format = '#,##0.00'
+        parameters:
+            stage - the name of the consolidation stage
+        '''
+        path = self.config.paths.get_path('consolidation_checkpoints') / stage / 'checkpoint.json'
+        if path.is_file():
+            try:
+                with path.open(mode='r') as f:
+                    marker = json.load(f)
+            except:
+                marker = {}
+        else:
+            marker = {}
+        return marker
 
-        # create totals row in FlexRAR worksheet:
-        ra_summary['FlexRAR'][f'A{row_number_summary}'] = 'Total:'
-        ra_summary['FlexRAR'][f'D{row_number_summary}'] = '=IFERROR(INDIRECT("C"&ROW())/INDIRECT("B"&ROW()),0)'
-        ra_summary['FlexRAR'][f'D{row_number_summary}'].number_format = '0.00%'
-        for col_letter in 'BCEFGHIJLMNOQRST':
-            ra_summary['FlexRAR']['{}{}'.format(col_letter,row_number_summary)] = '=SUM({0}2:{0}{1})'.format(col_letter,row_number_summary-1)
-            ra_summary['FlexRAR']['{}{}'.format(col_letter,row_number_summary)].number_format ='#,##0.00'
-        for col_letter in 'ABCDEFGHIJKLMNOPQRST':
-            ra_summary['FlexRAR']['{}{}'.format(col_letter,row_number_summary)].fill = PatternFill(start_color='00FF00',end_color='00FF00',fill_type='solid')
+    def checkpoint_is_valid(self,stage:str,input_fingerprint:str):
+        '''
+        checks whether a consolidation stage completed with the given input
+        fingerprint and its saved files are unchanged.
 
-        # apply conditional formatting to local true-up sheet:
-        for col_letter in ['F','K','P','U','Z','AE','AJ','AO','AT','AY','BD','BI','BN','BS']:
-            ra_summary['LocalTrueUp'].conditional_formatting.add(
-                '{0}{1}:{0}{2}'.format(col_letter,first_row_number_summary,row_number_summary-1),
-                CellIsRule(
-                    operator='lessThan',
-                    formula=[0],
-                    stopIfTrue=False,
-                    fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
-                    font=Font(color='9C0006')
-                )
-            )
+        parameters:
+            stage - the name of the consolidation stage
+            input_fingerprint - the current fingerprint of the stage's inputs
+        '''
+        checkpoint_path = self.config.paths.get_path('consolidation_checkpoints') / stage
+        marker = self.get_checkpoint_marker(stage)
+        files = marker.get('files',{})
+        return marker.get('input_fingerprint')==input_fingerprint and \
+            all([path_id in files.keys() for path_id in ['ra_summary','caiso_cross_check','consolidation_log']]) and \
+            all([(checkpoint_path / f['filename']).is_file() and get_file_hash(checkpoint_path / f['filename'])==f['file_hash'] for f in files.values()])
 
-        # apply conditional formatting to certifying officer sheet:
-        ra_summary['CertifyingOfficers'].conditional_formatting.add(
-            'E{}:E{}'.format(first_row_number_summary,row_number_summary-1),
-            CellIsRule(
-                operator='equal',
-                formula=['"Yes"'],
-                stopIfTrue=False,
-                fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
-                font=Font(color='9C0006')
-            )
-        )
-        ra_summary['CertifyingOfficers'].conditional_formatting.add(
-            'G{}:G{}'.format(first_row_number_summary,row_number_summary-1),
-            CellIsRule(
-                operator='equal',
-                formula=['"Yes"'],
-                stopIfTrue=False,
-                fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
-                font=Font(color='9C0006')
-            )
-        )
+    def save_checkpoint(self,stage:str,input_fingerprint:str):
+        '''
+        copies the output workbooks and consolidation log after a completed
+        consolidation stage into the stage's checkpoint directory, followed by
+        a completion marker with the stage's input fingerprint.
 
-        # write total lines in np and sp worksheets:
-        for sheet_name in ['NP26','SP26']:
-            ra_summary[sheet_name][f'A{row_number_summary}'] = 'Total:'
-            ra_summary[sheet_name][f'A{row_number_summary}'].fill = PatternFill(start_color='00FF00',end_color='00FF00',fill_type='solid')
-            for col_letter in 'BCDEFGHIJK':
-                ra_summary[sheet_name][f'{col_letter}{row_number_summary}'] = '=SUM({0}{1}:{0}{2})'.format(col_letter,first_row_number_summary,row_number_summary-1)
-                ra_summary[sheet_name][f'{col_letter}{row_number_summary}'].number_format = '#,##0.00'
-                ra_summary[sheet_name][f'{col_letter}{row_number_summary}'].fill = PatternFill(start_color='00FF00',end_color='00FF00',fill_type='solid')
-            ra_summary[sheet_name][f'I{row_number_summary}'] = '=INDIRECT("C"&ROW())+INDIRECT("E"&ROW())'
-            ra_summary[sheet_name][f'A{row_number_summary+1}'].value = 'Net Long/Short:'
-            ra_summary[sheet_name][f'C{row_number_summary+1}'].value = 'Excess in Zone:'
-            ra_summary[sheet_name][f'A{row_number_summary+1}'].fill = PatternFill(start_color='CCFFCC',end_color='CCFFCC',fill_type='solid')
-            ra_summary[sheet_name][f'E{row_number_summary+1}'] = '=INDIRECT("D"&ROW()-1)+INDIRECT("C"&ROW()-1)-INDIRECT("B"&ROW()-1)'
+        parameters:
+            stage - the name of the consolidation stage
+            input_fingerprint - the fingerprint of the stage's inputs
+        '''
+        checkpoint_path = self.config.paths.get_path('consolidation_checkpoints') / stage
+        checkpoint_path.mkdir(parents=True,exist_ok=True)
+        self.consolidation_logger.commit()
+        files = {}
+        for path_id in ['ra_summary','caiso_cross_check','consolidation_log']:
+            path = self.config.paths.get_path(path_id)
+            shutil.copyfile(path,checkpoint_path / path.name)
+            files[path_id] = {
+                'filename' : path.name,
+                'file_hash' : get_file_hash(checkpoint_path / path.name),
+            }
+        marker = {
+            'stage' : stage,
+            'filing_month' : self.config.filing_month.strftime('%Y-%m'),
+            'input_fingerprint' : input_fingerprint,
+            'completed' : ts.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'files' : files,
+        }
+        with (checkpoint_path / 'checkpoint.json').open(mode='w') as f:
+            json.dump(marker,f,indent=2)
+        self.logger.log('Saved Consolidation Checkpoint: {}'.format(stage),'INFORMATION')
+
+    def remove_checkpoint(self,stage:str):
+        '''
+        removes the completion marker of a consolidation stage before it is
+        run, so an interrupted stage is not mistaken for a completed one.
 
-            # apply conditional formatting to columns:
-            ra_summary[sheet_name].conditional_formatting.add(
-                f'F{first_row_number_summary}:F{row_number_summary-1}',
-                CellIsRule(
-                    operator='greaterThan',
-                    formula=[0],
-                    stopIfTrue=False,
-                    fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
-                    font=Font(color='9C0006')
-                )
-            )
-            ra_summary[sheet_name].conditional_formatting.add(
-                '{0}{1}:{0}{2}'.format({'NP26':'M','SP26':'L'}[sheet_name],first_row_number_summary,row_number_summary-1),
-                CellIsRule(
-                    operator='equal',
-                    formula=['"Monthly Filing Not Found"'],
-                    stopIfTrue=False,
-                    fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
-                    font=Font(color='9C0006')
-                )
-            )
+        parameters:
+            stage - the name of the consolidation stage
+        '''
+        path = self.config.paths.get_path('consolidation_checkpoints') / stage / 'checkpoint.json'
+        if path.is_file():
+            path.unlink()
+        else:
+            pass
 
-        # apply conditional formatting to requirements sheet in caiso supply plan cross-check file:
-        caiso_cross_check['Requirements'].conditional_formatting.add(
-            f'E{first_row_number_summary+1}:E{row_number_summary}',
-            CellIsRule(
-                operator='lessThan',
-                formula=['INDIRECT("B"&ROW())'],
-                stopIfTrue=False,
-                fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
-                font=Font(color='9C0006')
-            )
-        )
-        caiso_cross_check['Requirements'].conditional_formatting.add(
-            f'F{first_row_number_summary+1}:F{row_number_summary}',
-            CellIsRule(
-                operator='lessThan',
-                formula=[1.0],
-                stopIfTrue=False,
-                fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
-                font=Font(color='9C0006')
-            )
-        )
-        caiso_cross_check['Requirements'].conditional_formatting.add(
-            f'K{first_row_number_summary+1}:K{row_number_summary}',
-            CellIsRule(
-                operator='lessThan',
-                formula=['INDIRECT("J"&ROW())'],
-                stopIfTrue=False,
-                fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
-                font=Font(color='9C0006')
-            )
+    def restore_checkpoint(self,stage:str):
+        '''
+        copies the output workbooks and consolidation log saved after a
+        completed consolidation stage back to their working locations.
+
+        parameters:
+            stage - the name of the consolidation stage
+        '''
+        checkpoint_path = self.config.paths.get_path('consolidation_checkpoints') / stage
+        marker = self.get_checkpoint_marker(stage)
+        for path_id,f in marker['files'].items():
+            path = self.config.paths.get_path(path_id)
+            path.parent.mkdir(parents=True,exist_ok=True)
+            shutil.copyfile(checkpoint_path / f['filename'],path)
+        self.consolidation_logger.load_log()
+        self.logger.log('Resumed Consolidation from Checkpoint: {}'.format(stage),'INFORMATION')
+
+    def write_organization_values(self,ra_summary,caiso_cross_check,row_number:int,organization_id:str,summary:pd.DataFrame,physical_resources:pd.DataFrame,demand_response:pd.DataFrame):
+        '''
+        writes values from a load serving entity's monthly filing to its row on
+        the lse sheets of the summary workbook and the requirements sheet of
+        the caiso supply plan cross-check workbook, and logs the load serving
+        entity's compliance.
+
+        parameters:
+            ra_summary - the summary workbook, open for writing
+            caiso_cross_check - the caiso supply plan cross-check workbook,
+                open for writing
+            row_number - the row number of the load serving entity on the
+                summary workbook's lse sheets
+            organization_id - the load serving entity's organization id
+            summary - a dataframe of monthly filing summaries indexed by
+                organization id
+            physical_resources - a dataframe of physical resources including
+                the load serving entity's, with localities
+            demand_response - a dataframe of demand response programs
+                including the load serving entity's, with localities
+        '''
+        ra_summary['NP26'][f'G{row_number}'].value = summary.loc[organization_id,'np26dr']
+        ra_summary['NP26'][f'G{row_number}'].number_format = '#,##0.00'
+        ra_summary['SP26'][f'G{row_number}'] = summary.loc[organization_id,'sp26dr']
+        ra_summary['SP26'][f'G{row_number}'].number_format = '#,##0.00'
+        ra_summary['CertifyingOfficers'][f'B{row_number}'] = summary.loc[organization_id,'organization_officer_name']
+        ra_summary['CertifyingOfficers'][f'C{row_number}'] = summary.loc[organization_id,'organization_officer_title']
+        if self.config.paths.get_path('ra_monthly_filing',self.config.organizations.get_organization(organization_id)):
+            filename = self.config.paths.get_path('ra_monthly_filing',self.config.organizations.get_organization(organization_id)).name
+        else:
+            filename = 'Monthly Filing Not Found'
+        ra_summary['Summary'][f'J{row_number}'] = filename
+        ra_summary['NP26'][f'N{row_number}'] = filename
+        ra_summary['SP26'][f'M{row_number}'] = filename
+        ra_summary['CertifyingOfficers'][f'H{row_number}'] = filename
+        caiso_cross_check['Requirements'][f'C{row_number+1}'].value = physical_resources.loc[(physical_resources.loc[:,'organization_id']==organization_id),'resource_adequacy_system'].sum() - physical_resources.loc[(physical_resources.loc[:,'organization_id']==organization_id)&(physical_resources.loc[:,'resource_mcc_bucket']=='DR'),'resource_adequacy_system'].sum()
+        caiso_cross_check['Requirements'][f'C{row_number+1}'].number_format = '#,##0.00'
+        caiso_cross_check['Requirements'][f'D{row_number+1}'].value = (self.config.get_option('demand_response_multiplier')) * (summary.loc[organization_id,'np26dr'] + summary.loc[organization_id,'sp26dr'])
+        caiso_cross_check['Requirements'][f'D{row_number+1}'].number_format = '#,##0.00'
+        caiso_cross_check['Requirements'][f'E{row_number+1}'] = '=INDIRECT("C"&ROW())+INDIRECT("D"&ROW())'
+        caiso_cross_check['Requirements'][f'E{row_number+1}'].number_format = '#,##0.00'
+        caiso_cross_check['Requirements'][f'F{row_number+1}'] = '=IFERROR(ROUND(INDIRECT("E"&ROW())/INDIRECT("B"&ROW()),2),"")'
+        caiso_cross_check['Requirements'][f'F{row_number+1}'].number_format = '0.00%'
+        caiso_cross_check['Requirements'][f'N{row_number+1}'].value = physical_resources.loc[(physical_resources.loc[:,'organization_id']==organization_id)&(physical_resources.loc[:,'resource_adequacy_flexibility_category']==1),'resource_adequacy_committed_flexible'].sum()
+        caiso_cross_check['Requirements'][f'P{row_number+1}'].value = min(
+            caiso_cross_check['Requirements'][f'O{row_number+1}'].value +
+            caiso_cross_check['Requirements'][f'Q{row_number+1}'].value,
+            physical_resources.loc[(physical_resources.loc[:,'organization_id']==organization_id)&(physical_resources.loc[:,'resource_adequacy_flexibility_category']==2),'resource_adequacy_committed_flexible'].sum()
         )
-        caiso_cross_check['Requirements'].conditional_formatting.add(
-            f'L{first_row_number_summary+1}:L{row_number_summary}',
-            CellIsRule(
-                operator='lessThan',
-                formula=[1.0],
-                stopIfTrue=False,
-                fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
-                font=Font(color='9C0006')
-            )
+        caiso_cross_check['Requirements'][f'R{row_number+1}'].value = min(
+            caiso_cross_check['Requirements'][f'Q{row_number+1}'].value,
+            physical_resources.loc[(physical_resources.loc[:,'organization_id']==organization_id)&(physical_resources.loc[:,'resource_adequacy_flexibility_category']==3),'resource_adequacy_committed_flexible'].sum()
         )
-        caiso_cross_check['Requirements'].conditional_formatting.add(
-            f'N{first_row_number_summary+1}:N{row_number_summary}',
-            CellIsRule(
-                operator='lessThan',
-                formula=['INDIRECT("M"&ROW())'],
-                stopIfTrue=False,
-                fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
-                font=Font(color='9C0006')
-            )
+        # calculate values for caiso cross-check file because excel
+        # calculations aren't available from calculated fields in summary file:
+        if self.config.organizations.get_organization(organization_id)['type']=='investor-owned utility':
+            demand_response_coefficient = 1
+        else:
+            demand_response_coefficient = self.config.get_option('demand_response_multiplier')
+        localities = [
+            ['AA{}','los_angeles','sce'],
+            ['AF{}','ventura','sce'],
+            ['AK{}','san_diego','sdge'],
+            ['AP{}','bay_area','pge'],
+            ['AU{}','humboldt','pge'],
+            ['AZ{}','sierra','pge'],
+            ['BE{}','stockton','pge'],
+            ['BJ{}','northern_california','pge'],
+            ['BO{}','fresno','pge'],
+            ['BT{}','kern','pge'],
+        ]
+        for cell_address,locality,service_territory in localities:
+            if organization_id in ['pge','sce','sdge']:
+                transmission_loss_adder = 1
+            else:
+                transmission_loss_adder = round(self.config.get_option(f'transmission_loss_adder_{service_territory}'),5)
+            caiso_cross_check['Requirements'][cell_address.format(row_number+1)].value = \
+                physical_resources.loc[
+                    (physical_resources.loc[:,'organization_id']==organization_id) &
+                    (physical_resources.loc[:,'locality']==locality),
+                    'resource_adequacy_local'
+                ].sum() + \
+                transmission_loss_adder * \
+                demand_response.loc[
+                    (demand_response.loc[:,'organization_id']==organization_id) &
+                    (demand_response.loc[:,'locality']==locality),
+                    'resource_adequacy_local'
+                ].sum()
+        regions = [
+            ['BY{}',['humboldt','sierra','stockton','northern_california','fresno','kern'],'pge'],
+            ['CD{}',['los_angeles','ventura'],'sce'],
+            ['CI{}',['san_diego'],'sdge'],
+            ['CN{}',['bay_area','humboldt','sierra','stockton','northern_california','fresno','kern'],'pge'],
+        ]
+        for cell_address,localities,service_territory in regions:
+            if organization_id in ['pge','sce','sdge']:
+                transmission_loss_adder = 1
+            else:
+                transmission_loss_adder = round(self.config.get_option(f'transmission_loss_adder_{service_territory}'),5)
+            caiso_cross_check['Requirements'][cell_address.format(row_number+1)].value = \
+                physical_resources.loc[
+                    (physical_resources.loc[:,'organization_id']==organization_id) &
+                    (physical_resources.loc[:,'locality'].isin(localities)),
+                    'resource_adequacy_local'
+                ].sum() + \
+                transmission_loss_adder * \
+                demand_response.loc[
+                    (demand_response.loc[:,'organization_id']==organization_id) &
+                    (demand_response.loc[:,'locality'].isin(localities)),
+                    'resource_adequacy_local'
+                ].sum()
+        # update log with compliance:
+        requirements = caiso_cross_check['Requirements'][f'B{row_number+1}'].value
+        resources = caiso_cross_check['Requirements'][f'C{row_number+1}'].value + \
+            caiso_cross_check['Requirements'][f'D{row_number+1}'].value
+        if resources>=requirements:
+            compliance = 'Compliant'
+        else:
+            compliance = 'Noncompliant'
+        hot_path_counters.count('write_organization_values')
+        self.consolidation_logger.data.loc[
+            (self.consolidation_logger.data.loc[:,'ra_category']=='ra_monthly_filing') & \
+            (self.consolidation_logger.data.loc[:,'organization_id']==organization_id),
+            'compliance'
+        ] = compliance
+        if not self.dry_run:
+            self.consolidation_logger.commit()
+        else:
+            pass
+
+    def write_resource_row(self,ra_summary,caiso_cross_check,row_number:int,organization_id:str,resource:pd.Series,zone:str):
+        '''
+        writes a physical resource or demand response program from a monthly
+        filing to the physicalresources sheet of the summary workbook and the
+        filings sheet of the caiso supply plan cross-check workbook, along
+        with the formulas for each row.
+
+        parameters:
+            ra_summary - the summary workbook, open for writing
+            caiso_cross_check - the caiso supply plan cross-check workbook,
+                open for writing
+            row_number - the row number on the physicalresources sheet; the
+                resource is written one row lower on the filings sheet
+            organization_id - the load serving entity's organization id
+            resource - a series containing the resource's contract_id,
+                resource_id, capacities, mcc bucket, continuous availability,
+                and flexibility category
+            zone - the resource's zone from the nqc list
+        '''
+        monthly_nqc_formula = '=IFERROR(INDEX(NQC_List!$A:$P,MATCH(INDIRECT(ADDRESS(ROW(),3)),NQC_List!$B:$B,0),MATCH(INDIRECT(ADDRESS(1,COLUMN())),NQC_List!$1:$1,0)),"")'
+        ra_summary['PhysicalResources']['A{}'.format(row_number)] = organization_id
+        ra_summary['PhysicalResources']['B{}'.format(row_number)] = resource.loc['contract_id']
+        ra_summary['PhysicalResources']['C{}'.format(row_number)] = resource.loc['resource_id']
+        ra_summary['PhysicalResources']['D{}'.format(row_number)].value = resource.loc['resource_adequacy_system']
+        ra_summary['PhysicalResources']['E{}'.format(row_number)].value = resource.loc['resource_adequacy_local']
+        ra_summary['PhysicalResources']['F{}'.format(row_number)].value = resource.loc['resource_mcc_bucket']
+        ra_summary['PhysicalResources']['G{}'.format(row_number)].value = resource.loc['continuous_availability']
+        ra_summary['PhysicalResources']['H{}'.format(row_number)].value = resource.loc['resource_adequacy_committed_flexible']
+        ra_summary['PhysicalResources']['I{}'.format(row_number)].value = resource.loc['resource_adequacy_flexibility_category']
+        ra_summary['PhysicalResources']['J{}'.format(row_number)] = '=IFERROR(VLOOKUP(@INDIRECT("C"&ROW()),NQC_List!$B:$D,2,FALSE),"")'
+        ra_summary['PhysicalResources']['K{}'.format(row_number)] = '=IFERROR(VLOOKUP(@INDIRECT("C"&ROW()),NQC_List!$B:$D,3,FALSE),"")'
+        ra_summary['PhysicalResources']['L{}'.format(row_number)] = monthly_nqc_formula
+        ra_summary['PhysicalResources']['M{}'.format(row_number)] = monthly_nqc_formula
+        ra_summary['PhysicalResources']['N{}'.format(row_number)] = monthly_nqc_formula
+        ra_summary['PhysicalResources']['O{}'.format(row_number)] = monthly_nqc_formula
+        ra_summary['PhysicalResources']['P{}'.format(row_number)] = monthly_nqc_formula
+        ra_summary['PhysicalResources']['Q{}'.format(row_number)] = monthly_nqc_formula
+        ra_summary['PhysicalResources']['R{}'.format(row_number)] = monthly_nqc_formula
+        ra_summary['PhysicalResources']['S{}'.format(row_number)] = monthly_nqc_formula
+        ra_summary['PhysicalResources']['T{}'.format(row_number)] = monthly_nqc_formula
+        ra_summary['PhysicalResources']['U{}'.format(row_number)] = monthly_nqc_formula
+        ra_summary['PhysicalResources']['V{}'.format(row_number)] = monthly_nqc_formula
+        ra_summary['PhysicalResources']['W{}'.format(row_number)] = monthly_nqc_formula
+        ra_summary['PhysicalResources']['Y{}'.format(row_number)].font = Font(color='3366FF',bold=True)
+        ra_summary['PhysicalResources']['Z{}'.format(row_number)] = '=IF(COUNTIF(NQC_List!$B:$B,INDIRECT("C"&ROW()))=0,"No Match","")'
+        ra_summary['PhysicalResources']['Z{}'.format(row_number)].font =Font(color='FF0000',bold=True)
+        ra_summary['PhysicalResources']['AA{}'.format(row_number)].font = Font(bold=True)
+        caiso_cross_check['Filings']['A{}'.format(row_number+1)] = organization_id
+        caiso_cross_check['Filings']['B{}'.format(row_number+1)] = resource.loc['contract_id']
+        caiso_cross_check['Filings']['C{}'.format(row_number+1)] = resource.loc['resource_id']
+        caiso_cross_check['Filings']['D{}'.format(row_number+1)] = '=CONCATENATE(INDIRECT("A"&ROW()),INDIRECT("C"&ROW()),INDIRECT("G"&ROW()))'
+        caiso_cross_check['Filings']['E{}'.format(row_number+1)] = '=CONCATENATE(INDIRECT("A"&ROW()),INDIRECT("C"&ROW()))'
+        caiso_cross_check['Filings']['F{}'.format(row_number+1)] = '=CONCATENATE(INDIRECT("A"&ROW()),INDIRECT("C"&ROW()),INDIRECT("M"&ROW()))'
+        caiso_cross_check['Filings']['G{}'.format(row_number+1)].value = resource.loc['resource_adequacy_system']
+        caiso_cross_check['Filings']['H{}'.format(row_number+1)].value = resource.loc['resource_adequacy_local']
+        caiso_cross_check['Filings']['I{}'.format(row_number+1)] = '=SUMIFS($G:$G,$A:$A,INDIRECT("A"&ROW()),$C:$C,INDIRECT("C"&ROW()))'
+        caiso_cross_check['Filings']['J{}'.format(row_number+1)] = '=SUMIFS(CAISO_Sys_SP!$I:$I,CAISO_Sys_SP!$C:$C,INDIRECT("A"&ROW()),CAISO_Sys_SP!$F:$F,INDIRECT("C"&ROW()))'
+        caiso_cross_check['Filings']['K{}'.format(row_number+1)] = '=IF(INDIRECT("J"&ROW())<>INDIRECT("I"&ROW()),"Y: "&INDIRECT("J"&ROW())-INDIRECT("I"&ROW())&" MW","-")'
+        caiso_cross_check['Filings']['L{}'.format(row_number+1)].value = resource.loc['resource_mcc_bucket']
+        caiso_cross_check['Filings']['M{}'.format(row_number+1)].value = resource.loc['resource_adequacy_committed_flexible']
+        caiso_cross_check['Filings']['N{}'.format(row_number+1)] = '=SUMIFS($M:$M,$A:$A,INDIRECT("A"&ROW()),$C:$C,INDIRECT("C"&ROW()))'
+        caiso_cross_check['Filings']['O{}'.format(row_number+1)] = '=SUMIFS(CAISO_Flex_SP!$G:$G,CAISO_Flex_SP!$B:$B,INDIRECT("A"&ROW()),CAISO_Flex_SP!$E:$E,INDIRECT("C"&ROW()))'
+        caiso_cross_check['Filings']['P{}'.format(row_number+1)] = '=IF(INDIRECT("O"&ROW())<>INDIRECT("N"&ROW()),"Y: "&INDIRECT("O"&ROW())-INDIRECT("N"&ROW())&" MW","-")'
+        caiso_cross_check['Filings']['Q{}'.format(row_number+1)].value = resource.loc['resource_adequacy_flexibility_category']
+        caiso_cross_check['Filings']['R{}'.format(row_number+1)].value = zone
+        caiso_cross_check['Filings']['S{}'.format(row_number+1)] = '=IF(NOT(ISBLANK(INDIRECT("G"&ROW()))),IF(ISNA(VLOOKUP(INDIRECT("A"&ROW()),CAISO_Sys_SP!$A:$A,1,FALSE)),"N","-"),"")'
+        caiso_cross_check['Filings']['T{}'.format(row_number+1)] = '=IF(AND(NOT(ISBLANK(INDIRECT("H"&ROW()))),NOT(INDIRECT("H"&ROW())=0)),IF(ISNA(VLOOKUP(INDIRECT("B"&ROW()),CAISO_Sys_SP!$B:$B,1,FALSE)),"N","-"),"")'
+        caiso_cross_check['Filings']['U{}'.format(row_number+1)] = '=IF(NOT(ISBLANK(INDIRECT("M"&ROW()))),IF(ISNA(VLOOKUP(INDIRECT("C"&ROW()),CAISO_Flex_SP!$A:$A,1,FALSE)),"N","-"),"")'
+        for col in 'DEFIJKNOPSTU':
+            caiso_cross_check['Filings']['{}{}'.format(col,row_number+1)].fill = PatternFill(start_color='DDEBF7',end_color='DDEBF7',fill_type='solid')
+        hot_path_counters.count('write_resource_row')
+
+    def write_over_allocation_report(self,resource_allocations:pd.DataFrame):
+        '''
+        saves a report of resources whose combined capacity shown across all
+        load serving entities exceeds the filing month's nqc.
+
+        parameters:
+            resource_allocations - a dataframe produced by
+                get_resource_allocations
+        '''
+        over_allocations = get_over_allocation_report(resource_allocations)
+        if len(over_allocations)>0:
+            self.logger.log('Found {} Resources Shown in Excess of NQC'.format(len(over_allocations)),'WARNING')
+        else:
+            self.logger.log('No Resources Shown in Excess of NQC','INFORMATION')
+        if self.config.get_option('nqc_over_allocation_report_filename') is not None and not self.dry_run:
+            path = self.config.paths.get_path('nqc_over_allocation_report')
+            path.parent.mkdir(parents=True,exist_ok=True)
+            over_allocations.to_csv(path,index=False)
+            self.logger.log('Saved NQC Over-Allocation Report: {}'.format(path.name),'INFORMATION')
+        else:
+            pass
+
+    def write_filing_values(self,ra_summary,caiso_cross_check,resource_table:pd.DataFrame,first_row:int,total_row:int):
+        '''
+        replaces the formulas written by consolidate_filings to the summary
+        and caiso supply plan cross-check workbooks with values calculated
+        from the consolidated filings and allocations.
+
+        parameters:
+            ra_summary - the summary workbook, open for writing
+            caiso_cross_check - the caiso supply plan cross-check workbook,
+                open for writing
+            resource_table - a dataframe produced by get_resource_table
+            first_row - the row number of the first load-serving entity on
+                the summary workbook's lse sheets
+            total_row - the row number of the totals row following the last
+                load-serving entity
+        '''
+        self.logger.log('Writing Calculated Values to Summary and Cross-Check Files','INFORMATION')
+        summary_audit_entries = []
+        cross_check_audit_entries = []
+        last_row = total_row - 1
+        organization_ids = [ra_summary['NP26'][f'A{row_number}'].value for row_number in range(first_row,total_row)]
+
+        # np26 and sp26 zonal sheets, where column m on sp26 holds the filename:
+        np26_inputs = get_column_values(ra_summary['NP26'],['A','B','E','G','K'],first_row,last_row)
+        sp26_inputs = get_column_values(ra_summary['SP26'],['A','B','E','G','K'],first_row,last_row)
+        np26_values = get_zonal_values(np26_inputs,sp26_inputs,resource_table,'North',self.config.get_option('demand_response_multiplier'))
+        sp26_values = get_zonal_values(sp26_inputs,np26_inputs,resource_table,'South',self.config.get_option('demand_response_multiplier'))
+        for sheet_name,values in [['NP26',np26_values],['SP26',sp26_values.drop(columns='M')]]:
+            write_static_values(ra_summary[sheet_name],values,summary_audit_entries)
+            totals = get_column_totals(get_column_values(ra_summary[sheet_name],list('BCDEFGHJK'),first_row,last_row))
+            totals.loc['I'] = totals.loc['C'] + totals.loc['E']
+            write_static_values(ra_summary[sheet_name],pd.DataFrame([totals],index=[total_row]),summary_audit_entries)
+            net_position = pd.DataFrame({'E':[totals.loc['D'] + totals.loc['C'] - totals.loc['B']]},index=[total_row+1])
+            write_static_values(ra_summary[sheet_name],net_position,summary_audit_entries)
+
+        # mcc check sheet, using the obligation from the summary sheet where available:
+        mcc_parameters = [ra_summary['MCC_Parameters'][f'B{row_number}'].value for row_number in range(2,8)]
+        if all(isinstance(parameter,(int,float)) for parameter in mcc_parameters):
+            summary_obligations = {row[0].value : row[1].value for row in get_data_range(ra_summary['Summary'],'A','B',self.config)}
+            mcc_inputs = pd.DataFrame({'A':organization_ids},index=range(first_row,total_row))
+            mcc_inputs.loc[:,'B'] = [
+                summary_obligations[organization_id] if isinstance(summary_obligations.get(organization_id),(int,float)) \
+                else to_number(np26_inputs.loc[[row_number],'B']).sum() + to_number(sp26_inputs.loc[[row_number],'B']).sum()
+                for row_number,organization_id in zip(mcc_inputs.index,organization_ids)
+            ]
+            mcc_values = get_mcc_check_values(mcc_inputs,np26_values,sp26_values,resource_table,mcc_parameters)
+            write_static_values(ra_summary['MCC_Check'],mcc_values,summary_audit_entries)
+            totals = get_column_totals(get_column_values(ra_summary['MCC_Check'],list('BCDEFGHIJKLMNOP'),first_row,last_row))
+            write_static_values(ra_summary['MCC_Check'],pd.DataFrame([totals],index=[total_row]),summary_audit_entries)
+        else:
+            self.logger.log('Unable to Read MCC Parameters as Numbers, Leaving MCC_Check Formulas in Place','WARNING')
+
+        # flexible capacity sheet:
+        flex_inputs = get_column_values(ra_summary['FlexRAR'],list('ALMNQRS'),first_row,last_row)
+        write_static_values(ra_summary['FlexRAR'],get_flex_rar_values(flex_inputs,resource_table),summary_audit_entries)
+        totals = get_column_totals(get_column_values(ra_summary['FlexRAR'],list('BCEFGHIJLMNOQRST'),first_row,last_row))
+        totals.loc['D'] = totals.loc['C'] / totals.loc['B'] if totals.loc['B']!=0 else 0
+        write_static_values(ra_summary['FlexRAR'],pd.DataFrame([totals],index=[total_row]),summary_audit_entries)
+
+        # certifying officers sheet:
+        officer_inputs = get_column_values(ra_summary['CertifyingOfficers'],list('BCDF'),first_row,last_row)
+        write_static_values(ra_summary['CertifyingOfficers'],get_certifying_officer_values(officer_inputs),summary_audit_entries)
+
+        # local true-up sheet:
+        local_trueup_columns = list(map(get_column_letter,range(2,72)))
+        local_inputs = get_column_values(ra_summary['LocalTrueUp'],['A']+local_trueup_columns,first_row,last_row)
+        procurement = get_local_procurement(
+            resource_table,
+            organization_ids,
+            {organization_id : self.config.organizations.get_type(organization_id) for organization_id in organization_ids},
+            {service_territory : self.config.get_option(f'transmission_loss_adder_{service_territory}') for service_territory in ('pge','sce','sdge')}
         )
-        for col in ['AB','AG','AL','AQ','AV','BA','BF','BK','BP','BU','BZ','CE','CJ','CO']:
-            caiso_cross_check['Requirements'].conditional_formatting.add(
-                '{0}{1}:{0}{2}'.format(col,first_row_number_summary+1,row_number_summary),
-                CellIsRule(
-                    operator='lessThan',
-                    formula=[0],
-                    stopIfTrue=False,
-                    fill=PatternFill(start_color='FFC7CE',end_color='FFC7CE',fill_type='solid'),
-                    font=Font(color='9C0006')
-                )
-            )
+        write_static_values(ra_summary['LocalTrueUp'],get_local_trueup_values(local_inputs,procurement),summary_audit_entries)
+        local_trueup = get_column_values(ra_summary['LocalTrueUp'],local_trueup_columns,first_row,last_row)
+        write_static_values(ra_summary['LocalTrueUp'],pd.DataFrame([get_local_trueup_totals(local_trueup)],index=[total_row]),summary_audit_entries)
 
-        # save outputs and add to logs:
-        save_timestamp = ts.now()
-        email_id = '00000000-0000-0000-0000-{}0002'.format(save_timestamp.strftime('%Y%m%d'))
-        if email_id not in self.email_logger.data.loc[:,'email_id'].values:
-            email_information = pd.Series({
-                'email_id' : email_id,
-                'sender' : 'results',
-                'subject' : '',
-                'receipt_date' : save_timestamp,
-                'included' : True,
-                'group' : 'internal',
-            })
-            self.email_logger.log(email_information)
-        attachment_index = len(self.attachment_logger.data.loc[(self.attachment_logger.data.loc[:,'email_id']==email_id),'attachment_id'])
-        attachment_id = '{}0002{:020.0f}'.format(save_timestamp.strftime('%Y%m%d'),attachment_index)
-        archive_path = self.config.paths.get_path('ra_summary')
-        if attachment_id not in self.attachment_logger.data.loc[:,'attachment_id'].values and str(archive_path) not in self.attachment_logger.data.loc[:,'archive_path'].values:
-            attachment_information = pd.Series({
-                'email_id' : email_id,
-                'attachment_id' : attachment_id,
-                'download_path' : '',
-                'ra_category' : 'ra_summary',
-                'organization_id' : 'CPUC',
-                'effective_date' : filing_month,
-                'archive_path' : str(archive_path),
-            })
-            self.attachment_logger.log(attachment_information)
-        ra_summary.save(str(self.config.paths.get_path('ra_summary')))
-        ra_summary.close()
+        # physical resources sheet:
+        write_static_values(ra_summary['PhysicalResources'],get_nqc_lookup_values(resource_table,2,self.config.filing_month),summary_audit_entries)
 
-        attachment_index = len(self.attachment_logger.data.loc[(self.attachment_logger.data.loc[:,'email_id']==email_id),'attachment_id'])
-        attachment_id = '{}0002{:020.0f}'.format(save_timestamp.strftime('%Y%m%d'),attachment_index)
-        archive_path = self.config.paths.get_path('caiso_cross_check')
-        if attachment_id not in self.attachment_logger.data.loc[:,'attachment_id'].values and str(archive_path) not in self.attachment_logger.data.loc[:,'archive_path'].values:
-            attachment_information = pd.Series({
-                'email_id' : email_id,
-                'attachment_id' : attachment_id,
-                'download_path' : '',
-                'ra_category' : 'caiso_cross_check',
-                'organization_id' : 'CPUC',
-                'effective_date' : filing_month,
-                'archive_path' : str(archive_path),
-            })
-            self.attachment_logger.log(attachment_information)
-        self.attachment_logger.commit()
-        self.email_logger.commit()
-        caiso_cross_check.save(str(archive_path))
-        caiso_cross_check.close()
+        # requirements sheet in caiso supply plan cross-check file:
+        requirements_columns = list('BCDMNOPQR') + list(map(get_column_letter,range(24,94)))
+        requirements_inputs = get_column_values(caiso_cross_check['Requirements'],requirements_columns,first_row+1,last_row+1)
+        write_static_values(caiso_cross_check['Requirements'],get_requirements_values(requirements_inputs),cross_check_audit_entries)
 
-        # check time and report:
-        run_time = (ts.now() - init_time).total_seconds()
-        self.logger.log('Consolidated LSE Filings in {:02.0f}:{:02.0f}:{:05.2f}'.format(int(run_time/3600),int((run_time%3600)/60),run_time%60),'INFORMATION')
+        if self.config.get_option('consolidation_audit_sheet'):
+            write_audit_sheet(ra_summary,summary_audit_entries)
+            write_audit_sheet(caiso_cross_check,cross_check_audit_entries)
+        else:
+            pass
 
-    # consolidate caiso supply plans into cross-check file:
-    def consolidate_supply_plans(self):
+    def cross_check_supply_plans(self,caiso_cross_check,supply_plan_system:pd.DataFrame,supply_plan_flexible:pd.DataFrame,metric_cross_check=None):
         '''
-        loads data from caiso supply plan workbooks and populates the caiso
-        cross-check workbooks with data and calculation results.
+        joins the monthly filings written to the caiso supply plan cross-check
+        workbook against the caiso supply plans, writing the matched system
+        and flexible tables to the workbook as values. when the consolidation
+        output mode is 'values', the formulas comparing filings with supply
+        plans are also replaced with calculated values.
+
+        parameters:
+            caiso_cross_check - the caiso supply plan cross-check workbook,
+                open for writing
+            supply_plan_system - a dataframe produced by read_supply_plan for
+                the system supply plan
+            supply_plan_flexible - a dataframe produced by read_supply_plan
+                for the flexible supply plan
+            metric_cross_check - an optional copy of the cross-check workbook
+                from which the consolidation's metrics are saved, to which the
+                calculated values are written in formulas mode
         '''
         # start timer:
         init_time = ts.now()
-        self.logger.log('Copying CAISO Supply Plan into Cross-Check File','INFORMATION')
-
-        supply_plan_system = read_supply_plan(self.config,'supply_plan_system')
-        supply_plan_flexible = read_supply_plan(self.config,'supply_plan_flexible')
-
-        path = self.config.paths.get_path('caiso_cross_check')
-        caiso_cross_check = open_workbook(path,data_only=False,read_only=False)
+        self.logger.log('Matching Filings Against CAISO Supply Plans','INFORMATION')
 
-        # copy supply plan data into cross-check file:
-        row_number = 2
-        for _,row in supply_plan_system.iterrows():
-            caiso_cross_check['CAISO_Sys_SP'][f'A{row_number}'] = '=CONCATENATE(INDIRECT("C"&ROW()),INDIRECT("F"&ROW()),INDIRECT("I"&ROW()))'
-            caiso_cross_check['CAISO_Sys_SP'][f'B{row_number}'] = '=CONCATENATE(INDIRECT("C"&ROW()),INDIRECT("F"&ROW()))'
-            caiso_cross_check['CAISO_Sys_SP'][f'C{row_number}'] = '=VLOOKUP(INDIRECT("N"&ROW()),LoadServingEntities!B:C,2,FALSE)'
-            caiso_cross_check['CAISO_Sys_SP'][f'J{row_number}'] = '=SUMIFS(I:I,C:C,INDIRECT("C"&ROW()),F:F,INDIRECT("F"&ROW()))'
-            caiso_cross_check['CAISO_Sys_SP'][f'K{row_number}'] = '=SUMIFS(G:G,C:C,INDIRECT("C"&ROW()),F:F,INDIRECT("F"&ROW()))'
-            caiso_cross_check['CAISO_Sys_SP'][f'P{row_number}'] = '=IF(ISNA(VLOOKUP(INDIRECT("A"&ROW()),Filings!D:D,1,FALSE)),"N","-")'
-            for column_letter in 'ABCJKP':
-                caiso_cross_check['CAISO_Sys_SP'][f'{column_letter}{row_number}'].fill = PatternFill(start_color='DDEBF7',end_color='DDEBF7',fill_type='solid')
-            for column_index,column in enumerate(supply_plan_system.columns):
-                caiso_cross_check['CAISO_Sys_SP']['{}{}'.format('DEFGHILMNO'[column_index],row_number)].value = row.loc[column]
-            row_number += 1
+        # read filings and load-serving entity lookup tables written to the cross-check file:
+        filings = get_column_values(caiso_cross_check['Filings'],list(cross_check_filing_columns.keys()),3,max(caiso_cross_check['Filings'].max_row,3))
+        filings = filings.loc[filings.loc[:,'A'].notna(),:]
+        load_serving_entities_table = get_column_values(caiso_cross_check['LoadServingEntities'],['B','C'],2,max(caiso_cross_check['LoadServingEntities'].max_row,2))
+        load_serving_entities = {}
+        for caiso_id,organization_id in zip(load_serving_entities_table.loc[:,'B'],load_serving_entities_table.loc[:,'C']):
+            if caiso_id is not None and str(caiso_id).upper() not in load_serving_entities.keys():
+                load_serving_entities[str(caiso_id).upper()] = organization_id
+            else:
+                pass
+        supply_plan_system = map_load_serving_entities(supply_plan_system.set_index(supply_plan_system.index+2),load_serving_entities)
+        supply_plan_flexible = map_load_serving_entities(supply_plan_flexible.set_index(supply_plan_flexible.index+2),load_serving_entities)
+        unmapped_count = supply_plan_system.loc[:,'organization_id'].isna().sum() + supply_plan_flexible.loc[:,'organization_id'].isna().sum()
+        if unmapped_count>0:
+            self.logger.log('Unable to Identify Load Serving Entity for {} CAISO Supply Plan Rows'.format(unmapped_count),'WARNING')
+        else:
+            pass
 
-        # copy supply plan data into cross-check file:
-        row_number = 2
-        for _,row in supply_plan_flexible.iterrows():
-            caiso_cross_check['CAISO_Flex_SP'][f'A{row_number}'] = '=CONCATENATE(INDIRECT("B"&ROW()),INDIRECT("E"&ROW()),INDIRECT("G"&ROW()))'
-            caiso_cross_check['CAISO_Flex_SP'][f'B{row_number}'] = '=VLOOKUP(INDIRECT("K"&ROW()),LoadServingEntities!B:C,2,FALSE)'
-            caiso_cross_check['CAISO_Flex_SP'][f'H{row_number}'] = '=SUMIFS(G:G,B:B,INDIRECT("B"&ROW()),E:E,INDIRECT("E"&ROW()),F:F,INDIRECT("F"&ROW()))'
-            caiso_cross_check['CAISO_Flex_SP'][f'M{row_number}'] = '=IF(ISNA(VLOOKUP(INDIRECT("A"&ROW()),Filings!F:F,1,FALSE)),"N","-")'
-            for column_letter in 'ABHM':
-                caiso_cross_check['CAISO_Flex_SP'][f'{column_letter}{row_number}'].fill = PatternFill(start_color='DDEBF7',end_color='DDEBF7',fill_type='solid')
-            for column_index,column in enumerate(supply_plan_flexible.columns):
-                caiso_cross_check['CAISO_Flex_SP']['{}{}'.format('CDEFGIJKL'[column_index],row_number)].value = row.loc[column]
-            row_number += 1
+        # join filings and supply plans and write matched tables:
+        (system_matches,flexible_matches) = get_supply_plan_matches(filings.rename(columns=cross_check_filing_columns),supply_plan_system,supply_plan_flexible)
+        write_match_sheet(caiso_cross_check,'SystemMatch',system_matches)
+        write_match_sheet(caiso_cross_check,'FlexibleMatch',flexible_matches)
+        for match_type,matches in [['System',system_matches],['Flexible',flexible_matches]]:
+            status_counts = matches.loc[:,'status'].value_counts()
+            for status in ('Missing in Supply Plan','Missing in Filing'):
+                if status_counts.get(status,0)>0:
+                    self.logger.log('{} {} Resources {}'.format(status_counts.get(status),match_type,status),'WARNING')
+                else:
+                    pass
 
-        # save and close:
-        caiso_cross_check.save(str(self.config.paths.get_path('caiso_cross_check')))
-        caiso_cross_check.close()
+        # replace formulas with calculated values:
+        static_values = self.config.get_option('consolidation_output_mode')=='values' or self.dry_run
+        if static_values or metric_cross_check is not None:
+            audit_entries = []
+            organization_ids = []
+            for row_number in range(2,caiso_cross_check['FilingSummary'].max_row+1):
+                organization_id = caiso_cross_check['FilingSummary'][f'A{row_number}'].value
+                if organization_id is None:
+                    break
+                else:
+                    organization_ids.append(organization_id)
+            (filings_values,system_values,flexible_values,filing_summary_values) = get_supply_plan_values(
+                filings,
+                supply_plan_system,
+                supply_plan_flexible,
+                system_matches,
+                flexible_matches,
+                organization_ids
+            )
+            if static_values:
+                write_static_values(caiso_cross_check['Filings'],filings_values,audit_entries)
+                write_static_values(caiso_cross_check['CAISO_Sys_SP'],system_values,audit_entries,supply_plan_sheet_formulas['CAISO_Sys_SP'])
+                write_static_values(caiso_cross_check['CAISO_Flex_SP'],flexible_values,audit_entries,supply_plan_sheet_formulas['CAISO_Flex_SP'])
+                write_static_values(caiso_cross_check['FilingSummary'],filing_summary_values,audit_entries)
+                if self.config.get_option('consolidation_audit_sheet'):
+                    write_audit_sheet(caiso_cross_check,audit_entries)
+                else:
+                    pass
+            else:
+                # only the filing summary sheet is compared between consolidations:
+                write_static_values(metric_cross_check['FilingSummary'],filing_summary_values,[])
+        else:
+            pass
 
         # check time and report:
         run_time = (ts.now() - init_time).total_seconds()
-        self.logger.log('Copied CAISO Supply Plan to Cross-Check File in {:02.0f}:{:02.0f}:{:05.2f}'.format(int(run_time/3600),int((run_time%3600)/60),run_time%60),'INFORMATION')
+        self.logger.log('Matched Filings Against CAISO Supply Plans in {:02.0f}:{:02.0f}:{:05.2f}'.format(int(run_time/3600),int((run_time%3600)/60),run_time%60),'INFORMATION')
 
     def check_files(self):
         '''
@@ -1328,83 +2497,7 @@ class WorkbookConsolidator:
         '''
         filing_month = self.config.filing_month
         self.attachment_logger.load_log()
-        def set_file_status(ra_category,organization_id):
-            attachments = self.attachment_logger.data
-            if ra_category in ('ra_monthly_filing','supply_plan_system','supply_plan_flexible','cam_rmr'):
-                effective_date = pd.to_datetime(filing_month).to_numpy().astype('datetime64[M]')
-            elif ra_category=='cam_rmr_update':
-                effective_date = pd.to_datetime(filing_month).replace(month=6).to_numpy().astype('datetime64[M]')
-            elif ra_category=='incremental_local':
-                effective_date = pd.to_datetime(filing_month).replace(month=7).to_numpy().astype('datetime64[M]')
-            else:
-                effective_date = pd.to_datetime(filing_month).replace(month=1).to_numpy().astype('datetime64[M]')
-            file_information = pd.Series({
-                'filing_month' : filing_month,
-                'ra_category' : ra_category,
-                'effective_date' : effective_date,
-                'organization_id' : organization_id,
-                'attachment_id' : '',
-                'archive_path' : '',
-                'status' : '',
-                'compliance' : '' if ra_category=='ra_monthly_filing' else 'n/a',
-            })
-            versions = attachments.loc[
-                (attachments.loc[:,'ra_category']==ra_category) & \
-                (attachments.loc[:,'effective_date']==effective_date) & \
-                (attachments.loc[:,'organization_id']==organization_id), \
-                ['email_id','attachment_id','archive_path']
-            ].merge(self.email_logger.data.loc[:,['email_id','receipt_date']],on='email_id')
-            versions.sort_values('receipt_date',ascending=True,inplace=True)
-            if len(versions)>0 and Path(versions.iloc[0].loc['archive_path']).is_file():
-                receipt_date = versions.iloc[0].loc['receipt_date']
-                receipt_date = receipt_date.tz_localize(tz='UTC').tz_convert('US/Pacific').tz_localize(None)
-                versions.sort_values('receipt_date',ascending=False,inplace=True)
-                if ra_category=='ra_monthly_filing' and receipt_date>self.config.get_filing_due_date(filing_month):
-                    file_information.loc['attachment_id'] = versions.iloc[0].loc['attachment_id']
-                    file_information.loc['archive_path'] = versions.iloc[0].loc['archive_path']
-                    file_information.loc['status'] = 'Late'
-                else:
-                    file_information.loc['attachment_id'] = versions.iloc[0].loc['attachment_id']
-                    file_information.loc['archive_path'] = versions.iloc[0].loc['archive_path']
-                    file_information.loc['status'] = 'Ready'
-            elif ra_category=='incremental_local' and filing_month.month<=6:
-                file_information.loc['attachment_id'] = ''
-                file_information.loc['archive_path'] = ''
-                file_information.loc['status'] = 'Not Required'
-            elif ra_category=='cam_rmr' and filing_month.year>=2024:
-                file_information.loc['attachment_id'] = ''
-                file_information.loc['archive_path'] = ''
-                file_information.loc['status'] = 'Not Required'
-            elif ra_category=='ra_monthly_filing':
-                if len(versions)>0:
-                    file_information.loc['attachment_id'] = versions.iloc[0].loc['attachment_id']
-                    file_information.loc['archive_path'] = ''
-                    file_information.loc['status'] = 'Invalid File'
-                else:
-                    file_information.loc['attachment_id'] = ''
-                    file_information.loc['archive_path'] = ''
-                    file_information.loc['status'] = 'File Not Submitted'
-            elif self.config.paths.get_path(ra_category) is not None:
-                if self.config.paths.get_path(ra_category).is_file():
-                    file_information.loc['attachment_id'] = versions.iloc[0].loc['attachment_id']
-                    file_information.loc['archive_path'] = str(self.config.paths.get_path(ra_category))
-                    file_information.loc['status'] = 'Ready'
-                else:
-                    file_information.loc['attachment_id'] = ''
-                    file_information.loc['archive_path'] = ''
-                    file_information.loc['status'] = 'File Not Found'
-            else:
-                file_information.loc['attachment_id'] = ''
-                file_information.loc['archive_path'] = ''
-                file_information.loc['status'] = 'File Not Found'
-            # overwrite previous entries for a given file:
-            check_columns = ['ra_category','effective_date','organization_id']
-            previous_log_indices = (self.consolidation_logger.data.loc[:,check_columns]==file_information.loc[check_columns]).apply(all,axis='columns',result_type='reduce')
-            if previous_log_indices.sum()>0:
-                self.consolidation_logger.data.drop(index=self.consolidation_logger.data.loc[previous_log_indices,:].index,inplace=True)
-            else:
-                pass
-            self.consolidation_logger.log(file_information)
+
         # get list of current lses from summary template file:
         path = self.config.paths.get_path('ra_summary_template')
         ra_summary = open_workbook(path,data_only=True,read_only=True)
@@ -1421,9 +2514,242 @@ class WorkbookConsolidator:
             'supply_plan_flexible'
         ] + ['ra_monthly_filing'] * len(active_lses)
         organization_ids = ['CEC','CEC','CEC','CPUC','CPUC','CPUC','CAISO','CAISO'] + active_lses
-        # get list of active load serving entities from summary sheet:
-        for ra_category,organization_id in zip(ra_categories,organization_ids):
-            set_file_status(ra_category,organization_id)
+
+        # table of expected files with the effective date of each:
+        month_start = pd.to_datetime(filing_month).to_period('M').to_timestamp()
+        def get_effective_date(ra_category):
+            if ra_category in ('ra_monthly_filing','supply_plan_system','supply_plan_flexible','cam_rmr'):
+                effective_date = month_start
+            elif ra_category=='cam_rmr_update':
+                effective_date = month_start.replace(month=6)
+            elif ra_category=='incremental_local':
+                effective_date = month_start.replace(month=7)
+            else:
+                effective_date = month_start.replace(month=1)
+            return effective_date
+        check_columns = ['ra_category','effective_date','organization_id']
+        files = pd.DataFrame({
+            'filing_month' : filing_month,
+            'ra_category' : ra_categories,
+            'effective_date' : pd.to_datetime([get_effective_date(ra_category) for ra_category in ra_categories]).astype('datetime64[ns]'),
+            'organization_id' : organization_ids,
+        })
+
+        # index the attachment log on the expected files once, attaching receipt dates from the email log:
+        attachments = self.attachment_logger.data.loc[:,check_columns+['email_id','attachment_id','archive_path']]
+        attachments = attachments.assign(effective_date=pd.to_datetime(attachments.loc[:,'effective_date']).astype('datetime64[ns]'))
+        expected_keys = pd.MultiIndex.from_frame(files.loc[:,check_columns])
+        versions = attachments.loc[pd.MultiIndex.from_frame(attachments.loc[:,check_columns]).isin(expected_keys),:]
+        versions = versions.merge(self.email_logger.data.loc[:,['email_id','receipt_date']],on='email_id')
+        versions = versions.sort_values('receipt_date',ascending=True,kind='mergesort')
+        first_versions = versions.drop_duplicates(check_columns,keep='first').loc[:,check_columns+['attachment_id','archive_path','receipt_date']]
+        last_versions = versions.drop_duplicates(check_columns,keep='last').loc[:,check_columns+['attachment_id','archive_path']]
+        files = files.merge(
+            first_versions.rename(columns={'attachment_id':'first_attachment_id','archive_path':'first_archive_path'}),
+            how='left',
+            on=check_columns
+        ).merge(
+            last_versions.rename(columns={'attachment_id':'last_attachment_id','archive_path':'last_archive_path'}),
+            how='left',
+            on=check_columns
+        )
+
+        # resolve the status of all files in a single pass:
+        has_versions = files.loc[:,'first_archive_path'].notna()
+        first_version_found = files.loc[:,'first_archive_path'].map(lambda archive_path: pd.notna(archive_path) and Path(archive_path).is_file()).astype(bool)
+        receipt_dates = pd.to_datetime(files.loc[:,'receipt_date']).dt.tz_localize(tz='UTC').dt.tz_convert('US/Pacific').dt.tz_localize(None)
+        is_filing = files.loc[:,'ra_category']=='ra_monthly_filing'
+        late = is_filing & (receipt_dates>self.config.get_filing_due_date(filing_month))
+        configured_paths = {
+            ra_category : self.config.paths.get_path(ra_category) for ra_category in set(ra_categories) if ra_category!='ra_monthly_filing'
+        }
+        configured_path_found = files.loc[:,'ra_category'].map(
+            lambda ra_category: configured_paths.get(ra_category) is not None and configured_paths[ra_category].is_file()
+        ).astype(bool)
+        first_attachment_ids = files.loc[:,'first_attachment_id'].fillna('').astype(str)
+        last_attachment_ids = files.loc[:,'last_attachment_id'].fillna('').astype(str)
+        last_archive_paths = files.loc[:,'last_archive_path'].fillna('').astype(str)
+        conditions = [
+            first_version_found & late,
+            first_version_found,
+            (files.loc[:,'ra_category']=='incremental_local') & (filing_month.month<=6),
+            (files.loc[:,'ra_category']=='cam_rmr') & (filing_month.year>=2024),
+            is_filing & has_versions,
+            is_filing,
+            configured_path_found,
+        ]
+        files = files.assign(
+            status=np.select(conditions,['Late','Ready','Not Required','Not Required','Invalid File','File Not Submitted','Ready'],'File Not Found'),
+            attachment_id=np.select(conditions,[last_attachment_ids,last_attachment_ids,'','',first_attachment_ids,'',first_attachment_ids],''),
+            archive_path=np.select(
+                conditions,
+                [last_archive_paths,last_archive_paths,'','','','',files.loc[:,'ra_category'].map(lambda ra_category: str(configured_paths.get(ra_category)))],
+                ''
+            ),
+            compliance=np.where(is_filing,'','n/a'),
+        )
+        # fingerprint each file to detect revisions between runs:
+        files = files.assign(file_hash=files.loc[:,'archive_path'].map(
+            lambda archive_path: get_file_hash(archive_path) if archive_path!='' and Path(archive_path).is_file() else ''
+        ))
+
+        # overwrite previous entries for each file:
+        logged_keys = self.consolidation_logger.data.loc[:,check_columns]
+        logged_keys = logged_keys.assign(effective_date=pd.to_datetime(logged_keys.loc[:,'effective_date']).astype('datetime64[ns]'))
+        previous_log_indices = pd.MultiIndex.from_frame(logged_keys).isin(expected_keys)
+        self.consolidation_logger.data = self.consolidation_logger.data.loc[~previous_log_indices,:]
+        self.consolidation_logger.log_batch(files.loc[:,['filing_month']+check_columns+['attachment_id','archive_path','status','compliance','file_hash']])
+        self.timer.count(rows=len(files))
+
         ready =  all([s in ('Ready','Late','Not Required') for s in self.consolidation_logger.data.loc[(self.consolidation_logger.data.loc[:,'ra_category']!='ra_monthly_filing'),'status']])
-        self.consolidation_logger.commit()
-        return ready
\ No newline at end of file
+        if not self.dry_run:
+            self.consolidation_logger.commit()
+        else:
+            pass
+        return ready
+
+def save_csv(table:pd.DataFrame,path:Path):
+    '''
+    saves a dataframe to a csv file by writing a temporary file alongside it
+    and replacing the original, so that other processes never read a
+    partially written file.
+
+    parameters:
+        table - the dataframe to save, without its index
+        path - path object pointing to the csv file
+    '''
+    path.parent.mkdir(parents=True,exist_ok=True)
+    temporary_path = path.with_name(path.name+'.tmp')
+    table.to_csv(temporary_path,index=False)
+    temporary_path.replace(path)
+
+def read_shared_input_tables(configuration_path:Path,filing_month:ts,path_id:str):
+    '''
+    opens an input workbook and returns its tables, as run in a worker process
+    by WorkbookConsolidator.read_shared_inputs.
+
+    parameters:
+        configuration_path - path object pointing to a yaml file containing
+            configuration options
+        filing_month - the filing month being consolidated
+        path_id - a path id accepted by WorkbookConsolidator.read_shared_input
+    '''
+    config = ConfigurationOptions(configuration_path,filing_month=filing_month)
+    (read_tables,open_options) = WorkbookConsolidator.shared_input_readers[path_id]
+    workbook = open_workbook(config.paths.get_path(path_id),**open_options)
+    tables = read_tables(workbook,config)
+    workbook.close()
+    return tables
+
+def consolidate_month(configuration_path:Path,filing_month:ts,shared_inputs:dict=None):
+    '''
+    checks files and consolidates allocations, filings, and supply plans for a
+    single filing month, as one of a batch of months run in parallel
+    processes. results are recorded in the month's own log files, while the
+    email and attachment logs shared between months are left to the calling
+    process. returns true if the consolidation completed.
+
+    parameters:
+        configuration_path - path object pointing to a yaml file containing
+            configuration options
+        filing_month - the filing month to consolidate
+        shared_inputs - an optional dictionary of tables read from year-scoped
+            input files by WorkbookConsolidator.read_shared_input and of
+            allocation cubes from WorkbookConsolidator.get_allocation_cube
+    '''
+    cons = WorkbookConsolidator(configuration_path,filing_month=filing_month)
+    if shared_inputs is not None:
+        cons.shared_inputs = shared_inputs
+    else:
+        pass
+    cons.defer_result_logging = True
+    cons.consolidation_logger.clear_log()
+    cons.consolidation_logger.commit()
+    with cons.timer.span('consolidate'):
+        with cons.timer.span('check_files'):
+            ready = cons.check_files()
+        if ready:
+            cons.consolidate_stages()
+            completed = True
+        else:
+            missing_files = (cons.consolidation_logger.data.loc[:,'ra_category']!='ra_monthly_filing') & \
+                (cons.consolidation_logger.data.loc[:,'status']=='File Not Found')
+            missing_ra_categories = ', '.join(cons.consolidation_logger.data.loc[missing_files,'ra_category'])
+            cons.logger.log('Files Not Ready for Consolidation: {}'.format(missing_ra_categories),'ERROR')
+            completed = False
+    return completed
+
+def consolidate_months(configuration_path:Path,filing_months:list,processes:int=None):
+    '''
+    consolidates a batch of filing months within a single year, reading the
+    year-scoped year ahead, month ahead, cam-rmr update, incremental local, and
+    nqc list files once and running each month's consolidation in a separate
+    process with its own output files and logs. the allocation cube for the
+    year is calculated and saved once, before the months are consolidated.
+    returns a dictionary of whether each month's consolidation completed.
+
+    parameters:
+        configuration_path - path object pointing to a yaml file containing
+            configuration options for the year
+        filing_months - a list of filing month timestamps within one year
+        processes - the maximum number of worker processes, defaulting to
+            the number of processors
+    '''
+    # start timer:
+    init_time = ts.now()
+    filing_months = sorted(filing_months)
+    cons = WorkbookConsolidator(configuration_path,filing_month=filing_months[0])
+    cons.logger.log('Consolidating {} Filing Months: {} to {}'.format(len(filing_months),filing_months[0].strftime('%Y-%m'),filing_months[-1].strftime('%Y-%m')),'INFORMATION')
+
+    # read year-scoped inputs once for all months:
+    path_ids = ['year_ahead','month_ahead','nqc_list']
+    if filing_months[-1].month>=6:
+        path_ids.append('cam_rmr_update')
+    else:
+        pass
+    if filing_months[-1].month>=7:
+        path_ids.append('incremental_local')
+    else:
+        pass
+    cons.read_shared_inputs(path_ids)
+    for path_id in path_ids:
+        try:
+            cons.read_shared_input(path_id)
+        except:
+            cons.logger.log('Unable to Read Shared Input {}, Leaving to Each Filing Month'.format(path_id),'WARNING')
+
+    # calculate and save the allocation cube once, rather than in each month's process:
+    if filing_months[0].year>=2024:
+        try:
+            ra_summary = open_workbook(cons.config.paths.get_path('ra_summary_template'),data_only=True,read_only=True)
+            data_range = get_data_range(ra_summary['Summary'],'A','',cons.config)
+            summary = data_range_to_dataframe(['organization_id'],data_range)
+            ra_summary.close()
+            cons.get_allocation_cube(list(summary.loc[:,'organization_id']))
+        except:
+            cons.logger.log('Unable to Calculate Allocation Cube, Leaving to Each Filing Month','WARNING')
+    else:
+        pass
+
+    # consolidate each month in a separate process:
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = {filing_month : executor.submit(consolidate_month,configuration_path,filing_month,cons.shared_inputs) for filing_month in filing_months}
+        completed = {}
+        for filing_month,future in futures.items():
+            try:
+                completed[filing_month] = future.result()
+            except Exception as e:
+                cons.logger.log('Unable to Consolidate {}: {}'.format(filing_month.strftime('%Y-%m'),e),'ERROR')
+                completed[filing_month] = False
+
+    # add results to the shared email and attachment logs one month at a time:
+    for filing_month in filing_months:
+        if completed[filing_month]:
+            WorkbookConsolidator(configuration_path,filing_month=filing_month).log_results()
+        else:
+            pass
+
+    # check time and report:
+    run_time = (ts.now() - init_time).total_seconds()
+    cons.logger.log('Consolidated {} of {} Filing Months in {:02.0f}:{:02.0f}:{:05.2f}'.format(sum(completed.values()),len(filing_months),int(run_time/3600),int((run_time%3600)/60),run_time%60),'INFORMATION')
+    return completed
\ No newline at end of file
@@ -1,8 +1,12 @@
 import sys
+import queue
+import threading
 from pathlib import Path
 from pandas import Timestamp as ts,Timedelta as td
 
 from ra_consolidator import WorkbookConsolidator
+from configuration_options import ConfigurationOptions
+from ra_logging import TimingLogger
 from login import kw_user,kw_api_client
 from ra_organizer import Organizer
 from export_to_ezdb import DataExporter
@@ -12,13 +16,37 @@ from export_to_ezdb import DataExporter
 # Robert Hansen, PE
 
 # download and organize resource adequacy monthly/annual reports
-def ra_filings(configuration_options_path:Path,download:bool=False,organize:bool=False,consolidate:bool=False,notify:bool=False,export:bool=False,filing_month:ts=None):
+def ra_filings(configuration_options_path:Path,download:bool=False,organize:bool=False,consolidate:bool=False,notify:bool=False,export:bool=False,filing_month:ts=None,incremental:bool=False,dry_run:bool=False,snapshot:str=None,save_snapshot:str=None,profile:bool=False,watch:bool=False):
     '''
     this function is the primary means of interacting with the resource
     adequacy monthly filing compliance tool. It can be run as a scheduled task
-    on a daily basis.
+    on a daily basis. if incremental is true, consolidation patches the
+    previously consolidated files with revised monthly filings where possible
+    rather than rebuilding them. if dry_run is true, consolidation is
+    performed in memory without saving any files other than a report of
+    differences from the previous consolidation, or from the named snapshot
+    if one is given. if save_snapshot is given, the consolidation's results
+    are saved as a snapshot under that name. the wall time and throughput of
+    each stage are recorded in a run manifest alongside the log file. if
+    profile is true, each stage is also profiled, with profile statistics and
+    a summary of the most expensive functions saved in the log directory. if
+    watch is true, the download directories are then watched for manually
+    placed files, which are organized as they arrive until interrupted.
     '''
     starttime = ts.now().strftime('%Y-%m-%d %H:%M:%S')
+    config = ConfigurationOptions(configuration_options_path,filing_month=filing_month)
+    timer = TimingLogger(
+        config.paths.get_path('run_manifest'),
+        config.paths.get_path('run_metrics') if config.get_option('run_metrics_filename') is not None else None,
+        {'filing_month':config.filing_month.strftime('%Y-%m')},
+        config.get_option('trace_memory'),
+        config.get_option('count_hot_paths')
+    )
+    if profile:
+        timer.profile_directory = config.paths.get_path('log').parent
+        timer.profile_top_functions = config.get_option('profile_top_functions')
+    else:
+        pass
     starttime_logged = False
     # cleared_log = False
 
@@ -26,11 +54,13 @@ def ra_filings(configuration_options_path:Path,download:bool=False,organize:bool
     if download or notify:
         from kiteworks_api_downloader import AttachmentDownloader
         kw = AttachmentDownloader(configuration_options_path=configuration_options_path,user=kw_user,api_client=kw_api_client,filing_month=filing_month)
+        kw.timer = timer
         # kw.logger.clear_log()
         kw.logger.log('AUTOMATION STARTED AT {}'.format(starttime),'INFORMATION')
         starttime_logged = True
         if download:
-            kw.download_current_month()
+            with timer.span('download'):
+                kw.download_current_month()
         else:
             pass
     else:
@@ -38,51 +68,72 @@ def ra_filings(configuration_options_path:Path,download:bool=False,organize:bool
 
     # organize downloaded attachments into final report directory:
     org = Organizer(configuration_options_path,filing_month=filing_month)
+    org.timer = timer
     if organize:
         # if not cleared_log:
         #     org.logger.clear_log
         if not starttime_logged:
             org.logger.log('AUTOMATION STARTED AT {}'.format(starttime),'INFORMATION')
             starttime_logged = True
-        org.organize()
+        with timer.span('organize'):
+            org.organize()
     else:
         pass
 
     # consolidate data from filings and requirement tables:
     if consolidate:
         cons = WorkbookConsolidator(configuration_options_path,filing_month=filing_month)
+        cons.timer = timer
         # if not cleared_log:
         #     cons.logger.clear_log()
         if not starttime_logged:
             cons.logger.log('AUTOMATION STARTED AT {}'.format(starttime),'INFORMATION')
             starttime_logged = True
-        cons.consolidation_logger.clear_log()
-        cons.consolidation_logger.commit()
-        ready = cons.check_files()
-        if ready:
-            missing_filings = (cons.consolidation_logger.data.loc[:,'ra_category']=='ra_monthly_filing') & \
-                (
-                    (cons.consolidation_logger.data.loc[:,'status']=='Invalid File') | \
-                    (cons.consolidation_logger.data.loc[:,'status']=='File Not Submitted') | \
+        with timer.span('consolidate'):
+            previous_consolidation_log = cons.consolidation_logger.data.copy()
+            cons.consolidation_logger.clear_log()
+            cons.consolidation_logger.commit()
+            with timer.span('check_files'):
+                ready = cons.check_files()
+            if ready:
+                missing_filings = (cons.consolidation_logger.data.loc[:,'ra_category']=='ra_monthly_filing') & \
+                    (
+                        (cons.consolidation_logger.data.loc[:,'status']=='Invalid File') | \
+                        (cons.consolidation_logger.data.loc[:,'status']=='File Not Submitted') | \
+                        (cons.consolidation_logger.data.loc[:,'status']=='File Not Found')
+                    )
+                missing_lses = ', '.join(cons.consolidation_logger.data.loc[missing_filings,'organization_id'])
+                if missing_filings.sum()>1:
+                    cons.logger.log('{} Monthly Filings Are Not Available for Consolidation: {}'.format(missing_filings.sum(),missing_lses),'WARNING')
+                elif missing_filings.sum()>0:
+                    cons.logger.log('{} Monthly Filing is Not Available for Consolidation: {}'.format(missing_filings.sum(),missing_lses),'WARNING')
+                if incremental and cons.consolidate_revised_filings(previous_consolidation_log):
+                    pass
+                else:
+                    cons.consolidate_stages()
+                completed = True
+            else:
+                missing_files = (cons.consolidation_logger.data.loc[:,'ra_category']!='ra_monthly_filing') & \
                     (cons.consolidation_logger.data.loc[:,'status']=='File Not Found')
-                )
-            missing_lses = ', '.join(cons.consolidation_logger.data.loc[missing_filings,'organization_id'])
-            if missing_filings.sum()>1:
-                cons.logger.log('{} Monthly Filings Are Not Available for Consolidation: {}'.format(missing_filings.sum(),missing_lses),'WARNING')
-            elif missing_filings.sum()>0:
-                cons.logger.log('{} Monthly Filing is Not Available for Consolidation: {}'.format(missing_filings.sum(),missing_lses),'WARNING')
-            cons.initialize_ra_summary()
-            cons.initialize_caiso_cross_check()
-            cons.consolidate_allocations()
-            cons.consolidate_filings()
-            cons.consolidate_supply_plans()
-            completed = True
-        else:
-            missing_files = (cons.consolidation_logger.data.loc[:,'ra_category']!='ra_monthly_filing') & \
-                (cons.consolidation_logger.data.loc[:,'status']=='File Not Found')
-            missing_ra_categories = ', '.join(cons.consolidation_logger.data.loc[missing_files,'ra_category'])
-            cons.logger.log('Files Not Ready for Consolidation: {}'.format(missing_ra_categories),'ERROR')
-            completed = False
+                missing_ra_categories = ', '.join(cons.consolidation_logger.data.loc[missing_files,'ra_category'])
+                cons.logger.log('Files Not Ready for Consolidation: {}'.format(missing_ra_categories),'ERROR')
+                completed = False
+            if completed and save_snapshot is not None:
+                cons.save_consolidation_snapshot(save_snapshot)
+            else:
+                pass
+    else:
+        pass
+
+    # consolidate in memory and compare with previous results:
+    if dry_run:
+        cons = WorkbookConsolidator(configuration_options_path,filing_month=filing_month)
+        cons.timer = timer
+        if not starttime_logged:
+            cons.logger.log('AUTOMATION STARTED AT {}'.format(starttime),'INFORMATION')
+            starttime_logged = True
+        with timer.span('dry_run'):
+            cons.dry_run_consolidation(snapshot_name=snapshot,save_snapshot_name=save_snapshot)
     else:
         pass
 
@@ -93,28 +144,182 @@ def ra_filings(configuration_options_path:Path,download:bool=False,organize:bool
         if not starttime_logged:
             org.logger.log('AUTOMATION STARTED AT {}'.format(starttime),'INFORMATION')
             starttime_logged = True
-        org.compress_archive()
+        with timer.span('compress_archive'):
+            org.compress_archive()
         if consolidate and notify:
-            kw.send_results(completed)
+            with timer.span('notify'):
+                kw.send_results(completed)
     else:
         pass
 
     # export input data and results for upload to ezdb:
     if export:
         de = DataExporter(configuration_options_path,filing_month=filing_month)
+        de.timer = timer
         if not starttime_logged:
             de.logger.log('AUTOMATION STARTED AT {}'.format(starttime),'INFORMATION')
             starttime_logged = True
-        de.write_all()
-        de.update_master_lookup_table()
+        with timer.span('export'):
+            de.write_all()
+            de.update_master_lookup_table()
+    else:
+        pass
+
+    # organize manually placed files as they arrive:
+    if watch:
+        if not starttime_logged:
+            org.logger.log('AUTOMATION STARTED AT {}'.format(starttime),'INFORMATION')
+            starttime_logged = True
+        org.watch()
     else:
         pass
 
+# download, organize, and consolidate resource adequacy filings as they arrive:
+def ra_filings_pipeline(configuration_options_path:Path,filing_month:ts=None,poll_interval:float=None,max_polls:int=None):
+    '''
+    runs the download, organize, and consolidate stages as a long-running
+    pipeline rather than as scheduled batch steps. kiteworks is checked for
+    new attachments every poll_interval seconds in a separate thread, and each
+    downloaded attachment is added to a work queue. attachments on the queue
+    are validated and copied to the archive while other downloads are still
+    in flight, with any attachments downloaded in the meantime organized
+    together in the next batch. once the attachments from a check have all
+    been organized, the files required for consolidation are checked without
+    saving the consolidation log, and if they are ready, the filing month is
+    consolidated incrementally and the results archive is updated. errors in
+    downloading, organizing, or consolidating are logged, and the pipeline
+    continues with the next attachments or check. the pipeline runs until
+    interrupted or until the given number of polls is reached.
+
+    parameters:
+        configuration_options_path - path pointing to the resource adequacy
+            configuration options yaml file
+        filing_month - an optional filing month timestamp to overwrite the
+            date in the configuration options yaml file
+        poll_interval - seconds between checks for new emails; if not
+            provided, the pipeline_poll_interval option is used
+        max_polls - an optional number of checks after which to stop
+    '''
+    from kiteworks_api_downloader import AttachmentDownloader
+    starttime = ts.now().strftime('%Y-%m-%d %H:%M:%S')
+    kw = AttachmentDownloader(configuration_options_path=configuration_options_path,user=kw_user,api_client=kw_api_client,filing_month=filing_month)
+    org = Organizer(configuration_options_path,filing_month=filing_month)
+    # share the downloader's logs, so that only one copy is saved:
+    org.email_logger = kw.email_logger
+    org.attachment_logger = kw.attachment_logger
+    # record the downloader thread's spans in a manifest of their own, since
+    # the organizer's timer saves its manifest from the main thread:
+    manifest_path = kw.timer.manifest_path
+    kw.timer.manifest_path = manifest_path.with_name(manifest_path.stem+'_download'+manifest_path.suffix)
+    kw.timer.metrics_path = None
+    if poll_interval is None:
+        poll_interval = org.config.get_option('pipeline_poll_interval')
+    else:
+        pass
+    org.logger.log('AUTOMATION STARTED AT {}'.format(starttime),'INFORMATION')
+    org.logger.log('Checking for New Attachments Every {} Seconds'.format(poll_interval),'INFORMATION')
+
+    # download new attachments in a separate thread, adding each to the queue,
+    # followed by None once polling stops:
+    downloaded_attachments = queue.Queue()
+    polling = threading.Event()
+    stopping = threading.Event()
+    def download():
+        polls = 0
+        while not stopping.is_set() and (max_polls is None or polls<max_polls):
+            polling.set()
+            try:
+                with kw.timer.span('download'):
+                    kw.download_current_month(on_download=downloaded_attachments.put)
+            except Exception as e:
+                kw.logger.log('Unable to Download Attachments: {}'.format(e),'ERROR')
+            polling.clear()
+            polls += 1
+            if max_polls is None or polls<max_polls:
+                stopping.wait(poll_interval)
+            else:
+                pass
+        downloaded_attachments.put(None)
+    downloader = threading.Thread(target=download,name='downloader',daemon=True)
+    downloader.start()
+
+    # organize attachments as they arrive, and check whether the filing month
+    # is ready for consolidation once each poll's attachments are organized:
+    downloading = True
+    consolidation_pending = False
+    try:
+        while downloading:
+            attachment_ids = []
+            try:
+                attachment_ids.append(downloaded_attachments.get(timeout=1))
+                while not downloaded_attachments.empty():
+                    attachment_ids.append(downloaded_attachments.get_nowait())
+            except queue.Empty:
+                pass
+            if None in attachment_ids:
+                downloading = False
+                attachment_ids = [attachment_id for attachment_id in attachment_ids if attachment_id is not None]
+            else:
+                pass
+            if len(attachment_ids)>0:
+                with kw.log_lock:
+                    # save the downloader's entries and reload the logs to parse their columns:
+                    for logger in [kw.email_logger,kw.attachment_logger]:
+                        logger.commit()
+                        logger.load_log()
+                    org.logger.log('Organizing {} New Attachments'.format(len(attachment_ids)),'INFORMATION')
+                    try:
+                        with org.timer.span('pipeline'):
+                            for step in [org.validate_all,org.set_versions,org.copy_rename_all]:
+                                with org.timer.span(step.__name__):
+                                    step()
+                    except Exception as e:
+                        # attachments left unvalidated are retried with the next batch:
+                        org.logger.log('Unable to Organize Attachments: {}'.format(e),'ERROR')
+                        for logger in [kw.email_logger,kw.attachment_logger]:
+                            logger.load_log()
+                consolidation_pending = True
+            else:
+                pass
+            if consolidation_pending and downloaded_attachments.empty() and not polling.is_set():
+                # hold the logs while consolidating, so the downloader does not
+                # save them while they are read, after saving any entries logged
+                # since the last batch so that reloading them does not drop them:
+                with kw.log_lock:
+                    for logger in [kw.email_logger,kw.attachment_logger]:
+                        logger.commit()
+                    try:
+                        cons = WorkbookConsolidator(configuration_options_path,filing_month=filing_month)
+                        cons.dry_run = True
+                        if cons.check_files():
+                            org.logger.log('Files Ready for Consolidation','INFORMATION')
+                            ra_filings(configuration_options_path,consolidate=True,filing_month=filing_month,incremental=True)
+                        else:
+                            pass
+                    except Exception as e:
+                        org.logger.log('Unable to Consolidate Filing Month: {}'.format(e),'ERROR')
+                    # reload the logs with any results added by the consolidation:
+                    for logger in [kw.email_logger,kw.attachment_logger]:
+                        logger.load_log()
+                consolidation_pending = False
+            else:
+                pass
+    except KeyboardInterrupt:
+        stopping.set()
+        org.logger.log('Stopped Pipeline','INFORMATION')
+
 if __name__=='__main__':
     today = ts.now().replace(hour=0,minute=0,second=0,microsecond=0)
 
     argv = sys.argv
     daily='--daily' in argv or '-D' in argv
+    incremental = False
+    dry_run = False
+    snapshot = None
+    save_snapshot = None
+    profile = '--profile' in argv or '-p' in argv
+    watch = False
+    pipeline = False
 
     # run daily schedule check, ignore all other arguments:
     if daily:
@@ -155,6 +360,7 @@ if __name__=='__main__':
             consolidate = True
             notify = True
             export = False
+            incremental = True
         elif (today+td(days=25)).day==1:
             print('exporting to ezdb (T-25)')
             # export results for ezdb:
@@ -179,8 +385,24 @@ if __name__=='__main__':
         consolidate='--consolidate' in argv or '-c' in argv
         notify='--notify' in argv or '-n' in argv
         export='--export' in argv or '-e' in argv
+        incremental='--incremental' in argv or '-i' in argv
+        dry_run='--dry-run' in argv or '-r' in argv
+        watch='--watch' in argv or '-w' in argv
+        pipeline='--pipeline' in argv or '-P' in argv
+        for arg in argv:
+            if arg.startswith('--snapshot='):
+                snapshot = arg.split('=',1)[1]
+            elif arg.startswith('--save-snapshot='):
+                save_snapshot = arg.split('=',1)[1]
+            else:
+                pass
 
-    if any([download,organize,consolidate,notify,export]):
+    if pipeline:
+        ra_filings_pipeline(
+            Path(r'\\Sf150pyclfs26\PYCLIENTFS\Users\svc_energyRA\ra_filings\config\ra_filings_config_{}.yaml'.format(filing_month.year)),
+            filing_month=filing_month
+        )
+    elif any([download,organize,consolidate,notify,export,dry_run,watch]):
         ra_filings(
             Path(r'\\Sf150pyclfs26\PYCLIENTFS\Users\svc_energyRA\ra_filings\config\ra_filings_config_{}.yaml'.format(filing_month.year)),
             download=download,
@@ -188,7 +410,13 @@ if __name__=='__main__':
             consolidate=consolidate,
             notify=notify,
             export=export,
-            filing_month=filing_month
+            filing_month=filing_month,
+            incremental=incremental,
+            dry_run=dry_run,
+            snapshot=snapshot,
+            save_snapshot=save_snapshot,
+            profile=profile,
+            watch=watch
         )
     else:
         pass
\ No newline at end of file
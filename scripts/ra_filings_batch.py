@@ -0,0 +1,22 @@
+import sys
+from pathlib import Path
+from pandas import Timestamp as ts,date_range
+
+from ra_consolidator import consolidate_months
+
+# consolidate a range of filing months, reading each year's shared inputs once
+# and running months in parallel, e.g., for backfills and audits:
+#     python ra_filings_batch.py 2024-01 2024-12 [processes]
+if __name__=='__main__':
+    argv = sys.argv
+    first_month = ts(argv[1]).replace(day=1)
+    last_month = ts(argv[2]).replace(day=1)
+    processes = int(argv[3]) if len(argv)>3 else None
+
+    filing_months = list(date_range(first_month,last_month,freq='MS'))
+    for year in sorted(set([filing_month.year for filing_month in filing_months])):
+        consolidate_months(
+            configuration_path=Path(r'\\Sf150pyclfs26\PYCLIENTFS\Users\svc_energyRA\ra_filings\config\ra_filings_config_{}.yaml'.format(year)),
+            filing_months=[filing_month for filing_month in filing_months if filing_month.year==year],
+            processes=processes
+        )
@@ -0,0 +1,869 @@
+import os
+import sys
+import json
+import random
+from pathlib import Path
+from calendar import monthrange
+from concurrent.futures import ProcessPoolExecutor
+from yaml import safe_dump
+from openpyxl import Workbook
+import pandas as pd
+from pandas import Timestamp as ts
+
+from ra_filings import ra_filings
+from ra_consolidator import WorkbookConsolidator
+
+# generate a synthetic archive of inputs at a chosen scale and run the
+# organize, consolidate, and export stages against it offline, reporting the
+# wall time and memory of each stage from the run manifest, e.g.:
+#     python ra_filings_benchmark.py [directory] --lses=50,200,500 --resources=20 --months=2024-06,2024-07 [--trace-memory] [--values]
+
+# local areas as (summary column, year-ahead label, iou territory):
+local_areas = [
+    ('los_angeles','LA Basin','SCE'),
+    ('ventura','Big Creek-Ventura','SCE'),
+    ('san_diego','San Diego','SDGE'),
+    ('bay_area','Bay Area','PGE'),
+    ('fresno','Fresno','PGE'),
+    ('sierra','Sierra','PGE'),
+    ('stockton','Stockton','PGE'),
+    ('kern','Kern','PGE'),
+    ('humboldt','Humboldt','PGE'),
+    ('northern_california','NCNB','PGE'),
+]
+
+# demand response allocation locations in the year-ahead workbook:
+demand_response_locations = ['LA Basin1','Big Creek/Ventura1','SDGE1','Bay Area1','Fresno0','Sierra0','Stockton0','Kern0','Humboldt0','NCNB0']
+
+investor_owned_utilities = {
+    'PGE' : ('LPGE','Pacific Gas & Electric'),
+    'SCE' : ('LSCE','Southern California Edison'),
+    'SDGE' : ('LSDG','San Diego Gas & Electric'),
+}
+
+class SyntheticArchive:
+    '''
+    a class to generate a self-contained archive of synthetic inputs laid out
+    as the tool expects to find them after download: a configuration file,
+    organizations and email filter files, summary and cross-check templates,
+    year-ahead, month-ahead, cam-rmr, incremental local, and nqc workbooks,
+    and monthly filings and caiso supply plans for each filing month.
+    '''
+    def __init__(self,root_directory:Path,load_serving_entities:int=50,resources_per_lse:int=20,filing_months:list=None,seed:int=0,output_mode:str='formulas',trace_memory:bool=False):
+        '''
+        initializes an instance of the SyntheticArchive class.
+
+        parameters:
+            root_directory - path object pointing to the directory in which
+                the archive will be generated
+            load_serving_entities - the number of synthetic load-serving
+                entities, in addition to the three investor-owned utilities
+            resources_per_lse - the number of physical resources listed in
+                each load-serving entity's monthly filing
+            filing_months - a list of filing months within a single year for
+                which filings and supply plans are generated; if not provided,
+                june 2024 is used
+            seed - seed for the random number generator, so that archives
+                generated with the same parameters are identical
+            output_mode - the consolidation output mode, either 'formulas' or
+                'values'
+            trace_memory - if true, python memory allocations are traced
+                during each stage of the benchmarked runs
+        '''
+        if filing_months is None:
+            filing_months = [ts(2024,6,1)]
+        else:
+            pass
+        self.root_directory = Path(root_directory).absolute()
+        self.filing_months = [ts(filing_month).replace(day=1) for filing_month in filing_months]
+        self.year = self.filing_months[0].year
+        self.resources_per_lse = resources_per_lse
+        self.output_mode = output_mode
+        self.trace_memory = trace_memory
+        self.random = random.Random(seed)
+        self.load_serving_entity_ids = ['LSE{:03d}'.format(n) for n in range(1,load_serving_entities+1)]
+        self.organization_ids = list(investor_owned_utilities.keys()) + self.load_serving_entity_ids
+        self.territories = {organization_id:organization_id for organization_id in investor_owned_utilities.keys()}
+        self.territories.update({organization_id:['PGE','SCE','SDGE'][n%3] for n,organization_id in enumerate(self.load_serving_entity_ids)})
+        self.month_starts = [ts(self.year,month,1) for month in range(1,13)]
+        self.configuration_path = self.root_directory / 'config' / 'ra_filings_config.yaml'
+        self.files_written = 0
+        self.bytes_written = 0
+
+        # nqc list shared by all filings, with enough resources that some are
+        # listed by more than one load-serving entity:
+        n_resources = max(100,load_serving_entities*resources_per_lse//4,resources_per_lse)
+        self.resources = []
+        for n in range(1,n_resources+1):
+            if self.random.random()<0.3:
+                local_area = 'CAISO System'
+                zone = self.random.choice(['North','South'])
+            else:
+                _,local_area,territory = self.random.choice(local_areas)
+                zone = 'North' if territory=='PGE' else 'South'
+            self.resources.append({
+                'resource_id' : 'RES{:05d}'.format(n),
+                'generator_name' : 'Synthetic Generator {:05d}'.format(n),
+                'zone' : zone,
+                'local_area' : local_area,
+                'nqc' : [round(self.random.uniform(1,200),2) for _ in range(12)],
+                'scid' : 'S{:04d}'.format(n%997),
+            })
+
+    def build(self):
+        '''
+        writes all files in the synthetic archive, replacing any previously
+        generated files.
+        '''
+        for directory in ['config','data/downloads','data/filings','data/requirements','data/supply_plans','data/nqc_lists','data/results','data/templates','data/archives','data/logs','data/snapshots','ezdb/Data']:
+            (self.root_directory / directory).mkdir(parents=True,exist_ok=True)
+        self.write_configuration()
+        self.write_organizations()
+        self.write_email_filter()
+        self.write_ra_summary_template()
+        self.write_caiso_cross_check_template()
+        self.write_master_lookup_table()
+        self.write_year_ahead()
+        self.write_month_ahead()
+        self.write_cam_rmr_update()
+        self.write_incremental_local()
+        self.write_nqc_list()
+        for filing_month in self.filing_months:
+            self.write_cam_rmr(filing_month)
+            self.write_supply_plans(filing_month)
+            for organization_id in self.organization_ids:
+                self.write_ra_monthly_filing(organization_id,filing_month)
+
+    def get_downloads_directory(self,sender_group:str,filing_month:ts=None):
+        '''
+        returns the download directory for internal or external attachments
+        for a filing month, creating it if necessary.
+
+        parameters:
+            sender_group - either 'internal' or 'external'
+            filing_month - the filing month; the first filing month if blank
+        '''
+        if filing_month is None:
+            filing_month = self.filing_months[0]
+        else:
+            pass
+        directory = self.root_directory / 'data' / 'downloads' / filing_month.strftime('%Y-%m') / sender_group
+        directory.mkdir(parents=True,exist_ok=True)
+        return directory
+
+    def save_workbook(self,workbook:Workbook,path:Path):
+        '''
+        saves a workbook and counts the file and its size.
+
+        parameters:
+            workbook - an openpyxl workbook
+            path - path object pointing to the file to write
+        '''
+        workbook.save(str(path))
+        self.files_written += 1
+        self.bytes_written += path.stat().st_size
+
+    def write_text(self,text:str,path:Path):
+        '''
+        writes a text file and counts the file and its size.
+
+        parameters:
+            text - the contents of the file
+            path - path object pointing to the file to write
+        '''
+        with path.open(mode='w') as f:
+            f.write(text)
+        self.files_written += 1
+        self.bytes_written += path.stat().st_size
+
+    def monthly_values(self,low:float=0,high:float=100):
+        '''
+        returns a list of twelve random monthly values.
+
+        parameters:
+            low - the smallest value
+            high - the largest value
+        '''
+        return [round(self.random.uniform(low,high),2) for _ in range(12)]
+
+    def write_configuration(self):
+        '''
+        writes a configuration file with all paths within the archive.
+        '''
+        data = str(self.root_directory / 'data')
+        ezdb = str(self.root_directory / 'ezdb' / 'Data')
+        configuration = {
+            'filing_month' : self.filing_months[0].strftime('%B %Y'),
+            'planning_reserve_margin' : 0.17,
+            'demand_response_multiplier' : 1.0,
+            'transmission_loss_adder_pge' : 1.0,
+            'transmission_loss_adder_sce' : 1.0,
+            'transmission_loss_adder_sdge' : 1.0,
+            'email_filter_filename' : str(self.root_directory / 'config' / 'email_filter.yaml'),
+            'archive_root_directory' : str(self.root_directory),
+            'organizations_filename' : str(self.root_directory / 'config' / 'organizations.yaml'),
+            'downloads_internal_directory' : os.path.join(data,'downloads','[yyyy]-[mm]','internal'),
+            'downloads_external_directory' : os.path.join(data,'downloads','[yyyy]-[mm]','external'),
+            'ra_monthly_filing_filename' : os.path.join(data,'filings','[yyyy]-[mm]','RAFiling_[yyyy]-[mm]_[organization_id]_rev[version].xlsx'),
+            'month_ahead_filename' : os.path.join(data,'requirements','[yyyy]_MonthAheadForecastSummary_rev[version].xlsx'),
+            'cam_rmr_filename' : os.path.join(data,'requirements','[yyyy]-[mm]_CAM-RMR_rev[version].xlsx'),
+            'year_ahead_filename' : os.path.join(data,'requirements','[yyyy]_YearAhead_rev[version].xlsx'),
+            'cam_rmr_update_filename' : os.path.join(data,'requirements','[yyyy]_CAM-RMR-Update_rev[version].xlsx'),
+            'incremental_local_filename' : os.path.join(data,'requirements','[yyyy]_IncrementalLocal_rev[version].xlsx'),
+            'supply_plan_system_filename' : os.path.join(data,'supply_plans','[yyyy]-[mm]_CAISO_SupplyPlan_System_rev[version].xlsx'),
+            'supply_plan_flexible_filename' : os.path.join(data,'supply_plans','[yyyy]-[mm]_CAISO_SupplyPlan_Flexible_rev[version].xlsx'),
+            'nqc_list_filename' : os.path.join(data,'nqc_lists','[yyyy]_NQC_List_rev[version].xlsx'),
+            'ra_summary_filename' : os.path.join(data,'results','MA_RASummary_[yyyy]-[mm].xlsx'),
+            'ra_summary_template_filename' : os.path.join(data,'templates','RASummary_template_[yyyy].xlsx'),
+            'caiso_cross_check_filename' : os.path.join(data,'results','RA_CAISO_SupplyPlan_CrossCheck_[yyyy]-[mm].xlsx'),
+            'caiso_cross_check_template_filename' : os.path.join(data,'templates','RA_CAISO_SupplyPlan_Crosscheck_template.xlsx'),
+            'nqc_over_allocation_report_filename' : os.path.join(data,'results','NQC_OverAllocation_[yyyy]-[mm].csv'),
+            'consolidation_diff_filename' : os.path.join(data,'results','ConsolidationDiff_[yyyy]-[mm].csv'),
+            'consolidation_snapshot_filename' : os.path.join(data,'snapshots','ConsolidationSnapshot_[yyyy]-[mm]_[snapshot].csv'),
+            'allocation_cube_filename' : os.path.join(data,'results','AllocationCube_[yyyy].csv'),
+            'annual_obligation_report_filename' : os.path.join(data,'results','AnnualObligations_[yyyy].csv'),
+            'results_archive_filename' : os.path.join(data,'archives','RAFilings_[yyyy]-[mm].zip'),
+            'ezdb_root_directory' : ezdb,
+            'ezdb_data_sources_filename' : os.path.join(ezdb,'data_sources','data_sources_[yyyy]-[mm].csv'),
+            'ezdb_organizations_filename' : os.path.join(ezdb,'organizations','organizations_[yyyy]-[mm].csv'),
+            'ezdb_requirements_filename' : os.path.join(ezdb,'requirements','requirements_[yyyy]-[mm].csv'),
+            'ezdb_resources_filename' : os.path.join(ezdb,'resources','resources_[yyyy]-[mm].csv'),
+            'ezdb_summaries_filename' : os.path.join(ezdb,'summaries','summaries_[yyyy]-[mm].csv'),
+            'ezdb_supply_plans_filename' : os.path.join(ezdb,'supply_plans','supply_plans_[yyyy]-[mm].csv'),
+            'ezdb_master_lookup_filename' : str(self.root_directory / 'ezdb' / 'EZDB_ED_RA_MasterLookup.xlsx'),
+            'log_filename' : os.path.join(data,'logs','ra_filings_[yyyy]-[mm].log'),
+            'cli_logging_criticalities' : 'ERROR',
+            'file_logging_criticalities' : 'ERROR,WARNING,INFORMATION',
+            'email_log_filename' : os.path.join(data,'logs','ra_filings_emails.csv'),
+            'attachment_log_filename' : os.path.join(data,'logs','ra_filings_attachments.csv'),
+            'consolidation_log_filename' : os.path.join(data,'logs','ra_filings_consolidation_[yyyy]-[mm].csv'),
+            'consolidation_output_mode' : self.output_mode,
+            'trace_memory' : self.trace_memory,
+            'version_controlled_files' : [
+                'ra_monthly_filing',
+                'cam_rmr',
+                'month_ahead',
+                'year_ahead',
+                'incremental_local',
+                'cam_rmr_update',
+                'supply_plan_system',
+                'supply_plan_flexible',
+            ],
+            'files_for_archive' : [
+                'configuration_options',
+                'organizations',
+                'email_filter',
+                'ra_monthly_filing',
+                'month_ahead',
+                'cam_rmr',
+                'year_ahead',
+                'incremental_local',
+                'cam_rmr_update',
+                'supply_plan_system',
+                'supply_plan_flexible',
+                'ra_summary',
+                'caiso_cross_check',
+                'log',
+                'email_log',
+                'attachment_log',
+                'consolidation_log',
+            ],
+        }
+        self.write_text('---\n' + safe_dump(configuration,sort_keys=False) + '...\n',self.configuration_path)
+
+    def write_organizations(self):
+        '''
+        writes an organizations file with the regulatory agencies, the
+        investor-owned utilities, and each synthetic load-serving entity.
+        '''
+        organizations = {
+            'CPUC' : {'scid':None,'pal_id':None,'type':'regulatory agency','aliases':['California Public Utilities Commission','PUC'],'default_email':''},
+            'CEC' : {'scid':None,'pal_id':None,'type':'regulatory agency','aliases':['California Energy Commission'],'default_email':''},
+            'CAISO' : {'scid':None,'pal_id':None,'type':'independent system operator','aliases':['California Independent System Operator'],'default_email':''},
+        }
+        for n,(organization_id,(scid,name)) in enumerate(investor_owned_utilities.items()):
+            organizations[organization_id] = {'scid':scid,'pal_id':n+1,'type':'investor-owned utility','aliases':[name,organization_id],'default_email':''}
+        for n,organization_id in enumerate(self.load_serving_entity_ids):
+            organizations[organization_id] = {
+                'scid' : 'L{}'.format(organization_id),
+                'pal_id' : n+100,
+                'type' : 'load-serving entity',
+                'aliases' : ['Synthetic Energy {}'.format(organization_id[3:]),organization_id],
+                'default_email' : '',
+            }
+        self.write_text('---\n' + safe_dump(organizations,sort_keys=False) + '...\n',self.root_directory / 'config' / 'organizations.yaml')
+
+    def write_email_filter(self):
+        '''
+        writes an email filter file.
+        '''
+        self.write_text('---\ninclude:\n  - Filing\n  - Supply Plan\nexclude:\n...\n',self.root_directory / 'config' / 'email_filter.yaml')
+
+    def write_ra_summary_template(self):
+        '''
+        writes a monthly summary template listing every load-serving entity.
+        '''
+        wb = Workbook()
+        ws = wb.active
+        ws.title = 'Summary'
+        ws.append(['LSE','Obligation','Physical Resources','Demand Response','Total Resources','Percent Available'])
+        for organization_id in self.organization_ids:
+            ws.append([organization_id])
+        ws.append(['Total'])
+        for sheet_name in ['NP26','SP26','FlexRAR','MCC_Check','CertifyingOfficers','LocalTrueUp','NQC_List','PhysicalResources']:
+            wb.create_sheet(sheet_name).append(['LSE'])
+        ws = wb.create_sheet('MCC_Parameters')
+        ws.append(['Bucket','Limit'])
+        for n,limit in enumerate([1.0,0.35,0.15,0.05,0.15,0.3]):
+            ws.append(['MCC {}'.format(n+1),limit])
+        self.save_workbook(wb,self.root_directory / 'data' / 'templates' / 'RASummary_template_{}.xlsx'.format(self.year))
+
+    def write_caiso_cross_check_template(self):
+        '''
+        writes a caiso supply plan cross-check template.
+        '''
+        wb = Workbook()
+        ws = wb.active
+        ws.title = 'Requirements'
+        ws.append(['LSE'])
+        ws.append([])
+        for sheet_name in ['FilingSummary','Filings','CAISO_Sys_SP','CAISO_Flex_SP']:
+            wb.create_sheet(sheet_name).append(['LSE'])
+        ws = wb.create_sheet('LoadServingEntities')
+        ws.append(['Name','SCID','ID'])
+        for organization_id in self.organization_ids:
+            ws.append([organization_id,self.get_scid(organization_id),organization_id])
+        self.save_workbook(wb,self.root_directory / 'data' / 'templates' / 'RA_CAISO_SupplyPlan_Crosscheck_template.xlsx')
+
+    def write_master_lookup_table(self):
+        '''
+        writes an empty ezdb master lookup table.
+        '''
+        wb = Workbook()
+        ws = wb.active
+        ws.title = 'TablesMaster'
+        ws.append(['ID','TableName','Description','Period','Title','Notes','Status','Owner','FileName','Updated','Source','Comments'])
+        self.save_workbook(wb,self.root_directory / 'ezdb' / 'EZDB_ED_RA_MasterLookup.xlsx')
+
+    def get_scid(self,organization_id:str):
+        '''
+        returns the caiso scheduling coordinator id of an organization.
+
+        parameters:
+            organization_id - a load-serving entity or investor-owned utility
+        '''
+        if organization_id in investor_owned_utilities.keys():
+            scid = investor_owned_utilities[organization_id][0]
+        else:
+            scid = 'L{}'.format(organization_id)
+        return scid
+
+    def write_year_ahead(self):
+        '''
+        writes the year-ahead allocation workbook.
+        '''
+        wb = Workbook()
+
+        # load forecasts for each load-serving entity and month:
+        ws = wb.active
+        ws.title = 'loadforecastinputdata'
+        ws.append([None,'IOU','Month','LSE','LSE Type','Submitted','Coincidence Adj.','Coincident Peak','LSE Specific','CoPkAdj','EELMDR Adj.','Adj. with LMDR','Pro Rata Adj.','Final Forecast'])
+        for organization_id in self.organization_ids:
+            for month in range(1,13):
+                forecast = round(self.random.uniform(10,2000),2)
+                ws.append([None,self.territories[organization_id],month,organization_id,'CCA',forecast,1.0,forecast,0,forecast,0,forecast,0,forecast])
+
+        # demand response allocations:
+        ws = wb.create_sheet('DRforAllocation')
+        for n,location in enumerate(demand_response_locations):
+            ws.cell(row=n+2,column=4,value=location)
+            for month,value in enumerate(self.monthly_values(0,50)):
+                ws.cell(row=n+2,column=month+5,value=value)
+
+        # cam credits and flexibility requirements:
+        ws = wb.create_sheet('Flexrequirements')
+        row_number = 4
+        for territory in ['PGE','SCE','SDGE']:
+            for category in range(1,4):
+                ws.cell(row=row_number,column=18,value=territory)
+                ws.cell(row=row_number,column=19,value=category)
+                for month,value in enumerate(self.monthly_values(0,100)):
+                    ws.cell(row=row_number,column=month+20,value=value)
+                row_number += 1
+        ws['B15'] = 'Flex Requirements net CAM'
+        row_number = 16
+        for organization_id in self.organization_ids:
+            for category in range(1,4):
+                ws.cell(row=row_number,column=1,value=organization_id)
+                ws.cell(row=row_number,column=2,value='Category {}'.format(category))
+                for month,value in enumerate(self.monthly_values(0,200)):
+                    ws.cell(row=row_number,column=month+3,value=value)
+                row_number += 1
+
+        # flexible rmr and cpe tables:
+        for sheet_name in ['Flex RMR','CPE Flexible']:
+            ws = wb.create_sheet(sheet_name)
+            ws.append(['LSE']+[month_start.strftime('%b') for month_start in self.month_starts])
+            for organization_id in self.organization_ids:
+                ws.append([organization_id]+self.monthly_values(0,20))
+            ws.append(['Total'])
+
+        # flexible irp credits by category:
+        ws = wb.create_sheet('IRP Flexible')
+        ws.append([None]+['{}. EFC'.format(month_start.strftime('%b')) for month_start in self.month_starts])
+        for organization_id in self.organization_ids:
+            for category in range(1,4):
+                ws.append(['{}{}'.format(organization_id,category)]+self.monthly_values(0,10))
+
+        # irp system credits:
+        ws = wb.create_sheet('IRP System')
+        ws.append([None]+['{}. System NQC'.format(month_start.strftime('%b')) for month_start in self.month_starts])
+        for organization_id in self.organization_ids:
+            for region in ['NP26','SP26']:
+                ws.append(['{}{} IRP'.format(organization_id,region)]+self.monthly_values(0,30))
+
+        # local requirements and year-ahead cam and rmr allocations:
+        ws = wb.create_sheet('Local RA-CAM-{}'.format(self.year))
+        for column_number,(_,label,_) in enumerate(local_areas):
+            ws.cell(row=2,column=column_number+3,value=label)
+            ws.cell(row=4,column=column_number+3,value=round(self.random.uniform(1000,10000),2))
+        row_number = 6
+        for organization_id in self.organization_ids:
+            ws.cell(row=row_number,column=2,value=organization_id)
+            for column_number in range(len(local_areas)):
+                ws.cell(row=row_number,column=column_number+3,value=round(self.random.uniform(0,100),2))
+            row_number += 1
+        ws.cell(row=row_number,column=2,value='Total')
+        ws['N2'] = 'YA CAM Allocatons (this flows into LSE table 8)'
+        row_number = 15
+        for organization_id in self.organization_ids:
+            for region,allocation_type in [('NP26','CAM'),('SP26','CAM'),('NP26','RMR'),('SP26','RMR'),('System','RMR')]:
+                ws.cell(row=row_number,column=13,value='{}{} {}'.format(organization_id,region,allocation_type))
+                for month,value in enumerate(self.monthly_values(0,50)):
+                    ws.cell(row=row_number,column=month+14,value=value)
+                row_number += 1
+
+        self.save_workbook(wb,self.get_downloads_directory('internal') / '{}_YearAhead.xlsx'.format(self.year))
+
+    def write_monthly_tracking(self,ws,blank_column:bool=False):
+        '''
+        writes a monthly tracking table of month-ahead forecasts for each
+        load-serving entity and month, beginning in cell B5.
+
+        parameters:
+            ws - the worksheet in which to write the table
+            blank_column - if true, an empty column is inserted before the
+                jurisdictional load shares, as in the cam-rmr workbook
+        '''
+        ws['B4'] = 'LSE'
+        row_number = 5
+        for organization_id in self.organization_ids:
+            for month_start in self.month_starts:
+                forecasts = [round(self.random.uniform(10,2000),2) for _ in range(26)]
+                load_shares = [round(self.random.uniform(0,0.05),4) for _ in range(4)]
+                values = [organization_id,'CCA','CPUC',organization_id,month_start.to_pydatetime(),'{}{}'.format(organization_id,month_start.strftime('%Y%m'))] + forecasts + ([None] if blank_column else []) + load_shares
+                for column_number,value in enumerate(values):
+                    ws.cell(row=row_number,column=column_number+2,value=value)
+                row_number += 1
+
+    def write_month_ahead(self):
+        '''
+        writes the month-ahead forecast summary workbook.
+        '''
+        wb = Workbook()
+        ws = wb.active
+        ws.title = 'Monthly Tracking'
+        self.write_monthly_tracking(ws)
+        self.save_workbook(wb,self.get_downloads_directory('internal') / '{}_MonthAheadForecastSummary.xlsx'.format(self.year))
+
+    def write_cam_rmr(self,filing_month:ts):
+        '''
+        writes the monthly cam-rmr workbook for a filing month.
+
+        parameters:
+            filing_month - the filing month of the workbook
+        '''
+        wb = Workbook()
+        ws = wb.active
+        ws.title = 'CAMRMR'
+        ws['A1'] = filing_month.strftime('%bMA%y')
+        for column_number in range(2,10):
+            ws.cell(row=4,column=column_number,value=round(self.random.uniform(100,5000),2))
+        self.write_monthly_tracking(wb.create_sheet('monthlytracking'),blank_column=True)
+        self.save_workbook(wb,self.get_downloads_directory('internal',filing_month) / 'CAM-RMR_{}.xlsx'.format(filing_month.strftime('%Y-%m')))
+
+    def write_cam_rmr_update(self):
+        '''
+        writes the mid-year cam, rmr, and diablo canyon credit true-up workbook.
+        '''
+        wb = Workbook()
+        ws = wb.active
+        ws.title = 'Jun to Dec CAM Update'
+        row_number = 14
+        for organization_id in self.organization_ids:
+            for region,allocation_type in [('NP26','CAM'),('SP26','CAM'),('NP26','RMR'),('SP26','RMR'),('System','RMR')]:
+                ws.cell(row=row_number,column=2,value='{} {} {}'.format(organization_id,region,allocation_type))
+                for month,value in enumerate(self.monthly_values(0,50)):
+                    ws.cell(row=row_number,column=month+3,value=value)
+                row_number += 1
+        ws = wb.create_sheet('Diablo Canyon Credits')
+        row_number = 7
+        for organization_id in self.organization_ids:
+            ws.cell(row=row_number,column=2,value=organization_id)
+            for month,value in enumerate(self.monthly_values(0,10)):
+                ws.cell(row=row_number,column=month+3,value=value)
+            row_number += 1
+        self.save_workbook(wb,self.get_downloads_directory('internal') / '{}_CAM-RMR-Update.xlsx'.format(self.year))
+
+    def write_incremental_local(self):
+        '''
+        writes the incremental local requirements workbook.
+        '''
+        wb = Workbook()
+        ws = wb.active
+        ws.title = 'IncrementalLocal'
+        ws.append(['LSE']+[label for _,label,_ in local_areas]+[None,'Category 1','Category 2','Category 3'])
+        for organization_id in self.organization_ids:
+            ws.append([organization_id]+[round(self.random.uniform(-10,10),2) for _ in local_areas]+[None]+[round(self.random.uniform(-5,5),2) for _ in range(3)])
+        ws.append(['Total'])
+        ws = wb.create_sheet('Local Trueup')
+        ws['A1'] = 'YA Local RAR Allocations'
+        row_number = 7
+        for organization_id in self.organization_ids:
+            ws.cell(row=row_number,column=2,value=organization_id)
+            for column_number in range(16):
+                ws.cell(row=row_number,column=column_number+3,value=round(self.random.uniform(0,50),2))
+            row_number += 1
+        self.save_workbook(wb,self.get_downloads_directory('internal') / '{}_IncrementalLocal.xlsx'.format(self.year))
+
+    def write_nqc_list(self):
+        '''
+        writes the nqc list workbook for the year.
+        '''
+        wb = Workbook()
+        ws = wb.active
+        ws.title = '{} NQC List'.format(self.year)
+        ws.append(['Generator Name','Resource ID','Path Designation','Local Area']+[month_start.strftime('%b').upper() for month_start in self.month_starts]+['Dispatchable','Deliverability Status','Deliverability MW','Comments'])
+        for resource in self.resources:
+            ws.append([resource['generator_name'],resource['resource_id'],resource['zone'],resource['local_area']]+resource['nqc']+['Y','Full',max(resource['nqc']),None])
+        self.save_workbook(wb,self.get_downloads_directory('internal') / '{}_NQC_List.xlsx'.format(self.year))
+
+    def get_contracted_resources(self,organization_id:str,filing_month:ts):
+        '''
+        returns the physical resources listed in a load-serving entity's
+        filing for a month, drawn reproducibly from the nqc list.
+
+        parameters:
+            organization_id - a load-serving entity or investor-owned utility
+            filing_month - the filing month
+        '''
+        resource_random = random.Random('{}{}'.format(organization_id,filing_month.strftime('%Y%m')))
+        month_index = filing_month.month - 1
+        contracted_resources = []
+        for resource in resource_random.sample(self.resources,min(self.resources_per_lse,len(self.resources))):
+            system = round(resource['nqc'][month_index]*resource_random.uniform(0.05,0.5),2)
+            flexible = round(system*0.5,2) if resource_random.random()<0.3 else 0
+            contracted_resources.append({
+                'resource' : resource,
+                'system' : system,
+                'local' : system if resource['local_area']!='CAISO System' else 0,
+                'flexible' : flexible,
+                'flexibility_category' : resource_random.randint(1,3) if flexible>0 else None,
+            })
+        return contracted_resources
+
+    def write_ra_monthly_filing(self,organization_id:str,filing_month:ts):
+        '''
+        writes a load-serving entity's monthly filing.
+
+        parameters:
+            organization_id - a load-serving entity or investor-owned utility
+            filing_month - the filing month of the filing
+        '''
+        name = investor_owned_utilities[organization_id][1] if organization_id in investor_owned_utilities.keys() else 'Synthetic Energy {}'.format(organization_id[3:])
+        last_day = monthrange(filing_month.year,filing_month.month)[1]
+        start_date = '{}/1/{}'.format(filing_month.month,filing_month.year)
+        end_date = '{}/{}/{}'.format(filing_month.month,last_day,filing_month.year)
+        wb = Workbook()
+        ws = wb.active
+        ws.title = 'Certification'
+        ws['B3'] = filing_month.to_pydatetime()
+        ws['B5'] = name
+        ws['B7'] = (filing_month - pd.Timedelta(days=45)).to_pydatetime()
+        ws['B21'] = 'Certifying Officer {}'.format(organization_id)
+        ws['B22'] = 'Director of Resource Planning'
+        ws['B23'] = 'Director of Resource Planning'
+        for sheet_name in ['LSE Allocations','ID and Local Area','Summary Year Ahead','Summary Month Ahead','II_Construc']:
+            wb.create_sheet(sheet_name)
+
+        # physical resources:
+        ws = wb.create_sheet('I_Phys_Res_Import_RA_Res')
+        for column_number,header in enumerate(['LSE','Contract Identifier','Resource ID','System RA (MW)','Local RA (MW)','MCC Bucket','Continuously Available','Flexible RA (MW)','Flexible Category','Start Date','End Date','SCID','Zonal RA','Local Area','North','South']):
+            ws.cell(row=3,column=column_number+1,value=header)
+        row_number = 5
+        for n,contracted_resource in enumerate(self.get_contracted_resources(organization_id,filing_month)):
+            resource = contracted_resource['resource']
+            values = [
+                organization_id,
+                '{}-{:04d}'.format(organization_id,n+1),
+                resource['resource_id'],
+                contracted_resource['system'],
+                contracted_resource['local'],
+                self.random.randint(1,4),
+                'Y',
+                contracted_resource['flexible'],
+                contracted_resource['flexibility_category'],
+                start_date,
+                end_date,
+                resource['scid'],
+                resource['zone'],
+                resource['local_area'],
+            ]
+            for column_number,value in enumerate(values):
+                ws.cell(row=row_number,column=column_number+1,value=value)
+            row_number += 1
+
+        # demand response:
+        ws = wb.create_sheet('III_Demand_Response')
+        for column_number,header in enumerate(['Contract Identifier','Program ID','System RA (MW)','Local RA (MW)','MCC Bucket','Third Party Program','Flexible RA (MW)','Flexible Category','Start Date','End Date','Operator','Zonal RA','Local Area','Do Not Delete']):
+            ws.cell(row=3,column=column_number+2,value=header)
+        ws['O4'] = 'North'
+        ws['P4'] = 'South'
+        ws['R3'] = 'PG&E'
+        ws['T3'] = 'SCE'
+        ws['V3'] = 'SDGE'
+        territory = self.territories[organization_id]
+        programs = [
+            {
+                'program_id' : 'DR{}{:02d}'.format(territory,n+1),
+                'system' : round(self.random.uniform(0,10),2),
+                'zone' : 'North' if territory=='PGE' else 'South',
+            }
+            for n in range(max(1,self.resources_per_lse//10))
+        ]
+        ws['O5'] = sum([program['system'] for program in programs if program['zone']=='North'])
+        ws['P5'] = sum([program['system'] for program in programs if program['zone']=='South'])
+        ws['S13'] = round(self.random.uniform(0,1),2)
+        ws['U8'] = round(self.random.uniform(0,1),2)
+        ws['W6'] = round(self.random.uniform(0,1),2)
+        row_number = 17
+        for n,program in enumerate(programs):
+            values = [organization_id,'{}-DR{:02d}'.format(organization_id,n+1),program['program_id'],program['system'],0,'DR','N',0,None,start_date,end_date,territory,program['zone'],'CAISO System']
+            for column_number,value in enumerate(values):
+                ws.cell(row=row_number,column=column_number+1,value=value)
+            row_number += 1
+
+        self.save_workbook(wb,self.get_downloads_directory('external',filing_month) / 'RAFiling_{}_{}.xlsx'.format(filing_month.strftime('%Y-%m'),organization_id))
+
+    def write_supply_plans(self,filing_month:ts):
+        '''
+        writes the caiso system and flexible supply plans for a filing month,
+        listing every resource shown in the month's filings, with a file date
+        two months before the filing month as in caiso's monthly exports.
+
+        parameters:
+            filing_month - the filing month of the supply plans
+        '''
+        export_date = filing_month - pd.DateOffset(months=2) + pd.Timedelta(days=14)
+        start_date = filing_month.to_pydatetime()
+        end_date = filing_month.replace(day=monthrange(filing_month.year,filing_month.month)[1]).to_pydatetime()
+        system = Workbook()
+        system_sheet = system.active
+        system_sheet.title = 'Export'
+        system_sheet.append(['Validation Status','SCID','Resource ID','Local RA','System RA','Total RA','Start Date','End Date','LSE SCID','Errors and Warnings'])
+        flexible = Workbook()
+        flexible_sheet = flexible.active
+        flexible_sheet.title = 'Export'
+        flexible_sheet.append(['Validation Status','Supplier','Resource ID','Category','Flex Capacity','Start Date','End Date','LSE','Errors and Warnings'])
+        for organization_id in self.organization_ids:
+            scid = self.get_scid(organization_id)
+            for contracted_resource in self.get_contracted_resources(organization_id,filing_month):
+                resource = contracted_resource['resource']
+                system_sheet.append(['Valid',resource['scid'],resource['resource_id'],contracted_resource['local'],contracted_resource['system']-contracted_resource['local'],contracted_resource['system'],start_date,end_date,scid,None])
+                if contracted_resource['flexible']>0:
+                    flexible_sheet.append(['Valid',resource['scid'],resource['resource_id'],contracted_resource['flexibility_category'],contracted_resource['flexible'],start_date,end_date,scid,None])
+                else:
+                    pass
+        file_date = '{}_{}_{}'.format(export_date.month,export_date.day,export_date.year)
+        self.save_workbook(system,self.get_downloads_directory('internal',filing_month) / 'CAISO Supply Plan System {}.xlsx'.format(file_date))
+        self.save_workbook(flexible,self.get_downloads_directory('internal',filing_month) / 'CAISO Supply Plan Flexible {}.xlsx'.format(file_date))
+
+def run_benchmark(directory:Path,load_serving_entities:int,resources_per_lse:int,filing_months:list,seed:int=0,output_mode:str='formulas',trace_memory:bool=False):
+    '''
+    generates a synthetic archive at one scale and runs the organize,
+    consolidate, and export stages for each filing month in turn, returning
+    a list of records with the wall time, counts, and memory of each stage
+    and sub-step read from the run manifest. for filing months from 2024,
+    the allocation cube is also checked against the allocations calculated
+    for the filing month alone. a run which fails is recorded with the error
+    rather than ending the benchmark.
+
+    parameters:
+        directory - path object pointing to the directory in which the
+            archive's own directory will be generated
+        load_serving_entities - the number of synthetic load-serving entities
+        resources_per_lse - the number of physical resources in each filing
+        filing_months - a list of filing months within a single year
+        seed - seed for the random number generator
+        output_mode - the consolidation output mode, 'formulas' or 'values'
+        trace_memory - if true, python memory allocations are traced
+    '''
+    archive = SyntheticArchive(
+        Path(directory) / 'lse{:03d}_resources{:03d}'.format(load_serving_entities,resources_per_lse),
+        load_serving_entities=load_serving_entities,
+        resources_per_lse=resources_per_lse,
+        filing_months=filing_months,
+        seed=seed,
+        output_mode=output_mode,
+        trace_memory=trace_memory
+    )
+    scale = {
+        'load_serving_entities' : load_serving_entities,
+        'resources_per_lse' : resources_per_lse,
+    }
+    init_time = ts.now()
+    archive.build()
+    records = [{
+        **scale,
+        'filing_month' : '',
+        'span' : 'generate_archive',
+        'parent' : '',
+        'wall_time' : (ts.now()-init_time).total_seconds(),
+        'status' : 'completed',
+        'files_written' : archive.files_written,
+        'bytes_written' : archive.bytes_written,
+        'error' : '',
+    }]
+    os.chdir(archive.root_directory)
+    for filing_month in archive.filing_months:
+        try:
+            ra_filings(archive.configuration_path,organize=True,consolidate=True,export=True,filing_month=filing_month)
+            error = ''
+        except Exception as e:
+            error = '{}: {}'.format(type(e).__name__,e)
+        manifest_path = archive.root_directory / 'data' / 'logs' / 'ra_filings_{}_manifest.json'.format(filing_month.strftime('%Y-%m'))
+        if manifest_path.is_file():
+            with manifest_path.open(mode='r') as f:
+                manifest = json.load(f)
+            spans = manifest['spans']
+        else:
+            spans = []
+        for span in spans:
+            records.append({
+                **scale,
+                'filing_month' : filing_month.strftime('%Y-%m'),
+                'span' : span['span'],
+                'parent' : span['parent'],
+                'wall_time' : span['wall_time'],
+                'status' : span['status'],
+                'rows' : span['rows'],
+                'files_read' : span['files_read'],
+                'bytes_read' : span['bytes_read'],
+                'bytes_written' : span['bytes_written'],
+                'peak_rss' : span['peak_rss'],
+                'traced_peak' : span['traced_peak'],
+                'error' : error if span['status']=='failed' else '',
+            })
+        if error!='' and not any([span['status']=='failed' for span in spans]):
+            records.append({**scale,'filing_month':filing_month.strftime('%Y-%m'),'span':'ra_filings','parent':'','status':'failed','error':error})
+        else:
+            pass
+        # check the allocation cube against the per-month allocation calculation:
+        if filing_month.year>=2024:
+            init_time = ts.now()
+            try:
+                differences = WorkbookConsolidator(archive.configuration_path,filing_month=filing_month).check_allocation_cube()
+                if len(differences)>0:
+                    error = 'Allocation Cube Differs from Calculated Allocations: {}'.format(', '.join(differences.loc[:,'component'].unique()))
+                else:
+                    error = ''
+                rows = len(differences)
+            except Exception as e:
+                error = '{}: {}'.format(type(e).__name__,e)
+                rows = 0
+            records.append({
+                **scale,
+                'filing_month' : filing_month.strftime('%Y-%m'),
+                'span' : 'check_allocation_cube',
+                'parent' : '',
+                'wall_time' : (ts.now()-init_time).total_seconds(),
+                'status' : 'completed' if error=='' else 'failed',
+                'rows' : rows,
+                'error' : error,
+            })
+        else:
+            pass
+    return records
+
+def benchmark(directory:Path,load_serving_entities:list=None,resources_per_lse:list=None,filing_months:list=None,seed:int=0,output_mode:str='formulas',trace_memory:bool=False):
+    '''
+    runs the end-to-end benchmark at each combination of scales, each in a
+    fresh process so that peak memory is measured independently of the other
+    scales, saves all records to a csv report in the benchmark directory, and
+    returns the report as a dataframe.
+
+    parameters:
+        directory - path object pointing to the benchmark directory
+        load_serving_entities - a list of numbers of load-serving entities;
+            if not provided, 50 is used
+        resources_per_lse - a list of numbers of resources in each filing; if
+            not provided, 20 is used
+        filing_months - a list of filing months within a single year; if not
+            provided, june 2024 is used
+        seed - seed for the random number generator
+        output_mode - the consolidation output mode, 'formulas' or 'values'
+        trace_memory - if true, python memory allocations are traced
+    '''
+    if load_serving_entities is None:
+        load_serving_entities = [50]
+    else:
+        pass
+    if resources_per_lse is None:
+        resources_per_lse = [20]
+    else:
+        pass
+    if filing_months is None:
+        filing_months = [ts(2024,6,1)]
+    else:
+        pass
+    directory = Path(directory).absolute()
+    directory.mkdir(parents=True,exist_ok=True)
+    records = []
+    for n_lses in load_serving_entities:
+        for n_resources in resources_per_lse:
+            print('benchmarking {} load-serving entities with {} resources each ...'.format(n_lses,n_resources))
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                records += executor.submit(run_benchmark,directory,n_lses,n_resources,filing_months,seed,output_mode,trace_memory).result()
+    columns = ['load_serving_entities','resources_per_lse','filing_month','span','parent','wall_time','status','rows','files_read','bytes_read','files_written','bytes_written','peak_rss','traced_peak','error']
+    report = pd.DataFrame(records,columns=columns)
+    report.to_csv(directory / 'benchmark_report.csv',index=False)
+    return report
+
+if __name__=='__main__':
+    argv = sys.argv
+    directory = Path('benchmark')
+    load_serving_entities = [50]
+    resources_per_lse = [20]
+    filing_months = [ts(2024,6,1)]
+    seed = 0
+    output_mode = 'values' if '--values' in argv else 'formulas'
+    trace_memory = '--trace-memory' in argv
+    for arg in argv[1:]:
+        if arg.startswith('--lses='):
+            load_serving_entities = [int(s) for s in arg.split('=',1)[1].split(',')]
+        elif arg.startswith('--resources='):
+            resources_per_lse = [int(s) for s in arg.split('=',1)[1].split(',')]
+        elif arg.startswith('--months='):
+            filing_months = [ts(s) for s in arg.split('=',1)[1].split(',')]
+        elif arg.startswith('--seed='):
+            seed = int(arg.split('=',1)[1])
+        elif not arg.startswith('-'):
+            directory = Path(arg)
+        else:
+            pass
+
+    report = benchmark(directory,load_serving_entities,resources_per_lse,filing_months,seed,output_mode,trace_memory)
+    stages = report.loc[(report.loc[:,'parent'].fillna('')==''),:]
+    print(stages.pivot_table(index=['load_serving_entities','resources_per_lse','filing_month'],columns='span',values='wall_time',aggfunc='sum').round(2).to_string())
+    print(stages.groupby(['load_serving_entities','resources_per_lse']).agg({'peak_rss':'max','traced_peak':'max'}).to_string())
+    print('saved benchmark report to {}'.format(Path(directory).absolute() / 'benchmark_report.csv'))
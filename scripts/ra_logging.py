@@ -1,8 +1,15 @@
 import re
+import io
+import sys
+import json
+import pstats
+import cProfile
+import tracemalloc
 import pandas as pd
 from pathlib import Path
 from pandas import Timestamp as ts
 from functools import reduce
+from contextlib import contextmanager
 
 # 2021-11-04
 # California Public Utilities Commission
@@ -118,6 +125,516 @@ class TextLogger:
         with self.log_path.open('w') as f:
             f.write('')
 
+def get_peak_rss():
+    '''
+    returns the peak resident set size, or peak working set on windows, of
+    the current process in bytes, or None if it cannot be determined.
+    '''
+    try:
+        if sys.platform=='win32':
+            import ctypes
+            from ctypes import wintypes
+            class ProcessMemoryCounters(ctypes.Structure):
+                _fields_ = [
+                    ('cb',wintypes.DWORD),
+                    ('PageFaultCount',wintypes.DWORD),
+                    ('PeakWorkingSetSize',ctypes.c_size_t),
+                    ('WorkingSetSize',ctypes.c_size_t),
+                    ('QuotaPeakPagedPoolUsage',ctypes.c_size_t),
+                    ('QuotaPagedPoolUsage',ctypes.c_size_t),
+                    ('QuotaPeakNonPagedPoolUsage',ctypes.c_size_t),
+                    ('QuotaNonPagedPoolUsage',ctypes.c_size_t),
+                    ('PagefileUsage',ctypes.c_size_t),
+                    ('PeakPagefileUsage',ctypes.c_size_t),
+                ]
+            counters = ProcessMemoryCounters()
+            counters.cb = ctypes.sizeof(counters)
+            ctypes.windll.kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+            ctypes.windll.psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE,ctypes.POINTER(ProcessMemoryCounters),wintypes.DWORD]
+            ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(),ctypes.byref(counters),counters.cb)
+            peak_rss = int(counters.PeakWorkingSetSize)
+        else:
+            import resource
+            # ru_maxrss is reported in bytes on macos and kilobytes elsewhere:
+            peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform=='darwin' else 1024)
+    except:
+        peak_rss = None
+    return peak_rss
+
+def get_allocation_source(filename:str):
+    '''
+    attributes a traced allocation to a package, e.g., 'openpyxl' or
+    'pandas', from the name of the file in which it occurred, or otherwise to
+    the module's name.
+
+    parameters:
+        filename - the name of the source file of a traced allocation
+    '''
+    parts = re.split(r'[\\/]',filename)
+    if 'site-packages' in parts[:-1]:
+        source = parts[parts.index('site-packages')+1]
+    else:
+        source = re.sub(r'\.py$','',parts[-1])
+    return source
+
+class HotPathCounters:
+    '''
+    lightweight counters for frequently executed operations, such as opening
+    workbooks, reading and writing worksheet cells, and accessing data log
+    tables, each attributed to the function in the pipeline scripts which
+    performed it. counting is disabled unless enabled through the
+    count_hot_paths configuration option, in which case the counts are
+    reported for each stage in the run manifest. a single instance,
+    hot_path_counters, is shared by all modules.
+    '''
+    # files whose frames are skipped when attributing counts to a function:
+    skipped_files = ['ra_logging.py','data_extraction.py','compliance_calculations.py']
+
+    def __init__(self):
+        '''
+        initializes an instance of the HotPathCounters class with counting
+        disabled.
+        '''
+        self.enabled = False
+        self.counts = {}
+
+    def enable(self):
+        '''
+        enables counting.
+        '''
+        self.enabled = True
+
+    def get_calling_function(self):
+        '''
+        returns the name of the innermost function on the call stack outside
+        of the logging, data extraction, and compliance calculation modules
+        and installed packages, in the form module.function.
+        '''
+        frame = sys._getframe(1)
+        while frame is not None and (
+            Path(frame.f_code.co_filename).name in self.skipped_files or \
+            'site-packages' in frame.f_code.co_filename or \
+            frame.f_code.co_filename.startswith('<')
+        ):
+            frame = frame.f_back
+        if frame is not None:
+            function = '{}.{}'.format(Path(frame.f_code.co_filename).stem,frame.f_code.co_name)
+        else:
+            function = 'unknown'
+        return function
+
+    def count(self,operation:str,items:int=1):
+        '''
+        counts a call to an operation and the number of items, e.g., cells,
+        it processed, attributed to the calling function.
+
+        parameters:
+            operation - a string naming the instrumented operation
+            items - the number of items processed
+        '''
+        if self.enabled:
+            key = (operation,self.get_calling_function())
+            (calls,total_items) = self.counts.get(key,(0,0))
+            self.counts[key] = (calls+1,total_items+int(items))
+        else:
+            pass
+
+    def reset(self):
+        '''
+        returns the counts as a list of dictionaries sorted by number of
+        items, and clears the counts.
+        '''
+        counts = [
+            {'operation':operation,'function':function,'calls':calls,'items':items}
+            for (operation,function),(calls,items) in sorted(self.counts.items(),key=lambda item: item[1][1],reverse=True)
+        ]
+        self.counts = {}
+        return counts
+
+hot_path_counters = HotPathCounters()
+
+class TimingLogger:
+    '''
+    records timing spans for the stages and sub-steps of a run, each with its
+    wall time and counts of rows processed, files read, and bytes read and
+    written. spans may be nested, and counts recorded within a sub-step are
+    included in the spans enclosing it. whenever an outermost span closes, the
+    run's spans are saved to a json run manifest, appended to a csv table of
+    spans from all runs alongside the manifest, and optionally written to a
+    prometheus textfile. if a profile directory is set, each outermost span
+    opened as a context manager is also run under a deterministic profiler.
+
+    the process's peak resident set size is recorded as each span closes. if
+    memory tracing is enabled, python's allocations are also traced during
+    each outermost span, recording the span's traced peak and the largest
+    allocation sites and packages still holding memory when it closes. if
+    hot path counting is enabled, the counts made during each outermost span
+    are also recorded.
+    '''
+
+    # counts recorded for each span:
+    counters = ['rows','files_read','bytes_read','bytes_written']
+
+    # memory measurements recorded for each span:
+    memory_measurements = ['peak_rss','traced_peak','traced_current']
+
+    def __init__(self,manifest_path:Path,metrics_path:Path=None,labels:dict=dict(),trace_memory:bool=False,count_hot_paths:bool=False):
+        '''
+        initializes an instance of the TimingLogger class.
+
+        parameters:
+            manifest_path - path object pointing to the json file where the
+                run manifest will be saved
+            metrics_path - an optional path object pointing to a prometheus
+                textfile where metrics will be saved
+            labels - a dictionary of labels identifying the run, such as the
+                filing month
+            trace_memory - if true, python memory allocations are traced
+                during each outermost span
+            count_hot_paths - if true, enables the shared hot path counters
+        '''
+        self.manifest_path = manifest_path
+        self.metrics_path = metrics_path
+        self.labels = labels
+        self.trace_memory = trace_memory
+        self.memory_top_sites = 10
+        self.tracing_memory = False
+        self.allocations = {}
+        self.hot_paths = {}
+        if count_hot_paths:
+            hot_path_counters.enable()
+        else:
+            pass
+        self.run_id = ts.now().strftime('%Y-%m-%d %H:%M:%S.%f')
+        self.spans = []
+        self.open_spans = []
+        self.committed_spans = 0
+        self.profile_directory = None
+        self.profile_top_functions = 30
+
+    def start(self,name:str):
+        '''
+        opens a span within the innermost open span.
+
+        parameters:
+            name - a string naming the stage or sub-step
+        '''
+        if len(self.open_spans)>0:
+            parent = self.open_spans[-1]['span']
+        else:
+            parent = ''
+        span = {
+            'span' : '{}/{}'.format(parent,name) if parent!='' else name,
+            'name' : name,
+            'parent' : parent,
+            'start' : ts.now(),
+            'end' : None,
+            'wall_time' : 0.0,
+            'status' : 'running',
+        }
+        span.update({counter:0 for counter in self.counters})
+        span.update({measurement:None for measurement in self.memory_measurements})
+        if self.trace_memory and len(self.open_spans)==0:
+            self.start_memory_tracing()
+        else:
+            pass
+        if hot_path_counters.enabled and len(self.open_spans)==0:
+            hot_path_counters.reset()
+        else:
+            pass
+        self.open_spans.append(span)
+
+    def stop(self,name:str=None,status:str='completed'):
+        '''
+        closes the named span, or the innermost span if no name is given,
+        along with any spans still open within it, adding its counts to the
+        enclosing span.
+
+        parameters:
+            name - an optional string naming the span to close
+            status - a string describing the outcome of the span, e.g.,
+                'completed' or 'failed'
+        '''
+        if name is None or name in [span['name'] for span in self.open_spans]:
+            closing = False
+            while not closing:
+                span = self.open_spans.pop()
+                closing = name is None or span['name']==name
+                span['end'] = ts.now()
+                span['wall_time'] = (span['end'] - span['start']).total_seconds()
+                span['status'] = status if closing else 'interrupted'
+                span['peak_rss'] = get_peak_rss()
+                if self.tracing_memory and len(self.open_spans)==0:
+                    self.stop_memory_tracing(span)
+                else:
+                    pass
+                if hot_path_counters.enabled and len(self.open_spans)==0:
+                    self.hot_paths[span['span']] = hot_path_counters.reset()
+                else:
+                    pass
+                if len(self.open_spans)>0:
+                    for counter in self.counters:
+                        self.open_spans[-1][counter] += span[counter]
+                else:
+                    pass
+                self.spans.append(span)
+            if len(self.open_spans)==0:
+                self.commit()
+            else:
+                pass
+        else:
+            pass
+
+    @contextmanager
+    def span(self,name:str):
+        '''
+        a context manager which opens a span and closes it when the enclosed
+        block completes, marking the span as failed if an exception is raised.
+        outermost spans are profiled if a profile directory is set.
+
+        parameters:
+            name - a string naming the stage or sub-step
+        '''
+        if self.profile_directory is not None and len(self.open_spans)==0:
+            profiler = cProfile.Profile()
+        else:
+            profiler = None
+        self.start(name)
+        if profiler is not None:
+            profiler.enable()
+        else:
+            pass
+        try:
+            yield self
+        except:
+            self.stop_profile(profiler,name)
+            self.stop(name,'failed')
+            raise
+        else:
+            self.stop_profile(profiler,name)
+            self.stop(name)
+
+    def stop_profile(self,profiler:cProfile.Profile,name:str):
+        '''
+        stops a profiler and saves its statistics for the named span to a
+        .prof file in the profile directory, readable with the pstats module
+        or a viewer such as snakeviz, then appends the span's most expensive
+        functions by cumulative time to a csv summary of all profiled runs.
+
+        parameters:
+            profiler - a cProfile.Profile object, or None if not profiling
+            name - a string naming the profiled span
+        '''
+        if profiler is not None:
+            profiler.disable()
+            try:
+                self.profile_directory.mkdir(parents=True,exist_ok=True)
+                prefix = self.manifest_path.stem.replace('_manifest','')
+                profiler.dump_stats(str(self.profile_directory / '{}_{}.prof'.format(prefix,name)))
+                statistics = pstats.Stats(profiler,stream=io.StringIO())
+                functions = sorted(statistics.stats.items(),key=lambda item: item[1][3],reverse=True)[:self.profile_top_functions]
+                summary = pd.DataFrame(
+                    [
+                        {
+                            'run_id' : self.run_id,
+                            'span' : name,
+                            'rank' : rank + 1,
+                            'function' : '{}:{}({})'.format(filename,line_number,function_name),
+                            'primitive_calls' : primitive_calls,
+                            'calls' : calls,
+                            'total_time' : total_time,
+                            'cumulative_time' : cumulative_time,
+                        }
+                        for rank,((filename,line_number,function_name),(primitive_calls,calls,total_time,cumulative_time,_)) in enumerate(functions)
+                    ],
+                    columns=['run_id','span','rank','function','primitive_calls','calls','total_time','cumulative_time']
+                )
+                for label,value in self.labels.items():
+                    summary = summary.assign(**{label:value})
+                summary_path = self.profile_directory / '{}_profile.csv'.format(prefix)
+                summary.to_csv(summary_path,mode='a',header=not summary_path.is_file(),index=False)
+            except OSError:
+                pass
+        else:
+            pass
+
+    def start_memory_tracing(self):
+        '''
+        starts tracing python memory allocations for an outermost span, or
+        resets the traced peak if allocations are already being traced.
+        '''
+        if tracemalloc.is_tracing():
+            if hasattr(tracemalloc,'reset_peak'):
+                tracemalloc.reset_peak()
+            else:
+                pass
+            self.tracing_memory = 'external'
+        else:
+            tracemalloc.start()
+            self.tracing_memory = 'internal'
+
+    def stop_memory_tracing(self,span:dict):
+        '''
+        takes a snapshot of the traced allocations at the end of an outermost
+        span, recording the span's traced peak and current memory and the
+        largest allocation sites and packages, then stops tracing if tracing
+        was started for the span so the next span's peak is measured
+        separately.
+
+        parameters:
+            span - the dictionary of an outermost span being closed
+        '''
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False,tracemalloc.__file__),
+            tracemalloc.Filter(False,'<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False,'<unknown>'),
+        ])
+        (span['traced_current'],span['traced_peak']) = tracemalloc.get_traced_memory()
+        if self.tracing_memory=='internal':
+            tracemalloc.stop()
+        else:
+            pass
+        self.tracing_memory = False
+        sources = {}
+        for statistic in snapshot.statistics('filename'):
+            source = get_allocation_source(statistic.traceback[0].filename)
+            (size,count) = sources.get(source,(0,0))
+            sources[source] = (size+statistic.size,count+statistic.count)
+        self.allocations[span['span']] = {
+            'sources' : [
+                {'source':source,'size':size,'count':count}
+                for source,(size,count) in sorted(sources.items(),key=lambda item: item[1][0],reverse=True)[:self.memory_top_sites]
+            ],
+            'sites' : [
+                {'site':'{}:{}'.format(statistic.traceback[0].filename,statistic.traceback[0].lineno),'size':statistic.size,'count':statistic.count}
+                for statistic in snapshot.statistics('lineno')[:self.memory_top_sites]
+            ],
+        }
+
+    def count(self,rows:int=0,files_read:int=0,bytes_read:int=0,bytes_written:int=0):
+        '''
+        adds counts to the innermost open span, if any.
+
+        parameters:
+            rows - the number of rows processed
+            files_read - the number of files read
+            bytes_read - the number of bytes read
+            bytes_written - the number of bytes written
+        '''
+        if len(self.open_spans)>0:
+            span = self.open_spans[-1]
+            span['rows'] += int(rows)
+            span['files_read'] += int(files_read)
+            span['bytes_read'] += int(bytes_read)
+            span['bytes_written'] += int(bytes_written)
+        else:
+            pass
+
+    def count_file(self,path:Path,mode:str='read'):
+        '''
+        counts a file read or written by the innermost open span, along with
+        its size in bytes.
+
+        parameters:
+            path - a path object pointing to the file
+            mode - either 'read' or 'written'
+        '''
+        if path is not None and Path(path).is_file():
+            size = Path(path).stat().st_size
+            if mode=='read':
+                self.count(files_read=1,bytes_read=size)
+            else:
+                self.count(bytes_written=size)
+        else:
+            pass
+
+    def commit(self):
+        '''
+        writes the run manifest with all closed spans, appends spans closed
+        since the last commit to the csv table of spans, and writes the
+        prometheus textfile if one is set.
+        '''
+        try:
+            spans = pd.DataFrame(self.spans,columns=['span','name','parent','start','end','wall_time','status']+self.counters+self.memory_measurements)
+            spans = spans.assign(
+                start=spans.loc[:,'start'].map(lambda t: t.strftime('%Y-%m-%d %H:%M:%S.%f')),
+                end=spans.loc[:,'end'].map(lambda t: t.strftime('%Y-%m-%d %H:%M:%S.%f')),
+                **{measurement:pd.Series([int(value) if pd.notna(value) else None for value in spans.loc[:,measurement]],index=spans.index,dtype=object) for measurement in self.memory_measurements}
+            )
+            self.manifest_path.parent.mkdir(parents=True,exist_ok=True)
+            manifest = {
+                'run_id' : self.run_id,
+                'labels' : self.labels,
+                'spans' : spans.sort_values('start',kind='mergesort').astype(object).where(spans.notna(),None).to_dict(orient='records'),
+                'allocations' : self.allocations,
+                'hot_paths' : self.hot_paths,
+            }
+            with self.manifest_path.open(mode='w') as f:
+                json.dump(manifest,f,indent=2)
+            table_path = self.manifest_path.with_suffix('.csv')
+            new_spans = spans.iloc[self.committed_spans:,:]
+            for label,value in self.labels.items():
+                new_spans = new_spans.assign(**{label:value})
+            new_spans.assign(run_id=self.run_id).to_csv(table_path,mode='a',header=not table_path.is_file(),index=False)
+            self.committed_spans = len(spans)
+            if self.metrics_path is not None:
+                self.write_metrics(spans.drop_duplicates('span',keep='last'))
+            else:
+                pass
+        except OSError:
+            pass
+
+    def write_metrics(self,spans:pd.DataFrame):
+        '''
+        writes gauges for each span's wall time and counts to a prometheus
+        textfile, replacing the file in a single step so a collector never
+        reads a partial file.
+
+        parameters:
+            spans - a dataframe of closed spans
+        '''
+        metrics = [
+            ('wall_time','ra_filings_span_wall_time_seconds','Wall time of each stage and sub-step in the latest run.'),
+            ('rows','ra_filings_span_rows','Rows processed by each stage and sub-step in the latest run.'),
+            ('files_read','ra_filings_span_files_read','Files read by each stage and sub-step in the latest run.'),
+            ('bytes_read','ra_filings_span_bytes_read','Bytes read by each stage and sub-step in the latest run.'),
+            ('bytes_written','ra_filings_span_bytes_written','Bytes written by each stage and sub-step in the latest run.'),
+            ('peak_rss','ra_filings_span_peak_rss_bytes','Peak resident set size of the process when each stage and sub-step closed in the latest run.'),
+            ('traced_peak','ra_filings_span_traced_peak_bytes','Peak traced python memory during each stage in the latest run.'),
+        ]
+        def get_labels(span:pd.Series):
+            labels = dict(self.labels)
+            labels.update({'span':span.loc['span'],'status':span.loc['status']})
+            return ','.join(['{}="{}"'.format(label,str(value).replace('\\','\\\\').replace('"','\\"')) for label,value in labels.items()])
+        lines = []
+        for column,metric,description in metrics:
+            lines.append('# HELP {} {}'.format(metric,description))
+            lines.append('# TYPE {} gauge'.format(metric))
+            for _,span in spans.loc[spans.loc[:,column].notna(),:].iterrows():
+                lines.append('{}{{{}}} {}'.format(metric,get_labels(span),span.loc[column]))
+        for key,metric,description in [('calls','ra_filings_hot_path_calls','Calls to each instrumented operation by function during each stage in the latest run.'),('items','ra_filings_hot_path_items','Items, e.g., cells, processed by each instrumented operation by function during each stage in the latest run.')]:
+            if len(self.hot_paths)>0:
+                lines.append('# HELP {} {}'.format(metric,description))
+                lines.append('# TYPE {} gauge'.format(metric))
+                for span,counts in self.hot_paths.items():
+                    for count in counts:
+                        labels = dict(self.labels)
+                        labels.update({'span':span,'operation':count['operation'],'function':count['function']})
+                        lines.append('{}{{{}}} {}'.format(metric,','.join(['{}="{}"'.format(label,value) for label,value in labels.items()]),count[key]))
+            else:
+                pass
+        lines.append('# HELP ra_filings_run_timestamp_seconds Start time of the latest run.')
+        lines.append('# TYPE ra_filings_run_timestamp_seconds gauge')
+        lines.append('ra_filings_run_timestamp_seconds{{{}}} {}'.format(
+            ','.join(['{}="{}"'.format(label,value) for label,value in self.labels.items()]),
+            ts(self.run_id).timestamp()
+        ))
+        self.metrics_path.parent.mkdir(parents=True,exist_ok=True)
+        temporary_path = self.metrics_path.with_name(self.metrics_path.name+'.tmp')
+        with temporary_path.open(mode='w') as f:
+            f.write('\n'.join(lines)+'\n')
+        temporary_path.replace(self.metrics_path)
+
 class DataLogger:
     '''
     data can be logged to a specified csv file. this class either loads data
@@ -141,6 +658,20 @@ class DataLogger:
         self.dtypes = {column:dtype for column,dtype in [('log_timestamp','datetime64[us]')]+list(dtypes.items())}
         self.set_delimiter(delimiter)
         self.set_log_path(log_path)
+    @property
+    def data(self):
+        '''
+        the log's dataframe, with each access from outside this module, e.g.,
+        to build a boolean mask, counted when hot path counting is enabled.
+        '''
+        if hot_path_counters.enabled and sys._getframe(1).f_code.co_filename!=__file__:
+            hot_path_counters.count('{}.data'.format(type(self).__name__),len(self._data))
+        else:
+            pass
+        return self._data
+    @data.setter
+    def data(self,data:pd.DataFrame):
+        self._data = data
     def log(self,data:pd.Series):
         '''
         appends a single row of input data to the dataframe.
@@ -150,6 +681,15 @@ class DataLogger:
         '''
         data['log_timestamp'] = ts.now()
         self.data = self.data.append(data,ignore_index=True)
+    def log_batch(self,data:pd.DataFrame):
+        '''
+        appends multiple rows of input data to the dataframe with a common
+        timestamp.
+
+        parameters:
+            data - a pandas dataframe containing rows of data to include in the log
+        '''
+        self.data = pd.concat([self.data,data.assign(log_timestamp=ts.now())],ignore_index=True)
     def load_log(self):
         '''
         checks the log file against the current list of columns and either
@@ -159,6 +699,9 @@ class DataLogger:
             dtypes = {column:dtype for column,dtype in filter(lambda x: not re.match('datetime.*',x[1]),self.dtypes.items())}
             parse_dates = list(filter(lambda k: re.match('datetime.*',self.dtypes[k]),self.dtypes.keys()))
             file_data = pd.read_csv(self.log_path,dtype=dtypes,parse_dates=parse_dates,delimiter=self.delimiter)
+            # text columns added since the log was saved are left blank:
+            for column in filter(lambda k: k not in file_data.columns and self.dtypes[k]=='string',self.dtypes.keys()):
+                file_data.loc[:,column] = ''
             if all([column in file_data.columns for column in self.dtypes.keys()]):
                 for date_column in parse_dates:
                     file_data.loc[:,date_column] = file_data.loc[:,date_column].astype(self.dtypes[date_column])
@@ -205,7 +748,142 @@ class DataLogger:
         columns = list(self.dtypes.keys())
         self.data.loc[:,columns].sort_values('log_timestamp').to_csv(self.log_path,sep=self.delimiter,index=False)
 
-class EmailLogger(DataLogger):
+class KeyedDataLogger(DataLogger):
+    '''
+    a data logger whose rows are identified by a key column, e.g., an email
+    or attachment id, with rows looked up and updated by key through an index
+    of each key's row labels rather than by masking the whole dataframe.
+    updates are held until the log is flushed, which applies them to the
+    dataframe in a single batch per column, and are flushed whenever the
+    dataframe is accessed. the index is rebuilt when the dataframe is
+    replaced, or after invalidate is called by code which has modified the
+    dataframe in place.
+    '''
+    def __init__(self,key_column:str,dtypes:dict=dict(),log_path:Path=Path.cwd()/'default.csv',delimiter:str='\t'):
+        '''
+        initializes an instance of the KeyedDataLogger class as a subclass of
+        the DataLogger class.
+
+        parameters:
+            key_column - the name of the column identifying each row
+            dtypes - dictionary of columns and their data types
+            log_path - path object pointing to the file to which data will be logged
+            delimiter - delimiter to use when logging data
+        '''
+        self.key_column = key_column
+        super().__init__(dtypes=dtypes,log_path=log_path,delimiter=delimiter)
+    @property
+    def data(self):
+        '''
+        the log's dataframe, with any pending updates applied. each access is
+        counted when hot path counting is enabled. invalidate must be called
+        after modifying the dataframe in place.
+        '''
+        self.flush()
+        if hot_path_counters.enabled:
+            hot_path_counters.count('{}.data'.format(type(self).__name__),len(self._data))
+        else:
+            pass
+        return self._data
+    @data.setter
+    def data(self,data:pd.DataFrame):
+        self._data = data
+        self.key_labels = None
+        self.pending_updates = dict()
+    def invalidate(self):
+        '''
+        clears the index of keys, to be rebuilt at the next lookup. called
+        after the dataframe has been modified in place, e.g., through
+        data.loc, since rows may have been added, removed, or rekeyed.
+        '''
+        self.flush()
+        self.key_labels = None
+    def get_key_labels(self):
+        '''
+        returns a dictionary of the row labels for each key, building it from
+        the key column if necessary.
+        '''
+        if self.key_labels is None:
+            self.key_labels = dict()
+            for label,key in zip(self._data.index,self._data.loc[:,self.key_column]):
+                self.key_labels.setdefault(key,[]).append(label)
+        else:
+            pass
+        return self.key_labels
+    def contains(self,key:str):
+        '''
+        returns true if the log contains a row with the given key.
+
+        parameters:
+            key - the value of the key column to look for
+        '''
+        return key in self.get_key_labels().keys()
+    def __contains__(self,key:str):
+        return self.contains(key)
+    def get(self,key:str):
+        '''
+        returns the first row with the given key as a pandas series, including
+        any pending updates, or raises a KeyError if the key is not logged.
+
+        parameters:
+            key - the value of the key column of the row to return
+        '''
+        label = self.get_key_labels()[key][0]
+        row = self._data.loc[label,:].copy()
+        for column,values in self.pending_updates.items():
+            if label in values.keys():
+                row.loc[column] = values[label]
+            else:
+                pass
+        return row
+    def update(self,key:str,values:dict):
+        '''
+        sets the given column values in each row with the given key, to be
+        applied to the dataframe when the log is next flushed.
+
+        parameters:
+            key - the value of the key column of the rows to update
+            values - a dictionary of column names and their new values
+        '''
+        for label in self.get_key_labels()[key]:
+            for column,value in values.items():
+                self.pending_updates.setdefault(column,dict())[label] = value
+    def flush(self):
+        '''
+        applies pending updates to the dataframe in a single batch per column.
+        '''
+        if len(self.pending_updates)>0:
+            pending_updates = self.pending_updates
+            self.pending_updates = dict()
+            for column,values in pending_updates.items():
+                self._data.loc[list(values.keys()),column] = list(values.values())
+        else:
+            pass
+    def log(self,data:pd.Series):
+        '''
+        appends a single row of input data to the dataframe, adding its key to
+        the index of keys if the dataframe's row labels are unchanged.
+
+        parameters:
+            data - a pandas series containing data to include in the log
+        '''
+        key_labels = self.key_labels
+        index = self._data.index
+        preserved_labels = isinstance(index,pd.RangeIndex) and index.start==0 and index.step==1
+        super().log(data)
+        if key_labels is not None and preserved_labels:
+            key_labels.setdefault(data.loc[self.key_column],[]).append(self._data.index[-1])
+            self.key_labels = key_labels
+        else:
+            pass
+    def commit(self):
+        '''
+        flushes pending updates and writes the log dataframe to file.
+        '''
+        self.flush()
+        super().commit()
+
+class EmailLogger(KeyedDataLogger):
     '''
     a data logger for tracking kiteworks emails from which attachments are
     downloaded.
@@ -228,13 +906,14 @@ class EmailLogger(DataLogger):
             'group' : 'string',
         }
         super().__init__(
+            key_column='email_id',
             dtypes=email_log_dtypes,
             log_path=log_path,
             delimiter=',',
         )
         self.data.loc[:,'receipt_date'] = self.data.loc[:,'receipt_date']
 
-class AttachmentLogger(DataLogger):
+class AttachmentLogger(KeyedDataLogger):
     '''
     a data logger for tracking attachments downloaded from kiteworks.
     '''
@@ -255,8 +934,10 @@ class AttachmentLogger(DataLogger):
             'organization_id' : 'string',
             'effective_date' : 'datetime64[D]',
             'archive_path' : 'string',
+            'file_hash' : 'string',
         }
         super().__init__(
+            key_column='attachment_id',
             dtypes=attachment_log_dtypes,
             log_path=log_path,
             delimiter=',',
@@ -268,8 +949,38 @@ class AttachmentLogger(DataLogger):
         self.data.loc[:,'ra_category'] = 'not_validated'
         self.data.loc[:,['organization_id','archive_path']]=''
         self.data.loc[:,'effective_date']=None
+        self.invalidate()
         self.commit()
 
+class ClassificationLogger(DataLogger):
+    '''
+    a data logger for memoizing attachment classifications by file contents,
+    so that identical attachments are not re-read when validated again.
+    '''
+    def __init__(self,log_path:Path):
+        '''
+        initializes an instance of the ClassificationLogger class as a subclass
+        of the DataLogger class.
+
+        parameters:
+            log_path - a path object pointing to the file where attachment
+                classifications should be logged.
+        '''
+        classification_log_dtypes = {
+            'file_hash' : 'string',
+            'sender_group' : 'string',
+            'filename' : 'string',
+            'filing_month' : 'datetime64[D]',
+            'ra_category' : 'string',
+            'organization_id' : 'string',
+            'effective_date' : 'datetime64[D]',
+        }
+        super().__init__(
+            dtypes=classification_log_dtypes,
+            log_path=log_path,
+            delimiter=',',
+        )
+
 class ConsolidationLogger(DataLogger):
     '''
     a data logger for tracking files relevant to a particular filing month.
@@ -291,6 +1002,7 @@ class ConsolidationLogger(DataLogger):
             'archive_path' : 'string',
             'status' : 'string',
             'compliance' : 'string',
+            'file_hash' : 'string',
         }
         super().__init__(
             dtypes=consolidation_log_dtypes,
@@ -2,19 +2,22 @@ from bdb import effective
 import io
 import os
 import re
+import json
 import xlrd
+import hashlib
+import time
 import shutil
 import pandas as pd
-from pathlib import Path
+from pathlib import Path,PurePath
 from openpyxl import load_workbook
-from openpyxl.utils.cell import get_column_letter
 from pandas import Timestamp as ts
 from datetime import datetime as dt
-from zipfile import BadZipFile, ZipFile
+from zipfile import BadZipFile, ZipFile, ZipInfo, ZIP_STORED, ZIP_DEFLATED
+from concurrent.futures import ProcessPoolExecutor,ThreadPoolExecutor
 
 from configuration_options import ConfigurationOptions
-from ra_logging import TextLogger,EmailLogger,AttachmentLogger
-from data_extraction import open_workbook,get_data_range
+from ra_logging import TextLogger,EmailLogger,AttachmentLogger,ClassificationLogger,TimingLogger
+from data_extraction import open_workbook,get_data_range,get_workbook_sheetnames,get_file_hash
 
 # 2021-11-04
 # California Public Utilities Commission
@@ -36,6 +39,7 @@ class Organizer:
             filing_month - an optional filing month timestamp to overwrite the
                 date in the configuration options yaml file
         '''
+        self.configuration_path = configuration_path
         self.config = ConfigurationOptions(configuration_path,filing_month=filing_month)
         self.logger = TextLogger(
             self.config.get_option('cli_logging_criticalities'),
@@ -44,6 +48,15 @@ class Organizer:
         )
         self.email_logger = EmailLogger(log_path=self.config.paths.get_path('email_log'))
         self.attachment_logger = AttachmentLogger(log_path=self.config.paths.get_path('attachment_log'))
+        self.classification_logger = ClassificationLogger(log_path=self.config.paths.get_path('classification_log'))
+        self.timer = TimingLogger(
+            self.config.paths.get_path('run_manifest'),
+            self.config.paths.get_path('run_metrics') if self.config.get_option('run_metrics_filename') is not None else None,
+            {'filing_month':self.config.filing_month.strftime('%Y-%m')},
+            self.config.get_option('trace_memory'),
+            self.config.get_option('count_hot_paths')
+        )
+        self.watching = False
 
     def validate_attachment(self,attachment_id:str):
         '''
@@ -54,276 +67,75 @@ class Organizer:
             attachment_id - a string representing a single email attachment
                 downloaded from kiteworks
         '''
-        def set_attachment_value(column,value):
-            attachment_selection = (self.attachment_logger.data.loc[:,'attachment_id']==attachment_id)
-            self.attachment_logger.data.loc[attachment_selection,column] = value
-        attachment = self.attachment_logger.data.loc[(self.attachment_logger.data.loc[:,'attachment_id']==attachment_id),:].iloc[0]
+        attachment = self.attachment_logger.get(attachment_id)
         download_path = Path(attachment.loc['download_path'])
-        emails = self.email_logger.data
-        email_information = emails.loc[(emails.loc[:,'email_id']==attachment.loc['email_id']),:].iloc[0]
+        email_information = self.email_logger.get(attachment.loc['email_id'])
         self.logger.log('Validating Attachment: {} ({})'.format(attachment_id,download_path),'INFORMATION')
         if download_path.is_file():
-            if download_path.suffix in ('.xlsx','.xlsm'):
-                with open(download_path,'rb') as f:
-                    in_mem_file = io.BytesIO(f.read())
-                    try:
-                        sheetnames = {
-                            'monthly_filing' : [
-                                'Certification',
-                                'LSE Allocations',
-                                'I_Phys_Res_Import_RA_Res',
-                                'III_Demand_Response',
-                            ],
-                            'cam_rmr_update' : ['Jun to Dec CAM Update','Diablo Canyon Credits'],
-                            'incremental_local' : ['IncrementalLocal'],
-                            'year_ahead' : [
-                                'loadforecastinputdata',
-                                'DRforAllocation',
-                                'Flexrequirements',
-                                'Flex RMR',
-                                'Local RA-CAM-{}'.format(pd.to_datetime(self.config.filing_month).year),
-                            ],
-                            'month_ahead' : ['Monthly Tracking'],
-                            'cam_rmr' : [
-                                'CAMRMR',
-                                'monthlytracking',
-                            ],
-                            'supply_plan': ['Export'],
-                            'nqc_list' : r'(\d{4}).*NQC List',
-                        }
-                        wb = load_workbook(in_mem_file,data_only=True,read_only=True)
-                        # monthly filing:
-                        if all([sheetname in wb.sheetnames for sheetname in sheetnames['monthly_filing']]):
-                            set_attachment_value('ra_category','ra_monthly_filing')
-                            sheet = wb['Certification']
-                            if self.config.organizations.lookup_id(sheet['B5'].value):
-                                submittal_information = {
-                                    'date' : sheet['B3'].value,
-                                    'organization_full' : sheet['B5'].value,
-                                    'organization_id' : self.config.organizations.lookup_id(sheet['B5'].value),
-                                    'organization_representative' : {
-                                        'name' : sheet['B21'].value,
-                                        'title' : sheet['B23'].value,
-                                        'email' : sheet['B22'].value,
-                                        'sign_date' : sheet['B24'].value,
-                                    },
-                                    'organization_contact' : {
-                                        'name' : sheet['B28'].value,
-                                        'title' : sheet['B29'].value,
-                                        'address' : '{}\n{}\n{}, {} {}'.format(
-                                            sheet['B30'].value,
-                                            sheet['B31'].value,
-                                            sheet['B32'].value,
-                                            sheet['B33'].value,
-                                            sheet['B34'].value
-                                        ),
-                                        'phone' : sheet['B35'].value,
-                                        'email' : sheet['B36'].value,
-                                    },
-                                    'organization_backup_contact' : {
-                                        'name' : sheet['B40'].value,
-                                        'title' : sheet['B41'].value,
-                                        'phone' : sheet['B42'].value,
-                                        'email' : sheet['B43'].value,
-                                    },
-                                    'compliance_period' : sheet['B3'].value,
-                                    'submittal_date' : sheet['B7'].value,
-                                }
-                                effective_date = submittal_information['date']
-                                if not isinstance(effective_date,dt):
-                                    effective_date = self.config.filing_month
-                                else:
-                                    pass
-                                set_attachment_value('effective_date',effective_date)
-                                set_attachment_value('organization_id',submittal_information['organization_id'])
-                            else:
-                                self.logger.log('Load Serving Entity Alias Not Recognized: \'{}\'\tAdd ID and Aliases to {}'.format(sheet['B5'].value,self.config.paths.get_path('organizations')),'WARNING')
-                                effective_date = self.config.filing_month
-                                set_attachment_value('effective_date',effective_date)
-                                set_attachment_value('organization_id','[LSE Alias Not Recognized]')
-                        # CAM, RMR, and Diablo Canyon credit true-up:
-                        elif all([sheetname in wb.sheetnames for sheetname in sheetnames['cam_rmr_update']]) and email_information.loc['group']=='internal':
-                            set_attachment_value('ra_category','cam_rmr_update')
-                            set_attachment_value('organization_id','CEC')
-                            if re.match(r'.*(\d{4}).*',download_path.name):
-                                effective_date = pd.to_datetime(re.match(r'.*(\d{4}).*',download_path.name).groups()[0]).replace(month=6)
-                                set_attachment_value('effective_date',effective_date)
-                            else:
-                                effective_date = self.config.filing_month.replace(month=6)
-                                set_attachment_value('effective_date',effective_date)
-                        # incremental local:
-                        elif all([sheetname in wb.sheetnames for sheetname in sheetnames['incremental_local']]) and email_information.loc['group']=='internal':
-                            set_attachment_value('ra_category','incremental_local')
-                            set_attachment_value('organization_id','CEC')
-                            if re.match(r'.*(\d{4}).*',download_path.name):
-                                effective_date = pd.to_datetime(re.match(r'.*(\d{4}).*',download_path.name).groups()[0]).replace(month=7)
-                                set_attachment_value('effective_date',effective_date)
-                            else:
-                                effective_date = self.config.filing_month.replace(month=7)
-                                set_attachment_value('effective_date',effective_date)
-                        # year ahead:
-                        elif all([sheetname in wb.sheetnames for sheetname in sheetnames['year_ahead']]) and email_information.loc['group']=='internal':
-                            set_attachment_value('ra_category','year_ahead')
-                            set_attachment_value('organization_id','CEC')
-                            if re.match(r'.*(\d{4}).*',download_path.name):
-                                effective_date = pd.to_datetime(re.match(r'.*(\d{4}).*',download_path.name).groups()[0])
-                                set_attachment_value('effective_date',effective_date)
-                            else:
-                                effective_date = self.config.filing_month
-                                set_attachment_value('effective_date',effective_date)
-                        # month ahead:
-                        elif all([sheetname in wb.sheetnames for sheetname in sheetnames['month_ahead']]) and email_information.loc['group']=='internal':
-                            set_attachment_value('ra_category','month_ahead')
-                            set_attachment_value('organization_id','CPUC')
-                            if re.match(r'.*(\d{4}).*',download_path.name):
-                                effective_date = pd.to_datetime(re.match(r'.*(\d{4}).*',download_path.name).groups()[0])
-                                set_attachment_value('effective_date',effective_date)
-                            else:
-                                effective_date = self.config.filing_month
-                                set_attachment_value('effective_date',effective_date)
-                        # cam-rmr:
-                        elif all([sheetname in wb.sheetnames for sheetname in sheetnames['cam_rmr']]) and email_information.loc['group']=='internal':
-                            effective_date = pd.to_datetime(dt.strptime(' '.join(re.match(r'(\w{3})MA(\d{2})',wb['CAMRMR']['A1'].value).groups()),'%b %y'))
-                            set_attachment_value('ra_category','cam_rmr')
-                            set_attachment_value('organization_id','CPUC')
-                            set_attachment_value('effective_date',effective_date)
-                        # nqc list:
-                        elif any([re.match(sheetnames['nqc_list'], s) for s in wb.sheetnames]):
-                            matching_sheetnames = filter(lambda s: s,[re.match(sheetnames['nqc_list'], s) for s in wb.sheetnames])
-                            effective_date = ts(min([int(x.groups()[0]) for x in matching_sheetnames]),1,1)
-                            set_attachment_value('ra_category','nqc_list')
-                            set_attachment_value('organization_id','CPUC')
-                            set_attachment_value('effective_date',effective_date)
-                        # system and flexible supply plans:
-                        elif all(sheetname in wb.sheetnames for sheetname in sheetnames['supply_plan']):
-                            sheet = wb[sheetnames['supply_plan'][0]]
-                            columns = [sheet['{}1'.format(get_column_letter(i+1))].value for i in range(sheet.max_column)]
-                            system_columns = [
-                                r'\s*validation\s*',
-                                r'\s*scid\s*',
-                                r'.*id\s*',
-                                r'\s*local.*',
-                                r'\s*system.*',
-                                r'.*total.*',
-                                r'.*start.*',
-                                r'.*end.*',
-                                r'.*lse.*',
-                                r'\s*errors.*warnings\s*',
-                            ]
-                            local_columns = [
-                                r'\s*validation\s*',
-                                r'\s*supplier\s*',
-                                r'.*id\s*',
-                                r'\s*category\s*',
-                                r'\s*flex.*',
-                                r'.*start.*',
-                                r'.*end.*',
-                                r'\s*lse\s*',
-                                r'\s*errors.*warnings\s*',
-                            ]
-                            effective_date_elements = re.match(r'.*\s(\d{1,2})[_\W](\d{1,2})[_\W](\d{2,4}).*',download_path.name).groups()
-                            if len(effective_date_elements[2])==2:
-                                effective_date = pd.to_datetime(dt.strptime('/'.join(effective_date_elements),'%m/%d/%y'))
-                            else:
-                                effective_date = pd.to_datetime(dt.strptime('/'.join(effective_date_elements),'%m/%d/%Y'))
-                            effective_date = effective_date.replace(effective_date.year+int((effective_date.month+1)/12),(effective_date.month+1)%12+1,1)
-                            if len(columns)>=len(system_columns) and all([re.match(s,columns[i].lower()) for i,s in enumerate(system_columns)]):
-                                set_attachment_value('ra_category','supply_plan_system')
-                                set_attachment_value('effective_date',effective_date)
-                                set_attachment_value('organization_id','CAISO')
-                            elif len(columns)>=len(local_columns) and all([re.match(s,columns[i].lower()) for i,s in enumerate(local_columns)]):
-                                set_attachment_value('ra_category','supply_plan_flexible')
-                                set_attachment_value('effective_date',effective_date)
-                                set_attachment_value('organization_id','CAISO')
-                            else:
-                                self.logger.log('Input Excel File Does Not Match Templates: '.format(download_path),'INFORMATION')
-                                set_attachment_value('ra_category','none')
-                                set_attachment_value('effective_date','NaT')
-                                set_attachment_value('organization_id','n/a')
-                            # system supply plan:
-                            # flexible supply plan:
-                        else:
-                            set_attachment_value('ra_category','none')
-                            set_attachment_value('organization_id','n/a')
-                            set_attachment_value('effective_date','NAT')
-                        wb.close()
-                    except BadZipFile:
-                        self.logger.log('Unable to open Excel file: {}'.format(download_path),'WARNING')
-                        set_attachment_value('ra_category','none')
-                        set_attachment_value('organization_id','n/a')
-                        set_attachment_value('effective_date','NAT')
-            # system and flexible supply plans (old format):
-            elif download_path.suffix=='.xls' and email_information.loc['group']=='internal':
-                wb = xlrd.open_workbook(download_path)
-                sheet = wb.sheet_by_index(0)
-                columns = [sheet.cell_value(rowx=0,colx=column_number) for column_number in range(sheet.ncols)]
-                system_columns = [
-                    r'\s*validation\s*',
-                    r'\s*scid\s*',
-                    r'.*id\s*',
-                    r'\s*local.*',
-                    r'\s*system.*',
-                    r'.*total.*',
-                    r'.*start.*',
-                    r'.*end.*',
-                    r'.*lse.*',
-                    r'\s*errors.*warnings\s*',
-                ]
-                local_columns = [
-                    r'\s*validation\s*',
-                    r'\s*supplier\s*',
-                    r'.*id\s*',
-                    r'\s*category\s*',
-                    r'\s*flex.*',
-                    r'.*start.*',
-                    r'.*end.*',
-                    r'\s*lse\s*',
-                    r'\s*errors.*warnings\s*',
-                ]
-                effective_date_elements = re.match(r'.*\s(\d{1,2})[_\W](\d{1,2})[_\W](\d{2,4}).*',download_path.name).groups()
-                if len(effective_date_elements[2])==2:
-                    effective_date = pd.to_datetime(dt.strptime('/'.join(effective_date_elements),'%m/%d/%y'))
-                else:
-                    effective_date = pd.to_datetime(dt.strptime('/'.join(effective_date_elements),'%m/%d/%Y'))
-                effective_date = effective_date.replace(effective_date.year+int((effective_date.month+1)/12),(effective_date.month+1)%12+1,1)
-                if len(columns)>=len(system_columns) and all([re.match(s,columns[i].lower()) for i,s in enumerate(system_columns)]):
-                    set_attachment_value('ra_category','supply_plan_system')
-                    set_attachment_value('effective_date',effective_date)
-                    set_attachment_value('organization_id','CAISO')
-                elif len(columns)>=len(local_columns) and all([re.match(s,columns[i].lower()) for i,s in enumerate(local_columns)]):
-                    set_attachment_value('ra_category','supply_plan_flexible')
-                    set_attachment_value('effective_date',effective_date)
-                    set_attachment_value('organization_id','CAISO')
-                else:
-                    self.logger.log('Input Excel File Does Not Match Templates: '.format(download_path),'INFORMATION')
-                    set_attachment_value('ra_category','none')
-                    set_attachment_value('effective_date','NaT')
-                    set_attachment_value('organization_id','n/a')
-            else:
-                self.logger.log('Skipping {} File: {}'.format(download_path.suffix,download_path),'INFORMATION')
-                set_attachment_value('ra_category','none')
-                set_attachment_value('effective_date','NaT')
-                set_attachment_value('organization_id','n/a')
+            self.timer.count_file(download_path,'read')
         else:
-            self.logger.log('Input File Not Found: {}'.format(download_path),'WARNING')
-            set_attachment_value('ra_category','none')
-            set_attachment_value('effective_date','NaT')
-            set_attachment_value('organization_id','n/a')
+            pass
+        self.update_attachments([(attachment_id,)+classify_attachment(self.config,download_path,email_information.loc['group'])])
+
+    def update_attachments(self,classifications:list):
+        '''
+        logs the messages from classifying attachments and updates the
+        attachment log with their categories, organizations, and effective
+        dates in a single batch, clearing their archive paths to be resolved
+        again by set_versions.
+
+        parameters:
+            classifications - a list of (attachment_id,attachment_values,
+                messages) tuples as returned by classify_attachments
+        '''
+        for _,_,messages in classifications:
+            for message,criticality in messages:
+                self.logger.log(message,criticality)
+        for attachment_id,attachment_values,_ in classifications:
+            self.attachment_logger.update(attachment_id,{
+                'ra_category' : attachment_values.get('ra_category'),
+                'organization_id' : attachment_values.get('organization_id'),
+                'effective_date' : pd.to_datetime(attachment_values.get('effective_date'),errors='coerce'),
+                'archive_path' : '',
+            })
         self.attachment_logger.commit()
 
-    def ingest_manual_downloads(self):
+    def get_download_paths(self):
         '''
-        checks for files in the download directories that do not appear in the
-        attachment log and adds them as manual overrides.
+        returns a list of (path,sender_group) tuples for each item in the
+        internal and external download directories.
         '''
-        ingest_timestamp = ts.now()
         downloads_internal = self.config.paths.get_path('downloads_internal').iterdir()
         downloads_external = self.config.paths.get_path('downloads_external').iterdir()
-        for path,sender_group in [(path,'internal') for path in downloads_internal] + [(path,'external') for path in downloads_external]:
-            if path.is_file() and str(path) not in self.attachment_logger.data.loc[:,'download_path'].values:
+        return [(path,'internal') for path in downloads_internal] + [(path,'external') for path in downloads_external]
+
+    def ingest_manual_downloads(self,paths:list=None):
+        '''
+        checks for files in the download directories that do not appear in the
+        attachment log and adds them as manual overrides. returns a list of
+        the ids assigned to the new attachments.
+
+        parameters:
+            paths - an optional list of (path,sender_group) tuples identifying
+                files to add to the attachment log, whether or not they
+                already appear in it; if not provided, the download
+                directories are checked for files not yet logged
+        '''
+        ingest_timestamp = ts.now()
+        if paths is None:
+            logged_paths = set(self.attachment_logger.data.loc[:,'download_path'].values)
+            paths = [(path,sender_group) for path,sender_group in self.get_download_paths() if str(path) not in logged_paths]
+        else:
+            pass
+        logged_email_ids = set(self.email_logger.data.loc[:,'email_id'].values)
+        attachment_counts = self.attachment_logger.data.loc[:,'email_id'].value_counts().to_dict()
+        attachment_ids = []
+        for path,sender_group in paths:
+            if path.is_file():
                 internal_bit = int(sender_group=='internal')
                 email_id = '00000000-0000-0000-0000-{}000{}'.format(ingest_timestamp.strftime('%Y%m%d'),internal_bit)
-                if email_id not in self.email_logger.data.loc[:,'email_id'].values:
+                if email_id not in logged_email_ids:
+                    logged_email_ids.add(email_id)
                     email_information = pd.Series({
                         'email_id' : email_id,
                         'sender' : 'manual_download',
@@ -333,7 +145,8 @@ class Organizer:
                         'group' : sender_group,
                     })
                     self.email_logger.log(email_information)
-                attachment_index = len(self.attachment_logger.data.loc[(self.attachment_logger.data.loc[:,'email_id']==email_id),'attachment_id'])
+                attachment_index = attachment_counts.get(email_id,0)
+                attachment_counts[email_id] = attachment_index + 1
                 attachment_id = '{}000{}{:020.0f}'.format(ingest_timestamp.strftime('%Y%m%d'),internal_bit,attachment_index)
                 attachment_information = pd.Series({
                     'email_id' : email_id,
@@ -343,47 +156,208 @@ class Organizer:
                     'organization_id' : '',
                     'effective_date' : '',
                     'archive_path' : '',
+                    'file_hash' : get_file_hash(path),
                 })
                 self.attachment_logger.log(attachment_information)
+                self.timer.count(rows=1)
+                attachment_ids.append(attachment_id)
+            else:
+                pass
         self.attachment_logger.commit()
         self.email_logger.commit()
+        return attachment_ids
+
+    def hash_attachments(self):
+        '''
+        calculates the content hash of each downloaded attachment in the
+        attachment log which doesn't yet have one.
+        '''
+        unhashed_attachments = self.attachment_logger.data.loc[:,'file_hash'].fillna('')==''
+        download_paths = self.attachment_logger.data.loc[unhashed_attachments,'download_path'].map(Path)
+        download_paths = download_paths.loc[download_paths.map(lambda path: path.is_file())]
+        for download_path in download_paths:
+            self.timer.count_file(download_path,'read')
+        self.attachment_logger.data.loc[download_paths.index,'file_hash'] = download_paths.map(get_file_hash)
+        self.attachment_logger.invalidate()
+
+    def expand_zip_attachments(self):
+        '''
+        adds each file within unvalidated zip attachments, including files
+        within nested zip archives, to the attachment log as an attachment of
+        the same email, to be classified and archived directly from the zip
+        archive without extracting it. the zip attachments themselves are
+        marked as not matching any ra category.
+        '''
+        attachments = self.attachment_logger.data
+        zip_attachments = attachments.loc[
+            (attachments.loc[:,'ra_category']=='not_validated') & \
+            (attachments.loc[:,'download_path'].fillna('').str.lower().str.endswith('.zip')),
+            ['email_id','attachment_id','download_path']
+        ]
+        logged_attachment_ids = set(attachments.loc[:,'attachment_id'].values)
+        member_attachments = []
+        for email_id,attachment_id,download_path in zip_attachments.itertuples(index=False):
+            try:
+                members = list_zip_members(Path(download_path))
+                self.logger.log('Reading {} Files in Zip Archive: {}'.format(len(members),download_path),'INFORMATION')
+            except (FileNotFoundError,BadZipFile):
+                members = []
+                self.logger.log('Unable to Read Zip Archive: {}'.format(download_path),'WARNING')
+            self.timer.count_file(Path(download_path),'read')
+            for member_index,(member_path,file_hash) in enumerate(members):
+                member_attachment_id = '{}-{:04.0f}'.format(attachment_id,member_index)
+                if member_attachment_id not in logged_attachment_ids:
+                    member_attachments.append({
+                        'email_id' : email_id,
+                        'attachment_id' : member_attachment_id,
+                        'download_path' : str(member_path),
+                        'ra_category' : 'not_validated',
+                        'organization_id' : '',
+                        'effective_date' : pd.NaT,
+                        'archive_path' : '',
+                        'file_hash' : file_hash,
+                    })
+                else:
+                    pass
+        if len(zip_attachments)>0:
+            zip_selection = self.attachment_logger.data.loc[:,'attachment_id'].isin(zip_attachments.loc[:,'attachment_id'])
+            self.attachment_logger.data.loc[zip_selection,'ra_category'] = 'none'
+            self.attachment_logger.data.loc[zip_selection,'organization_id'] = 'n/a'
+            self.attachment_logger.invalidate()
+            if len(member_attachments)>0:
+                self.attachment_logger.log_batch(pd.DataFrame(member_attachments))
+            else:
+                pass
+            self.attachment_logger.commit()
+        else:
+            pass
 
     def validate_all(self):
         '''
         validates each entry in the attachments_log and fills additional
-        information based on attachment contents.
+        information based on attachment contents. attachments with contents,
+        filename, and sender group matching a previously classified file
+        take the saved classification, and copies of the same file within
+        the attachment log are classified only once. the remaining
+        attachments are classified in parallel worker processes, and the
+        results are added to the attachment log in a single batch. files
+        within zip attachments are classified in place.
         '''
-        for _,attachment in self.attachment_logger.data.loc[(self.attachment_logger.data.loc[:,'ra_category']=='not_validated'),:].iterrows():
-            attachment_id = attachment.loc['attachment_id']
-            self.validate_attachment(attachment_id)
+        self.expand_zip_attachments()
+        self.hash_attachments()
+        unvalidated_attachments = self.attachment_logger.data.loc[(self.attachment_logger.data.loc[:,'ra_category']=='not_validated'),:]
+        unvalidated_attachments = unvalidated_attachments.merge(self.email_logger.data.loc[:,['email_id','group']].drop_duplicates('email_id'),how='left',on='email_id')
+        # saved classifications for the current filing month, keyed by file contents, filename, and sender group:
+        classification_log = self.classification_logger.data
+        classification_log = classification_log.loc[(classification_log.loc[:,'filing_month']==pd.to_datetime(self.config.filing_month)),:]
+        saved_classifications = {
+            (file_hash,sender_group,filename) : {'ra_category':ra_category,'organization_id':organization_id,'effective_date':effective_date}
+            for file_hash,sender_group,filename,ra_category,organization_id,effective_date in classification_log.loc[:,['file_hash','sender_group','filename','ra_category','organization_id','effective_date']].itertuples(index=False)
+        }
+        classifications = []
+        attachments = []
+        attachment_keys = dict()
+        queued_keys = set()
+        for attachment_id,download_path,sender_group,file_hash in unvalidated_attachments.loc[:,['attachment_id','download_path','group','file_hash']].itertuples(index=False):
+            key = (file_hash,sender_group,Path(download_path).name)
+            if file_hash!='' and key in saved_classifications.keys():
+                message = 'Using Saved Classification for Attachment: {} ({})'.format(attachment_id,download_path)
+                classifications.append((attachment_id,saved_classifications[key],[(message,'INFORMATION')]))
+            elif file_hash!='' and key in queued_keys:
+                # a copy of an attachment already queued for classification:
+                attachment_keys[attachment_id] = key
+            else:
+                self.logger.log('Validating Attachment: {} ({})'.format(attachment_id,download_path),'INFORMATION')
+                if Path(download_path).is_file():
+                    self.timer.count_file(Path(download_path),'read')
+                else:
+                    pass
+                attachments.append((attachment_id,download_path,sender_group))
+                attachment_keys[attachment_id] = key
+                queued_keys.add(key)
+        if len(attachments)>1:
+            # classify attachments in batches spread across worker processes:
+            batch_size = -(-len(attachments)//(4*(os.cpu_count() or 1)))
+            batches = [attachments[i:i+batch_size] for i in range(0,len(attachments),batch_size)]
+            with ProcessPoolExecutor() as executor:
+                futures = [executor.submit(classify_attachments,self.configuration_path,self.config.filing_month,batch) for batch in batches]
+                new_classifications = [classification for future in futures for classification in future.result()]
+        else:
+            new_classifications = [(attachment_id,)+classify_attachment(self.config,Path(download_path),sender_group) for attachment_id,download_path,sender_group in attachments]
+        # extend each new classification to copies of the same attachment and save it for reuse:
+        classified_ids = {attachment_id for attachment_id,_,_ in new_classifications}
+        new_classifications = {attachment_keys[attachment_id]:(attachment_values,messages) for attachment_id,attachment_values,messages in new_classifications}
+        for attachment_id,key in attachment_keys.items():
+            attachment_values,messages = new_classifications[key]
+            if attachment_id in classified_ids:
+                classifications.append((attachment_id,attachment_values,messages))
+            else:
+                message = 'Skipping Duplicate Attachment: {} -- Classified with Identical File'.format(attachment_id)
+                classifications.append((attachment_id,attachment_values,[(message,'INFORMATION')]))
+        new_classifications = pd.DataFrame(
+            [key+(self.config.filing_month,attachment_values.get('ra_category'),attachment_values.get('organization_id'),attachment_values.get('effective_date')) for key,(attachment_values,_) in new_classifications.items() if key[0]!=''],
+            columns=['file_hash','sender_group','filename','filing_month','ra_category','organization_id','effective_date']
+        )
+        if len(new_classifications)>0:
+            new_classifications.loc[:,'effective_date'] = pd.to_datetime(new_classifications.loc[:,'effective_date'],errors='coerce')
+            self.classification_logger.log_batch(new_classifications)
+            self.classification_logger.commit()
+        else:
+            pass
+        if len(classifications)>0:
+            self.update_attachments(classifications)
+        else:
+            pass
+        self.timer.count(rows=len(unvalidated_attachments))
 
     def set_versions(self):
         '''
-        determines the version numbers for each attachment in the attachment
-        log and sets the archive path for all entries in the attachment_log
-        which don't yet have one.
-        '''
-        columns = self.attachment_logger.data.columns
-        self.attachment_logger.data = self.attachment_logger.data.merge(self.email_logger.data.loc[:,['email_id','receipt_date']],on='email_id')
-        self.attachment_logger.data.loc[:,'version'] = \
-            self.attachment_logger.data.sort_values(['ra_category','organization_id','effective_date','receipt_date']) \
-            .groupby(['ra_category','organization_id','effective_date']).cumcount()
-        def get_archive_path(r):
-            ra_category = r.loc['ra_category']
-            organization = self.config.organizations.get_organization(r.loc['organization_id'])
-            if organization:
-                if r.loc['effective_date'] not in ('','n/a'):
-                    effective_date = r.loc['effective_date']
-                else:
-                    effective_date = self.config.filing_month
-                version = r.loc['version']
-                archive_path = str(self.config.paths.get_path(ra_category,organization=organization,date=effective_date,version=version))
-            else:
-                archive_path = ''
-            return archive_path
-        self.attachment_logger.data.loc[:,'archive_path'] = self.attachment_logger.data.apply(get_archive_path,axis='columns')
-        self.attachment_logger.data = self.attachment_logger.data.loc[:,columns]
+        determines the version numbers and sets the archive paths for entries
+        in the attachment_log which don't yet have one. archived attachments
+        keep their versions, and each new attachment is numbered after the
+        versions already archived for its category, organization, and
+        effective date, in order of receipt. copies of an earlier attachment
+        with the same contents share its version and archive path. archive
+        paths are resolved for all new attachments of each category at once.
+        '''
+        keys = ['ra_category','organization_id','effective_date']
+        attachments = self.attachment_logger.data
+        archived = attachments.loc[:,'archive_path'].fillna('')!=''
+        if (~archived).sum()==0:
+            return
+        else:
+            pass
+        receipt_dates = self.email_logger.data.drop_duplicates('email_id').set_index('email_id').loc[:,'receipt_date']
+        new_attachments = attachments.loc[~archived,keys+['file_hash']].assign(
+            file_hash=attachments.loc[~archived,'file_hash'].fillna(''),
+            receipt_date=attachments.loc[~archived,'email_id'].map(receipt_dates)
+        )
+        # copies of archived attachments take their archive paths:
+        archived_copies = attachments.loc[archived & (attachments.loc[:,'file_hash'].fillna('')!=''),keys+['file_hash','archive_path']] \
+            .drop_duplicates(keys+['file_hash'])
+        new_attachments = new_attachments.reset_index().merge(archived_copies,how='left',on=keys+['file_hash']).set_index('index')
+        # number new attachments after the versions already archived:
+        archived_versions = attachments.loc[archived,:].groupby(keys,dropna=False)['archive_path'].nunique().rename('archived_versions').reset_index()
+        uncopied = new_attachments.loc[:,'archive_path'].isna()
+        unversioned_attachments = new_attachments.loc[uncopied,:].sort_values(keys+['receipt_date'])
+        unversioned_attachments = unversioned_attachments.reset_index().merge(archived_versions,how='left',on=keys).set_index('index')
+        duplicates = unversioned_attachments.duplicated(keys+['file_hash']) & (unversioned_attachments.loc[:,'file_hash']!='')
+        unversioned_attachments.loc[:,'version'] = unversioned_attachments.loc[~duplicates,:].groupby(keys,dropna=False).cumcount() + \
+            unversioned_attachments.loc[~duplicates,'archived_versions'].fillna(0)
+        unversioned_attachments.loc[:,'version'] = unversioned_attachments.groupby(keys+['file_hash'],dropna=False)['version'].transform('first') \
+            .where(duplicates,unversioned_attachments.loc[:,'version'])
+        for ra_category,category_attachments in unversioned_attachments.groupby('ra_category'):
+            new_attachments.loc[category_attachments.index,'archive_path'] = self.config.paths.get_paths(
+                ra_category,
+                category_attachments.loc[:,'organization_id'],
+                category_attachments.loc[:,'effective_date'],
+                category_attachments.loc[:,'version'],
+                self.config.organizations
+            )
+        self.attachment_logger.data.loc[new_attachments.index,'archive_path'] = new_attachments.loc[:,'archive_path'].fillna('')
+        self.attachment_logger.invalidate()
         self.attachment_logger.commit()
+        self.timer.count(rows=len(new_attachments))
 
     def copy_rename(self,attachment_id:str):
         '''
@@ -393,15 +367,23 @@ class Organizer:
             attachment_id - a string representing a single email attachment
                 downloaded from kiteworks
         '''
-        attachment = self.attachment_logger.data.loc[(self.attachment_logger.data.loc[:,'attachment_id']==attachment_id),:].iloc[0]
+        attachment = self.attachment_logger.get(attachment_id)
         root_directory = Path(self.config.get_option('archive_root_directory'))
         download_path = Path(attachment.loc['download_path'])
         archive_path = Path(attachment.loc['archive_path'])
         if archive_path.name!='':
-            if download_path.is_file() and not archive_path.is_file():
+            if attachment_exists(download_path) and not archive_path.is_file():
                 archive_path.parent.mkdir(parents=True,exist_ok=True)
-                shutil.copyfile(download_path,root_directory/archive_path)
-                self.logger.log('Copying {} to {}'.format(download_path.relative_to(root_directory),archive_path),'INFORMATION')
+                if download_path.is_file():
+                    shutil.copyfile(download_path,root_directory/archive_path)
+                    self.timer.count_file(download_path,'read')
+                    self.logger.log('Copying {} to {}'.format(download_path.relative_to(root_directory),archive_path),'INFORMATION')
+                else:
+                    # extract a file within a zip attachment directly to the archive:
+                    with open_attachment(download_path) as f:
+                        (root_directory/archive_path).write_bytes(f.read())
+                    self.logger.log('Extracting {} to {}'.format(download_path.relative_to(root_directory),archive_path),'INFORMATION')
+                self.timer.count_file(root_directory/archive_path,'written')
             elif Path(archive_path).is_file():
                 self.logger.log('Skipping File {} -- Already Exists in Archive as {}'.format(download_path.relative_to(root_directory),archive_path),'INFORMATION')
             else:
@@ -411,38 +393,76 @@ class Organizer:
 
     def copy_rename_all(self):
         '''
-        copies all current attachments to their archive locations
+        copies all current attachments to their archive locations, skipping
+        copies of attachments with identical contents.
         '''
         self.attachment_logger.load_log()
         filing_month = pd.to_datetime(self.config.filing_month)
-        current_attachment_ids = self.attachment_logger.data.loc[
-            (
-                (
-                    (self.attachment_logger.data.loc[:,'ra_category']=='ra_monthly_filing') | \
-                    (self.attachment_logger.data.loc[:,'ra_category']=='supply_plan_system') | \
-                    (self.attachment_logger.data.loc[:,'ra_category']=='supply_plan_flexible') | \
-                    (self.attachment_logger.data.loc[:,'ra_category']=='cam_rmr')
-                ) & \
-                (self.attachment_logger.data.loc[:,'effective_date']==filing_month)
-            ) | \
-            (
-                (
-                    (self.attachment_logger.data.loc[:,'ra_category']=='year_ahead') | \
-                    (self.attachment_logger.data.loc[:,'ra_category']=='month_ahead') | \
-                    (self.attachment_logger.data.loc[:,'ra_category']=='nqc_list')
-                ) & \
-                (self.attachment_logger.data.loc[:,'effective_date']==filing_month.replace(month=1))
-            ) | \
-            (
-                (self.attachment_logger.data.loc[:,'ra_category']=='cam_rmr_update') & \
-                (self.attachment_logger.data.loc[:,'effective_date']==filing_month.replace(month=6))
-            ) | \
-            (
-                (self.attachment_logger.data.loc[:,'ra_category']=='incremental_local') & \
-                (self.attachment_logger.data.loc[:,'effective_date']==filing_month.replace(month=7))
-            ),'attachment_id']
-        for attachment_id in current_attachment_ids:
-            self.copy_rename(attachment_id)
+        # effective date of the current version of each category of file:
+        current_effective_dates = {
+            'ra_monthly_filing' : filing_month,
+            'supply_plan_system' : filing_month,
+            'supply_plan_flexible' : filing_month,
+            'cam_rmr' : filing_month,
+            'year_ahead' : filing_month.replace(month=1),
+            'month_ahead' : filing_month.replace(month=1),
+            'nqc_list' : filing_month.replace(month=1),
+            'cam_rmr_update' : filing_month.replace(month=6),
+            'incremental_local' : filing_month.replace(month=7),
+        }
+        current_attachments = self.attachment_logger.data.loc[
+            pd.to_datetime(self.attachment_logger.data.loc[:,'ra_category'].map(current_effective_dates))==self.attachment_logger.data.loc[:,'effective_date'],
+            ['attachment_id','download_path','archive_path','file_hash']
+        ]
+        duplicates = current_attachments.duplicated(['archive_path','file_hash']) & \
+            (current_attachments.loc[:,'archive_path'].fillna('')!='') & \
+            (current_attachments.loc[:,'file_hash'].fillna('')!='')
+        for attachment_id,archive_path in current_attachments.loc[duplicates,['attachment_id','archive_path']].itertuples(index=False):
+            self.logger.log('Skipping Duplicate Attachment {} -- Identical to File Archived as {}'.format(attachment_id,archive_path),'INFORMATION')
+        if self.config.get_option('archive_placement_mode')=='link':
+            self.place_attachments(current_attachments.loc[~duplicates,:])
+        else:
+            for attachment_id in current_attachments.loc[~duplicates,'attachment_id']:
+                self.copy_rename(attachment_id)
+
+    def place_attachments(self,attachments:pd.DataFrame):
+        '''
+        places attachments at their archive paths in parallel threads,
+        hardlinking each where the download and archive directories are on the
+        same file system and copying otherwise. archived files matching their
+        attachment's size and hash are left in place, and other existing files
+        are replaced. while watching the download directories, where files
+        may be edited in place, attachments are always copied, and archived
+        files hardlinked to their attachment are replaced with copies.
+
+        parameters:
+            attachments - a dataframe of attachments from the attachment log
+                with attachment_id, download_path, archive_path, and file_hash
+                columns
+        '''
+        root_directory = Path(self.config.get_option('archive_root_directory'))
+        unmatched_attachments = attachments.loc[:,'archive_path'].fillna('')==''
+        for download_path in attachments.loc[unmatched_attachments,'download_path']:
+            self.logger.log('Skipping File {} -- Does Not Match Any RA Templates'.format(download_path),'INFORMATION')
+        placements = [
+            (Path(download_path),root_directory/archive_path,file_hash if isinstance(file_hash,str) else '')
+            for download_path,archive_path,file_hash in attachments.loc[~unmatched_attachments,['download_path','archive_path','file_hash']].itertuples(index=False)
+        ]
+        with ThreadPoolExecutor() as executor:
+            results = list(executor.map(lambda placement: place_attachment(*placement,link=not self.watching),placements))
+        for (download_path,archive_path,_),(placement,replaced) in zip(placements,results):
+            if placement=='unchanged':
+                self.logger.log('Skipping File {} -- Already Exists in Archive as {}'.format(download_path,archive_path),'INFORMATION')
+            elif placement=='missing':
+                self.logger.log('Unable to Copy {} to Archive'.format(download_path),'INFORMATION')
+            else:
+                if placement in ('copied','extracted'):
+                    self.timer.count_file(download_path,'read')
+                    self.timer.count_file(archive_path,'written')
+                else:
+                    pass
+                placement_verb = {'linked':'Linking','copied':'Copying','extracted':'Extracting'}[placement]
+                self.logger.log('{} {} to {}{}'.format(placement_verb,download_path,archive_path,' -- Replacing Changed File' if replaced else ''),'INFORMATION')
 
     def unzip(self,path:Path):
         '''
@@ -514,15 +534,114 @@ class Organizer:
         # self.traverse(self.config.paths.get_path('downloads_internal'),'internal')
         # self.traverse(self.config.paths.get_path('downloads_external'),'external')
         # self.cleanup(self.config.paths.get_path('download_directory'))
-        self.ingest_manual_downloads()
-        self.validate_all()
-        self.set_versions()
-        self.copy_rename_all()
+        for step in [self.ingest_manual_downloads,self.validate_all,self.set_versions,self.copy_rename_all]:
+            with self.timer.span(step.__name__):
+                step()
+
+    def watch(self,poll_interval:float=None,max_polls:int=None):
+        '''
+        watches the download directories for manually placed files between
+        scheduled runs. files which are new or modified since they were last
+        ingested are added to the attachment log once their size and
+        modification time are unchanged for one poll, and are then validated
+        and copied to the archive. the modification times of known files are
+        saved next to the attachment log so that watching resumes where it
+        left off after a restart. watching continues until interrupted or
+        until the given number of polls is reached. attachments are copied
+        rather than hardlinked to the archive while watching.
+
+        parameters:
+            poll_interval - seconds between checks of the download directories;
+                if not provided, the watch_poll_interval option is used
+            max_polls - an optional number of checks after which to stop
+        '''
+        if poll_interval is None:
+            poll_interval = self.config.get_option('watch_poll_interval')
+        else:
+            pass
+        attachment_log_path = self.config.paths.get_path('attachment_log')
+        known_files_path = attachment_log_path.with_name(attachment_log_path.stem+'_watched.json')
+        if known_files_path.is_file():
+            with known_files_path.open('r') as f:
+                known_files = json.load(f)
+        else:
+            # files already in the attachment log are known as of their current modification times:
+            logged_paths = set(self.attachment_logger.data.loc[:,'download_path'].values)
+            known_files = {str(path):path.stat().st_mtime_ns for path,_ in self.get_download_paths() if str(path) in logged_paths and path.is_file()}
+        pending_files = dict()
+        polls = 0
+        self.watching = True
+        if self.config.get_option('archive_placement_mode')=='link':
+            # archived files hardlinked to downloads would change with any edit to the download:
+            self.logger.log('Replacing Hardlinked Archive Files with Copies While Watching','INFORMATION')
+            self.copy_rename_all()
+        else:
+            pass
+        self.logger.log('Watching Download Directories Every {} Seconds'.format(poll_interval),'INFORMATION')
+        try:
+            while max_polls is None or polls<max_polls:
+                settled_files = []
+                changed_files = dict()
+                for path,sender_group in self.get_download_paths():
+                    try:
+                        status = path.stat()
+                    except FileNotFoundError:
+                        continue
+                    if path.is_file() and known_files.get(str(path))!=status.st_mtime_ns:
+                        if pending_files.get(str(path))==(status.st_mtime_ns,status.st_size):
+                            settled_files.append((path,sender_group,str(path) in known_files.keys()))
+                            known_files[str(path)] = status.st_mtime_ns
+                        else:
+                            # wait for files still being written to settle:
+                            changed_files[str(path)] = (status.st_mtime_ns,status.st_size)
+                    else:
+                        pass
+                pending_files = changed_files
+                if len(settled_files)>0:
+                    # reload the logs, which may have been updated by a scheduled run, and
+                    # skip new files which that run has already ingested:
+                    self.email_logger.load_log()
+                    self.attachment_logger.load_log()
+                    logged_paths = set(self.attachment_logger.data.loc[:,'download_path'].values)
+                    ready_files = [(path,sender_group) for path,sender_group,modified in settled_files if modified or str(path) not in logged_paths]
+                    if len(ready_files)>0:
+                        self.logger.log('Ingesting {} New or Modified Files from Download Directories'.format(len(ready_files)),'INFORMATION')
+                        with self.timer.span('watch'):
+                            with self.timer.span('ingest_manual_downloads'):
+                                self.ingest_manual_downloads(ready_files)
+                            for step in [self.validate_all,self.set_versions,self.copy_rename_all]:
+                                with self.timer.span(step.__name__):
+                                    step()
+                    else:
+                        pass
+                else:
+                    pass
+                if len(settled_files)>0 or not known_files_path.is_file():
+                    with known_files_path.open('w') as f:
+                        json.dump(known_files,f,indent=2)
+                else:
+                    pass
+                polls += 1
+                if max_polls is None or polls<max_polls:
+                    time.sleep(poll_interval)
+                else:
+                    pass
+        except KeyboardInterrupt:
+            self.logger.log('Stopped Watching Download Directories','INFORMATION')
+        finally:
+            self.watching = False
 
     def compress_archive(self):
         '''
-        creates a zip archive and populates it with compressed copies of the
-        files specified in the Organizer instance's Paths object.
+        creates or updates a zip archive containing the files specified in the
+        Organizer instance's Paths object. excel files, which are already zip
+        containers, are stored without further compression and other files are
+        deflated. files are read and hashed in parallel threads, then
+        compressed and written to the archive in order. a manifest of each
+        archived file's
+        size, modification time, and hash is saved next to the archive, so
+        that only new or changed files are written when the archive is
+        updated.
         '''
         # get list of current lses from summary template file:
         path = self.config.paths.get_path('ra_summary_template')
@@ -532,13 +651,579 @@ class Organizer:
         path_ids = [(path_id,None) for path_id in filter(lambda s: s!='ra_monthly_filing',self.config.paths.files_for_archive)] + \
             list(zip(['ra_monthly_filing'] * len(active_lses),active_lses))
         paths = [path_id for path_ids in [self.config.paths.get_all_versions(path_id[0],organization=self.config.organizations.get_organization(path_id[1])) for path_id in path_ids] for path_id in path_ids]
-        if self.config.paths.get_path('results_archive').exists():
-            self.config.paths.get_path('results_archive').unlink()
+        paths = [path for path in paths if path is not None and path.is_file()]
+        archive_path = self.config.paths.get_path('results_archive')
+        manifest_path = archive_path.with_name(archive_path.stem+'_manifest.json')
+        if archive_path.is_file() and manifest_path.is_file():
+            with manifest_path.open('r') as f:
+                manifest = json.load(f)
+            with ZipFile(archive_path,'r') as previous_archive:
+                previous_arcnames = set(previous_archive.namelist())
+        else:
+            manifest = dict()
+            previous_arcnames = set()
+        # check files against the manifest in parallel, hashing only those with changed sizes or timestamps:
+        with ThreadPoolExecutor() as executor:
+            members = list(executor.map(lambda path: get_archive_member(path,manifest.get(get_arcname(path))),paths))
+        members = {member['arcname']:member for member in members}
+        changed_members = [arcname for arcname,member in members.items() if arcname not in manifest.keys() or manifest[arcname]['file_hash']!=member['file_hash']]
+        removed_members = [arcname for arcname in manifest.keys() if arcname not in members.keys()]
+        compression_level = self.config.get_option('results_archive_compression_level')
+        def read_member(arcname:str,previous_archive:ZipFile=None):
+            if previous_archive is not None:
+                previous_zinfo = previous_archive.getinfo(arcname)
+                zinfo = ZipInfo(previous_zinfo.filename,previous_zinfo.date_time)
+                zinfo.compress_type = previous_zinfo.compress_type
+                zinfo.external_attr = previous_zinfo.external_attr
+                contents = previous_archive.read(arcname)
+            else:
+                path = Path(members[arcname]['path'])
+                zinfo = ZipInfo.from_file(path,arcname=arcname)
+                zinfo.compress_type = get_compress_type(path)
+                contents = path.read_bytes()
+                self.timer.count_file(path,'read')
+            return (zinfo,contents)
+        def write_members(archive:ZipFile,arcnames:list,previous_archive:ZipFile=None):
+            # read members in parallel, in batches to limit the contents held in memory:
+            batch_size = 4*(os.cpu_count() or 1)
+            with ThreadPoolExecutor() as executor:
+                for i in range(0,len(arcnames),batch_size):
+                    for zinfo,contents in executor.map(lambda arcname: read_member(arcname,previous_archive),arcnames[i:i+batch_size]):
+                        archive.writestr(zinfo,contents,compress_type=zinfo.compress_type,compresslevel=compression_level)
+        if len(changed_members)==0 and len(removed_members)==0 and len(manifest)>0:
+            self.logger.log('Results Archive Up to Date: {}'.format(archive_path),'INFORMATION')
+        elif len(manifest)>0 and len(removed_members)==0 and all([arcname not in previous_arcnames for arcname in changed_members]):
+            # only new files, which are appended to the existing archive; a
+            # changed file already in the archive requires a rebuild instead:
+            with ZipFile(archive_path,'a') as archive:
+                write_members(archive,changed_members)
+            self.logger.log('Added {} Files to Results Archive: {}'.format(len(changed_members),archive_path),'INFORMATION')
+            self.timer.count_file(archive_path,'written')
+        else:
+            # rebuild the archive, carrying over unchanged members from the previous archive:
+            temporary_path = archive_path.with_name(archive_path.name+'.tmp')
+            with ZipFile(temporary_path,'w') as archive:
+                if len(manifest)>0:
+                    with ZipFile(archive_path,'r') as previous_archive:
+                        unchanged_members = [arcname for arcname in members.keys() if arcname not in changed_members and arcname in previous_arcnames]
+                        write_members(archive,unchanged_members,previous_archive)
+                        write_members(archive,[arcname for arcname in members.keys() if arcname not in unchanged_members])
+                else:
+                    write_members(archive,list(members.keys()))
+            temporary_path.replace(archive_path)
+            self.logger.log('Rebuilt Results Archive with {} New or Changed and {} Removed Files: {}'.format(len(changed_members),len(removed_members),archive_path),'INFORMATION')
+            self.timer.count_file(archive_path,'written')
+        with manifest_path.open('w') as f:
+            json.dump(members,f,indent=2)
+
+def classify_attachment(config:ConfigurationOptions,download_path:Path,sender_group:str):
+    '''
+    reviews a downloaded attachment and categorizes it based on its relevance
+    to the resource adequacy filing program. returns a dictionary with the
+    attachment's ra_category, organization_id, and effective_date, and a list
+    of (message,criticality) tuples to be logged, so that attachments can be
+    classified in worker processes and logged by the calling process.
+
+    parameters:
+        config - an instance of the ConfigurationOptions class
+        download_path - path object pointing to the downloaded attachment, or
+            to a file within a downloaded zip archive
+        sender_group - the group of the email's sender, either 'internal' or
+            'external'
+    '''
+    attachment_values = {}
+    messages = []
+    def set_attachment_value(column,value):
+        attachment_values[column] = value
+    if attachment_exists(download_path):
+        if download_path.suffix in ('.xlsx','.xlsm'):
+            with open_attachment(download_path) as f:
+                try:
+                    sheetnames = {
+                        'monthly_filing' : [
+                            'Certification',
+                            'LSE Allocations',
+                            'I_Phys_Res_Import_RA_Res',
+                            'III_Demand_Response',
+                        ],
+                        'cam_rmr_update' : ['Jun to Dec CAM Update','Diablo Canyon Credits'],
+                        'incremental_local' : ['IncrementalLocal'],
+                        'year_ahead' : [
+                            'loadforecastinputdata',
+                            'DRforAllocation',
+                            'Flexrequirements',
+                            'Flex RMR',
+                            'Local RA-CAM-{}'.format(pd.to_datetime(config.filing_month).year),
+                        ],
+                        'month_ahead' : ['Monthly Tracking'],
+                        'cam_rmr' : [
+                            'CAMRMR',
+                            'monthlytracking',
+                        ],
+                        'supply_plan': ['Export'],
+                        'nqc_list' : r'(\d{4}).*NQC List',
+                    }
+                    # classify by the sheet names in the workbook manifest, loading
+                    # the workbook only to read cells from candidate files:
+                    workbook_sheetnames = get_workbook_sheetnames(f)
+                    wb = None
+                    def load_candidate_workbook():
+                        f.seek(0)
+                        return load_workbook(io.BytesIO(f.read()),data_only=True,read_only=True)
+                    # monthly filing:
+                    if all([sheetname in workbook_sheetnames for sheetname in sheetnames['monthly_filing']]):
+                        set_attachment_value('ra_category','ra_monthly_filing')
+                        wb = load_candidate_workbook()
+                        sheet = wb['Certification']
+                        if config.organizations.lookup_id(sheet['B5'].value):
+                            submittal_information = {
+                                'date' : sheet['B3'].value,
+                                'organization_full' : sheet['B5'].value,
+                                'organization_id' : config.organizations.lookup_id(sheet['B5'].value),
+                                'organization_representative' : {
+                                    'name' : sheet['B21'].value,
+                                    'title' : sheet['B23'].value,
+                                    'email' : sheet['B22'].value,
+                                    'sign_date' : sheet['B24'].value,
+                                },
+                                'organization_contact' : {
+                                    'name' : sheet['B28'].value,
+                                    'title' : sheet['B29'].value,
+                                    'address' : '{}\n{}\n{}, {} {}'.format(
+                                        sheet['B30'].value,
+                                        sheet['B31'].value,
+                                        sheet['B32'].value,
+                                        sheet['B33'].value,
+                                        sheet['B34'].value
+                                    ),
+                                    'phone' : sheet['B35'].value,
+                                    'email' : sheet['B36'].value,
+                                },
+                                'organization_backup_contact' : {
+                                    'name' : sheet['B40'].value,
+                                    'title' : sheet['B41'].value,
+                                    'phone' : sheet['B42'].value,
+                                    'email' : sheet['B43'].value,
+                                },
+                                'compliance_period' : sheet['B3'].value,
+                                'submittal_date' : sheet['B7'].value,
+                            }
+                            effective_date = submittal_information['date']
+                            if not isinstance(effective_date,dt):
+                                effective_date = config.filing_month
+                            else:
+                                pass
+                            set_attachment_value('effective_date',effective_date)
+                            set_attachment_value('organization_id',submittal_information['organization_id'])
+                        else:
+                            messages.append(('Load Serving Entity Alias Not Recognized: \'{}\'\tAdd ID and Aliases to {}'.format(sheet['B5'].value,config.paths.get_path('organizations')),'WARNING'))
+                            effective_date = config.filing_month
+                            set_attachment_value('effective_date',effective_date)
+                            set_attachment_value('organization_id','[LSE Alias Not Recognized]')
+                    # CAM, RMR, and Diablo Canyon credit true-up:
+                    elif all([sheetname in workbook_sheetnames for sheetname in sheetnames['cam_rmr_update']]) and sender_group=='internal':
+                        set_attachment_value('ra_category','cam_rmr_update')
+                        set_attachment_value('organization_id','CEC')
+                        if re.match(r'.*(\d{4}).*',download_path.name):
+                            effective_date = pd.to_datetime(re.match(r'.*(\d{4}).*',download_path.name).groups()[0]).replace(month=6)
+                            set_attachment_value('effective_date',effective_date)
+                        else:
+                            effective_date = config.filing_month.replace(month=6)
+                            set_attachment_value('effective_date',effective_date)
+                    # incremental local:
+                    elif all([sheetname in workbook_sheetnames for sheetname in sheetnames['incremental_local']]) and sender_group=='internal':
+                        set_attachment_value('ra_category','incremental_local')
+                        set_attachment_value('organization_id','CEC')
+                        if re.match(r'.*(\d{4}).*',download_path.name):
+                            effective_date = pd.to_datetime(re.match(r'.*(\d{4}).*',download_path.name).groups()[0]).replace(month=7)
+                            set_attachment_value('effective_date',effective_date)
+                        else:
+                            effective_date = config.filing_month.replace(month=7)
+                            set_attachment_value('effective_date',effective_date)
+                    # year ahead:
+                    elif all([sheetname in workbook_sheetnames for sheetname in sheetnames['year_ahead']]) and sender_group=='internal':
+                        set_attachment_value('ra_category','year_ahead')
+                        set_attachment_value('organization_id','CEC')
+                        if re.match(r'.*(\d{4}).*',download_path.name):
+                            effective_date = pd.to_datetime(re.match(r'.*(\d{4}).*',download_path.name).groups()[0])
+                            set_attachment_value('effective_date',effective_date)
+                        else:
+                            effective_date = config.filing_month
+                            set_attachment_value('effective_date',effective_date)
+                    # month ahead:
+                    elif all([sheetname in workbook_sheetnames for sheetname in sheetnames['month_ahead']]) and sender_group=='internal':
+                        set_attachment_value('ra_category','month_ahead')
+                        set_attachment_value('organization_id','CPUC')
+                        if re.match(r'.*(\d{4}).*',download_path.name):
+                            effective_date = pd.to_datetime(re.match(r'.*(\d{4}).*',download_path.name).groups()[0])
+                            set_attachment_value('effective_date',effective_date)
+                        else:
+                            effective_date = config.filing_month
+                            set_attachment_value('effective_date',effective_date)
+                    # cam-rmr:
+                    elif all([sheetname in workbook_sheetnames for sheetname in sheetnames['cam_rmr']]) and sender_group=='internal':
+                        wb = load_candidate_workbook()
+                        effective_date = pd.to_datetime(dt.strptime(' '.join(re.match(r'(\w{3})MA(\d{2})',wb['CAMRMR']['A1'].value).groups()),'%b %y'))
+                        set_attachment_value('ra_category','cam_rmr')
+                        set_attachment_value('organization_id','CPUC')
+                        set_attachment_value('effective_date',effective_date)
+                    # nqc list:
+                    elif any([re.match(sheetnames['nqc_list'], s) for s in workbook_sheetnames]):
+                        matching_sheetnames = filter(lambda s: s,[re.match(sheetnames['nqc_list'], s) for s in workbook_sheetnames])
+                        effective_date = ts(min([int(x.groups()[0]) for x in matching_sheetnames]),1,1)
+                        set_attachment_value('ra_category','nqc_list')
+                        set_attachment_value('organization_id','CPUC')
+                        set_attachment_value('effective_date',effective_date)
+                    # system and flexible supply plans:
+                    elif all(sheetname in workbook_sheetnames for sheetname in sheetnames['supply_plan']):
+                        wb = load_candidate_workbook()
+                        sheet = wb[sheetnames['supply_plan'][0]]
+                        columns = list(next(sheet.iter_rows(min_row=1,max_row=1,values_only=True),[]))
+                        system_columns = [
+                            r'\s*validation\s*',
+                            r'\s*scid\s*',
+                            r'.*id\s*',
+                            r'\s*local.*',
+                            r'\s*system.*',
+                            r'.*total.*',
+                            r'.*start.*',
+                            r'.*end.*',
+                            r'.*lse.*',
+                            r'\s*errors.*warnings\s*',
+                        ]
+                        local_columns = [
+                            r'\s*validation\s*',
+                            r'\s*supplier\s*',
+                            r'.*id\s*',
+                            r'\s*category\s*',
+                            r'\s*flex.*',
+                            r'.*start.*',
+                            r'.*end.*',
+                            r'\s*lse\s*',
+                            r'\s*errors.*warnings\s*',
+                        ]
+                        effective_date_elements = re.match(r'.*\s(\d{1,2})[_\W](\d{1,2})[_\W](\d{2,4}).*',download_path.name).groups()
+                        if len(effective_date_elements[2])==2:
+                            effective_date = pd.to_datetime(dt.strptime('/'.join(effective_date_elements),'%m/%d/%y'))
+                        else:
+                            effective_date = pd.to_datetime(dt.strptime('/'.join(effective_date_elements),'%m/%d/%Y'))
+                        effective_date = effective_date.replace(effective_date.year+int((effective_date.month+1)/12),(effective_date.month+1)%12+1,1)
+                        if len(columns)>=len(system_columns) and all([re.match(s,columns[i].lower()) for i,s in enumerate(system_columns)]):
+                            set_attachment_value('ra_category','supply_plan_system')
+                            set_attachment_value('effective_date',effective_date)
+                            set_attachment_value('organization_id','CAISO')
+                        elif len(columns)>=len(local_columns) and all([re.match(s,columns[i].lower()) for i,s in enumerate(local_columns)]):
+                            set_attachment_value('ra_category','supply_plan_flexible')
+                            set_attachment_value('effective_date',effective_date)
+                            set_attachment_value('organization_id','CAISO')
+                        else:
+                            messages.append(('Input Excel File Does Not Match Templates: '.format(download_path),'INFORMATION'))
+                            set_attachment_value('ra_category','none')
+                            set_attachment_value('effective_date','NaT')
+                            set_attachment_value('organization_id','n/a')
+                        # system supply plan:
+                        # flexible supply plan:
+                    else:
+                        set_attachment_value('ra_category','none')
+                        set_attachment_value('organization_id','n/a')
+                        set_attachment_value('effective_date','NAT')
+                    if wb is not None:
+                        wb.close()
+                    else:
+                        pass
+                except BadZipFile:
+                    messages.append(('Unable to open Excel file: {}'.format(download_path),'WARNING'))
+                    set_attachment_value('ra_category','none')
+                    set_attachment_value('organization_id','n/a')
+                    set_attachment_value('effective_date','NAT')
+        # system and flexible supply plans (old format):
+        elif download_path.suffix=='.xls' and sender_group=='internal':
+            with open_attachment(download_path) as f:
+                wb = xlrd.open_workbook(file_contents=f.read())
+            sheet = wb.sheet_by_index(0)
+            columns = [sheet.cell_value(rowx=0,colx=column_number) for column_number in range(sheet.ncols)]
+            system_columns = [
+                r'\s*validation\s*',
+                r'\s*scid\s*',
+                r'.*id\s*',
+                r'\s*local.*',
+                r'\s*system.*',
+                r'.*total.*',
+                r'.*start.*',
+                r'.*end.*',
+                r'.*lse.*',
+                r'\s*errors.*warnings\s*',
+            ]
+            local_columns = [
+                r'\s*validation\s*',
+                r'\s*supplier\s*',
+                r'.*id\s*',
+                r'\s*category\s*',
+                r'\s*flex.*',
+                r'.*start.*',
+                r'.*end.*',
+                r'\s*lse\s*',
+                r'\s*errors.*warnings\s*',
+            ]
+            effective_date_elements = re.match(r'.*\s(\d{1,2})[_\W](\d{1,2})[_\W](\d{2,4}).*',download_path.name).groups()
+            if len(effective_date_elements[2])==2:
+                effective_date = pd.to_datetime(dt.strptime('/'.join(effective_date_elements),'%m/%d/%y'))
+            else:
+                effective_date = pd.to_datetime(dt.strptime('/'.join(effective_date_elements),'%m/%d/%Y'))
+            effective_date = effective_date.replace(effective_date.year+int((effective_date.month+1)/12),(effective_date.month+1)%12+1,1)
+            if len(columns)>=len(system_columns) and all([re.match(s,columns[i].lower()) for i,s in enumerate(system_columns)]):
+                set_attachment_value('ra_category','supply_plan_system')
+                set_attachment_value('effective_date',effective_date)
+                set_attachment_value('organization_id','CAISO')
+            elif len(columns)>=len(local_columns) and all([re.match(s,columns[i].lower()) for i,s in enumerate(local_columns)]):
+                set_attachment_value('ra_category','supply_plan_flexible')
+                set_attachment_value('effective_date',effective_date)
+                set_attachment_value('organization_id','CAISO')
+            else:
+                messages.append(('Input Excel File Does Not Match Templates: '.format(download_path),'INFORMATION'))
+                set_attachment_value('ra_category','none')
+                set_attachment_value('effective_date','NaT')
+                set_attachment_value('organization_id','n/a')
         else:
+            messages.append(('Skipping {} File: {}'.format(download_path.suffix,download_path),'INFORMATION'))
+            set_attachment_value('ra_category','none')
+            set_attachment_value('effective_date','NaT')
+            set_attachment_value('organization_id','n/a')
+    else:
+        messages.append(('Input File Not Found: {}'.format(download_path),'WARNING'))
+        set_attachment_value('ra_category','none')
+        set_attachment_value('effective_date','NaT')
+        set_attachment_value('organization_id','n/a')
+    return (attachment_values,messages)
+
+def classify_attachments(configuration_path:Path,filing_month:ts,attachments:list):
+    '''
+    classifies a list of attachments in a worker process, returning a list of
+    (attachment_id,attachment_values,messages) tuples.
+
+    parameters:
+        configuration_path - path object pointing to a yaml file containing
+            configuration options
+        filing_month - the filing month being organized
+        attachments - a list of (attachment_id,download_path,sender_group)
+            tuples
+    '''
+    config = ConfigurationOptions(configuration_path,filing_month=filing_month)
+    return [(attachment_id,)+classify_attachment(config,Path(download_path),sender_group) for attachment_id,download_path,sender_group in attachments]
+
+def place_attachment(download_path:Path,archive_path:Path,file_hash:str='',link:bool=True):
+    '''
+    hardlinks or copies a downloaded attachment to its archive path unless the
+    archived file already matches, returning a tuple with the placement, one
+    of 'linked', 'copied', 'extracted', 'unchanged', or 'missing', and
+    whether a changed file was replaced. files within zip attachments are
+    extracted directly to their archive paths.
+
+    parameters:
+        download_path - path object pointing to the downloaded attachment
+        archive_path - path object pointing to the attachment's location in
+            the archive
+        file_hash - the sha-256 digest of the attachment's contents, if known
+        link - if false, the attachment is always copied, and an archived file
+            hardlinked to the attachment is replaced with a copy
+    '''
+    if download_path.is_file():
+        contents = None
+        size = download_path.stat().st_size
+    elif attachment_exists(download_path):
+        # files within zip attachments are read into memory and extracted:
+        with open_attachment(download_path) as f:
+            contents = f.read()
+        size = len(contents)
+    else:
+        return ('missing',False)
+    replaced = False
+    if archive_path.is_file():
+        if contents is None and os.path.samefile(download_path,archive_path):
+            if link:
+                return ('unchanged',False)
+            else:
+                archive_path.unlink()
+        elif archive_path.stat().st_size==size and get_file_hash(archive_path)==(
+            file_hash if file_hash!='' else get_file_hash(download_path) if contents is None else hashlib.sha256(contents).hexdigest()
+        ):
+            return ('unchanged',False)
+        else:
+            archive_path.unlink()
+            replaced = True
+    else:
+        archive_path.parent.mkdir(parents=True,exist_ok=True)
+    if contents is not None:
+        archive_path.write_bytes(contents)
+        return ('extracted',replaced)
+    elif link and download_path.stat().st_dev==archive_path.parent.stat().st_dev:
+        try:
+            os.link(download_path,archive_path)
+            return ('linked',replaced)
+        except OSError:
             pass
-        with ZipFile(self.config.paths.get_path('results_archive'),'x') as archive:
-            for path in paths:
-                if path is not None and path.is_file():
-                    archive.write(path,arcname=str(path))
+    else:
+        pass
+    shutil.copyfile(download_path,archive_path)
+    return ('copied',replaced)
+
+def get_compress_type(path:Path):
+    '''
+    returns the zip compression method for a file in the results archive:
+    excel files, which are already compressed, are stored, and other files are
+    deflated.
+
+    parameters:
+        path - path object pointing to a file to be archived
+    '''
+    if path.suffix.lower() in ('.xlsx','.xlsm','.xls','.zip'):
+        return ZIP_STORED
+    else:
+        return ZIP_DEFLATED
+
+def get_arcname(path:Path):
+    '''
+    returns the name under which a file is stored in the results archive,
+    normalized as ZipInfo.from_file normalizes names written to an archive,
+    i.e., without a drive or leading separator and with forward slashes, so
+    that names in the manifest match those listed by ZipFile.namelist.
+
+    parameters:
+        path - path object pointing to a file to be archived
+    '''
+    return PurePath(os.path.normpath(os.path.splitdrive(str(path))[1])).as_posix().lstrip('/')
+
+def get_archive_member(path:Path,manifest_entry:dict=None):
+    '''
+    returns a results archive manifest entry for a file, reusing the hash in
+    the previous entry if the file's size and modification time are unchanged.
+
+    parameters:
+        path - path object pointing to a file to be archived
+        manifest_entry - the file's entry in the previous manifest, if any
+    '''
+    status = path.stat()
+    if manifest_entry is not None and manifest_entry['size']==status.st_size and manifest_entry['modified']==status.st_mtime_ns:
+        file_hash = manifest_entry['file_hash']
+    else:
+        file_hash = get_file_hash(path)
+    return {
+        'arcname' : get_arcname(path),
+        'path' : str(path),
+        'size' : status.st_size,
+        'modified' : status.st_mtime_ns,
+        'file_hash' : file_hash,
+    }
+
+def split_zip_member_path(download_path:Path):
+    '''
+    splits a path to a file within a downloaded zip archive, e.g.,
+    downloads/filings.zip/june/RAFiling.xlsx, into the path of the zip file
+    and the file's name within the archive, returning (None,None) if the path
+    does not pass through a zip file.
+
+    parameters:
+        download_path - path object pointing to a file within a zip archive
+    '''
+    for archive_path in download_path.parents:
+        if archive_path.suffix.lower()=='.zip' and archive_path.is_file():
+            return (archive_path,download_path.relative_to(archive_path).as_posix())
+        else:
+            pass
+    return (None,None)
+
+def read_zip_member(archive,member:str):
+    '''
+    reads the contents of a file within a zip archive, opening any nested zip
+    archives named in the member's path in memory. raises KeyError if the
+    archive does not contain the file.
+
+    parameters:
+        archive - a path or binary file object pointing to a zip archive
+        member - the name of the file within the archive, which may pass
+            through nested zip archives, e.g., june.zip/RAFiling.xlsx
+    '''
+    with ZipFile(archive,'r') as z:
+        names = set(z.namelist())
+        if member in names:
+            return z.read(member)
+        else:
+            parts = member.split('/')
+            for i in range(1,len(parts)):
+                nested_archive = '/'.join(parts[:i])
+                if nested_archive in names and nested_archive.lower().endswith('.zip'):
+                    return read_zip_member(io.BytesIO(z.read(nested_archive)),'/'.join(parts[i:]))
+                else:
+                    pass
+    raise KeyError(member)
+
+def attachment_exists(download_path:Path):
+    '''
+    checks whether a downloaded attachment, or a file within a downloaded zip
+    archive, exists.
+
+    parameters:
+        download_path - path object pointing to the attachment
+    '''
+    if download_path.is_file():
+        return True
+    else:
+        archive_path,member = split_zip_member_path(download_path)
+        if archive_path is not None:
+            try:
+                read_zip_member(archive_path,member)
+                return True
+            except (KeyError,BadZipFile):
+                return False
+        else:
+            return False
+
+def open_attachment(download_path:Path):
+    '''
+    opens a downloaded attachment as a binary file object. files within
+    downloaded zip archives are read into memory rather than extracted.
+
+    parameters:
+        download_path - path object pointing to the attachment, or to a file
+            within a downloaded zip archive
+    '''
+    if download_path.is_file():
+        return open(download_path,'rb')
+    else:
+        archive_path,member = split_zip_member_path(download_path)
+        if archive_path is not None:
+            try:
+                return io.BytesIO(read_zip_member(archive_path,member))
+            except (KeyError,BadZipFile):
+                pass
+        else:
+            pass
+    raise FileNotFoundError(str(download_path))
+
+def list_zip_members(download_path:Path,archive:io.BytesIO=None):
+    '''
+    lists the files within a downloaded zip archive without extracting it,
+    returning a list of (path,file_hash) tuples with paths passing through
+    the archive, e.g., downloads/filings.zip/june/RAFiling.xlsx. files
+    within nested zip archives are listed in place of the nested archives.
+
+    parameters:
+        download_path - path object pointing to a zip archive, or to a zip
+            archive nested within another
+        archive - an optional file object containing the archive, used when
+            listing nested archives already read into memory
+    '''
+    members = []
+    with (open_attachment(download_path) if archive is None else archive) as f:
+        with ZipFile(f,'r') as z:
+            for member in filter(lambda member: not member.is_dir(),z.infolist()):
+                contents = z.read(member)
+                member_path = download_path / member.filename
+                if member.filename.lower().endswith('.zip'):
+                    try:
+                        members += list_zip_members(member_path,io.BytesIO(contents))
+                    except BadZipFile:
+                        members.append((member_path,hashlib.sha256(contents).hexdigest()))
                 else:
-                    pass
\ No newline at end of file
+                    members.append((member_path,hashlib.sha256(contents).hexdigest()))
+    return members
\ No newline at end of file